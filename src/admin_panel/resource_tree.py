@@ -1,20 +1,34 @@
 from datetime import datetime
 from pathlib import Path
 
-from config import getClusterConfig
+from config import getClusterConfig, getSchedulerConfig
+from forecast.training import resolve_data_dir
 from scheduler.resources import ResourceAvailabilityTree
+from storage.constants import STATE_FILE
 from storage.service import slurmStorage
 
+# Индекс по сырому кэшу экспорта строится один раз на версию state.json.
+_JOB_INDEX_CACHE = {}
 
-def build_resource_tree_payload() -> dict:
-    timestamp = int(datetime.now().timestamp())
-    storage = slurmStorage().create()
-    try:
-        runningJobs = storage.getRunningJobs(timestamp)
-    finally:
-        storage.close()
 
+def build_resource_tree_payload(timestamp: int | None = None, projectRoot: str | Path | None = None) -> dict:
+    """
+    Resource tree for now from slurmdb, or for a past ``timestamp`` from the
+    local raw job cache of the forecast export without a DB connection.
+    """
     clusterConfig = getClusterConfig()
+    if timestamp is None:
+        timestamp = int(datetime.now().timestamp())
+        source = "slurmdb"
+        storage = slurmStorage().create()
+        try:
+            runningJobs = storage.getRunningJobs(timestamp)
+        finally:
+            storage.close()
+    else:
+        source = "raw_cache"
+        runningJobs = _load_historical_job_index(clusterConfig, projectRoot).getRunningJobs(timestamp)
+
     resourceTree = ResourceAvailabilityTree.fromClusterAndJobs(
         clusterConfig=clusterConfig,
         runningJobs=runningJobs,
@@ -64,6 +78,7 @@ def build_resource_tree_payload() -> dict:
         "cluster_config_file": str(Path(getattr(clusterConfig, "config_path", "") or "").resolve())
         if getattr(clusterConfig, "config_path", None)
         else None,
+        "source": source,
         "running_job_count": len(runningJobs),
         "feature_count": len(features),
         "node_count": len(allNodes),
@@ -79,6 +94,25 @@ def build_resource_tree_payload() -> dict:
     }
 
 
+def _load_historical_job_index(clusterConfig, projectRoot: str | Path | None):
+    dataDir = resolve_data_dir(
+        projectRoot or Path.cwd(), getattr(getSchedulerConfig(), "forecast_data_dir", None)
+    )
+    statePath = dataDir / STATE_FILE
+    cacheKey = (
+        str(dataDir),
+        statePath.stat().st_mtime_ns if statePath.exists() else None,
+        id(clusterConfig),
+    )
+    jobIndex = _JOB_INDEX_CACHE.get(cacheKey)
+    if jobIndex is None:
+        jobIndex = slurmStorage().loadHistoricalJobIndex(outputDir=dataDir, clusterConfig=clusterConfig)
+        _JOB_INDEX_CACHE.clear()
+        _JOB_INDEX_CACHE[cacheKey] = jobIndex
+
+    return jobIndex
+
+
 def _build_node_payload(node) -> dict:
     return {
         "name": node.nodeName,
@@ -16,6 +16,7 @@ except ModuleNotFoundError:
     logger.success = logger.info
 
 from config import getAdminPanelAccessConfig, getServerConfig
+from storage.timeutils import parse_time_value
 
 from .calendars import (
     create_calendar_file,
@@ -131,7 +132,13 @@ class AdminPanelServer:
 
         if path == "/api/resource-tree":
             try:
-                self._send_json(handler, build_resource_tree_payload())
+                self._send_json(
+                    handler,
+                    build_resource_tree_payload(
+                        timestamp=parse_time_value(params.get("at", [""])[0]),
+                        projectRoot=self.projectRoot,
+                    ),
+                )
             except Exception as error:
                 self._send_json(handler, {"error": str(error)}, status=HTTPStatus.BAD_REQUEST)
             return
@@ -7,6 +7,8 @@ from config.timezone import now_in_timezone
 from scheduler.attempt_cache import get_failed_job_pool_cleanup_status
 from scheduler.cron import SCHEDULER_INTERVAL_MINUTES, get_scheduler_service_status
 from scheduler.runtime_state import SchedulerRuntimeStateStore
+from storage.active_jobs import get_active_job_set_metrics
+from storage.repository import get_connection_pool_metrics
 
 
 def build_scheduler_system_status_payload(
@@ -70,6 +72,8 @@ def build_scheduler_system_status_payload(
         "failed_job_pool_cleanup_interval_seconds": failedJobPoolCleanup["cleanup_interval_seconds"],
         "failed_job_pool_next_cleanup_at": failedJobPoolCleanup["next_cleanup_at"],
     }
+    payload["db_pool"] = get_connection_pool_metrics()
+    payload["active_jobs"] = get_active_job_set_metrics()
     return payload
 
 
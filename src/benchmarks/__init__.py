@@ -0,0 +1 @@
+"""Performance benchmarks for TaskShift storage and scheduling hot paths."""
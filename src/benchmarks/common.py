@@ -0,0 +1,156 @@
+import random
+import time
+import tracemalloc
+
+from config.models import ClusterConfig, NodeGroupConfig, NodeResources, PartitionConfig
+from storage.models import HistoricalJob, RawHistoricalJobRow
+
+BENCHMARK_BASE_TIMESTAMP = 1700000000
+
+
+def build_benchmark_cluster_config(
+    featureCount: int = 4, nodesPerFeature: int = 32
+) -> ClusterConfig:
+    clusterConfig = ClusterConfig()
+    nodeNames = []
+    for featureIndex in range(featureCount):
+        firstNode = featureIndex * nodesPerFeature + 1
+        lastNode = firstNode + nodesPerFeature - 1
+        namePattern = f"bn-[{firstNode:05d}-{lastNode:05d}]"
+        nodeNames.append(namePattern)
+        clusterConfig.node_groups.append(
+            NodeGroupConfig(
+                name_pattern=namePattern,
+                node_count=nodesPerFeature,
+                weight=1,
+                features=[f"bench_{featureIndex}"],
+                resources=NodeResources(
+                    sockets=2,
+                    cores_per_socket=16,
+                    threads_per_core=1,
+                    gpus=4 if featureIndex % 2 == 0 else 0,
+                ),
+            )
+        )
+
+    clusterConfig.partitions.append(
+        PartitionConfig(
+            name="normal",
+            nodes=",".join(nodeNames),
+            state="UP",
+            max_cpus_per_node=None,
+            max_nodes=None,
+        )
+    )
+    return clusterConfig
+
+
+def generate_historical_jobs(
+    jobCount: int,
+    spanDays: int = 90,
+    featureCount: int = 4,
+    nodesPerFeature: int = 32,
+    seed: int = 0,
+    baseTimestamp: int = BENCHMARK_BASE_TIMESTAMP,
+) -> list[HistoricalJob]:
+    generator = random.Random(seed)
+    spanSeconds = spanDays * 24 * 3600
+    jobs = []
+    for index in range(jobCount):
+        featureIndex = generator.randrange(featureCount)
+        nodeCount = generator.choice((1, 1, 1, 2, 4))
+        firstNode = featureIndex * nodesPerFeature + 1 + generator.randrange(
+            nodesPerFeature - nodeCount + 1
+        )
+        nodelist = (
+            f"bn-{firstNode:05d}"
+            if nodeCount == 1
+            else f"bn-[{firstNode:05d}-{firstNode + nodeCount - 1:05d}]"
+        )
+        timeStart = baseTimestamp + generator.randrange(spanSeconds)
+        timeEnd = timeStart + generator.randint(60, 2 * 24 * 3600)
+        cpus = nodeCount * generator.choice((1, 4, 8, 16, 32))
+        gpus = nodeCount * generator.choice((0, 1, 2, 4)) if featureIndex % 2 == 0 else 0
+        tresAlloc = f"1={cpus},4={nodeCount}" + (f",1001={gpus}" if gpus else "")
+        jobs.append(
+            HistoricalJob(
+                dbIndex=index + 1,
+                jobID=100000 + index,
+                jobName="bench",
+                timelimit=2880,
+                state=3,
+                priority=1,
+                constraints=f"bench_{featureIndex}",
+                cpusReq=cpus,
+                nodesAlloc=nodeCount,
+                timeStart=timeStart,
+                timeEnd=timeEnd,
+                timeSubmit=timeStart - 60,
+                timeEligible=timeStart - 60,
+                modTime=timeEnd,
+                tresReq=tresAlloc,
+                tresAlloc=tresAlloc,
+                nodelist=nodelist,
+                partition="normal",
+            )
+        )
+
+    return jobs
+
+
+def generate_raw_job_rows(jobCount: int, **kwargs) -> list[RawHistoricalJobRow]:
+    return [
+        RawHistoricalJobRow(
+            job_db_inx=job.dbIndex,
+            id_job=job.jobID,
+            job_name=job.jobName,
+            timelimit=job.timelimit,
+            state=job.state,
+            priority=job.priority,
+            constraints=job.constraints,
+            cpus_req=job.cpusReq,
+            nodes_alloc=job.nodesAlloc,
+            time_start=job.timeStart,
+            time_end=job.timeEnd,
+            time_submit=job.timeSubmit,
+            time_eligible=job.timeEligible,
+            mod_time=job.modTime,
+            tres_req=job.tresReq,
+            tres_alloc=job.tresAlloc,
+            nodelist=job.nodelist,
+            partition=job.partition,
+        )
+        for job in generate_historical_jobs(jobCount=jobCount, **kwargs)
+    ]
+
+
+def measure_seconds(callback, repeat: int = 1):
+    bestSeconds = None
+    result = None
+    for _ in range(max(1, repeat)):
+        startedAt = time.perf_counter()
+        result = callback()
+        elapsedSeconds = time.perf_counter() - startedAt
+        if bestSeconds is None or elapsedSeconds < bestSeconds:
+            bestSeconds = elapsedSeconds
+
+    return bestSeconds, result
+
+
+def measure_peak_bytes(callback) -> int:
+    # Отдельный прогон: tracemalloc заметно замедляет код и исказил бы время.
+    wasTracing = tracemalloc.is_tracing()
+    if wasTracing:
+        tracemalloc.reset_peak()
+    else:
+        tracemalloc.start()
+
+    try:
+        baselineBytes, _ = tracemalloc.get_traced_memory()
+        callback()
+        _, peakBytes = tracemalloc.get_traced_memory()
+    finally:
+        if not wasTracing:
+            tracemalloc.stop()
+
+    return max(0, peakBytes - baselineBytes)
@@ -0,0 +1,90 @@
+import argparse
+import json
+import tempfile
+from pathlib import Path
+
+from storage.constants import NODE_HEATMAP_FILE
+from storage.node_heatmap import NodeUtilizationHeatmap, build_node_utilization_heatmap
+
+from .common import build_benchmark_cluster_config, generate_historical_jobs, measure_seconds
+
+
+def run_node_heatmap_benchmark(
+    jobCount: int = 500_000,
+    spanDays: int = 365,
+    featureCount: int = 8,
+    nodesPerFeature: int = 512,
+    intervalMinutes: int = 15,
+    repeat: int = 1,
+) -> dict:
+    clusterConfig = build_benchmark_cluster_config(featureCount=featureCount, nodesPerFeature=nodesPerFeature)
+    jobs = generate_historical_jobs(
+        jobCount=jobCount, spanDays=spanDays, featureCount=featureCount, nodesPerFeature=nodesPerFeature
+    )
+    nowTimestamp = max(job.timeEnd for job in jobs)
+
+    buildSeconds, heatmap = measure_seconds(
+        lambda: build_node_utilization_heatmap(
+            jobs, clusterConfig, intervalMinutes=intervalMinutes, nowTimestamp=nowTimestamp
+        ),
+        repeat=repeat,
+    )
+    with tempfile.TemporaryDirectory() as tempDir:
+        heatmapPath = Path(tempDir) / NODE_HEATMAP_FILE
+        saveSeconds, _ = measure_seconds(lambda: heatmap.save(heatmapPath), repeat=repeat)
+        loadSeconds, loaded = measure_seconds(lambda: NodeUtilizationHeatmap.load(heatmapPath), repeat=repeat)
+        fileBytes = heatmapPath.stat().st_size
+
+    windowStart = loaded.rangeStart + (loaded.bucketCount // 2) * loaded.intervalSeconds
+    querySeconds, (_, _, block) = measure_seconds(
+        lambda: loaded.getMatrix(
+            loaded.nodeNames[: nodesPerFeature],
+            windowStart,
+            windowStart + 7 * 24 * 3600,
+            normalize=True,
+        ),
+        repeat=repeat,
+    )
+
+    return {
+        "jobs": jobCount,
+        "nodes": len(heatmap.nodeNames),
+        "buckets": heatmap.bucketCount,
+        "dense_cells": len(heatmap.nodeNames) * heatmap.bucketCount,
+        "stored_changes": int(len(heatmap.bucketIndexes)),
+        "file_bytes": fileBytes,
+        "query_block": list(block.shape),
+        "seconds": {
+            "build": buildSeconds,
+            "save": saveSeconds,
+            "load": loadSeconds,
+            "query_week_of_one_group": querySeconds,
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure building, storing and querying the per-node utilization heatmap"
+    )
+    parser.add_argument("--jobs", type=int, default=500_000)
+    parser.add_argument("--span-days", type=int, default=365)
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--nodes-per-feature", type=int, default=512)
+    parser.add_argument("--interval-minutes", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    report = run_node_heatmap_benchmark(
+        jobCount=args.jobs,
+        spanDays=args.span_days,
+        featureCount=args.features,
+        nodesPerFeature=args.nodes_per_feature,
+        intervalMinutes=args.interval_minutes,
+        repeat=args.repeat,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
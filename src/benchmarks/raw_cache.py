@@ -0,0 +1,106 @@
+import argparse
+import json
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+
+from storage.cache import (
+    append_cached_historical_job_rows,
+    load_cached_historical_job_columns,
+    save_cached_historical_job_rows,
+)
+from storage.columnar import ColumnarJobRows
+from storage.constants import RAW_JOBS_CACHE_DIR, RAW_JOBS_CACHE_FILE
+from storage.models import RawHistoricalJobRow
+
+from .common import generate_raw_job_rows, measure_seconds
+
+
+def run_raw_cache_benchmark(
+    jobCount: int = 200000, spanDays: int = 365, repeat: int = 1
+) -> dict:
+    rows = generate_raw_job_rows(jobCount=jobCount, spanDays=spanDays)
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        jsonPath = Path(tempDir) / RAW_JOBS_CACHE_FILE
+        columnsPath = Path(tempDir) / RAW_JOBS_CACHE_DIR
+
+        with open(jsonPath, "w", encoding="utf-8") as file:
+            json.dump([asdict(row) for row in rows], file, ensure_ascii=False)
+        save_cached_historical_job_rows(columnsPath, rows)
+
+        jsonLoadSeconds, _ = measure_seconds(
+            lambda: _load_json_rows(jsonPath), repeat=repeat
+        )
+        columnsLoadSeconds, columns = measure_seconds(
+            lambda: load_cached_historical_job_columns(columnsPath), repeat=repeat
+        )
+        jsonMaterializeSeconds, _ = measure_seconds(
+            lambda: [row.toHistoricalJob() for row in _load_json_rows(jsonPath)],
+            repeat=repeat,
+        )
+        columnsMaterializeSeconds, _ = measure_seconds(
+            lambda: load_cached_historical_job_columns(columnsPath).toHistoricalJobs(),
+            repeat=repeat,
+        )
+
+        cacheBytes = {
+            "json": jsonPath.stat().st_size,
+            "columnar": sum(
+                path.stat().st_size for path in columnsPath.rglob("*") if path.is_file()
+            ),
+        }
+
+        # Пакет синхронизации размером около процента истории: полная
+        # перезапись кэша против дописывания одного сегмента.
+        batchRows = ColumnarJobRows.fromRows(rows[-max(1, jobCount // 100):])
+        rewriteSeconds, _ = measure_seconds(
+            lambda: save_cached_historical_job_rows(
+                Path(tempDir) / "rewrite",
+                ColumnarJobRows.concat([columns, batchRows]),
+            ),
+            repeat=repeat,
+        )
+        appendSeconds, _ = measure_seconds(
+            lambda: append_cached_historical_job_rows(columnsPath, batchRows),
+            repeat=repeat,
+        )
+
+        return {
+            "rows": jobCount,
+            "span_days": spanDays,
+            "bytes": cacheBytes,
+            "load_seconds": {"json": jsonLoadSeconds, "columnar": columnsLoadSeconds},
+            "materialize_seconds": {
+                "json": jsonMaterializeSeconds,
+                "columnar": columnsMaterializeSeconds,
+            },
+            "sync_seconds": {"rewrite": rewriteSeconds, "append": appendSeconds},
+            "identical": columns.toRows()
+            == sorted(rows, key=lambda row: (row.time_start, row.id_job, row.job_db_inx)),
+        }
+
+
+def _load_json_rows(jsonPath: Path) -> list[RawHistoricalJobRow]:
+    # Так кэш читался до перехода на колонки.
+    with open(jsonPath, "r", encoding="utf-8") as file:
+        return [RawHistoricalJobRow.from_dict(item) for item in json.load(file)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare JSON and columnar raw job row caches"
+    )
+    parser.add_argument("--jobs", type=int, default=200000)
+    parser.add_argument("--span-days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    report = run_raw_cache_benchmark(
+        jobCount=args.jobs, spanDays=args.span_days, repeat=args.repeat
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import argparse
+import json
+
+from storage.constants import SERIES_ENGINE_NUMPY, SERIES_ENGINE_PYTHON
+from storage.series import (
+    ANALYSIS_FORCED_START_TIMESTAMPS,
+    _build_feature_events,
+    _build_overall_events,
+    _build_series_numpy,
+    _build_series_python,
+    _ClusterConfigTimeline,
+    _get_analysis_feature_names,
+    _resolve_series_range_end,
+    build_historical_utilization_series,
+)
+from storage.timeutils import floor_timestamp
+
+from .common import (
+    build_benchmark_cluster_config,
+    generate_historical_jobs,
+    measure_seconds,
+)
+
+
+def run_series_engine_benchmark(
+    jobCount: int = 20000,
+    spanDays: int = 180,
+    featureCount: int = 4,
+    intervalMinutes: int = 15,
+    repeat: int = 1,
+    workers: int = 1,
+) -> dict:
+    clusterConfig = build_benchmark_cluster_config(featureCount=featureCount)
+    jobs = generate_historical_jobs(
+        jobCount=jobCount, spanDays=spanDays, featureCount=featureCount
+    )
+
+    timings = {}
+    results = {}
+    for engine in (SERIES_ENGINE_PYTHON, SERIES_ENGINE_NUMPY):
+        timings[engine], results[engine] = measure_seconds(
+            lambda engine=engine: build_historical_utilization_series(
+                jobs=jobs,
+                clusterConfig=clusterConfig,
+                intervalMinutes=intervalMinutes,
+                engine=engine,
+            ),
+            repeat=repeat,
+        )
+
+    parallelTimings = {}
+    parallelIdentical = True
+    if workers > 1:
+        for engine in (SERIES_ENGINE_PYTHON, SERIES_ENGINE_NUMPY):
+            parallelTimings[engine], parallelResult = measure_seconds(
+                lambda engine=engine: build_historical_utilization_series(
+                    jobs=jobs,
+                    clusterConfig=clusterConfig,
+                    intervalMinutes=intervalMinutes,
+                    engine=engine,
+                    workers=workers,
+                ),
+                repeat=repeat,
+            )
+            parallelIdentical = parallelIdentical and parallelResult == results[engine]
+
+    sweepTimings = _measure_sweep_seconds(
+        jobs=jobs,
+        clusterConfig=clusterConfig,
+        intervalMinutes=intervalMinutes,
+        repeat=repeat,
+    )
+
+    return {
+        "jobs": jobCount,
+        "span_days": spanDays,
+        "features": featureCount,
+        "points_per_series": len(results[SERIES_ENGINE_PYTHON].get("overall", [])),
+        "seconds": timings,
+        "speedup": (
+            timings[SERIES_ENGINE_PYTHON] / timings[SERIES_ENGINE_NUMPY]
+            if timings[SERIES_ENGINE_NUMPY] > 0
+            else None
+        ),
+        "sweep_seconds": sweepTimings,
+        "identical": results[SERIES_ENGINE_PYTHON] == results[SERIES_ENGINE_NUMPY],
+        "workers": workers,
+        "parallel_seconds": parallelTimings,
+        "parallel_identical": parallelIdentical,
+    }
+
+
+def _measure_sweep_seconds(jobs, clusterConfig, intervalMinutes: int, repeat: int) -> dict:
+    # Отдельно меряем только проход по корзинам: разбор nodelist в события
+    # одинаков для обоих движков и сильно размывает разницу.
+    intervalSeconds = intervalMinutes * 60
+    timeline = _ClusterConfigTimeline.from_cluster_config(clusterConfig)
+    featureNames = _get_analysis_feature_names(timeline)
+    nowTimestamp = max(job.timeEnd for job in jobs)
+    featureLoads, _ = _build_feature_events(
+        jobs=jobs,
+        clusterConfigTimeline=timeline,
+        nowTimestamp=nowTimestamp,
+        allowedFeatures=set(featureNames),
+        forcedFeatureStartTimestamps=ANALYSIS_FORCED_START_TIMESTAMPS,
+    )
+    overallEvents = _build_overall_events(featureLoads)
+    sweepArguments = {
+        "featureNames": featureNames,
+        "featureLoads": featureLoads,
+        "overallEvents": overallEvents,
+        "clusterConfigTimeline": timeline,
+        "rangeStart": floor_timestamp(min(overallEvents), intervalSeconds),
+        "rangeEnd": _resolve_series_range_end(max(overallEvents), intervalSeconds),
+        "intervalSeconds": intervalSeconds,
+        "featureCommissionTimestamps": {},
+        "forcedFeatureStartTimestamps": ANALYSIS_FORCED_START_TIMESTAMPS,
+    }
+
+    return {
+        SERIES_ENGINE_PYTHON: measure_seconds(
+            lambda: _build_series_python(**sweepArguments), repeat=repeat
+        )[0],
+        SERIES_ENGINE_NUMPY: measure_seconds(
+            lambda: _build_series_numpy(**sweepArguments), repeat=repeat
+        )[0],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare python and numpy utilization series engines"
+    )
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--span-days", type=int, default=180)
+    parser.add_argument("--features", type=int, default=4)
+    parser.add_argument("--interval-minutes", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    report = run_series_engine_benchmark(
+        jobCount=args.jobs,
+        spanDays=args.span_days,
+        featureCount=args.features,
+        intervalMinutes=args.interval_minutes,
+        repeat=args.repeat,
+        workers=args.workers,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from forecast.service import ForecastService
+from forecast.training import build_current_year_seasonality_points, load_overall_series_frame
+from storage.constants import SERIES_ROLLUP_DIR
+from storage.series import write_historical_utilization_series
+
+from .common import measure_seconds
+
+SERIES_START_TIMESTAMP = 1_577_836_800
+
+
+def run_series_load_benchmark(spanDays: int = 1460, intervalMinutes: int = 15, repeat: int = 1) -> dict:
+    points = _generate_series_points(spanDays=spanDays, intervalMinutes=intervalMinutes)
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        seriesDir = Path(tempDir) / "series"
+        write_historical_utilization_series(seriesDir, {"overall": points}, intervalMinutes)
+        jsonPath = seriesDir / "overall.json"
+        arrayPath = seriesDir / "overall.npy"
+        service = ForecastService.__new__(ForecastService)
+
+        rollupAverageSeconds, rollupAverage = measure_seconds(
+            lambda: service._loadFeatureAverage(jsonPath), repeat=repeat
+        )
+        rollupSeasonalitySeconds, rollupSeasonality = measure_seconds(
+            lambda: build_current_year_seasonality_points(seriesDir=tempDir), repeat=repeat
+        )
+        cacheBytes = {"json": jsonPath.stat().st_size, "npy": arrayPath.stat().st_size}
+
+        # Без дневных агрегатов средние и сезонность считаются по 15-минутной серии.
+        shutil.rmtree(seriesDir / SERIES_ROLLUP_DIR)
+        arrayFrameSeconds, arrayFrame = measure_seconds(
+            lambda: load_overall_series_frame(tempDir), repeat=repeat
+        )
+        arrayAverageSeconds, arrayAverage = measure_seconds(
+            lambda: service._loadFeatureAverage(jsonPath), repeat=repeat
+        )
+
+        # Без бинарной копии загрузчики возвращаются к разбору JSON.
+        arrayPath.unlink()
+        jsonFrameSeconds, jsonFrame = measure_seconds(
+            lambda: load_overall_series_frame(tempDir), repeat=repeat
+        )
+        jsonAverageSeconds, jsonAverage = measure_seconds(
+            lambda: service._loadFeatureAverage(jsonPath), repeat=repeat
+        )
+        jsonSeasonalitySeconds, jsonSeasonality = measure_seconds(
+            lambda: build_current_year_seasonality_points(seriesDir=tempDir), repeat=repeat
+        )
+
+        return {
+            "points": len(points),
+            "bytes": cacheBytes,
+            "frame_seconds": {"json": jsonFrameSeconds, "npy": arrayFrameSeconds},
+            "average_seconds": {
+                "json": jsonAverageSeconds,
+                "npy": arrayAverageSeconds,
+                "rollup_1d": rollupAverageSeconds,
+            },
+            "seasonality_seconds": {"json": jsonSeasonalitySeconds, "rollup_1d": rollupSeasonalitySeconds},
+            "same_times": arrayFrame["time"].equals(jsonFrame["time"]),
+            "same_seasonality": rollupSeasonality == jsonSeasonality,
+            "max_value_difference": float(
+                max(
+                    np.abs(arrayFrame["cpu"] - jsonFrame["cpu"]).max(),
+                    np.abs(arrayFrame["gpu"] - jsonFrame["gpu"]).max(),
+                    abs(arrayAverage["gpu"] - jsonAverage["gpu"]),
+                    abs(rollupAverage["gpu"] - jsonAverage["gpu"]),
+                )
+            ),
+        }
+
+
+def _generate_series_points(spanDays: int, intervalMinutes: int) -> list[dict]:
+    random = np.random.default_rng(42)
+    pointCount = spanDays * 24 * 60 // intervalMinutes
+    cpuValues = np.round(random.uniform(0.0, 100.0, pointCount), 2).tolist()
+    gpuValues = np.round(random.uniform(0.0, 100.0, pointCount), 2).tolist()
+    return [
+        {
+            "time": SERIES_START_TIMESTAMP + index * intervalMinutes * 60,
+            "cpu": cpu,
+            "gpu": gpu,
+        }
+        for index, (cpu, gpu) in enumerate(zip(cpuValues, gpuValues))
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare JSON and npy utilization series loading"
+    )
+    parser.add_argument("--span-days", type=int, default=1460)
+    parser.add_argument("--interval-minutes", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    report = run_series_load_benchmark(
+        spanDays=args.span_days,
+        intervalMinutes=args.interval_minutes,
+        repeat=args.repeat,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
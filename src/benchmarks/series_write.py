@@ -0,0 +1,83 @@
+import argparse
+import json
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from storage.jsonio import write_json_array_stream
+from storage.timeutils import format_timestamp
+
+from .common import measure_seconds
+
+SERIES_START_TIMESTAMP = 1_577_836_800
+
+
+def run_series_write_benchmark(spanDays: int = 1460, intervalMinutes: int = 15, repeat: int = 1) -> dict:
+    pointCount = spanDays * 24 * 60 // intervalMinutes
+
+    def iterPoints(formatTime=format_timestamp):
+        random = np.random.default_rng(42)
+        for index in range(pointCount):
+            yield {
+                "time": formatTime(SERIES_START_TIMESTAMP + index * intervalMinutes * 60),
+                "cpu": round(float(random.uniform(0.0, 100.0)), 2),
+                "gpu": round(float(random.uniform(0.0, 100.0)), 2),
+            }
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        outputPath = Path(tempDir)
+
+        def writeIndented():
+            points = list(iterPoints())
+            with open(outputPath / "indented.json", "w", encoding="utf-8") as file:
+                json.dump(points, file, indent=2, ensure_ascii=False)
+            return outputPath / "indented.json"
+
+        variants = {
+            "indent_dump": writeIndented,
+            "stream": lambda: write_json_array_stream(outputPath / "stream.json", iterPoints())[0],
+            "stream_gzip": lambda: write_json_array_stream(
+                outputPath / "gzip.json", iterPoints(), compression="gzip"
+            )[0],
+            # Схема v2: время точки хранится секундами эпохи без форматирования.
+            "stream_epoch": lambda: write_json_array_stream(
+                outputPath / "epoch.json", iterPoints(int)
+            )[0],
+        }
+
+        report = {"points": pointCount, "seconds": {}, "bytes": {}, "peak_bytes": {}}
+        for name, write in variants.items():
+            seconds, path = measure_seconds(write, repeat=repeat)
+            tracemalloc.start()
+            write()
+            _, peakBytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            report["seconds"][name] = seconds
+            report["bytes"][name] = path.stat().st_size
+            report["peak_bytes"][name] = peakBytes
+
+        return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare indented json.dump with the streaming series writer"
+    )
+    parser.add_argument("--span-days", type=int, default=1460)
+    parser.add_argument("--interval-minutes", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    report = run_series_write_benchmark(
+        spanDays=args.span_days,
+        intervalMinutes=args.interval_minutes,
+        repeat=args.repeat,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
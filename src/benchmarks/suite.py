@@ -0,0 +1,625 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+from contextlib import chdir
+from datetime import datetime
+from functools import cached_property
+from itertools import count
+from pathlib import Path
+
+import numpy as np
+
+from admin_panel.logs import (
+    build_job_logs_payload,
+    build_job_runtime_log_payload,
+    build_scheduler_runtime_log_payload,
+    build_taskshift_log_payload,
+)
+from config.logger import (
+    JOB_LAUNCH_LOG_FILE_NAME,
+    JOB_RUNTIME_LOG_FILE_NAME,
+    LOG_FILE_NAME,
+    SCHEDULER_RUNTIME_LOG_FILE_NAME,
+    build_runtime_log_event,
+    setup_logger,
+)
+from config.models import SchedulerConfig
+from config.paths import academicCalendarRoot
+from forecast.training import (
+    DEFAULT_FORECAST_PREDICTION_HORIZON_HOURS,
+    TARGET_COLUMN,
+    _decompose_gpu_multiseasonality,
+    build_future_forecast_points,
+    build_training_frame,
+)
+from scheduler.attempt_cache import reset_cache
+from scheduler.resources import RESOURCE_TREE_ENGINE_NUMPY, RESOURCE_TREE_ENGINE_PYTHON, get_resource_tree_class
+from scheduler.service import Scheduler
+from storage.active_jobs import ActiveJobSet
+from storage.constants import SERIES_ENGINE_NUMPY, SERIES_ENGINE_PYTHON
+from storage.repository import SlurmDBRepository
+from storage.series import build_historical_utilization_series, export_historical_utilization_series
+from storage.service import slurmStorage
+
+from .common import measure_peak_bytes, measure_seconds
+from .workload import TIMELIMIT_MINUTES, build_synthetic_cluster_config, build_synthetic_slurmdb
+
+BENCHMARK_RESULTS_VERSION = 1
+BENCHMARK_SCALES = {
+    "small": {
+        "nodes": 256,
+        "features": 8,
+        "partitions": 3,
+        "span_days": 60,
+        "jobs_per_day": 500,
+        "pending_jobs": 200,
+        "log_lines": 20_000,
+    },
+    "medium": {
+        "nodes": 1024,
+        "features": 16,
+        "partitions": 4,
+        "span_days": 365,
+        "jobs_per_day": 2000,
+        "pending_jobs": 1000,
+        "log_lines": 200_000,
+    },
+    "large": {
+        "nodes": 4096,
+        "features": 32,
+        "partitions": 6,
+        "span_days": 730,
+        "jobs_per_day": 4500,
+        "pending_jobs": 5000,
+        "log_lines": 1_000_000,
+    },
+}
+BENCHMARK_CASES = (
+    "history_sync",
+    "series_build_python",
+    "series_build_numpy",
+    "resource_tree",
+    "resource_tree_numpy",
+    "scheduler_pass",
+    "scheduler_pass_numpy",
+    "training_frame",
+    "gpu_decomposition",
+    "forecast_points",
+    "log_payloads",
+)
+DEFAULT_TIME_THRESHOLD = 0.2
+DEFAULT_MEMORY_THRESHOLD = 0.2
+# Ниже этих порогов разница тонет в шуме таймера и аллокатора.
+MIN_REGRESSION_SECONDS = 0.01
+MIN_REGRESSION_BYTES = 1 << 20
+
+
+class BenchmarkWorkload:
+    """
+    Synthetic cluster, SQLite slurmDB and derived inputs of one benchmark scale.
+
+    Everything is built lazily in ``workDir`` on first use, so a run of a few
+    cases prepares only what those cases read. Preparation is not timed.
+    """
+
+    def __init__(self, workDir: str | Path, scale: dict, seed: int = 0):
+        self.workDir = Path(workDir)
+        self.scale = dict(scale)
+        self.seed = seed
+        # Путь к календарю относительный: фиксируем его до chdir в кейсе с логами.
+        self.calendarRoot = Path(academicCalendarRoot).resolve()
+        self.exportRuns = count()
+
+    @cached_property
+    def clusterConfig(self):
+        return build_synthetic_cluster_config(
+            nodeCount=self.scale["nodes"],
+            featureCount=self.scale["features"],
+            partitionCount=self.scale["partitions"],
+        )
+
+    @cached_property
+    def database(self):
+        return build_synthetic_slurmdb(
+            self.workDir / "slurmdb.sqlite",
+            self.clusterConfig,
+            spanDays=self.scale["span_days"],
+            jobsPerDay=self.scale["jobs_per_day"],
+            pendingBacklog=self.scale["pending_jobs"],
+            seed=self.seed,
+        )
+
+    @cached_property
+    def jobs(self):
+        repository = self.createRepository().create()
+        try:
+            return repository.get_historical_jobs()
+        finally:
+            repository.close()
+
+    @cached_property
+    def endTimestamp(self) -> int:
+        return max(job.modTime for job in self.jobs)
+
+    @cached_property
+    def runningJobs(self):
+        return [job for job in self.jobs if job.timeEnd == 0 or job.timeEnd > self.endTimestamp]
+
+    @cached_property
+    def seriesDir(self) -> Path:
+        return export_historical_utilization_series(
+            self.workDir / "series_export",
+            self.jobs,
+            clusterConfig=self.clusterConfig,
+            nowTimestamp=self.endTimestamp,
+            engine=SERIES_ENGINE_NUMPY,
+        )
+
+    @cached_property
+    def trainingFrame(self):
+        return build_training_frame(self.seriesDir, calendarRoot=self.calendarRoot)
+
+    @cached_property
+    def forecastModel(self):
+        frame, featureColumns = self.trainingFrame
+        return _LinearForecastModel.fit(frame, featureColumns)
+
+    @cached_property
+    def logsDir(self) -> Path:
+        logsDir = self.workDir / "logs"
+        _write_benchmark_logs(logsDir, self.scale["log_lines"], self.jobs)
+        return logsDir
+
+    def createRepository(self) -> SlurmDBRepository:
+        return SlurmDBRepository(pool=self.database.createPool())
+
+    def describe(self) -> dict:
+        return {
+            **self.scale,
+            "seed": self.seed,
+            "rows": self.database.countRows(),
+            "started_jobs": len(self.jobs),
+            "running_jobs": len(self.runningJobs),
+        }
+
+
+class _LinearForecastModel:
+    """Least-squares stand-in for CatBoost: forecast cost here is feature building, not the model."""
+
+    def __init__(self, coefficients: np.ndarray):
+        self.coefficients = coefficients
+
+    @classmethod
+    def fit(cls, frame, featureColumns):
+        trainingRows = frame.dropna(subset=[*featureColumns, TARGET_COLUMN])
+        features = trainingRows[featureColumns].to_numpy(dtype=float)
+        design = np.column_stack([features, np.ones(len(features))])
+        coefficients, *_ = np.linalg.lstsq(design, trainingRows[TARGET_COLUMN].to_numpy(dtype=float), rcond=None)
+        return cls(coefficients)
+
+    def predict(self, features):
+        features = np.asarray(features, dtype=float)
+        return features @ self.coefficients[:-1] + self.coefficients[-1]
+
+
+class _BenchmarkConnector:
+    def __init__(self):
+        self.launchedJobs = 0
+
+    def executeJob(self, job, placement=None, runId=None):
+        self.launchedJobs += 1
+
+
+def _build_history_sync_case(workload: BenchmarkWorkload):
+    def syncHistory():
+        storage = slurmStorage(repository=workload.createRepository()).create()
+        try:
+            return storage.syncHistoricalJobsCache(outputDir=workload.workDir / f"export_{next(workload.exportRuns)}")
+        finally:
+            storage.close()
+            storage.repository.pool.close()
+
+    return syncHistory
+
+
+def _build_series_case(engine: str):
+    def build(workload: BenchmarkWorkload):
+        jobs = workload.jobs
+        return lambda: build_historical_utilization_series(
+            jobs,
+            clusterConfig=workload.clusterConfig,
+            nowTimestamp=workload.endTimestamp,
+            engine=engine,
+        )
+
+    return build
+
+
+def _build_resource_tree_case(engine: str):
+    def build(workload: BenchmarkWorkload):
+        runningJobs = workload.runningJobs
+        return lambda: get_resource_tree_class(engine).fromClusterAndJobs(
+            workload.clusterConfig, runningJobs, workload.endTimestamp
+        )
+
+    return build
+
+
+def _build_scheduler_pass_case(engine: str):
+    return lambda workload: _build_scheduler_pass(workload, engine)
+
+
+def _build_scheduler_pass(workload: BenchmarkWorkload, engine: str):
+    schedulerConfig = SchedulerConfig()
+    schedulerConfig.timelimit = max(TIMELIMIT_MINUTES)
+    schedulerConfig.max_launched_jobs = None
+    schedulerConfig.forecast_enabled = False
+    schedulerConfig.resource_tree_engine = engine
+    launchLogPath = workload.workDir / JOB_LAUNCH_LOG_FILE_NAME
+    storage = slurmStorage(activeJobs=ActiveJobSet(), repository=workload.createRepository()).create()
+    scheduler = Scheduler(
+        storage=storage,
+        connector=_BenchmarkConnector(),
+        schedulerConfig=schedulerConfig,
+        clusterConfig=workload.clusterConfig,
+        jobLaunchEventWriter=lambda event: _append_jsonl(launchLogPath, event),
+    )
+
+    def schedule():
+        # Прошлый проход не должен превращать свои попытки в пул неудачных запусков.
+        reset_cache()
+        return scheduler.schedule(runId="benchmark", trigger="benchmark")
+
+    return schedule
+
+
+def _build_training_frame_case(workload: BenchmarkWorkload):
+    seriesDir = workload.seriesDir
+    return lambda: build_training_frame(seriesDir, calendarRoot=workload.calendarRoot)
+
+
+def _build_gpu_decomposition_case(workload: BenchmarkWorkload):
+    frame, _ = workload.trainingFrame
+    return lambda: _decompose_gpu_multiseasonality(frame)
+
+
+def _build_forecast_points_case(workload: BenchmarkWorkload):
+    _, featureColumns = workload.trainingFrame
+    model = workload.forecastModel
+    return lambda: build_future_forecast_points(
+        model=model,
+        seriesDir=workload.seriesDir,
+        featureColumns=featureColumns,
+        now=datetime.fromtimestamp(workload.endTimestamp),
+        horizonHours=DEFAULT_FORECAST_PREDICTION_HORIZON_HOURS,
+        calendarRoot=workload.calendarRoot,
+    )
+
+
+def _build_log_payloads_case(workload: BenchmarkWorkload):
+    workDir = workload.logsDir.parent
+
+    def buildPayloads():
+        # Панель читает logs/ относительно текущего каталога.
+        with chdir(workDir):
+            return [
+                build_taskshift_log_payload(query="job", statuses=["INFO"]),
+                build_job_logs_payload(statuses=["ATTEMPTED"], page=2),
+                build_scheduler_runtime_log_payload(query="pass"),
+                build_job_runtime_log_payload(statuses=["LAUNCH_FAILED"]),
+            ]
+
+    return buildPayloads
+
+
+CASE_BUILDERS = {
+    "history_sync": _build_history_sync_case,
+    "series_build_python": _build_series_case(SERIES_ENGINE_PYTHON),
+    "series_build_numpy": _build_series_case(SERIES_ENGINE_NUMPY),
+    "resource_tree": _build_resource_tree_case(RESOURCE_TREE_ENGINE_PYTHON),
+    "resource_tree_numpy": _build_resource_tree_case(RESOURCE_TREE_ENGINE_NUMPY),
+    "scheduler_pass": _build_scheduler_pass_case(RESOURCE_TREE_ENGINE_PYTHON),
+    "scheduler_pass_numpy": _build_scheduler_pass_case(RESOURCE_TREE_ENGINE_NUMPY),
+    "training_frame": _build_training_frame_case,
+    "gpu_decomposition": _build_gpu_decomposition_case,
+    "forecast_points": _build_forecast_points_case,
+    "log_payloads": _build_log_payloads_case,
+}
+
+
+def run_benchmark_suite(
+    scale: str = "small",
+    cases=None,
+    repeat: int = 1,
+    measureMemory: bool = True,
+    seed: int = 0,
+    workDir: str | Path | None = None,
+    scaleOverrides: dict | None = None,
+) -> dict:
+    """
+    Time every case in ``cases`` (all by default) on the synthetic workload of ``scale``.
+
+    ``seconds`` is the best of ``repeat`` runs. ``peak_bytes`` comes from one more
+    run under ``tracemalloc`` and counts Python and numpy allocations above the
+    level at the start of the case.
+    """
+    if scale not in BENCHMARK_SCALES:
+        raise ValueError(f"Unknown benchmark scale '{scale}', expected one of {tuple(BENCHMARK_SCALES)}")
+
+    selectedCases = list(cases or BENCHMARK_CASES)
+    unknownCases = [name for name in selectedCases if name not in CASE_BUILDERS]
+    if unknownCases:
+        raise ValueError(f"Unknown benchmark cases {unknownCases}, expected some of {BENCHMARK_CASES}")
+
+    with tempfile.TemporaryDirectory(prefix="taskshift-bench-") as tempDir:
+        workload = BenchmarkWorkload(
+            Path(workDir) if workDir is not None else Path(tempDir),
+            {**BENCHMARK_SCALES[scale], **(scaleOverrides or {})},
+            seed=seed,
+        )
+        setupSeconds, _ = measure_seconds(lambda: workload.jobs)
+
+        results = {}
+        for name in selectedCases:
+            callback = CASE_BUILDERS[name](workload)
+            seconds, _ = measure_seconds(callback, repeat=repeat)
+            results[name] = {
+                "seconds": seconds,
+                "peak_bytes": measure_peak_bytes(callback) if measureMemory else None,
+            }
+
+        return {
+            "version": BENCHMARK_RESULTS_VERSION,
+            "scale": scale,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "environment": _describe_environment(),
+            "workload": {**workload.describe(), "setup_seconds": setupSeconds},
+            "repeat": repeat,
+            "cases": results,
+        }
+
+
+def compare_benchmark_results(
+    results: dict,
+    baseline: dict,
+    timeThreshold: float = DEFAULT_TIME_THRESHOLD,
+    memoryThreshold: float = DEFAULT_MEMORY_THRESHOLD,
+) -> dict:
+    """
+    Ratios of ``results`` to ``baseline`` per case and the cases that regressed.
+
+    A case regresses when its time or peak memory grows by more than the
+    threshold share and by more than ``MIN_REGRESSION_SECONDS`` or
+    ``MIN_REGRESSION_BYTES``. Results of different scales are not comparable.
+    """
+    if results.get("scale") != baseline.get("scale"):
+        raise ValueError(
+            f"Benchmark scale '{results.get('scale')}' cannot be compared with baseline scale '{baseline.get('scale')}'"
+        )
+
+    comparison = {}
+    regressions = []
+    baselineCases = baseline.get("cases", {})
+    for name, case in results.get("cases", {}).items():
+        baselineCase = baselineCases.get(name)
+        if baselineCase is None:
+            comparison[name] = {"status": "new"}
+            continue
+
+        timeRatio, timeRegressed = _compare_metric(
+            case.get("seconds"), baselineCase.get("seconds"), timeThreshold, MIN_REGRESSION_SECONDS
+        )
+        memoryRatio, memoryRegressed = _compare_metric(
+            case.get("peak_bytes"), baselineCase.get("peak_bytes"), memoryThreshold, MIN_REGRESSION_BYTES
+        )
+        regressedMetrics = [metric for metric, flag in (("time", timeRegressed), ("memory", memoryRegressed)) if flag]
+        comparison[name] = {
+            "status": "regression" if regressedMetrics else "ok",
+            "time_ratio": timeRatio,
+            "memory_ratio": memoryRatio,
+            "regressed": regressedMetrics,
+        }
+        if regressedMetrics:
+            regressions.append(name)
+
+    return {
+        "scale": results.get("scale"),
+        "time_threshold": timeThreshold,
+        "memory_threshold": memoryThreshold,
+        "missing_cases": sorted(set(baselineCases) - set(results.get("cases", {}))),
+        "regressions": regressions,
+        "cases": comparison,
+    }
+
+
+def load_benchmark_results(path: str | Path) -> dict:
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_benchmark_results(path: str | Path, results: dict):
+    outputPath = Path(path)
+    outputPath.parent.mkdir(parents=True, exist_ok=True)
+    with open(outputPath, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2, ensure_ascii=False)
+        file.write("\n")
+
+
+def _compare_metric(value, baselineValue, threshold: float, minimumDelta: float):
+    if value is None or not baselineValue:
+        return None, False
+
+    ratio = value / baselineValue
+    return ratio, value > baselineValue * (1 + threshold) and value - baselineValue >= minimumDelta
+
+
+def _describe_environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _append_jsonl(path: Path, event: dict):
+    with open(path, "a", encoding="utf-8") as file:
+        json.dump(event, file, ensure_ascii=False)
+        file.write("\n")
+
+
+def _write_benchmark_logs(logsDir: Path, lineCount: int, jobs):
+    logsDir.mkdir(parents=True, exist_ok=True)
+    levels = ("DEBUG", "INFO", "INFO", "INFO", "WARNING", "SUCCESS")
+    sampleJobs = jobs[:lineCount] or jobs
+
+    with open(logsDir / LOG_FILE_NAME, "w", encoding="utf-8") as file:
+        for index in range(lineCount):
+            job = sampleJobs[index % len(sampleJobs)]
+            timestamp = datetime.fromtimestamp(job.timeStart).strftime("%Y-%m-%d %H:%M:%S.000")
+            file.write(
+                f"{timestamp} | {levels[index % len(levels)]} | scheduler.service:schedule:{index % 400} | "
+                f"Scheduler job decision | job {job.jobID} on {job.nodelist}\n"
+            )
+
+    with open(logsDir / JOB_LAUNCH_LOG_FILE_NAME, "w", encoding="utf-8") as launchFile, open(
+        logsDir / JOB_RUNTIME_LOG_FILE_NAME, "w", encoding="utf-8"
+    ) as runtimeFile, open(logsDir / SCHEDULER_RUNTIME_LOG_FILE_NAME, "w", encoding="utf-8") as schedulerFile:
+        for index in range(lineCount):
+            job = sampleJobs[index % len(sampleJobs)]
+            status = "LAUNCH_FAILED" if index % 5 == 0 else "LAUNCH_ATTEMPTED"
+            json.dump(
+                {
+                    "event": "job_launch",
+                    "status": status,
+                    "job_id": job.jobID,
+                    "job_name": job.jobName,
+                    "partition": job.partition,
+                    "feature": job.constraints,
+                    "nodes": [job.nodelist],
+                    "launched_at_unix": job.timeStart,
+                    "run_id": f"run-{index // 50}",
+                },
+                launchFile,
+            )
+            launchFile.write("\n")
+            json.dump(
+                build_runtime_log_event(
+                    category="job_runtime",
+                    status=status,
+                    message=f"Job {job.jobID} decision={status}",
+                    timestamp=job.timeStart,
+                    eventType="JOB_DECISION",
+                    run_id=f"run-{index // 50}",
+                    job_id=job.jobID,
+                ),
+                runtimeFile,
+            )
+            runtimeFile.write("\n")
+            json.dump(
+                build_runtime_log_event(
+                    category="scheduler_runtime",
+                    status="RUN_FINISHED",
+                    message=f"Scheduler pass finished: launched={index % 7}",
+                    timestamp=job.timeStart,
+                    eventType="RUN_FINISHED",
+                    run_id=f"run-{index}",
+                ),
+                schedulerFile,
+            )
+            schedulerFile.write("\n")
+
+
+def format_benchmark_report(results: dict, comparison: dict | None = None) -> str:
+    lines = [f"TaskShift benchmarks, scale '{results['scale']}' ({results['workload']['rows']} job rows)"]
+    for name, case in results["cases"].items():
+        peakBytes = case.get("peak_bytes")
+        line = f"  {name:<22} {case['seconds']:>10.3f} s"
+        line += f" {peakBytes / (1 << 20):>10.1f} MiB" if peakBytes is not None else " " * 15
+        if comparison is not None:
+            caseComparison = comparison["cases"].get(name, {})
+            ratio = caseComparison.get("time_ratio")
+            line += f"  x{ratio:.2f}" if ratio is not None else "  new"
+            if caseComparison.get("status") == "regression":
+                line += f"  REGRESSION ({', '.join(caseComparison['regressed'])})"
+        lines.append(line)
+
+    if comparison is not None and comparison["missing_cases"]:
+        lines.append(f"  missing from results: {', '.join(comparison['missing_cases'])}")
+
+    return "\n".join(lines)
+
+
+def add_benchmark_arguments(parser):
+    parser.add_argument("--scale", choices=tuple(BENCHMARK_SCALES), default="small")
+    parser.add_argument(
+        "--cases",
+        nargs="+",
+        choices=BENCHMARK_CASES,
+        default=None,
+        help="Benchmark cases to run. Defaults to all of them",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per case, the best time is reported")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic workload")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run of every case")
+    parser.add_argument("--work-dir", default=None, help="Keep the generated workload here instead of a temp dir")
+    parser.add_argument("--output", default=None, help="Write results JSON to this file")
+    parser.add_argument("--baseline", default=None, help="Results JSON to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_TIME_THRESHOLD,
+        help="Allowed share of time growth over the baseline before a case is a regression",
+    )
+    parser.add_argument(
+        "--memory-threshold",
+        type=float,
+        default=DEFAULT_MEMORY_THRESHOLD,
+        help="Allowed share of peak memory growth over the baseline",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="WARNING",
+        help="Log level while benchmarks run. Lower levels add logging overhead to the timings",
+    )
+
+
+def run_benchmarks(args) -> int:
+    results = run_benchmark_suite(
+        scale=args.scale,
+        cases=args.cases,
+        repeat=args.repeat,
+        measureMemory=not args.no_memory,
+        seed=args.seed,
+        workDir=args.work_dir,
+    )
+    comparison = None
+    if args.baseline:
+        comparison = compare_benchmark_results(
+            results,
+            load_benchmark_results(args.baseline),
+            timeThreshold=args.threshold,
+            memoryThreshold=args.memory_threshold,
+        )
+        results["comparison"] = comparison
+
+    if args.output:
+        save_benchmark_results(args.output, results)
+    print(format_benchmark_report(results, comparison))
+
+    return 1 if comparison is not None and comparison["regressions"] else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time and memory-profile TaskShift hot paths on synthetic data")
+    add_benchmark_arguments(parser)
+    args = parser.parse_args(argv)
+    setup_logger(level=args.log_level)
+    return run_benchmarks(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+import argparse
+import json
+import random
+
+from storage.models import HistoricalJob
+from storage.tres_codes import decode_tres
+
+from .common import measure_seconds
+
+
+def run_tres_decode_benchmark(rowCount: int = 1_000_000, passes: int = 3, repeat: int = 1) -> dict:
+    tresPairs = _generate_tres_pairs(rowCount)
+
+    def buildJobs():
+        decode_tres.cache_clear()
+        return [_build_job(index, tresReq, tresAlloc) for index, (tresReq, tresAlloc) in enumerate(tresPairs)]
+
+    buildSeconds, jobs = measure_seconds(buildJobs, repeat=repeat)
+
+    def readDecoded():
+        total = 0
+        for _ in range(passes):
+            for job in jobs:
+                total += job.getAllocatedCpus() + job.getAllocatedGpus() + job.getRequestedGpus()
+        return total
+
+    def readParsed():
+        total = 0
+        for _ in range(passes):
+            for job in jobs:
+                total += (
+                    _parse_allocated_cpus(job)
+                    + _parse_allocated_gpus(job)
+                    + _get_tres_value(job.tresReq, {"1001", "gres/gpu", "gpu"})
+                )
+        return total
+
+    decodedSeconds, decodedTotal = measure_seconds(readDecoded, repeat=repeat)
+    parsedSeconds, parsedTotal = measure_seconds(readParsed, repeat=repeat)
+    if decodedTotal != parsedTotal:
+        raise RuntimeError("Decoded TRES amounts differ from per-call parsing")
+
+    return {
+        "rows": rowCount,
+        "passes": passes,
+        "distinct_tres_strings": decode_tres.cache_info().currsize,
+        "seconds": {
+            "build_with_decode": buildSeconds,
+            "getters_decoded": decodedSeconds,
+            "getters_parsed": parsedSeconds,
+        },
+    }
+
+
+def _generate_tres_pairs(rowCount: int) -> list[tuple[str, str]]:
+    generator = random.Random(0)
+    pairs = []
+    for _ in range(rowCount):
+        nodeCount = generator.choice((1, 1, 1, 2, 4))
+        cpus = nodeCount * generator.choice((1, 4, 8, 16, 32))
+        gpus = nodeCount * generator.choice((0, 0, 1, 2, 4))
+        memory = cpus * generator.choice((1000, 4000))
+        tresReq = f"1={cpus},2={memory},4={nodeCount}" + (f",1001={gpus}" if gpus else "")
+        tresAlloc = f"{tresReq},5={cpus}" + (f",1007={gpus}" if gpus else "")
+        pairs.append((tresReq, tresAlloc))
+
+    return pairs
+
+
+def _build_job(index: int, tresReq: str, tresAlloc: str) -> HistoricalJob:
+    return HistoricalJob(
+        dbIndex=index,
+        jobID=index,
+        jobName="bench",
+        timelimit=60,
+        state=3,
+        priority=1,
+        constraints=None,
+        cpusReq=1,
+        nodesAlloc=1,
+        timeStart=1,
+        timeEnd=2,
+        timeSubmit=1,
+        timeEligible=1,
+        modTime=2,
+        tresReq=tresReq,
+        tresAlloc=tresAlloc,
+        nodelist=None,
+        partition=None,
+    )
+
+
+# Разбор TRES-строки на каждый вызов, как это делали геттеры до декодирования.
+def _parse_tres_map(tresValue: str | None) -> dict[str, int]:
+    if not tresValue:
+        return {}
+
+    parsed = {}
+    for entry in tresValue.split(","):
+        entry = entry.strip()
+        if "=" not in entry:
+            continue
+
+        key, value = entry.split("=", maxsplit=1)
+        try:
+            parsed[key] = int(value)
+        except ValueError:
+            continue
+
+    return parsed
+
+
+def _get_tres_value(tresValue: str | None, aliases: set[str]) -> int:
+    tresMap = _parse_tres_map(tresValue)
+    for alias in aliases:
+        if alias in tresMap:
+            return tresMap[alias]
+
+    return 0
+
+
+def _parse_allocated_cpus(job: HistoricalJob) -> int:
+    return _get_tres_value(job.tresAlloc, {"1", "cpu"}) or job.cpusReq or 0
+
+
+def _parse_allocated_gpus(job: HistoricalJob) -> int:
+    return _get_tres_value(job.tresAlloc, {"1001", "gres/gpu", "gpu"}) or _get_tres_value(
+        job.tresReq, {"1001", "gres/gpu", "gpu"}
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare TRES getters on decoded fields with per-call string parsing"
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--passes", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    report = run_tres_decode_benchmark(rowCount=args.rows, passes=args.passes, repeat=args.repeat)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
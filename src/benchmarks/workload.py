@@ -0,0 +1,392 @@
+import argparse
+import json
+import math
+import random
+import re
+from pathlib import Path
+
+import numpy as np
+
+from config.models import ClusterConfig, NodeGroupConfig, NodeResources, PartitionConfig
+from config.parsing import expand_hostlist
+from storage.constants import PENDING_STATE
+from storage.mirror import SQLiteSlurmDB
+from storage.models import RawHistoricalJobRow
+
+from .common import BENCHMARK_BASE_TIMESTAMP, measure_seconds
+
+DAY_SECONDS = 24 * 3600
+RUNNING_STATE = 1
+COMPLETED_STATE = 3
+FAILED_STATE = 5
+# Поколения узлов: (sockets, cores_per_socket, gpus).
+CPU_NODE_PROFILES = ((2, 16, 0), (2, 32, 0), (2, 64, 0))
+GPU_NODE_PROFILES = ((2, 16, 4), (2, 32, 8))
+# Суточный профиль отправки задач: ночью поток в несколько раз ниже, чем днём.
+HOURLY_SUBMIT_WEIGHTS = (2, 1, 1, 1, 1, 2, 3, 5, 8, 10, 11, 11, 9, 10, 11, 11, 10, 8, 6, 5, 4, 4, 3, 3)
+TIMELIMIT_MINUTES = (30, 60, 240, 720, 1440, 2880, 4320)
+NODE_COUNT_CHOICES = (1, 1, 1, 1, 1, 1, 1, 1, 2, 2, 2, 4, 4, 8, 16)
+# Узел делится на доли: задача без целых узлов занимает от одной до трёх.
+NODE_SLOTS = 4
+
+
+def build_synthetic_cluster_config(
+    nodeCount: int = 2048,
+    featureCount: int = 16,
+    partitionCount: int = 4,
+    gpuFeatureShare: float = 0.25,
+) -> ClusterConfig:
+    """
+    Cluster of ``nodeCount`` nodes split evenly between ``featureCount`` features.
+
+    Every feature is served by two node groups of different hardware generations
+    and weights. The first ``gpuFeatureShare`` of features have GPU nodes.
+    Partition ``normal`` spans the whole cluster, the other
+    ``partitionCount - 1`` partitions take every n-th feature.
+    """
+    if featureCount < 1 or nodeCount < featureCount:
+        raise ValueError("Synthetic cluster needs at least one node per feature")
+
+    clusterConfig = ClusterConfig()
+    clusterConfig.gres_types = ["gpu"]
+    gpuFeatureCount = round(featureCount * gpuFeatureShare)
+    extraPartitionCount = max(0, partitionCount - 1)
+    partitionPatterns = {f"part_{index}": [] for index in range(extraPartitionCount)}
+    allPatterns = []
+
+    nextNode = 1
+    for featureIndex in range(featureCount):
+        featureNodeCount = nodeCount // featureCount + (1 if featureIndex < nodeCount % featureCount else 0)
+        profiles = GPU_NODE_PROFILES if featureIndex < gpuFeatureCount else CPU_NODE_PROFILES
+        groupSizes = [featureNodeCount - featureNodeCount // 2, featureNodeCount // 2]
+
+        for generation, groupSize in enumerate(size for size in groupSizes if size > 0):
+            sockets, coresPerSocket, gpus = profiles[(featureIndex + generation) % len(profiles)]
+            namePattern = f"sn-[{nextNode:05d}-{nextNode + groupSize - 1:05d}]"
+            nextNode += groupSize
+            allPatterns.append(namePattern)
+            if extraPartitionCount:
+                partitionPatterns[f"part_{featureIndex % extraPartitionCount}"].append(namePattern)
+
+            clusterConfig.node_groups.append(
+                NodeGroupConfig(
+                    name_pattern=namePattern,
+                    node_count=groupSize,
+                    weight=generation + 1,
+                    features=[f"feat_{featureIndex:03d}"],
+                    resources=NodeResources(
+                        sockets=sockets,
+                        cores_per_socket=coresPerSocket,
+                        threads_per_core=1,
+                        gpus=gpus,
+                    ),
+                )
+            )
+
+    clusterConfig.partitions.append(PartitionConfig(name="normal", nodes=",".join(allPatterns), state="UP"))
+    for partitionName, patterns in partitionPatterns.items():
+        clusterConfig.partitions.append(PartitionConfig(name=partitionName, nodes=",".join(patterns), state="UP"))
+
+    return clusterConfig
+
+
+def iter_synthetic_job_row_batches(
+    clusterConfig: ClusterConfig,
+    spanDays: int = 365,
+    jobsPerDay: int = 2000,
+    arrayShare: float = 0.05,
+    burstsPerWeek: float = 2.0,
+    pendingBacklog: int = 0,
+    seed: int = 0,
+    baseTimestamp: int = BENCHMARK_BASE_TIMESTAMP,
+    batchDays: int = 7,
+):
+    """
+    Yield ``linux_job_table`` rows for ``spanDays`` of history, ``batchDays`` at a time.
+
+    Arrivals follow a daily and weekly cycle around ``jobsPerDay`` submissions.
+    On top of that come bursts of similar short jobs from one user and array jobs
+    whose tasks share the submit time and start one after another. Jobs still
+    running at the end of the span keep ``time_end = 0``, and jobs that have not
+    started are pending rows with ``time_start = 0``. ``pendingBacklog`` more
+    jobs submitted during the last day are left pending as the scheduler queue.
+    """
+    generator = random.Random(seed)
+    groups = _build_job_groups(clusterConfig)
+    groupWeights = _cumulative([len(group["nodes"]) for group in groups])
+    hourWeights = _cumulative(HOURLY_SUBMIT_WEIGHTS)
+    endTimestamp = baseTimestamp + spanDays * DAY_SECONDS
+    ids = {"db_inx": 1, "job_id": 100_000}
+
+    batch = []
+    for day in range(spanDays):
+        dayStart = baseTimestamp + day * DAY_SECONDS
+        weekdayFactor = 0.5 if (dayStart // DAY_SECONDS + 3) % 7 >= 5 else 1.0
+        seasonFactor = 1.0 + 0.2 * math.sin(2 * math.pi * day / 365)
+        meanJobs = jobsPerDay * weekdayFactor * seasonFactor
+        submitCount = max(0, round(generator.gauss(meanJobs, math.sqrt(meanJobs))))
+
+        submissions = []
+        for _ in range(submitCount):
+            hour = generator.choices(range(24), cum_weights=hourWeights)[0]
+            taskCount = generator.randint(2, 16) if generator.random() < arrayShare else 1
+            submissions.append(
+                (
+                    dayStart + hour * 3600 + generator.randrange(3600),
+                    generator.choices(groups, cum_weights=groupWeights)[0],
+                    taskCount,
+                    False,
+                )
+            )
+
+        if generator.random() < burstsPerWeek / 7:
+            group = generator.choices(groups, cum_weights=groupWeights)[0]
+            burstStart = dayStart + generator.randrange(DAY_SECONDS)
+            burstWindow = generator.randint(15, 60) * 60
+            for _ in range(int(jobsPerDay * generator.uniform(0.1, 0.5))):
+                submissions.append((burstStart + generator.randrange(burstWindow), group, 1, True))
+
+        # Узлы занимаются в порядке отправки, как их выдавал бы планировщик.
+        submissions.sort(key=lambda submission: submission[0])
+        for timeSubmit, group, taskCount, burst in submissions:
+            batch.extend(_build_job_rows(generator, group, timeSubmit, taskCount, endTimestamp, ids, burst))
+
+        if (day + 1) % batchDays == 0 and batch:
+            yield batch
+            batch = []
+
+    for _ in range(pendingBacklog):
+        group = generator.choices(groups, cum_weights=groupWeights)[0]
+        timeSubmit = endTimestamp - 1 - generator.randrange(DAY_SECONDS)
+        # Граница окна на момент отправки: задача гарантированно ещё не стартовала.
+        batch.extend(_build_job_rows(generator, group, timeSubmit, 1, timeSubmit, ids, burst=False))
+
+    if batch:
+        yield batch
+
+
+def generate_synthetic_job_rows(clusterConfig: ClusterConfig, **kwargs) -> list[RawHistoricalJobRow]:
+    return [row for batch in iter_synthetic_job_row_batches(clusterConfig, **kwargs) for row in batch]
+
+
+def build_synthetic_slurmdb(path: str | Path, clusterConfig: ClusterConfig, **kwargs) -> SQLiteSlurmDB:
+    database = SQLiteSlurmDB(path)
+    for batch in iter_synthetic_job_row_batches(clusterConfig, **kwargs):
+        database.insertRows(batch)
+
+    return database
+
+
+def _build_job_groups(clusterConfig: ClusterConfig) -> list[dict]:
+    partitionNodes = [
+        (partition.name, set(expand_hostlist(partition.nodes))) for partition in clusterConfig.partitions
+    ]
+    groups = []
+    for nodeGroup in clusterConfig.node_groups:
+        nodes = expand_hostlist(nodeGroup.name_pattern)
+        if not nodes:
+            continue
+
+        groups.append(
+            {
+                "nodes": nodes,
+                "feature": nodeGroup.features[0] if nodeGroup.features else None,
+                "cores": nodeGroup.resources.cpu_cores,
+                "gpus": nodeGroup.resources.gpus,
+                "partitions": [name for name, names in partitionNodes if nodes[0] in names] or [None],
+                # Момент освобождения каждой доли каждого узла.
+                "slots_free_at": np.zeros((len(nodes), NODE_SLOTS), dtype=np.int64),
+            }
+        )
+
+    if not groups:
+        raise ValueError("Synthetic workload needs a cluster config with node groups")
+
+    return groups
+
+
+def _build_job_rows(generator, group, timeSubmit, taskCount, endTimestamp, ids, burst):
+    nodes = group["nodes"]
+    # Короткие задачи и большая часть обычных делят узел, остальные берут узлы целиком.
+    if burst or generator.random() < 0.7:
+        nodeCount = 1
+        slots = 1 if burst else generator.randint(1, NODE_SLOTS - 1)
+    else:
+        # Широкая задача не занимает всю группу, иначе очередь группы встаёт целиком.
+        nodeCount = min(generator.choice(NODE_COUNT_CHOICES), max(1, len(nodes) // 2))
+        slots = NODE_SLOTS
+    cpusPerNode = max(1, group["cores"] * slots // NODE_SLOTS)
+    gpusPerNode = group["gpus"] * slots // NODE_SLOTS
+    timelimit = generator.choice(TIMELIMIT_MINUTES[:3] if burst else TIMELIMIT_MINUTES)
+    partition = generator.choice(group["partitions"])
+    kind = "burst" if burst else "array" if taskCount > 1 else "job"
+    jobName = f"{group['feature'] or 'job'}_{kind}_{generator.randrange(100)}"
+    priority = generator.randint(1, 10_000)
+    tresReq = f"1={cpusPerNode * nodeCount},4={nodeCount}" + (f",1001={gpusPerNode * nodeCount}" if gpusPerNode else "")
+    waitSeconds = int(generator.expovariate(1 / (3600 if burst else 600)))
+    # Медиана длительности: полчаса у коротких задач из всплеска, три часа у остальных.
+    medianDuration = math.log(1800 if burst else 3 * 3600)
+
+    rows = []
+    for taskIndex in range(taskCount):
+        durationSeconds = min(timelimit * 60, int(generator.lognormvariate(medianDuration, 1.2)) + 30)
+        # Задачи массива стартуют по мере освобождения ресурсов, а не все сразу.
+        earliestStart = timeSubmit + waitSeconds + taskIndex * generator.randint(0, 300)
+        nodeIndexes, timeStart = _reserve_slots(group, nodeCount, slots, earliestStart, durationSeconds, endTimestamp)
+        timeEnd = timeStart + durationSeconds
+        state = FAILED_STATE if generator.random() < 0.03 else COMPLETED_STATE
+        row = {
+            "nodes_alloc": nodeCount,
+            "time_start": timeStart,
+            "time_end": timeEnd,
+            "tres_alloc": f"{tresReq},5={cpusPerNode * nodeCount}",
+            "nodelist": _format_hostlist([nodes[index] for index in nodeIndexes]),
+            "mod_time": timeEnd,
+        }
+        if timeStart >= endTimestamp:
+            state = PENDING_STATE
+            row.update(
+                nodes_alloc=0,
+                time_start=0,
+                time_end=0,
+                tres_alloc="",
+                nodelist="None assigned",
+                mod_time=timeSubmit,
+            )
+        elif timeEnd > endTimestamp:
+            state = RUNNING_STATE
+            row.update(time_end=0, mod_time=timeStart)
+
+        rows.append(
+            RawHistoricalJobRow(
+                job_db_inx=ids["db_inx"],
+                id_job=ids["job_id"],
+                job_name=jobName,
+                timelimit=timelimit,
+                state=state,
+                priority=priority,
+                constraints=group["feature"],
+                cpus_req=cpusPerNode * nodeCount,
+                time_submit=timeSubmit,
+                time_eligible=timeSubmit,
+                tres_req=tresReq,
+                partition=partition,
+                **row,
+            )
+        )
+        ids["db_inx"] += 1
+        ids["job_id"] += 1
+
+    return rows
+
+
+def _reserve_slots(group, nodeCount, slots, earliestStart, durationSeconds, endTimestamp):
+    """
+    Earliest start for ``slots`` shares on each of ``nodeCount`` nodes of the group.
+
+    Nodes whose shares free up first are taken, so an overloaded group queues
+    jobs instead of running more of them than it has resources for. Jobs that
+    would start after ``endTimestamp`` stay pending and reserve nothing.
+    """
+    slotsFreeAt = group["slots_free_at"]
+    if slots == NODE_SLOTS:
+        nodeReadyAt = slotsFreeAt.max(axis=1)
+        nodeIndexes = (
+            np.sort(np.argpartition(nodeReadyAt, nodeCount - 1)[:nodeCount])
+            if nodeCount < len(nodeReadyAt)
+            else np.arange(len(nodeReadyAt))
+        )
+        timeStart = max(earliestStart, int(nodeReadyAt[nodeIndexes].max()))
+        if timeStart < endTimestamp:
+            slotsFreeAt[nodeIndexes] = timeStart + durationSeconds
+        return nodeIndexes.tolist(), timeStart
+
+    nodeReadyAt = np.partition(slotsFreeAt, slots - 1, axis=1)[:, slots - 1]
+    nodeIndex = int(np.argmin(nodeReadyAt))
+    timeStart = max(earliestStart, int(nodeReadyAt[nodeIndex]))
+    if timeStart < endTimestamp:
+        nodeSlots = slotsFreeAt[nodeIndex]
+        nodeSlots[np.argsort(nodeSlots, kind="stable")[:slots]] = timeStart + durationSeconds
+    return [nodeIndex], timeStart
+
+
+def _format_hostlist(nodeNames: list[str]) -> str:
+    if len(nodeNames) == 1:
+        return nodeNames[0]
+
+    matches = [re.fullmatch(r"(.*?)(\d+)", name) for name in nodeNames]
+    if any(match is None for match in matches) or len(
+        {(match.group(1), len(match.group(2))) for match in matches}
+    ) != 1:
+        return ",".join(nodeNames)
+
+    prefix = matches[0].group(1)
+    width = len(matches[0].group(2))
+    ranges = []
+    for number in sorted(int(match.group(2)) for match in matches):
+        if ranges and number == ranges[-1][1] + 1:
+            ranges[-1][1] = number
+        else:
+            ranges.append([number, number])
+
+    return prefix + "[" + ",".join(
+        f"{first:0{width}d}" if first == last else f"{first:0{width}d}-{last:0{width}d}" for first, last in ranges
+    ) + "]"
+
+
+def _cumulative(weights) -> list[float]:
+    total = 0
+    result = []
+    for weight in weights:
+        total += weight
+        result.append(total)
+
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic cluster and a SQLite slurmDB with its job history"
+    )
+    parser.add_argument("--output", required=True, help="SQLite file for linux_job_table")
+    parser.add_argument("--cluster-config", help="Where to save the matching cluster.yaml")
+    parser.add_argument("--nodes", type=int, default=2048)
+    parser.add_argument("--features", type=int, default=16)
+    parser.add_argument("--partitions", type=int, default=4)
+    parser.add_argument("--span-days", type=int, default=365)
+    parser.add_argument("--jobs-per-day", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    clusterConfig = build_synthetic_cluster_config(
+        nodeCount=args.nodes, featureCount=args.features, partitionCount=args.partitions
+    )
+    if args.cluster_config:
+        clusterConfig.saveConfig(args.cluster_config)
+
+    generateSeconds, database = measure_seconds(
+        lambda: build_synthetic_slurmdb(
+            args.output,
+            clusterConfig,
+            spanDays=args.span_days,
+            jobsPerDay=args.jobs_per_day,
+            seed=args.seed,
+        )
+    )
+    print(
+        json.dumps(
+            {
+                "nodes": args.nodes,
+                "features": args.features,
+                "span_days": args.span_days,
+                "rows": database.countRows(),
+                "file_bytes": Path(args.output).stat().st_size,
+                "seconds": generateSeconds,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ except ModuleNotFoundError:
     logger.success = logger.info
 
 from admin_panel import AdminPanelServer
+from benchmarks.suite import add_benchmark_arguments, run_benchmarks
 from config import (
     SchedulerRuntimeConfig,
     clusterConfigFile,
@@ -45,6 +46,20 @@ from scheduler.cron import (
 )
 from scheduler.runtime_state import SchedulerControlPlane
 from storage import slurmStorage
+from storage.repository import close_connection_pool
+from storage.constants import (
+    DEFAULT_BACKFILL_CHUNK_DAYS,
+    DEFAULT_BACKFILL_WORKERS,
+    DEFAULT_SERIES_BUILD_WORKERS,
+    DEFAULT_SERIES_ENGINE,
+    DEFAULT_SERIES_GROUP_BY,
+    JOB_MIRROR_MODES,
+    JOB_MIRROR_OFF,
+    RAW_JOBS_COMPACTION_MIN_SEGMENTS,
+    SERIES_COMPRESSIONS,
+    SERIES_ENGINES,
+    SERIES_GROUP_DIMENSIONS,
+)
 
 
 class GracefulInterrupt(Exception):
@@ -52,6 +67,7 @@ class GracefulInterrupt(Exception):
 
 
 ACTIVE_RESOURCES = []
+RAW_CACHE_COMPACTION_TIME = (3, 0)
 
 
 def _get_numeric_config_value(config, fieldName: str, defaultValue):
@@ -168,6 +184,59 @@ def build_parser():
         default=None,
         help="Optional end timestamp for currently running jobs. Accepts unix timestamp or ISO datetime",
     )
+    exportParser.add_argument(
+        "--tail-only",
+        action="store_true",
+        help="Recompute only buckets after the sealed series checkpoint and append them to existing series files",
+    )
+    exportParser.add_argument(
+        "--series-engine",
+        choices=SERIES_ENGINES,
+        default=DEFAULT_SERIES_ENGINE,
+        help="Utilization series engine: per-bucket python loop or vectorized numpy sweep",
+    )
+    exportParser.add_argument(
+        "--series-workers",
+        type=int,
+        default=None,
+        help="Worker processes for event collection and per-feature series building. Defaults to scheduler series_build_workers",
+    )
+    exportParser.add_argument(
+        "--series-compression",
+        choices=SERIES_COMPRESSIONS,
+        default=None,
+        help="Compression of series/*.json files. Defaults to the compression of the already exported series, plain JSON for a new export",
+    )
+    exportParser.add_argument(
+        "--series-group-by",
+        nargs="+",
+        choices=SERIES_GROUP_DIMENSIONS,
+        default=list(DEFAULT_SERIES_GROUP_BY),
+        help="Series breakdowns to export. Partition and node group series are written to series/groups/<dimension>/",
+    )
+    exportParser.add_argument(
+        "--backfill-chunk-days",
+        type=float,
+        nargs="?",
+        const=DEFAULT_BACKFILL_CHUNK_DAYS,
+        default=None,
+        help=(
+            "On the first sync, fetch history in mod_time chunks of this many days concurrently. "
+            f"Without a value uses {DEFAULT_BACKFILL_CHUNK_DAYS} days. An interrupted backfill resumes on the next export"
+        ),
+    )
+    exportParser.add_argument(
+        "--backfill-workers",
+        type=int,
+        default=DEFAULT_BACKFILL_WORKERS,
+        help="Chunks fetched at once during backfill. Capped by free connections in the DB pool",
+    )
+    exportParser.add_argument(
+        "--job-mirror-mode",
+        choices=JOB_MIRROR_MODES,
+        default=None,
+        help="Local SQLite mirror of linux_job_table in the output dir. Defaults to scheduler job_mirror_mode",
+    )
 
     rebuildParser = subparsers.add_parser(
         "rebuild-series",
@@ -176,7 +245,7 @@ def build_parser():
     rebuildParser.add_argument(
         "--output-dir",
         default=None,
-        help="Export directory containing raw_job_rows.json and state.json. Defaults to scheduler forecast_data_dir",
+        help="Export directory containing the raw_job_rows cache and state.json. Defaults to scheduler forecast_data_dir",
     )
     rebuildParser.add_argument(
         "--interval-minutes",
@@ -189,6 +258,68 @@ def build_parser():
         default=None,
         help="Optional end timestamp for currently running jobs. Accepts unix timestamp or ISO datetime",
     )
+    rebuildParser.add_argument(
+        "--series-engine",
+        choices=SERIES_ENGINES,
+        default=DEFAULT_SERIES_ENGINE,
+        help="Utilization series engine: per-bucket python loop or vectorized numpy sweep",
+    )
+    rebuildParser.add_argument(
+        "--series-workers",
+        type=int,
+        default=None,
+        help="Worker processes for event collection and per-feature series building. Defaults to scheduler series_build_workers",
+    )
+    rebuildParser.add_argument(
+        "--series-compression",
+        choices=SERIES_COMPRESSIONS,
+        default=None,
+        help="Compression of series/*.json files. Defaults to the compression of the already exported series, plain JSON for a new export",
+    )
+    rebuildParser.add_argument(
+        "--series-group-by",
+        nargs="+",
+        choices=SERIES_GROUP_DIMENSIONS,
+        default=list(DEFAULT_SERIES_GROUP_BY),
+        help="Series breakdowns to export. Partition and node group series are written to series/groups/<dimension>/",
+    )
+
+    heatmapParser = subparsers.add_parser(
+        "export-node-heatmap",
+        help="Build the per-node CPU/GPU occupancy heatmap from the local raw cache without MySQL access",
+    )
+    heatmapParser.add_argument(
+        "--output-dir",
+        default=None,
+        help="Export directory containing the raw_job_rows cache. Defaults to scheduler forecast_data_dir",
+    )
+    heatmapParser.add_argument(
+        "--interval-minutes",
+        type=int,
+        default=15,
+        help="Heatmap bucket size in minutes",
+    )
+    heatmapParser.add_argument(
+        "--now-timestamp",
+        default=None,
+        help="Optional end timestamp for currently running jobs. Accepts unix timestamp or ISO datetime",
+    )
+
+    compactCacheParser = subparsers.add_parser(
+        "compact-raw-cache",
+        help="Collapse raw job cache segments into one segment with only preferred job versions",
+    )
+    compactCacheParser.add_argument(
+        "--output-dir",
+        default=None,
+        help="Export directory containing the raw_job_rows cache. Defaults to scheduler forecast_data_dir",
+    )
+    compactCacheParser.add_argument(
+        "--min-segments",
+        type=int,
+        default=RAW_JOBS_COMPACTION_MIN_SEGMENTS,
+        help="Compact only when the cache has at least this many segments",
+    )
 
     trainForecastParser = subparsers.add_parser(
         "train-forecast-model",
@@ -210,6 +341,12 @@ def build_parser():
         help="Train the model from the existing export without refreshing historical utilization first",
     )
 
+    benchParser = subparsers.add_parser(
+        "bench",
+        help="Time and memory-profile hot paths on a synthetic cluster and compare with a baseline",
+    )
+    add_benchmark_arguments(benchParser)
+
     return parser
 
 
@@ -256,6 +393,28 @@ def resolve_forecast_model_dir(args=None, schedulerConfig=None) -> str | None:
     return resolve_project_path(effectiveSchedulerConfig.forecast_model_dir)
 
 
+def resolve_series_build_workers(args=None, schedulerConfig=None) -> int:
+    if args is not None and getattr(args, "series_workers", None) is not None:
+        return max(1, int(args.series_workers))
+
+    effectiveSchedulerConfig = schedulerConfig or getSchedulerConfig()
+    return int(
+        _get_numeric_config_value(
+            effectiveSchedulerConfig,
+            "series_build_workers",
+            DEFAULT_SERIES_BUILD_WORKERS,
+        )
+    )
+
+
+def resolve_job_mirror_mode(args=None, schedulerConfig=None) -> str:
+    if args is not None and getattr(args, "job_mirror_mode", None) is not None:
+        return args.job_mirror_mode
+
+    effectiveSchedulerConfig = schedulerConfig or getSchedulerConfig()
+    return getattr(effectiveSchedulerConfig, "job_mirror_mode", JOB_MIRROR_OFF)
+
+
 def resolve_cluster_refresh_command(schedulerConfig=None) -> list[str]:
     effectiveSchedulerConfig = schedulerConfig or getSchedulerConfig()
     return list(effectiveSchedulerConfig.cluster_config_refresh_command)
@@ -485,6 +644,24 @@ def run_scheduler_loop(args, schedulerRuntimeConfig=None, schedulerControlPlane=
             logger.warning(f"Scheduled cluster config refresh failed: {error}")
             return None
 
+    def compact_raw_cache_job():
+        effectiveSchedulerConfig = (
+            schedulerRuntimeConfig.get_config()
+            if schedulerRuntimeConfig is not None
+            else getSchedulerConfig()
+        )
+        dataDir = resolve_forecast_data_dir(args, effectiveSchedulerConfig)
+        if dataDir is None:
+            return None
+        try:
+            return slurmStorage().compactHistoricalJobsCache(
+                outputDir=dataDir,
+                minSegments=RAW_JOBS_COMPACTION_MIN_SEGMENTS,
+            )
+        except Exception as error:
+            logger.warning(f"Scheduled raw job cache compaction failed: {error}")
+            return None
+
     def job_runner():
         try:
             return execute_scheduler_pass(trigger="scheduled")
@@ -536,6 +713,18 @@ def run_scheduler_loop(args, schedulerRuntimeConfig=None, schedulerControlPlane=
                 "misfire_grace_time": 12 * 60 * 60,
             }
         )
+        compactionHour, compactionMinute = RAW_CACHE_COMPACTION_TIME
+        backgroundJobs.append(
+            {
+                "id": "taskshift-raw-cache-compaction",
+                "kind": "cron",
+                "runner": compact_raw_cache_job,
+                "day_of_week": "*",
+                "hour": compactionHour,
+                "minute": compactionMinute,
+                "misfire_grace_time": 12 * 60 * 60,
+            }
+        )
     backgroundJobs.append(
         {
             "id": "taskshift-cluster-config-refresh",
@@ -558,16 +747,26 @@ def run_scheduler_loop(args, schedulerRuntimeConfig=None, schedulerControlPlane=
 
 
 def run_export(args):
+    outputDir = resolve_export_output_dir(args)
     logger.debug("Creating MySQL connector for historical utilization export")
-    storage = register_resource(slurmStorage().create())
+    storage = register_resource(
+        slurmStorage(jobMirrorMode=resolve_job_mirror_mode(args), mirrorDir=outputDir).create()
+    )
 
     try:
         outputPath = storage.exportIncrementalHistoricalUtilization(
-            outputDir=resolve_export_output_dir(args),
+            outputDir=outputDir,
             intervalMinutes=args.interval_minutes,
             historyStart=args.history_start,
             modifiedUntil=args.modified_until,
             nowTimestamp=args.now_timestamp,
+            seriesEngine=args.series_engine,
+            tailOnly=args.tail_only,
+            seriesWorkers=resolve_series_build_workers(args),
+            seriesCompression=args.series_compression,
+            backfillChunkDays=args.backfill_chunk_days,
+            backfillWorkers=args.backfill_workers,
+            seriesGroupBy=args.series_group_by,
         )
         logger.info(f"Historical utilization series exported to '{outputPath}'")
     finally:
@@ -581,12 +780,39 @@ def run_rebuild_series(args):
         outputDir=resolve_export_output_dir(args),
         intervalMinutes=args.interval_minutes,
         nowTimestamp=args.now_timestamp,
+        seriesEngine=args.series_engine,
+        seriesWorkers=resolve_series_build_workers(args),
+        seriesCompression=args.series_compression,
+        seriesGroupBy=args.series_group_by,
     )
     logger.info(
         f"Historical utilization series rebuilt from local raw cache in '{outputPath}'"
     )
 
 
+def run_export_node_heatmap(args):
+    storage = slurmStorage()
+    heatmapPath = storage.exportNodeUtilizationHeatmap(
+        outputDir=resolve_export_output_dir(args),
+        intervalMinutes=args.interval_minutes,
+        nowTimestamp=args.now_timestamp,
+    )
+    logger.info(f"Node utilization heatmap written to '{heatmapPath}'")
+
+
+def run_compact_raw_cache(args):
+    storage = slurmStorage()
+    stats = storage.compactHistoricalJobsCache(
+        outputDir=resolve_export_output_dir(args),
+        minSegments=args.min_segments,
+    )
+    if stats is not None:
+        logger.info(
+            f"Raw job cache compacted: {stats['segments_before']} segments, "
+            f"{stats['collapsed_versions']} superseded versions removed"
+        )
+
+
 def run_train_forecast_model(args=None, schedulerConfig=None, refreshData: bool | None = None):
     effectiveSchedulerConfig = schedulerConfig or getSchedulerConfig()
     dataDir = resolve_export_output_dir(args or argparse.Namespace(), effectiveSchedulerConfig)
@@ -617,6 +843,8 @@ def run_train_forecast_model(args=None, schedulerConfig=None, refreshData: bool
             "forecast_prediction_horizon_hours",
             DEFAULT_FORECAST_PREDICTION_HORIZON_HOURS,
         ),
+        seriesBuildWorkers=resolve_series_build_workers(schedulerConfig=effectiveSchedulerConfig),
+        jobMirrorMode=resolve_job_mirror_mode(schedulerConfig=effectiveSchedulerConfig),
     )
     logger.info(
         "Forecast model training finished: "
@@ -774,6 +1002,8 @@ def bootstrap_forecast_runtime(args=None, schedulerConfig=None, startupReason: s
             timezoneName=timezoneName,
             modelUpdateIntervalHours=modelUpdateIntervalHours,
             forecastPredictionHorizonHours=forecastPredictionHorizonHours,
+            seriesBuildWorkers=resolve_series_build_workers(schedulerConfig=effectiveSchedulerConfig),
+            jobMirrorMode=resolve_job_mirror_mode(schedulerConfig=effectiveSchedulerConfig),
         )
     except Exception as error:
         append_forecast_runtime_event(
@@ -850,6 +1080,11 @@ def run_serve_web_panel(args):
         webPanelServer.close()
 
 
+def run_bench(args) -> int:
+    setup_logger(level=args.log_level)
+    return run_benchmarks(args)
+
+
 def main():
     setup_logger()
     signal.signal(signal.SIGINT, handle_sigint)
@@ -889,10 +1124,21 @@ def main():
             run_rebuild_series(args)
             return 0
 
+        if args.command == "export-node-heatmap":
+            run_export_node_heatmap(args)
+            return 0
+
+        if args.command == "compact-raw-cache":
+            run_compact_raw_cache(args)
+            return 0
+
         if args.command == "train-forecast-model":
             run_train_forecast_model(args)
             return 0
 
+        if args.command == "bench":
+            return run_bench(args)
+
         parser.error(f"Unknown command: {args.command}")
         return 2
     except GracefulInterrupt:
@@ -903,3 +1149,5 @@ def main():
         logger.warning("Interrupted by user, shutting down gracefully")
         cleanup_active_resources()
         return 130
+    finally:
+        close_connection_pool()
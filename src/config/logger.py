@@ -42,28 +42,28 @@ def _get_runtime_log_file_path(fileName: str) -> Path:
     return logDir / fileName
 
 
-def _configure_standard_logging(logFilePath: Path):
+def _configure_standard_logging(logFilePath: Path, level: str = "DEBUG"):
     formatter = logging.Formatter(LOG_FORMAT)
 
     streamHandler = logging.StreamHandler(sys.stderr)
-    streamHandler.setLevel(logging.DEBUG)
+    streamHandler.setLevel(level)
     streamHandler.setFormatter(formatter)
 
     fileHandler = logging.FileHandler(logFilePath, mode="a", encoding="utf-8")
-    fileHandler.setLevel(logging.DEBUG)
+    fileHandler.setLevel(level)
     fileHandler.setFormatter(formatter)
 
     rootLogger = logging.getLogger()
     rootLogger.handlers.clear()
-    rootLogger.setLevel(logging.DEBUG)
+    rootLogger.setLevel(level)
     rootLogger.addHandler(streamHandler)
     rootLogger.addHandler(fileHandler)
 
 
-def setup_logger():
+def setup_logger(level: str = "DEBUG"):
     global file_logger
     logFilePath = _get_log_file_path()
-    _configure_standard_logging(logFilePath)
+    _configure_standard_logging(logFilePath, level)
     sessionMarker = (
         f"========== TaskShift start | pid={os.getpid()} | "
         f"time={datetime.now().isoformat(timespec='seconds')} =========="
@@ -75,8 +75,8 @@ def setup_logger():
         return
 
     logger.remove()
-    logger.add(sys.stderr, level="DEBUG", format=LOGURU_FORMAT)
-    logger.add(str(logFilePath), level="DEBUG", format=LOGURU_FORMAT, mode="a", enqueue=False)
+    logger.add(sys.stderr, level=level, format=LOGURU_FORMAT)
+    logger.add(str(logFilePath), level=level, format=LOGURU_FORMAT, mode="a", enqueue=False)
 
     file_logger = logger
     logger.info(sessionMarker)
@@ -2,6 +2,7 @@ import os
 import re
 import shlex
 import subprocess
+from bisect import bisect_right
 from dataclasses import dataclass
 from zoneinfo import ZoneInfo
 
@@ -94,6 +95,8 @@ class ClusterConfig:
         self.partitions = []
         self._node_features_cache = None
         self._node_capacities_cache = None
+        self._node_count_epochs_cache = None
+        self._node_capacities_by_epoch_cache = {}
 
     def loadConfig(self, filePath):
         if not os.path.exists(filePath):
@@ -141,6 +144,8 @@ class ClusterConfig:
         ]
         self._node_features_cache = None
         self._node_capacities_cache = None
+        self._node_count_epochs_cache = None
+        self._node_capacities_by_epoch_cache = {}
         return self
 
     def loadFromSlurmText(self, slurmConfigText: str):
@@ -154,6 +159,8 @@ class ClusterConfig:
         self.partitions = []
         self._node_features_cache = None
         self._node_capacities_cache = None
+        self._node_count_epochs_cache = None
+        self._node_capacities_by_epoch_cache = {}
 
         for line in nodesSection:
             if line.startswith("GresTypes="):
@@ -266,21 +273,50 @@ class ClusterConfig:
         return capacities
 
     def getNodeCapacitiesAt(self, timestamp: int) -> dict[str, dict]:
-        nodeCapacities = {}
+        return {
+            nodeName: {
+                "features": list(nodeCapacity["features"]),
+                "cpu": nodeCapacity["cpu"],
+                "gpu": nodeCapacity["gpu"],
+            }
+            for nodeName, nodeCapacity in self._get_node_capacities_map_at(timestamp).items()
+        }
+
+    def getNodeGroupNames(self) -> list[str]:
+        return [node_group.name_pattern for node_group in self.node_groups]
 
+    def getNodeGroupCapacitiesAt(self, timestamp: int) -> dict[str, dict[str, int]]:
+        capacities = {}
         for node_group in self.node_groups:
-            expandedNodes = expand_hostlist(node_group.name_pattern)
-            activeNodeCount = node_group.get_node_count_at(timestamp)
-            activeNodes = expandedNodes[:activeNodeCount]
+            activeNodeCount = max(0, node_group.get_node_count_at(timestamp))
+            capacities[node_group.name_pattern] = {
+                "cpu": activeNodeCount * node_group.resources.cpu_cores,
+                "gpu": activeNodeCount * node_group.resources.gpus,
+            }
 
-            for nodeName in activeNodes:
-                nodeCapacities[nodeName] = {
-                    "features": list(node_group.features),
-                    "cpu": node_group.resources.cpu_cores,
-                    "gpu": node_group.resources.gpus,
-                }
+        return capacities
 
-        return nodeCapacities
+    def getPartitionNames(self) -> list[str]:
+        return [partition.name for partition in self.partitions]
+
+    def getPartitionCapacitiesAt(self, timestamp: int) -> dict[str, dict[str, int]]:
+        nodeCapacities = self._get_node_capacities_map_at(timestamp)
+        capacities = {}
+        for partition in self.partitions:
+            capacities[partition.name] = {"cpu": 0, "gpu": 0}
+            for nodeName in self.getPartitionNodeNames(partition.name, timestamp):
+                capacities[partition.name]["cpu"] += nodeCapacities[nodeName]["cpu"]
+                capacities[partition.name]["gpu"] += nodeCapacities[nodeName]["gpu"]
+
+        return capacities
+
+    def getNodeCountEpochAt(self, timestamp: int) -> int:
+        """
+        Index of the interval between node-count history boundaries that contains
+        ``timestamp``. Every node group has the same active node count at two
+        timestamps with the same epoch.
+        """
+        return bisect_right(self._get_node_count_epochs(), int(timestamp))
 
     def getPartition(self, partitionName: str | None) -> PartitionConfig | None:
         if not partitionName:
@@ -348,13 +384,36 @@ class ClusterConfig:
 
         return featureCapacities
 
+    def getNodeGroupCapacitiesForHostlist(
+        self, hostlist: str, timestamp: int | None = None
+    ) -> dict[str, dict[str, int]]:
+        if timestamp is None:
+            sourceCapacities = self._get_node_capacities_map()
+        else:
+            sourceCapacities = self._get_node_capacities_map_at(timestamp)
+
+        groupCapacities = {}
+        for nodeName in expand_hostlist(hostlist):
+            nodeCapacity = sourceCapacities.get(nodeName)
+            if nodeCapacity is None:
+                continue
+
+            groupCapacity = groupCapacities.setdefault(
+                nodeCapacity["group"], {"nodes": 0, "cpu": 0, "gpu": 0}
+            )
+            groupCapacity["nodes"] += 1
+            groupCapacity["cpu"] += nodeCapacity["cpu"]
+            groupCapacity["gpu"] += nodeCapacity["gpu"]
+
+        return groupCapacities
+
     def getNodeCapacitiesForHostlist(
         self, hostlist: str, timestamp: int | None = None
     ) -> dict[str, dict]:
         if timestamp is None:
             sourceCapacities = self._get_node_capacities_map()
         else:
-            sourceCapacities = self.getNodeCapacitiesAt(timestamp)
+            sourceCapacities = self._get_node_capacities_map_at(timestamp)
 
         hostlistCapacities = {}
         for nodeName in expand_hostlist(hostlist):
@@ -389,6 +448,7 @@ class ClusterConfig:
         for node_group in self.node_groups:
             for nodeName in expand_hostlist(node_group.name_pattern):
                 self._node_capacities_cache[nodeName] = {
+                    "group": node_group.name_pattern,
                     "features": list(node_group.features),
                     "cpu": node_group.resources.cpu_cores,
                     "gpu": node_group.resources.gpus,
@@ -396,6 +456,45 @@ class ClusterConfig:
 
         return self._node_capacities_cache
 
+    def _get_node_capacities_map_at(self, timestamp: int) -> dict[str, dict]:
+        epoch = self.getNodeCountEpochAt(timestamp)
+        nodeCapacities = self._node_capacities_by_epoch_cache.get(epoch)
+        if nodeCapacities is not None:
+            return nodeCapacities
+
+        nodeCapacities = {}
+        for node_group in self.node_groups:
+            expandedNodes = expand_hostlist(node_group.name_pattern)
+            activeNodeCount = node_group.get_node_count_at(timestamp)
+            activeNodes = expandedNodes[:activeNodeCount]
+
+            for nodeName in activeNodes:
+                nodeCapacities[nodeName] = {
+                    "group": node_group.name_pattern,
+                    "features": list(node_group.features),
+                    "cpu": node_group.resources.cpu_cores,
+                    "gpu": node_group.resources.gpus,
+                }
+
+        self._node_capacities_by_epoch_cache[epoch] = nodeCapacities
+        return nodeCapacities
+
+    def _get_node_count_epochs(self) -> list[int]:
+        if self._node_count_epochs_cache is not None:
+            return self._node_count_epochs_cache
+
+        boundaries = set()
+        for node_group in self.node_groups:
+            for period in node_group.history or []:
+                boundaries.update(
+                    int(boundary)
+                    for boundary in (period.start, period.end)
+                    if boundary is not None
+                )
+
+        self._node_count_epochs_cache = sorted(boundaries)
+        return self._node_count_epochs_cache
+
     def _node_group_to_dict(self, node_group: NodeGroupConfig) -> dict:
         result = {
             "name_pattern": node_group.name_pattern,
@@ -630,6 +729,10 @@ class AdminPanelAccessConfig:
 class DBConfig:
     DEFAULT_CHARSET = "utf8mb4"
     DEFAULT_COLLATION = "utf8mb4_general_ci"
+    DEFAULT_POOL_SIZE = 4
+    DEFAULT_POOL_TIMEOUT_SECONDS = 30
+    DEFAULT_STATEMENT_TIMEOUT_SECONDS = 0
+    DEFAULT_ACTIVE_JOBS_RECONCILE_SECONDS = 600
 
     def __init__(self):
         self.host = None
@@ -638,6 +741,10 @@ class DBConfig:
         self.database = None
         self.charset = self.DEFAULT_CHARSET
         self.collation = self.DEFAULT_COLLATION
+        self.pool_size = self.DEFAULT_POOL_SIZE
+        self.pool_timeout_seconds = self.DEFAULT_POOL_TIMEOUT_SECONDS
+        self.statement_timeout_seconds = self.DEFAULT_STATEMENT_TIMEOUT_SECONDS
+        self.active_jobs_reconcile_seconds = self.DEFAULT_ACTIVE_JOBS_RECONCILE_SECONDS
 
     def loadConfig(self, filePath):
         from dotenv import load_dotenv
@@ -656,6 +763,16 @@ class DBConfig:
         self.database = os.getenv("DB_DATABASE")
         self.charset = os.getenv("DB_CHARSET", self.DEFAULT_CHARSET)
         self.collation = os.getenv("DB_COLLATION", self.DEFAULT_COLLATION)
+        self.pool_size = max(1, int(os.getenv("DB_POOL_SIZE", self.DEFAULT_POOL_SIZE)))
+        self.pool_timeout_seconds = float(
+            os.getenv("DB_POOL_TIMEOUT", self.DEFAULT_POOL_TIMEOUT_SECONDS)
+        )
+        self.statement_timeout_seconds = float(
+            os.getenv("DB_STATEMENT_TIMEOUT", self.DEFAULT_STATEMENT_TIMEOUT_SECONDS)
+        )
+        self.active_jobs_reconcile_seconds = float(
+            os.getenv("DB_ACTIVE_JOBS_RECONCILE", self.DEFAULT_ACTIVE_JOBS_RECONCILE_SECONDS)
+        )
         return self
 
     def getParameters(self):
@@ -688,6 +805,13 @@ class SchedulerConfig:
     DEFAULT_CONNECTOR_TIMEOUT_SECONDS = 30
     DEFAULT_CONNECTOR_API_TOKEN = None
     DEFAULT_CONNECTOR_TARGET_QOS = None
+    DEFAULT_SERIES_BUILD_WORKERS = 1
+    # Режимы совпадают с storage.constants.JOB_MIRROR_MODES.
+    JOB_MIRROR_MODES = ("off", "sync", "read_through")
+    DEFAULT_JOB_MIRROR_MODE = "off"
+    # Движки совпадают с scheduler.resources.RESOURCE_TREE_ENGINES.
+    RESOURCE_TREE_ENGINES = ("python", "numpy")
+    DEFAULT_RESOURCE_TREE_ENGINE = "python"
 
     def __init__(self):
         self.timelimit = None
@@ -715,6 +839,9 @@ class SchedulerConfig:
         self.connector_api_token = self.DEFAULT_CONNECTOR_API_TOKEN
         self.connector_timeout_seconds = self.DEFAULT_CONNECTOR_TIMEOUT_SECONDS
         self.connector_target_qos = self.DEFAULT_CONNECTOR_TARGET_QOS
+        self.series_build_workers = self.DEFAULT_SERIES_BUILD_WORKERS
+        self.job_mirror_mode = self.DEFAULT_JOB_MIRROR_MODE
+        self.resource_tree_engine = self.DEFAULT_RESOURCE_TREE_ENGINE
 
     def loadConfig(self, filePath):
         if not os.path.exists(filePath):
@@ -793,6 +920,16 @@ class SchedulerConfig:
         self.connector_target_qos = self._normalize_optional_string(
             connectorConfig.get("target_qos", self.DEFAULT_CONNECTOR_TARGET_QOS)
         )
+        self.series_build_workers = self._normalize_positive_integer(
+            config.get("series_build_workers", self.DEFAULT_SERIES_BUILD_WORKERS),
+            "series_build_workers",
+        )
+        self.job_mirror_mode = self._normalize_job_mirror_mode(
+            config.get("job_mirror_mode", self.DEFAULT_JOB_MIRROR_MODE)
+        )
+        self.resource_tree_engine = self._normalize_resource_tree_engine(
+            config.get("resource_tree_engine", self.DEFAULT_RESOURCE_TREE_ENGINE)
+        )
         return self
 
     def saveConfig(self, filePath):
@@ -855,6 +992,15 @@ class SchedulerConfig:
                 self.cluster_config_refresh_command
             )
 
+        if self.series_build_workers is not None:
+            result["series_build_workers"] = self.series_build_workers
+
+        if self.job_mirror_mode != self.DEFAULT_JOB_MIRROR_MODE:
+            result["job_mirror_mode"] = self.job_mirror_mode
+
+        if self.resource_tree_engine != self.DEFAULT_RESOURCE_TREE_ENGINE:
+            result["resource_tree_engine"] = self.resource_tree_engine
+
         if self.connector_mserver_url:
             result["connector"] = result.get("connector", {})
             result["connector"]["mserver_url"] = self.connector_mserver_url
@@ -894,6 +1040,9 @@ class SchedulerConfig:
         clone.connector_api_token = self.connector_api_token
         clone.connector_timeout_seconds = self.connector_timeout_seconds
         clone.connector_target_qos = self.connector_target_qos
+        clone.series_build_workers = self.series_build_workers
+        clone.job_mirror_mode = self.job_mirror_mode
+        clone.resource_tree_engine = self.resource_tree_engine
         return clone
 
     def _loadEnvFile(self):
@@ -925,6 +1074,27 @@ class SchedulerConfig:
 
         return normalized
 
+    def _normalize_positive_integer(self, value, fieldName: str):
+        normalized = self._normalize_positive_number(value, fieldName)
+        if not isinstance(normalized, int):
+            raise ValueError(f"{fieldName} must be an integer")
+
+        return normalized
+
+    def _normalize_job_mirror_mode(self, value):
+        normalized = str(value or self.DEFAULT_JOB_MIRROR_MODE).strip()
+        if normalized not in self.JOB_MIRROR_MODES:
+            raise ValueError(f"job_mirror_mode must be one of {', '.join(self.JOB_MIRROR_MODES)}")
+
+        return normalized
+
+    def _normalize_resource_tree_engine(self, value):
+        normalized = str(value or self.DEFAULT_RESOURCE_TREE_ENGINE).strip()
+        if normalized not in self.RESOURCE_TREE_ENGINES:
+            raise ValueError(f"resource_tree_engine must be one of {', '.join(self.RESOURCE_TREE_ENGINES)}")
+
+        return normalized
+
     def _normalize_command(self, commandValue):
         if commandValue is None:
             return list(self.DEFAULT_CLUSTER_CONFIG_REFRESH_COMMAND)
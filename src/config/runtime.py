@@ -20,6 +20,8 @@ HOT_RELOADABLE_SCHEDULER_FIELDS = (
     "forecast_data_dir",
     "forecast_model_dir",
     "forecast_skip_startup_training",
+    "series_build_workers",
+    "resource_tree_engine",
 )
 
 
@@ -12,6 +12,10 @@ except ModuleNotFoundError:
     logger = logging.getLogger(__name__)
     logger.success = logger.info
 
+from storage.jsonio import list_json_files, load_json
+from storage.series_binary import find_series_array, load_series_array
+from storage.series_rollup import load_series_rollup
+
 from .models import FeatureForecast
 from .training import (
     DEFAULT_FORECAST_PREDICTION_HORIZON_HOURS,
@@ -102,7 +106,7 @@ class ForecastService:
             return {}
 
         averageLoadsByFeature = {}
-        for seriesFile in sorted(seriesDir.glob("*.json")):
+        for seriesFile in list_json_files(seriesDir):
             averageLoads = self._loadFeatureAverage(seriesFile)
             if averageLoads is None:
                 continue
@@ -155,9 +159,16 @@ class ForecastService:
         return resolve_series_dir(dataDir)
 
     def _loadFeatureAverage(self, seriesFile: Path) -> dict[str, float] | None:
+        dailyRollup = load_series_rollup(seriesFile.parent, seriesFile.stem, "1d")
+        if dailyRollup is not None:
+            return self._loadFeatureRollupAverage(dailyRollup.values)
+
+        arrayPath = find_series_array(seriesFile)
+        if arrayPath is not None:
+            return self._loadFeatureArrayAverage(arrayPath)
+
         try:
-            with open(seriesFile, "r", encoding="utf-8") as file:
-                payload = json.load(file)
+            payload = load_json(seriesFile)
         except (OSError, json.JSONDecodeError) as error:
             logger.warning(f"Failed to load forecast series from '{seriesFile}': {error}")
             return None
@@ -187,6 +198,33 @@ class ForecastService:
             "gpu": sum(gpuValues) / len(gpuValues),
         }
 
+    def _loadFeatureArrayAverage(self, arrayPath: Path) -> dict[str, float] | None:
+        try:
+            values = load_series_array(arrayPath)
+        except (OSError, ValueError) as error:
+            logger.warning(f"Failed to load forecast series from '{arrayPath}': {error}")
+            return None
+
+        if len(values) == 0:
+            return None
+
+        return {
+            "cpu": float(values["cpu"].mean(dtype=np.float64)),
+            "gpu": float(values["gpu"].mean(dtype=np.float64)),
+        }
+
+    def _loadFeatureRollupAverage(self, rows) -> dict[str, float] | None:
+        counts = rows["count"].astype(np.float64)
+        totalCount = counts.sum()
+        if totalCount == 0:
+            return None
+
+        # Среднее всей серии из дневных средних, взвешенных числом точек.
+        return {
+            "cpu": float((rows["cpu_mean"] * counts).sum() / totalCount),
+            "gpu": float((rows["gpu_mean"] * counts).sum() / totalCount),
+        }
+
     def _parsePercentValue(self, value) -> float | None:
         if value is None:
             return None
@@ -13,7 +13,11 @@ from config.timezone import coerce_datetime_timezone, now_in_timezone
 from config.calendar import ConferenceCalendarConfig
 from config.paths import academicCalendarRoot
 from storage import slurmStorage
-from storage.constants import DEFAULT_EXPORT_ROOT
+from storage.constants import DEFAULT_EXPORT_ROOT, DEFAULT_SERIES_BUILD_WORKERS, JOB_MIRROR_OFF
+from storage.jsonio import load_json, resolve_json_file
+from storage.series_binary import find_series_array, load_series_array
+from storage.series_rollup import load_series_rollup
+from storage.timeutils import to_wall_clock_seconds
 
 try:
     from loguru import logger
@@ -218,6 +222,10 @@ def make_catboost_regressor():
 
 
 def _parse_time_column(rawTime: pd.Series) -> pd.Series:
+    if pd.api.types.is_integer_dtype(rawTime):
+        # Схема v2: секунды эпохи переводятся в локальное время, как в метках v1.
+        return pd.to_datetime(to_wall_clock_seconds(rawTime.to_numpy()), unit="s")
+
     parsed = pd.to_datetime(rawTime, format="%H:%M:%S %d.%m.%y", errors="coerce")
     missingMask = parsed.isna()
     if missingMask.any():
@@ -227,10 +235,12 @@ def _parse_time_column(rawTime: pd.Series) -> pd.Series:
 
 def _load_overall_series(seriesDir: Path) -> pd.DataFrame:
     overallPath = seriesDir / f"{DEFAULT_FEATURE_NAME}.json"
-    if not overallPath.exists():
+    arrayPath = find_series_array(overallPath)
+    if arrayPath is not None:
+        return _load_overall_series_array(arrayPath)
+    if resolve_json_file(overallPath) is None:
         raise FileNotFoundError(f"Overall utilization series not found: {overallPath}")
-    with open(overallPath, "r", encoding="utf-8") as file:
-        payload = json.load(file)
+    payload = load_json(overallPath)
     if not isinstance(payload, list):
         raise ValueError(f"Overall series must contain a JSON list: {overallPath}")
     frame = pd.DataFrame(payload)
@@ -242,6 +252,23 @@ def _load_overall_series(seriesDir: Path) -> pd.DataFrame:
     frame["time"] = _parse_time_column(frame["time"])
     frame["cpu"] = pd.to_numeric(frame["cpu"], errors="coerce")
     frame["gpu"] = pd.to_numeric(frame["gpu"], errors="coerce")
+    return _normalize_overall_frame(frame)
+
+
+def _load_overall_series_array(arrayPath: Path) -> pd.DataFrame:
+    values = load_series_array(arrayPath)
+    frame = pd.DataFrame(
+        {
+            # В массиве секунды эпохи: переводим в настенное время, как в JSON-метках.
+            "time": pd.to_datetime(to_wall_clock_seconds(values["time"]), unit="s"),
+            "cpu": values["cpu"].astype(np.float64),
+            "gpu": values["gpu"].astype(np.float64),
+        }
+    )
+    return _normalize_overall_frame(frame)
+
+
+def _normalize_overall_frame(frame: pd.DataFrame) -> pd.DataFrame:
     frame = frame.dropna(subset=["time"]).sort_values("time").drop_duplicates(subset=["time"], keep="last")
     frame["cpu"] = frame["cpu"].clip(lower=MIN_UTILIZATION, upper=MAX_UTILIZATION)
     frame["gpu"] = frame["gpu"].clip(lower=MIN_UTILIZATION, upper=MAX_UTILIZATION)
@@ -582,27 +609,19 @@ def build_current_year_seasonality_points(
     pointLimit: int = 366,
 ) -> dict:
     effectiveNow = now or datetime.now()
-    overallFrame = load_overall_series_frame(seriesDir)
-    if overallFrame.empty:
+    dailyMedians = _load_daily_gpu_medians(seriesDir)
+    if dailyMedians.empty:
         return {"year": effectiveNow.year, "points": [], "method": "daily_median_minus_21d_trend"}
 
     currentYear = int(effectiveNow.year)
-    currentYearFrame = overallFrame.loc[overallFrame["time"].dt.year == currentYear].copy()
+    currentYearDays = dailyMedians.loc[dailyMedians["time"].dt.year == currentYear]
     yearUsed = currentYear
-    if currentYearFrame.empty:
-        latestTimestamp = overallFrame["time"].max()
-        yearUsed = int(pd.Timestamp(latestTimestamp).year)
-        currentYearFrame = overallFrame.loc[overallFrame["time"].dt.year == yearUsed].copy()
+    if currentYearDays.empty:
+        yearUsed = int(pd.Timestamp(dailyMedians["time"].max()).year)
+        currentYearDays = dailyMedians.loc[dailyMedians["time"].dt.year == yearUsed]
 
-    dailyFrame = (
-        currentYearFrame.set_index("time")[["gpu"]]
-        .resample("D")
-        .median()
-        .rename(columns={"gpu": "daily_gpu_percent"})
-        .reset_index()
-    )
-    if dailyFrame.empty:
-        return {"year": yearUsed, "points": [], "method": "daily_median_minus_21d_trend"}
+    # Дни без точек остаются пропусками, как после resample("D").
+    dailyFrame = currentYearDays.set_index("time").asfreq("D").reset_index()
 
     dailyFrame["trend_gpu_percent"] = (
         dailyFrame["daily_gpu_percent"]
@@ -646,6 +665,29 @@ def build_current_year_seasonality_points(
     }
 
 
+def _load_daily_gpu_medians(seriesDir: str | Path) -> pd.DataFrame:
+    resolvedSeriesDir = resolve_series_dir(seriesDir)
+    dailyRollup = load_series_rollup(resolvedSeriesDir, DEFAULT_FEATURE_NAME, "1d")
+    if dailyRollup is not None:
+        rows = dailyRollup.values
+        return pd.DataFrame(
+            {
+                "time": pd.to_datetime(to_wall_clock_seconds(rows["time"]), unit="s"),
+                "daily_gpu_percent": np.clip(rows["gpu_p50"], MIN_UTILIZATION, MAX_UTILIZATION),
+            }
+        )
+
+    return (
+        _load_overall_series(resolvedSeriesDir)
+        .set_index("time")[["gpu"]]
+        .resample("D")
+        .median()
+        .dropna()
+        .rename(columns={"gpu": "daily_gpu_percent"})
+        .reset_index()
+    )
+
+
 def _build_centered_fourier_block(phase: np.ndarray, order: int) -> np.ndarray:
     columns = []
     for harmonic in range(1, order + 1):
@@ -1009,6 +1051,8 @@ def train_gradient_boosting_forecast(
     timezoneName: str = "Europe/Moscow",
     modelUpdateIntervalHours: int | float = DEFAULT_MODEL_UPDATE_INTERVAL_HOURS,
     forecastPredictionHorizonHours: int | float = DEFAULT_FORECAST_PREDICTION_HORIZON_HOURS,
+    seriesBuildWorkers: int = DEFAULT_SERIES_BUILD_WORKERS,
+    jobMirrorMode: str = JOB_MIRROR_OFF,
 ) -> ForecastArtifact:
     effectiveNow = coerce_datetime_timezone(now or now_in_timezone(timezoneName), timezoneName)
     resolvedModelDir = resolve_model_dir(projectRoot, modelDir)
@@ -1032,9 +1076,13 @@ def train_gradient_boosting_forecast(
 
     if refreshData:
         logger.info(f"Refreshing utilization export before model training into '{resolvedDataDir}'")
-        storage = slurmStorage().create()
+        storage = slurmStorage(jobMirrorMode=jobMirrorMode, mirrorDir=resolvedDataDir).create()
         try:
-            storage.exportIncrementalHistoricalUtilization(outputDir=str(resolvedDataDir))
+            storage.exportIncrementalHistoricalUtilization(
+                outputDir=str(resolvedDataDir),
+                tailOnly=True,
+                seriesWorkers=seriesBuildWorkers,
+            )
         finally:
             storage.close()
 
@@ -1179,6 +1227,8 @@ def ensure_fresh_forecast_model(
     timezoneName: str = "Europe/Moscow",
     modelUpdateIntervalHours: int | float = DEFAULT_MODEL_UPDATE_INTERVAL_HOURS,
     forecastPredictionHorizonHours: int | float = DEFAULT_FORECAST_PREDICTION_HORIZON_HOURS,
+    seriesBuildWorkers: int = DEFAULT_SERIES_BUILD_WORKERS,
+    jobMirrorMode: str = JOB_MIRROR_OFF,
 ) -> ForecastArtifact | None:
     effectiveNow = coerce_datetime_timezone(now or now_in_timezone(timezoneName), timezoneName)
     artifact = load_artifact(resolve_model_dir(projectRoot, modelDir))
@@ -1211,4 +1261,6 @@ def ensure_fresh_forecast_model(
         timezoneName=timezoneName,
         modelUpdateIntervalHours=modelUpdateIntervalHours,
         forecastPredictionHorizonHours=forecastPredictionHorizonHours,
+        seriesBuildWorkers=seriesBuildWorkers,
+        jobMirrorMode=jobMirrorMode,
     )
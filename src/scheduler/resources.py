@@ -1,6 +1,8 @@
 import logging
 from dataclasses import dataclass
 
+import numpy as np
+
 try:
     from loguru import logger
 except ModuleNotFoundError:
@@ -8,6 +10,11 @@ except ModuleNotFoundError:
     logger = logging.getLogger(__name__)
     logger.success = logger.info
 
+RESOURCE_TREE_ENGINE_PYTHON = "python"
+RESOURCE_TREE_ENGINE_NUMPY = "numpy"
+RESOURCE_TREE_ENGINES = (RESOURCE_TREE_ENGINE_PYTHON, RESOURCE_TREE_ENGINE_NUMPY)
+DEFAULT_RESOURCE_TREE_ENGINE = RESOURCE_TREE_ENGINE_PYTHON
+
 
 @dataclass
 class NodeResourceState:
@@ -47,12 +54,21 @@ class JobPlacement:
 class ResourceAvailabilityTree:
     def __init__(self, nodesByFeature: dict[str, list[NodeResourceState]]):
         self.nodesByFeature = nodesByFeature
+        # Индексы строятся один раз: без них каждая запущенная задача обходила все узлы кластера.
+        self.nodeStatesByFeature = {
+            featureName: {nodeState.nodeName: nodeState for nodeState in featureNodes}
+            for featureName, featureNodes in nodesByFeature.items()
+        }
+        self.nodeStatesByName = {}
+        for featureNodes in nodesByFeature.values():
+            for nodeState in featureNodes:
+                self.nodeStatesByName.setdefault(nodeState.nodeName, nodeState)
+        self.nodePositions = {nodeName: position for position, nodeName in enumerate(self.nodeStatesByName)}
 
     @classmethod
     def fromClusterAndJobs(cls, clusterConfig, runningJobs, timestamp: int):
         nodeCapacities = clusterConfig.getNodeCapacitiesAt(timestamp)
         nodesByFeature = {}
-        nodeStatesByName = {}
 
         for nodeName, capacity in nodeCapacities.items():
             nodeState = NodeResourceState(
@@ -61,7 +77,6 @@ class ResourceAvailabilityTree:
                 totalCpu=capacity["cpu"],
                 totalGpu=capacity["gpu"],
             )
-            nodeStatesByName[nodeName] = nodeState
 
             for featureName in capacity["features"]:
                 nodesByFeature.setdefault(featureName, []).append(
@@ -118,10 +133,7 @@ class ResourceAvailabilityTree:
         )
 
     def reservePlacement(self, placement: JobPlacement):
-        featureNodes = {
-            nodeState.nodeName: nodeState
-            for nodeState in self.nodesByFeature.get(placement.featureName, [])
-        }
+        featureNodes = self.nodeStatesByFeature.get(placement.featureName, {})
 
         for allocation in placement.allocations:
             nodeState = featureNodes.get(allocation.nodeName)
@@ -415,16 +427,340 @@ class ResourceAvailabilityTree:
     def _getAssignedNodeStates(self, job):
         from config import expand_hostlist
 
-        assignedNodeNames = set(expand_hostlist(job.nodelist))
+        assignedNodeNames = [
+            nodeName for nodeName in set(expand_hostlist(job.nodelist)) if nodeName in self.nodeStatesByName
+        ]
+        # Порядок узлов как в дереве, а не в hostlist: от него зависят фича и раскладка задачи.
+        assignedNodeNames.sort(key=self.nodePositions.__getitem__)
 
-        assignedStates = []
-        for featureNodes in self.nodesByFeature.values():
-            for nodeState in featureNodes:
-                if nodeState.nodeName in assignedNodeNames:
-                    assignedStates.append(nodeState)
+        return [self.nodeStatesByName[nodeName] for nodeName in assignedNodeNames]
+
+
+def _to_python_number(value):
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def _array_property(name: str, convert):
+    def getValue(nodeState):
+        return convert(getattr(nodeState.arrays, name)[nodeState.position])
+
+    def setValue(nodeState, value):
+        getattr(nodeState.arrays, name)[nodeState.position] = value
+
+    return property(getValue, setValue)
+
+
+class ArrayNodeResourceState(NodeResourceState):
+    """``NodeResourceState`` view of one node row in the arrays of ``ArrayResourceAvailabilityTree``."""
+
+    def __init__(self, arrays: "_NodeArrays", position: int, featureName: str):
+        self.arrays = arrays
+        self.position = position
+        self.nodeName = arrays.nodeNames[position]
+        self.featureName = featureName
+
+    totalCpu = _array_property("totalCpu", _to_python_number)
+    totalGpu = _array_property("totalGpu", _to_python_number)
+    usedCpu = _array_property("usedCpu", float)
+    usedGpu = _array_property("usedGpu", float)
+
+
+class _NodeArrays:
+    def __init__(self, nodeStates: list[NodeResourceState]):
+        self.nodeNames = [nodeState.nodeName for nodeState in nodeStates]
+        self.totalCpu = np.array([nodeState.totalCpu for nodeState in nodeStates], dtype=np.float64)
+        self.totalGpu = np.array([nodeState.totalGpu for nodeState in nodeStates], dtype=np.float64)
+        self.usedCpu = np.array([nodeState.usedCpu for nodeState in nodeStates], dtype=np.float64)
+        self.usedGpu = np.array([nodeState.usedGpu for nodeState in nodeStates], dtype=np.float64)
+
+
+class ArrayResourceAvailabilityTree(ResourceAvailabilityTree):
+    """
+    Resource tree that keeps node totals and used amounts in NumPy arrays.
 
+    Candidate filtering, ordering by availability and capacity checks run on the
+    array rows of a feature, and spread allocation is computed per round instead
+    of one unit at a time. Placements match ``ResourceAvailabilityTree``: sorts
+    are stable and sums are sequential, as in the Python code. Nodes in
+    ``nodesByFeature`` are views of the arrays, so reading and changing them
+    keeps working.
+    """
+
+    def __init__(self, nodesByFeature: dict[str, list[NodeResourceState]]):
         uniqueStates = {}
-        for nodeState in assignedStates:
-            uniqueStates[nodeState.nodeName] = nodeState
+        for featureNodes in nodesByFeature.values():
+            for nodeState in featureNodes:
+                uniqueStates.setdefault(nodeState.nodeName, nodeState)
+
+        self.arrays = _NodeArrays(list(uniqueStates.values()))
+        nodeViews = {
+            nodeName: ArrayNodeResourceState(self.arrays, position, nodeState.featureName)
+            for position, (nodeName, nodeState) in enumerate(uniqueStates.items())
+        }
+        super().__init__(
+            {
+                featureName: [nodeViews[nodeState.nodeName] for nodeState in featureNodes]
+                for featureName, featureNodes in nodesByFeature.items()
+            }
+        )
+        self.featurePositions = {
+            featureName: np.array([nodeState.position for nodeState in featureNodes], dtype=np.intp)
+            for featureName, featureNodes in self.nodesByFeature.items()
+        }
+        self.featureNodeNames = {
+            featureName: [nodeState.nodeName for nodeState in featureNodes]
+            for featureName, featureNodes in self.nodesByFeature.items()
+        }
+
+    def getFeatureTotals(
+        self,
+        featureName: str,
+        allowedNodeNames: set[str] | None = None,
+        maxCpuPerNode: int | None = None,
+    ) -> dict[str, float]:
+        positions = self._getCandidatePositions(featureName, allowedNodeNames)
+        return {
+            "cpu": _sequential_sum(self._getAvailableCpuAt(positions, maxCpuPerNode)),
+            "gpu": _to_python_number(_sequential_sum(self.arrays.totalGpu[positions])),
+        }
+
+    def getFeatureSnapshot(
+        self,
+        featureName: str,
+        allowedNodeNames: set[str] | None = None,
+        maxCpuPerNode: int | None = None,
+    ) -> dict[str, float]:
+        positions = self._getCandidatePositions(featureName, allowedNodeNames)
+        return {
+            "available_cpu": _sequential_sum(self._getAvailableCpuAt(positions, maxCpuPerNode)),
+            "available_gpu": _sequential_sum(self._getAvailableGpuAt(positions)),
+            "total_cpu": _to_python_number(_sequential_sum(self.arrays.totalCpu[positions])),
+            "total_gpu": _to_python_number(_sequential_sum(self.arrays.totalGpu[positions])),
+        }
+
+    def _findPlacementOnFeature(
+        self,
+        job,
+        featureName: str,
+        allowedNodeNames: set[str] | None,
+        maxCpuPerNode: int | None,
+        maxNodesLimit: int | None,
+    ):
+        positions = self._getCandidatePositions(featureName, allowedNodeNames)
+        if len(positions) == 0:
+            return None
+
+        requestedNodes = job.getRequestedNodes()
+        if maxNodesLimit is not None and requestedNodes > maxNodesLimit:
+            return None
+
+        return self._buildPlacementAt(
+            featureName=featureName,
+            positions=positions,
+            requestedCpu=job.getRequestedCpus(),
+            requestedGpu=job.getRequestedGpus(),
+            requestedNodes=requestedNodes if requestedNodes > 0 else None,
+            spreadAcrossSelectedNodes=requestedNodes > 1,
+            maxCpuPerNode=maxCpuPerNode,
+            maxNodesLimit=maxNodesLimit,
+        )
+
+    def _buildPlacement(
+        self,
+        featureName: str,
+        candidateNodes: list[NodeResourceState],
+        requestedCpu: int,
+        requestedGpu: int,
+        requestedNodes: int | None,
+        spreadAcrossSelectedNodes: bool,
+        maxCpuPerNode: int | None,
+        maxNodesLimit: int | None,
+    ):
+        return self._buildPlacementAt(
+            featureName=featureName,
+            positions=np.fromiter((node.position for node in candidateNodes), dtype=np.intp, count=len(candidateNodes)),
+            requestedCpu=requestedCpu,
+            requestedGpu=requestedGpu,
+            requestedNodes=requestedNodes,
+            spreadAcrossSelectedNodes=spreadAcrossSelectedNodes,
+            maxCpuPerNode=maxCpuPerNode,
+            maxNodesLimit=maxNodesLimit,
+        )
+
+    def _buildPlacementAt(
+        self,
+        featureName: str,
+        positions: np.ndarray,
+        requestedCpu: int,
+        requestedGpu: int,
+        requestedNodes: int | None,
+        spreadAcrossSelectedNodes: bool,
+        maxCpuPerNode: int | None,
+        maxNodesLimit: int | None,
+    ):
+        availableCpu = self._getAvailableCpuAt(positions, maxCpuPerNode)
+        availableGpu = self._getAvailableGpuAt(positions)
+        # lexsort устойчив, как sorted(reverse=True): равные узлы сохраняют порядок дерева.
+        order = np.lexsort((-availableCpu, -availableGpu))
+        positions, availableCpu, availableGpu = positions[order], availableCpu[order], availableGpu[order]
+
+        if requestedNodes is None:
+            selectedCount = _count_minimum_nodes(availableCpu, availableGpu, requestedCpu, requestedGpu, maxNodesLimit)
+        else:
+            if len(positions) < requestedNodes:
+                return None
+
+            selectedCount = requestedNodes
+            if not (
+                _sequential_sum(availableCpu[:selectedCount]) >= requestedCpu
+                and _sequential_sum(availableGpu[:selectedCount]) >= requestedGpu
+            ):
+                return None
+
+        if selectedCount == 0:
+            return None
+
+        allocations = self._allocateAt(
+            positions=positions[:selectedCount],
+            availableCpu=availableCpu[:selectedCount],
+            availableGpu=availableGpu[:selectedCount],
+            requestedCpu=requestedCpu,
+            requestedGpu=requestedGpu,
+            spreadAcrossSelectedNodes=spreadAcrossSelectedNodes,
+        )
+        if allocations is None:
+            return None
+
+        return JobPlacement(featureName=featureName, allocations=allocations)
+
+    def _allocateAt(
+        self,
+        positions: np.ndarray,
+        availableCpu: np.ndarray,
+        availableGpu: np.ndarray,
+        requestedCpu: int,
+        requestedGpu: int,
+        spreadAcrossSelectedNodes: bool,
+    ):
+        cpuAllocation = np.zeros(len(positions))
+        gpuAllocation = np.zeros(len(positions))
+
+        if requestedGpu > 0:
+            if spreadAcrossSelectedNodes:
+                gpuOrder = np.argsort(availableGpu, kind="stable")
+            else:
+                gpuOrder = np.argsort(-availableGpu, kind="stable")
+            remainingGpu, gpuAllocation[gpuOrder] = _distribute_resource(
+                availableGpu[gpuOrder], float(requestedGpu), spreadAcrossSelectedNodes
+            )
+            if remainingGpu > 0:
+                return None
+
+        if requestedCpu > 0:
+            withoutGpu = gpuAllocation == 0
+            if spreadAcrossSelectedNodes:
+                cpuOrder = np.lexsort((availableCpu, withoutGpu))
+            else:
+                cpuOrder = np.lexsort((-availableCpu, withoutGpu))
+            remainingCpu, cpuAllocation[cpuOrder] = _distribute_resource(
+                availableCpu[cpuOrder], float(requestedCpu), spreadAcrossSelectedNodes
+            )
+            if remainingCpu > 0:
+                return None
+
+        return [
+            NodeAllocation(nodeName=self.arrays.nodeNames[position], cpu=float(cpu), gpu=float(gpu))
+            for position, cpu, gpu in zip(positions.tolist(), cpuAllocation, gpuAllocation)
+            if cpu > 0 or gpu > 0
+        ]
+
+    def _getCandidatePositions(self, featureName: str, allowedNodeNames: set[str] | None) -> np.ndarray:
+        positions = self.featurePositions.get(featureName, np.empty(0, dtype=np.intp))
+        if allowedNodeNames is None:
+            return positions
+
+        # Проверка по множеству дешевле np.isin: разделы больше фич, а isin сортирует оба массива.
+        nodeNames = self.featureNodeNames.get(featureName, [])
+        allowedMask = np.fromiter(
+            (nodeName in allowedNodeNames for nodeName in nodeNames), dtype=bool, count=len(nodeNames)
+        )
+        return positions[allowedMask]
+
+    def _getAvailableCpuAt(self, positions: np.ndarray, maxCpuPerNode: int | None) -> np.ndarray:
+        availableCpu = np.maximum(0.0, self.arrays.totalCpu[positions] - self.arrays.usedCpu[positions])
+        if maxCpuPerNode is None:
+            return availableCpu
+
+        return np.minimum(availableCpu, float(maxCpuPerNode))
+
+    def _getAvailableGpuAt(self, positions: np.ndarray) -> np.ndarray:
+        return np.maximum(0.0, self.arrays.totalGpu[positions] - self.arrays.usedGpu[positions])
+
+
+def get_resource_tree_class(engine: str = DEFAULT_RESOURCE_TREE_ENGINE):
+    if engine == RESOURCE_TREE_ENGINE_PYTHON:
+        return ResourceAvailabilityTree
+    if engine == RESOURCE_TREE_ENGINE_NUMPY:
+        return ArrayResourceAvailabilityTree
+
+    raise ValueError(f"Unknown resource tree engine '{engine}', expected one of {RESOURCE_TREE_ENGINES}")
+
+
+def _count_minimum_nodes(availableCpu, availableGpu, requestedCpu: int, requestedGpu: int, maxNodesLimit: int | None) -> int:
+    limit = len(availableCpu) if maxNodesLimit is None else min(len(availableCpu), maxNodesLimit)
+    if limit <= 0:
+        return 0
+
+    # cumsum складывает по порядку, как цикл _pickMinimumNodes, поэтому граница та же.
+    reached = (np.cumsum(availableCpu[:limit]) >= requestedCpu) & (np.cumsum(availableGpu[:limit]) >= requestedGpu)
+    if not reached.any():
+        return 0
+
+    return int(np.argmax(reached)) + 1
+
+
+def _distribute_resource(capacities: np.ndarray, remainingAmount: float, spread: bool):
+    """
+    Allocate ``remainingAmount`` over ``capacities`` in their order and return
+    the amount left and the allocation per node.
+
+    Without ``spread`` nodes are filled one after another. With ``spread`` the
+    Python tree hands out one unit per node per round; after ``k`` full rounds a
+    node holds ``min(capacity, k)``, so the full rounds are found by bisection
+    and only the last, partial round is walked in order.
+    """
+    capacities = np.maximum(capacities, 0.0)
+    if remainingAmount <= 0:
+        return 0.0, np.zeros(len(capacities))
+
+    if not spread:
+        before = np.cumsum(capacities) - capacities
+        allocation = np.clip(remainingAmount - before, 0.0, capacities)
+        return remainingAmount - _sequential_sum(allocation), allocation
+
+    totalCapacity = _sequential_sum(capacities)
+    if totalCapacity <= remainingAmount:
+        return remainingAmount - totalCapacity, capacities.copy()
+
+    fullRounds, overflowRounds = 0, int(np.ceil(capacities.max()))
+    while overflowRounds - fullRounds > 1:
+        rounds = (fullRounds + overflowRounds) // 2
+        if _sequential_sum(np.minimum(capacities, rounds)) <= remainingAmount:
+            fullRounds = rounds
+        else:
+            overflowRounds = rounds
+
+    allocation = np.minimum(capacities, float(fullRounds))
+    leftAmount = remainingAmount - _sequential_sum(allocation)
+    steps = np.clip(capacities - fullRounds, 0.0, 1.0)
+    allocation += np.clip(leftAmount - (np.cumsum(steps) - steps), 0.0, steps)
+    return 0.0, allocation
+
+
+def _sequential_sum(values: np.ndarray) -> float:
+    # np.sum складывает попарно; сумма по порядку совпадает с sum() в Python-дереве.
+    if len(values) == 0:
+        return 0.0
 
-        return list(uniqueStates.values())
+    return float(np.cumsum(values)[-1])
@@ -30,7 +30,7 @@ from .attempt_cache import (
     save_failed_job_pool,
     save_launch_attempts,
 )
-from .resources import ResourceAvailabilityTree
+from .resources import get_resource_tree_class
 
 
 class Scheduler:
@@ -42,11 +42,14 @@ class Scheduler:
         schedulerConfig=None,
         jobRuntimeEventWriter=None,
         schedulerRuntimeEventWriter=None,
+        clusterConfig=None,
+        jobLaunchEventWriter=None,
     ):
         self.config = schedulerConfig or getSchedulerConfig()
-        self.clusterConfig = getClusterConfig()
+        self.clusterConfig = clusterConfig or getClusterConfig()
         self.jobRuntimeEventWriter = jobRuntimeEventWriter
         self.schedulerRuntimeEventWriter = schedulerRuntimeEventWriter
+        self.jobLaunchEventWriter = jobLaunchEventWriter
         self.forecastService = None
         if forecastDataDir is not None:
             self.forecastService = ForecastService(
@@ -110,7 +113,7 @@ class Scheduler:
             message=f"Built running-jobs snapshot with {len(runningJobs)} active jobs.",
             running_job_count=len(runningJobs),
         )
-        resourceTree = ResourceAvailabilityTree.fromClusterAndJobs(
+        resourceTree = get_resource_tree_class(self.config.resource_tree_engine).fromClusterAndJobs(
             clusterConfig=self.clusterConfig,
             runningJobs=runningJobs,
             timestamp=currentTimestamp,
@@ -231,7 +234,7 @@ class Scheduler:
                 runId=runId,
                 trigger=trigger,
             )
-            append_job_launch_event(launchEvent)
+            self._write_job_launch_event(launchEvent)
             currentLaunchAttempts.append(launchEvent)
             pendingJobsById[job.getID()]["status"] = "ATTEMPTED"
             pendingJobsById[job.getID()]["was_attempted"] = True
@@ -352,7 +355,7 @@ class Scheduler:
                     )
                 )
 
-            append_job_launch_event(reconciledAttemptEvent)
+            self._write_job_launch_event(reconciledAttemptEvent)
 
         save_launch_attempts([])
         save_failed_job_pool(failedJobPool)
@@ -586,6 +589,12 @@ class Scheduler:
         )
         self.schedulerRuntimeEventWriter(event)
 
+    def _write_job_launch_event(self, event: dict):
+        if self.jobLaunchEventWriter is None:
+            append_job_launch_event(event)
+            return
+        self.jobLaunchEventWriter(event)
+
     def _write_job_runtime_event(self, event: dict):
         if self.jobRuntimeEventWriter is None:
             return
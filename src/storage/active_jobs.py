@@ -0,0 +1,136 @@
+import logging
+import threading
+import time
+
+try:
+    from loguru import logger
+except ModuleNotFoundError:
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+    logger.success = logger.info
+
+from config import getDBConfig
+
+from .models import HistoricalJob
+
+
+_ACTIVE_JOB_SET = None
+_ACTIVE_JOB_SET_LOCK = threading.Lock()
+
+
+class ActiveJobSet:
+    """
+    Running slurmDB jobs kept in memory between scheduler ticks.
+
+    The first call and every ``reconcileSeconds`` run the full active-jobs query.
+    In between only rows with ``mod_time`` at or after the last seen value are
+    read and applied on top of the set: started jobs are added, finished or
+    deleted ones are removed. The boundary second is read again on purpose,
+    because rows committed later in the same second have the same ``mod_time``.
+    """
+
+    def __init__(self, reconcileSeconds: float = 600, clock=time.monotonic):
+        self.reconcileSeconds = float(reconcileSeconds)
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.jobs: dict[tuple, HistoricalJob] = {}
+        self.lastModTime = None
+        self.refreshedTimestamp = None
+        self.reconciledAt = None
+        self.fullReloads = 0
+        self.deltaRefreshes = 0
+        self.deltaRows = 0
+
+    def getRunningJobs(self, repository, nowTimestamp: int) -> list[HistoricalJob]:
+        with self.lock:
+            if self.refreshedTimestamp is not None and nowTimestamp < self.refreshedTimestamp:
+                # Набор уже не хранит задачи, завершившиеся до прошлого обновления.
+                return repository.get_active_jobs(nowTimestamp)
+
+            if self.reconciledAt is None or self.clock() - self.reconciledAt >= self.reconcileSeconds:
+                self._reload(repository, nowTimestamp)
+            else:
+                self._applyChanges(repository, nowTimestamp)
+
+            self.refreshedTimestamp = nowTimestamp
+            return sorted(
+                (job for job in self.jobs.values() if _is_running(job, nowTimestamp)),
+                key=_get_active_job_order,
+            )
+
+    def getMetrics(self) -> dict:
+        with self.lock:
+            return {
+                "jobs": len(self.jobs),
+                "last_mod_time": self.lastModTime,
+                "full_reloads": self.fullReloads,
+                "delta_refreshes": self.deltaRefreshes,
+                "delta_rows": self.deltaRows,
+            }
+
+    def _reload(self, repository, nowTimestamp: int):
+        # Отметку берём до выборки: всё, что изменится во время неё, попадёт в следующую дельту.
+        lastModTime = repository.get_max_job_mod_time()
+        jobs = repository.get_active_jobs(nowTimestamp)
+
+        previousCount = len(self.jobs)
+        self.jobs = {_get_job_key(job): job for job in jobs}
+        self.lastModTime = lastModTime
+        self.reconciledAt = self.clock()
+        self.fullReloads += 1
+        logger.debug(
+            f"Reconciled active job set: {len(self.jobs)} jobs (was {previousCount}), last mod_time {lastModTime}"
+        )
+
+    def _applyChanges(self, repository, nowTimestamp: int):
+        changes = repository.get_job_changes(self.lastModTime)
+        for job, isLive in changes:
+            key = _get_job_key(job)
+            if isLive and _is_running(job, nowTimestamp):
+                self.jobs[key] = job
+            else:
+                self.jobs.pop(key, None)
+            self.lastModTime = max(self.lastModTime, job.modTime)
+
+        for key in [key for key, job in self.jobs.items() if not _is_running(job, nowTimestamp)]:
+            del self.jobs[key]
+
+        self.deltaRefreshes += 1
+        self.deltaRows += len(changes)
+        logger.debug(f"Applied {len(changes)} job changes, {len(self.jobs)} active jobs")
+
+
+def get_active_job_set() -> ActiveJobSet:
+    global _ACTIVE_JOB_SET
+
+    with _ACTIVE_JOB_SET_LOCK:
+        if _ACTIVE_JOB_SET is None:
+            _ACTIVE_JOB_SET = ActiveJobSet(reconcileSeconds=getDBConfig().active_jobs_reconcile_seconds)
+
+        return _ACTIVE_JOB_SET
+
+
+def get_active_job_set_metrics() -> dict | None:
+    with _ACTIVE_JOB_SET_LOCK:
+        activeJobs = _ACTIVE_JOB_SET
+
+    return activeJobs.getMetrics() if activeJobs is not None else None
+
+
+def reset_active_job_set():
+    global _ACTIVE_JOB_SET
+
+    with _ACTIVE_JOB_SET_LOCK:
+        _ACTIVE_JOB_SET = None
+
+
+def _get_job_key(job: HistoricalJob) -> tuple:
+    return (job.dbIndex, job.jobID)
+
+
+def _get_active_job_order(job: HistoricalJob) -> tuple:
+    return (job.timeStart, job.dbIndex or 0, job.jobID)
+
+
+def _is_running(job: HistoricalJob, nowTimestamp: int) -> bool:
+    return job.timeStart > 0 and (job.timeEnd == 0 or job.timeEnd > nowTimestamp)
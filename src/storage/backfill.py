@@ -0,0 +1,101 @@
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+try:
+    from loguru import logger
+except ModuleNotFoundError:
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+    logger.success = logger.info
+
+
+def split_mod_time_range(rangeStart: int, rangeEnd: int, chunkSeconds: int) -> list[tuple[int, int]]:
+    """
+    Split ``[rangeStart, rangeEnd]`` into inclusive ``(modifiedFrom, modifiedUntil)``
+    chunks that do not overlap and together cover every integer ``mod_time``.
+    """
+    if chunkSeconds <= 0:
+        raise ValueError(f"Backfill chunk must be positive, got {chunkSeconds} seconds")
+
+    return [
+        (chunkStart, min(chunkStart + chunkSeconds - 1, rangeEnd))
+        for chunkStart in range(int(rangeStart), int(rangeEnd) + 1, int(chunkSeconds))
+    ]
+
+
+def build_backfill_state(historyStartTimestamp, modifiedUntilTimestamp, rangeEnd: int, chunkSeconds: int) -> dict:
+    """
+    State of an unfinished backfill. It has no ``last_mod_time``, so an interrupted
+    run is never taken for a finished sync by the incremental path.
+    """
+    return {
+        "history_start": historyStartTimestamp,
+        "modified_until": modifiedUntilTimestamp,
+        "backfill": {
+            "range_start": historyStartTimestamp,
+            "range_end": int(rangeEnd),
+            "chunk_seconds": int(chunkSeconds),
+            "completed_chunks": [],
+        },
+    }
+
+
+def get_pending_backfill_chunks(backfillState: dict) -> list[tuple[int, int]]:
+    completedStarts = set(backfillState["completed_chunks"])
+    return [
+        chunk
+        for chunk in split_mod_time_range(
+            backfillState["range_start"], backfillState["range_end"], backfillState["chunk_seconds"]
+        )
+        if chunk[0] not in completedStarts
+    ]
+
+
+def run_parallel_backfill(chunks, fetchChunk, onChunkFetched, workers: int) -> int:
+    """
+    Fetch ``chunks`` on at most ``workers`` threads, each with its own connection.
+
+    ``onChunkFetched(chunk, rows)`` runs in the calling thread as chunks finish, in
+    completion order, so cache appends and state writes need no locking. After a
+    failure no new chunks are started, chunks already running are still
+    checkpointed, and the first error is raised.
+    """
+    chunks = list(chunks)
+    if not chunks:
+        return 0
+
+    fetchedCount = 0
+    firstError = None
+    chunkIterator = iter(chunks)
+    with ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="backfill") as executor:
+        running = {}
+
+        def submitNext():
+            chunk = next(chunkIterator, None)
+            if chunk is not None:
+                running[executor.submit(fetchChunk, *chunk)] = chunk
+
+        # Заданий в очереди не больше, чем воркеров: после ошибки незапущенные куски не стартуют.
+        for _ in range(max(1, int(workers))):
+            submitNext()
+
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = running.pop(future)
+                try:
+                    rows = future.result()
+                except Exception as error:
+                    logger.error(f"Backfill chunk mod_time {chunk[0]}..{chunk[1]} failed: {error}")
+                    firstError = firstError or error
+                    continue
+
+                onChunkFetched(chunk, rows)
+                fetchedCount += 1
+                if firstError is None:
+                    submitNext()
+
+    if firstError is not None:
+        raise firstError
+
+    return fetchedCount
@@ -1,8 +1,19 @@
 import json
+import logging
 from datetime import datetime
 from pathlib import Path
 
+try:
+    from loguru import logger
+except ModuleNotFoundError:
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+    logger.success = logger.info
+
+from .columnar import ColumnarJobRows
+from .jsonio import write_json_atomic
 from .models import RawHistoricalJobRow
+from .segments import JobRowSegmentLog
 from .timeutils import parse_time_value
 
 
@@ -15,23 +26,85 @@ def load_state(statePath: Path) -> dict:
 
 
 def save_state(statePath: Path, state: dict):
-    with open(statePath, "w", encoding="utf-8") as file:
-        json.dump(state, file, indent=2, ensure_ascii=False)
+    write_json_atomic(statePath, state)
+
+
+def load_series_checkpoint(checkpointPath: Path) -> dict | None:
+    if not checkpointPath.exists():
+        return None
+
+    with open(checkpointPath, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_series_checkpoint(checkpointPath: Path, checkpoint: dict | None):
+    if checkpoint is None:
+        checkpointPath.unlink(missing_ok=True)
+        return
+
+    write_json_atomic(checkpointPath, checkpoint)
+
+
+def resolve_job_rows_cache_paths(rawJobsPath: Path) -> tuple[Path, Path]:
+    rawJobsPath = Path(rawJobsPath)
+    if rawJobsPath.suffix == ".json":
+        return rawJobsPath.with_suffix(""), rawJobsPath
+
+    return rawJobsPath, rawJobsPath.with_name(f"{rawJobsPath.name}.json")
+
+
+def load_cached_historical_job_columns(rawJobsPath: Path) -> ColumnarJobRows:
+    columnsPath, legacyJsonPath = resolve_job_rows_cache_paths(rawJobsPath)
+    segmentLog = JobRowSegmentLog(columnsPath)
+    if segmentLog.exists():
+        return segmentLog.loadRows()
+
+    if legacyJsonPath.exists():
+        return migrate_json_job_rows_cache(legacyJsonPath, columnsPath)
+
+    return ColumnarJobRows.empty()
 
 
 def load_cached_historical_job_rows(rawJobsPath: Path) -> list[RawHistoricalJobRow]:
-    if not rawJobsPath.exists():
-        return []
+    return load_cached_historical_job_columns(rawJobsPath).toRows()
 
-    with open(rawJobsPath, "r", encoding="utf-8") as file:
-        payload = json.load(file)
 
-    return [RawHistoricalJobRow.from_dict(item) for item in payload]
+def save_cached_historical_job_rows(rawJobsPath: Path, rows):
+    columnsPath, _ = resolve_job_rows_cache_paths(rawJobsPath)
+    columns = rows if isinstance(rows, ColumnarJobRows) else ColumnarJobRows.fromRows(rows)
+    JobRowSegmentLog(columnsPath).replace(columns)
+
+
+def append_cached_historical_job_rows(rawJobsPath: Path, rows) -> dict | None:
+    columnsPath, _ = resolve_job_rows_cache_paths(rawJobsPath)
+    columns = rows if isinstance(rows, ColumnarJobRows) else ColumnarJobRows.fromRows(rows)
+    return JobRowSegmentLog(columnsPath).append(columns)
+
 
+def compact_cached_historical_job_rows(rawJobsPath: Path, minSegments: int = 2) -> dict | None:
+    columnsPath, _ = resolve_job_rows_cache_paths(rawJobsPath)
+    segmentLog = JobRowSegmentLog(columnsPath)
+    if not segmentLog.exists():
+        return None
 
-def save_cached_historical_job_rows(rawJobsPath: Path, rows: list[RawHistoricalJobRow]):
-    with open(rawJobsPath, "w", encoding="utf-8") as file:
-        json.dump([row.to_dict() for row in rows], file, indent=2, ensure_ascii=False)
+    return segmentLog.compact(minSegments=minSegments)
+
+
+def migrate_json_job_rows_cache(legacyJsonPath: Path, columnsPath: Path) -> ColumnarJobRows:
+    with open(legacyJsonPath, "r", encoding="utf-8") as file:
+        payload = json.load(file)
+
+    segmentLog = JobRowSegmentLog(columnsPath)
+    segmentLog.replace(
+        ColumnarJobRows.fromRows(RawHistoricalJobRow.from_dict(item) for item in payload)
+    )
+    migratedPath = legacyJsonPath.with_name(f"{legacyJsonPath.name}.migrated")
+    legacyJsonPath.rename(migratedPath)
+    logger.success(
+        f"Migrated {len(payload)} cached raw job rows from '{legacyJsonPath}' "
+        f"to segmented cache '{columnsPath}', kept the original as '{migratedPath.name}'"
+    )
+    return segmentLog.loadRows()
 
 
 def resolve_history_start(historyStart, state: dict) -> int | None:
@@ -43,14 +116,24 @@ def resolve_history_start(historyStart, state: dict) -> int | None:
 
 def build_state_payload(
     previousState: dict,
-    mergedRows: list[RawHistoricalJobRow],
+    mergedRows: list[RawHistoricalJobRow] | ColumnarJobRows,
     historyStartTimestamp: int | None,
     modifiedUntilTimestamp: int | None,
+    batchRows: ColumnarJobRows | None = None,
 ) -> dict:
-    lastModTime = max(
-        (row.mod_time for row in mergedRows),
-        default=previousState.get("last_mod_time", 0) if previousState else 0,
+    modTimes = (
+        mergedRows.getIntColumn("mod_time").tolist()
+        if isinstance(mergedRows, ColumnarJobRows)
+        else [row.mod_time for row in mergedRows]
     )
+    # Версия из пакета могла проиграть уже сохранённой, но её mod_time всё равно
+    # считается синхронизированным, иначе следующий запрос вернёт её снова.
+    if batchRows is not None:
+        modTimes.extend(batchRows.getIntColumn("mod_time").tolist())
+    if previousState and previousState.get("last_mod_time") is not None:
+        modTimes.append(previousState["last_mod_time"])
+
+    lastModTime = max(modTimes, default=0)
     return {
         "history_start": historyStartTimestamp,
         "modified_until": modifiedUntilTimestamp,
@@ -0,0 +1,185 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .constants import SERIES_GROUP_NODE_GROUP, SERIES_GROUP_PARTITION
+
+STEP_ORIGIN_TIMESTAMP = np.iinfo(np.int64).min
+
+
+@dataclass(frozen=True)
+class CapacityStepFunction:
+    """
+    Piecewise-constant CPU/GPU capacity.
+
+    ``cpu[i]`` and ``gpu[i]`` apply from ``timestamps[i]`` up to the next change
+    timestamp. The first step starts at ``STEP_ORIGIN_TIMESTAMP``, so every
+    timestamp falls into some step.
+    """
+
+    timestamps: np.ndarray
+    cpu: np.ndarray
+    gpu: np.ndarray
+
+    def at(self, timestamp: int) -> dict[str, int]:
+        stepIndex = int(np.searchsorted(self.timestamps, int(timestamp), side="right")) - 1
+        return {"cpu": int(self.cpu[stepIndex]), "gpu": int(self.gpu[stepIndex])}
+
+    def lookup(self, timestamps) -> tuple[np.ndarray, np.ndarray]:
+        stepIndexes = (
+            np.searchsorted(
+                self.timestamps, np.asarray(timestamps, dtype=np.int64), side="right"
+            )
+            - 1
+        )
+        return self.cpu[stepIndexes], self.gpu[stepIndexes]
+
+
+@dataclass(frozen=True)
+class CompiledCapacityTimeline:
+    """
+    Capacity step functions of a cluster config timeline, one per analysed
+    feature plus ``overall`` for the union of features that have started.
+    ``groups`` holds the partition and node group steps keyed by their series
+    name, see ``get_group_series_name``.
+    """
+
+    features: dict[str, CapacityStepFunction]
+    overall: CapacityStepFunction
+    groups: dict[str, CapacityStepFunction] = field(default_factory=dict)
+
+    def getFeatureCapacityAt(self, feature: str, timestamp: int) -> dict[str, int]:
+        stepFunction = self.features.get(feature)
+        if stepFunction is None:
+            return {"cpu": 0, "gpu": 0}
+
+        return stepFunction.at(timestamp)
+
+    def getOverallCapacityAt(self, timestamp: int) -> dict[str, int]:
+        return self.overall.at(timestamp)
+
+
+def get_group_series_name(dimension: str, group: str) -> str:
+    return f"{dimension}:{group}"
+
+
+def split_group_series_name(seriesName: str) -> tuple[str, str] | None:
+    """
+    ``(dimension, group)`` of a name built by ``get_group_series_name``, ``None``
+    for feature and ``overall`` series.
+    """
+    dimension, separator, group = seriesName.partition(":")
+    if not separator or dimension not in (SERIES_GROUP_PARTITION, SERIES_GROUP_NODE_GROUP):
+        return None
+
+    return dimension, group
+
+
+def compile_capacity_timeline(
+    clusterConfigTimeline,
+    featureNames,
+    featureCommissionTimestamps: dict[str, int] | None = None,
+    forcedFeatureStartTimestamps: dict[str, int] | None = None,
+    groupDimensions=(),
+) -> CompiledCapacityTimeline:
+    featureCommissionTimestamps = featureCommissionTimestamps or {}
+    forcedFeatureStartTimestamps = forcedFeatureStartTimestamps or {}
+    changeTimestamps = collect_capacity_change_timestamps(
+        clusterConfigTimeline,
+        extraTimestamps=[
+            *featureCommissionTimestamps.values(),
+            *forcedFeatureStartTimestamps.values(),
+        ],
+    )
+    # Ёмкость постоянна между соседними точками изменения, поэтому первую
+    # ступень достаточно посчитать за секунду до самой ранней из них.
+    evaluationTimestamps = [
+        changeTimestamps[0] - 1 if changeTimestamps else 0,
+        *changeTimestamps,
+    ]
+    stepTimestamps = np.array([STEP_ORIGIN_TIMESTAMP, *changeTimestamps], dtype=np.int64)
+    stepConfigs = [
+        clusterConfigTimeline.getConfigAt(timestamp) for timestamp in evaluationTimestamps
+    ]
+    stepFeatureCapacities = [
+        config.getFeatureCapacitiesAt(timestamp)
+        for timestamp, config in zip(evaluationTimestamps, stepConfigs)
+    ]
+
+    features = {}
+    for feature in featureNames:
+        commissionTimestamp = featureCommissionTimestamps.get(feature)
+        stepCapacities = [
+            (
+                {"cpu": 0, "gpu": 0}
+                if commissionTimestamp is not None and timestamp < commissionTimestamp
+                else capacities.get(feature, {"cpu": 0, "gpu": 0})
+            )
+            for timestamp, capacities in zip(evaluationTimestamps, stepFeatureCapacities)
+        ]
+        features[feature] = _build_step_function(stepTimestamps, stepCapacities)
+
+    allowedFeatures = set(featureNames)
+    overallCapacities = []
+    for timestamp, config in zip(evaluationTimestamps, stepConfigs):
+        activeFeatures = {
+            feature
+            for feature in allowedFeatures
+            if forcedFeatureStartTimestamps.get(feature, 0) <= timestamp
+        }
+        overallCapacities.append(
+            config.getClusterCapacitiesForFeaturesAt(timestamp, activeFeatures)
+        )
+
+    groups = {}
+    for dimension in groupDimensions:
+        stepGroupCapacities = [
+            _get_group_capacities_at(config, dimension, timestamp)
+            for timestamp, config in zip(evaluationTimestamps, stepConfigs)
+        ]
+        groupNames = sorted(
+            {group for capacities in stepGroupCapacities for group in capacities}
+        )
+        for group in groupNames:
+            groups[get_group_series_name(dimension, group)] = _build_step_function(
+                stepTimestamps,
+                [
+                    capacities.get(group, {"cpu": 0, "gpu": 0})
+                    for capacities in stepGroupCapacities
+                ],
+            )
+
+    return CompiledCapacityTimeline(
+        features=features,
+        overall=_build_step_function(stepTimestamps, overallCapacities),
+        groups=groups,
+    )
+
+
+def collect_capacity_change_timestamps(clusterConfigTimeline, extraTimestamps=()) -> list[int]:
+    candidates = list(clusterConfigTimeline.timestamps)
+    candidates.extend(extraTimestamps)
+    for snapshot in clusterConfigTimeline.snapshots:
+        for nodeGroup in snapshot["config"].node_groups:
+            for period in nodeGroup.history or []:
+                candidates.append(period.start)
+                candidates.append(period.end)
+
+    return sorted({int(timestamp) for timestamp in candidates if timestamp is not None})
+
+
+def _get_group_capacities_at(config, dimension: str, timestamp: int) -> dict[str, dict[str, int]]:
+    if dimension == SERIES_GROUP_PARTITION:
+        return config.getPartitionCapacitiesAt(timestamp)
+    if dimension == SERIES_GROUP_NODE_GROUP:
+        return config.getNodeGroupCapacitiesAt(timestamp)
+
+    raise ValueError(f"Unknown series group dimension '{dimension}'")
+
+
+def _build_step_function(stepTimestamps: np.ndarray, stepCapacities: list[dict]) -> CapacityStepFunction:
+    return CapacityStepFunction(
+        timestamps=stepTimestamps,
+        cpu=np.array([capacities["cpu"] for capacities in stepCapacities], dtype=np.int64),
+        gpu=np.array([capacities["gpu"] for capacities in stepCapacities], dtype=np.int64),
+    )
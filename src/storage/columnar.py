@@ -0,0 +1,388 @@
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from .models import HistoricalJob, RawHistoricalJobRow
+from .tres_codes import EMPTY_TRES_COUNTS, TresCounts, decode_tres
+
+COLUMNAR_FORMAT_VERSION = 1
+COLUMNAR_MANIFEST_FILE = "manifest.json"
+COLUMNAR_STRINGS_FILE = "strings.json"
+
+INT_NULL = np.iinfo(np.int64).min
+STRING_NULL = -1
+
+INT_COLUMNS = (
+    "job_db_inx",
+    "id_job",
+    "timelimit",
+    "state",
+    "priority",
+    "cpus_req",
+    "nodes_alloc",
+    "time_start",
+    "time_end",
+    "time_submit",
+    "time_eligible",
+    "mod_time",
+)
+STRING_COLUMNS = (
+    "job_name",
+    "constraints",
+    "tres_req",
+    "tres_alloc",
+    "nodelist",
+    "partition",
+)
+ROW_COLUMNS = (
+    "job_db_inx",
+    "id_job",
+    "job_name",
+    "timelimit",
+    "state",
+    "priority",
+    "constraints",
+    "cpus_req",
+    "nodes_alloc",
+    "time_start",
+    "time_end",
+    "time_submit",
+    "time_eligible",
+    "mod_time",
+    "tres_req",
+    "tres_alloc",
+    "nodelist",
+    "partition",
+)
+
+
+class ColumnarJobRows:
+    """
+    Raw slurmdb rows stored column by column.
+
+    Integer columns are int64 arrays with ``INT_NULL`` for missing values. String
+    columns hold int32 codes into one shared string table, so repeated nodelists,
+    TRES strings and partitions are stored once. Arrays loaded from disk are
+    memory-mapped; objects are only created for rows that are actually needed.
+    """
+
+    def __init__(self, columns: dict[str, np.ndarray], strings: list[str]):
+        self.columns = columns
+        self.strings = strings
+
+    @classmethod
+    def empty(cls):
+        return cls(
+            {
+                **{column: np.empty(0, dtype=np.int64) for column in INT_COLUMNS},
+                **{column: np.empty(0, dtype=np.int32) for column in STRING_COLUMNS},
+            },
+            [],
+        )
+
+    @classmethod
+    def fromRows(cls, rows):
+        rows = list(rows)
+        strings = []
+        stringCodes = {}
+
+        def encode(value):
+            if value is None:
+                return STRING_NULL
+
+            code = stringCodes.get(value)
+            if code is None:
+                code = len(strings)
+                stringCodes[value] = code
+                strings.append(value)
+
+            return code
+
+        columns = {}
+        for column in INT_COLUMNS:
+            columns[column] = np.fromiter(
+                (
+                    INT_NULL if getattr(row, column) is None else int(getattr(row, column))
+                    for row in rows
+                ),
+                dtype=np.int64,
+                count=len(rows),
+            )
+        for column in STRING_COLUMNS:
+            columns[column] = np.fromiter(
+                (encode(getattr(row, column)) for row in rows),
+                dtype=np.int32,
+                count=len(rows),
+            )
+
+        return cls(columns, strings)
+
+    @classmethod
+    def fromRowBatches(cls, batches):
+        """Encode row batches one at a time, so only one batch of row objects is alive."""
+        return cls.concat([cls.fromRows(batch) for batch in batches])
+
+    @classmethod
+    def concat(cls, parts):
+        parts = [part for part in parts if len(part) > 0]
+        if not parts:
+            return cls.empty()
+
+        if len(parts) == 1:
+            return parts[0]
+
+        strings = []
+        stringCodes = {}
+        remappedCodes = {column: [] for column in STRING_COLUMNS}
+        for part in parts:
+            mapping = np.empty(len(part.strings) + 1, dtype=np.int32)
+            mapping[-1] = STRING_NULL
+            for index, value in enumerate(part.strings):
+                code = stringCodes.get(value)
+                if code is None:
+                    code = len(strings)
+                    stringCodes[value] = code
+                    strings.append(value)
+                mapping[index] = code
+
+            for column in STRING_COLUMNS:
+                # Код -1 указывает на последний элемент mapping, т.е. на STRING_NULL.
+                remappedCodes[column].append(mapping[np.asarray(part.columns[column])])
+
+        columns = {
+            column: np.concatenate([np.asarray(part.columns[column]) for part in parts])
+            for column in INT_COLUMNS
+        }
+        for column in STRING_COLUMNS:
+            columns[column] = np.concatenate(remappedCodes[column])
+
+        return cls(columns, strings)
+
+    @classmethod
+    def load(cls, path: str | Path, mmapMode: str | None = "r"):
+        columnsPath = Path(path)
+        with open(columnsPath / COLUMNAR_MANIFEST_FILE, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+        if manifest.get("version") != COLUMNAR_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported columnar job cache version {manifest.get('version')} in '{columnsPath}'"
+            )
+
+        with open(columnsPath / COLUMNAR_STRINGS_FILE, "r", encoding="utf-8") as file:
+            strings = json.load(file)
+
+        columns = {}
+        for column in (*INT_COLUMNS, *STRING_COLUMNS):
+            columnPath = columnsPath / f"{column}.npy"
+            # Пустые массивы numpy не умеет отображать в память.
+            columns[column] = np.load(
+                columnPath, mmap_mode=mmapMode if manifest.get("row_count") else None
+            )
+
+        return cls(columns, strings)
+
+    def save(self, path: str | Path) -> Path:
+        columnsPath = Path(path)
+        temporaryPath = columnsPath.with_name(f"{columnsPath.name}.tmp")
+        previousPath = columnsPath.with_name(f"{columnsPath.name}.old")
+        shutil.rmtree(temporaryPath, ignore_errors=True)
+        temporaryPath.mkdir(parents=True)
+
+        for column in (*INT_COLUMNS, *STRING_COLUMNS):
+            np.save(temporaryPath / f"{column}.npy", np.asarray(self.columns[column]))
+
+        with open(temporaryPath / COLUMNAR_STRINGS_FILE, "w", encoding="utf-8") as file:
+            json.dump(self.strings, file, ensure_ascii=False)
+
+        with open(temporaryPath / COLUMNAR_MANIFEST_FILE, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "version": COLUMNAR_FORMAT_VERSION,
+                    "row_count": len(self),
+                    "int_columns": list(INT_COLUMNS),
+                    "string_columns": list(STRING_COLUMNS),
+                },
+                file,
+                indent=2,
+            )
+
+        shutil.rmtree(previousPath, ignore_errors=True)
+        if columnsPath.exists():
+            columnsPath.rename(previousPath)
+        temporaryPath.rename(columnsPath)
+        shutil.rmtree(previousPath, ignore_errors=True)
+        return columnsPath
+
+    def __len__(self) -> int:
+        return int(len(self.columns["id_job"]))
+
+    def __iter__(self):
+        return iter(self.toRows())
+
+    def getIntColumn(self, column: str, default: int = 0) -> np.ndarray:
+        values = np.asarray(self.columns[column])
+        return np.where(values == INT_NULL, default, values)
+
+    def getStringColumn(self, column: str) -> list[str | None]:
+        strings = self.strings
+        return [
+            strings[code] if code >= 0 else None
+            for code in np.asarray(self.columns[column]).tolist()
+        ]
+
+    def getTresColumn(self, column: str) -> list[TresCounts]:
+        """
+        Decoded TRES amounts of ``column``; each distinct string of the shared
+        table is decoded once and its result is reused by every row.
+        """
+        codes = np.asarray(self.columns[column])
+        decoded = {
+            code: decode_tres(self.strings[code]) for code in np.unique(codes[codes >= 0]).tolist()
+        }
+        return [decoded.get(code, EMPTY_TRES_COUNTS) for code in codes.tolist()]
+
+    def getStringMask(self, column: str, predicate) -> np.ndarray:
+        stringMask = np.fromiter(
+            (bool(predicate(value)) for value in self.strings),
+            dtype=bool,
+            count=len(self.strings),
+        )
+        codes = np.asarray(self.columns[column])
+        mask = np.zeros(len(codes), dtype=bool)
+        present = codes >= 0
+        mask[present] = stringMask[codes[present]]
+        return mask
+
+    def take(self, indexes) -> "ColumnarJobRows":
+        indexes = np.asarray(indexes, dtype=np.int64)
+        return ColumnarJobRows(
+            {column: np.asarray(values)[indexes] for column, values in self.columns.items()},
+            self.strings,
+        )
+
+    def getSortedIndexes(self) -> np.ndarray:
+        return np.lexsort(
+            (
+                self.getIntColumn("job_db_inx", default=-1),
+                self.getIntColumn("id_job"),
+                self.getIntColumn("time_start"),
+            )
+        )
+
+    def selectPreferredVersions(self) -> tuple[np.ndarray, int]:
+        """
+        Return row indexes of the preferred version of every logical job.
+
+        Uses the same ordering as ``models.score_job_version``: assigned nodes,
+        finished, allocated TRES, then ``mod_time``; on a full tie the earlier row
+        wins. The result follows the materialization order
+        ``(time_start, id_job, job_db_inx)``.
+        """
+        rowCount = len(self)
+        if rowCount == 0:
+            return np.empty(0, dtype=np.int64), 0
+
+        jobIds = self.getIntColumn("id_job")
+        order = np.lexsort(
+            (
+                -np.arange(rowCount),
+                self.getIntColumn("mod_time"),
+                self.getStringMask("tres_alloc", bool),
+                self.getIntColumn("time_end") > 0,
+                self.getStringMask(
+                    "nodelist", lambda value: value and value != "None assigned"
+                ),
+                jobIds,
+            )
+        )
+        sortedIds = jobIds[order]
+        groupLast = np.flatnonzero(np.r_[sortedIds[1:] != sortedIds[:-1], True])
+        preferred = order[groupLast]
+
+        preferredRows = self.take(preferred)
+        return preferred[preferredRows.getSortedIndexes()], rowCount - len(preferred)
+
+    def toRows(self) -> list[RawHistoricalJobRow]:
+        values = self._decodeColumns()
+        return [
+            RawHistoricalJobRow(**dict(zip(ROW_COLUMNS, rowValues)))
+            for rowValues in zip(*(values[column] for column in ROW_COLUMNS))
+        ]
+
+    def toHistoricalJobs(self) -> list[HistoricalJob]:
+        values = self._decodeColumns()
+        jobs = []
+        for (
+            dbIndex,
+            jobID,
+            jobName,
+            timelimit,
+            state,
+            priority,
+            constraints,
+            cpusReq,
+            nodesAlloc,
+            timeStart,
+            timeEnd,
+            timeSubmit,
+            timeEligible,
+            modTime,
+            tresReq,
+            tresAlloc,
+            nodelist,
+            partition,
+            requestedTres,
+            allocatedTres,
+        ) in zip(
+            *(values[column] for column in ROW_COLUMNS),
+            self.getTresColumn("tres_req"),
+            self.getTresColumn("tres_alloc"),
+        ):
+            jobs.append(
+                HistoricalJob(
+                    dbIndex=dbIndex,
+                    jobID=jobID,
+                    jobName=jobName,
+                    timelimit=timelimit,
+                    state=state,
+                    priority=priority,
+                    constraints=constraints,
+                    cpusReq=cpusReq or 0,
+                    nodesAlloc=nodesAlloc or 0,
+                    timeStart=timeStart or 0,
+                    timeEnd=timeEnd or 0,
+                    timeSubmit=timeSubmit or 0,
+                    timeEligible=timeEligible or 0,
+                    modTime=modTime or 0,
+                    tresReq=tresReq,
+                    tresAlloc=tresAlloc,
+                    nodelist=nodelist,
+                    partition=partition,
+                    requestedTres=requestedTres,
+                    allocatedTres=allocatedTres,
+                )
+            )
+
+        return jobs
+
+    def _decodeColumns(self) -> dict[str, list]:
+        values = {}
+        for column in INT_COLUMNS:
+            values[column] = [
+                None if value == INT_NULL else value
+                for value in np.asarray(self.columns[column]).tolist()
+            ]
+        for column in STRING_COLUMNS:
+            values[column] = self.getStringColumn(column)
+
+        return values
+
+
+def select_preferred_job_rows(rows: ColumnarJobRows) -> ColumnarJobRows:
+    """
+    Keep one preferred version per ``id_job``, ordered by ``(time_start, id_job, job_db_inx)``.
+    """
+    preferredIndexes, _ = rows.selectPreferredVersions()
+    return rows.take(preferredIndexes)
@@ -3,10 +3,47 @@ from pathlib import Path
 PENDING_STATE = 0
 DEFAULT_BUCKET_MINUTES = 15
 DEFAULT_EXPORT_ROOT = Path("exports") / "historical_utilization" / "current"
+RAW_JOBS_CACHE_DIR = "raw_job_rows"
+# Прежний формат кэша, переносится в RAW_JOBS_CACHE_DIR при первом чтении.
 RAW_JOBS_CACHE_FILE = "raw_job_rows.json"
+RAW_JOBS_COMPACTION_MIN_SEGMENTS = 8
+# Строк за один fetchmany при потоковой выборке истории из slurmDB.
+HISTORICAL_FETCH_BATCH_SIZE = 10_000
+# Первичная загрузка истории кусками по mod_time на нескольких соединениях пула.
+DEFAULT_BACKFILL_WORKERS = 3
+DEFAULT_BACKFILL_CHUNK_DAYS = 30
 STATE_FILE = "state.json"
 SERIES_DIR = "series"
+SERIES_ROLLUP_DIR = "rollups"
+# Ряды партиций и групп узлов: series/groups/<dimension>/<group>.json.
+SERIES_GROUPS_DIR = "groups"
 METADATA_FILE = "metadata.json"
+SERIES_CHECKPOINT_FILE = "series_checkpoint.json"
+NODE_HEATMAP_FILE = "node_heatmap.npz"
+JOB_MIRROR_FILE = "job_mirror.sqlite"
+JOB_MIRROR_OFF = "off"
+JOB_MIRROR_SYNC = "sync"
+JOB_MIRROR_READ_THROUGH = "read_through"
+JOB_MIRROR_MODES = (JOB_MIRROR_OFF, JOB_MIRROR_SYNC, JOB_MIRROR_READ_THROUGH)
+SERIES_ENGINE_PYTHON = "python"
+SERIES_ENGINE_NUMPY = "numpy"
+SERIES_ENGINES = (SERIES_ENGINE_PYTHON, SERIES_ENGINE_NUMPY)
+DEFAULT_SERIES_ENGINE = SERIES_ENGINE_PYTHON
+DEFAULT_SERIES_BUILD_WORKERS = 1
+SERIES_GROUP_FEATURE = "feature"
+SERIES_GROUP_PARTITION = "partition"
+SERIES_GROUP_NODE_GROUP = "node_group"
+SERIES_GROUP_DIMENSIONS = (SERIES_GROUP_FEATURE, SERIES_GROUP_PARTITION, SERIES_GROUP_NODE_GROUP)
+DEFAULT_SERIES_GROUP_BY = (SERIES_GROUP_FEATURE,)
+SERIES_COMPRESSION_NONE = "none"
+SERIES_COMPRESSION_GZIP = "gzip"
+SERIES_COMPRESSION_ZSTD = "zstd"
+SERIES_COMPRESSIONS = (SERIES_COMPRESSION_NONE, SERIES_COMPRESSION_GZIP, SERIES_COMPRESSION_ZSTD)
+
+# v1: "time" is a "%H:%M:%S %d.%m.%y" label; v2: integer epoch seconds.
+SERIES_SCHEMA_VERSION_LABELS = 1
+SERIES_SCHEMA_VERSION_EPOCH = 2
+SERIES_SCHEMA_VERSION = SERIES_SCHEMA_VERSION_EPOCH
 
 GET_JOBS_WITH_STATE_QUERY = """SELECT id_job, job_name, timelimit, priority, constraints, cpus_req, tres_req, `partition`
                         FROM linux_job_table
@@ -23,3 +60,11 @@ GET_ACTIVE_JOBS_BASE_QUERY = """SELECT job_db_inx, id_job, job_name, timelimit,
                         mod_time, tres_req, tres_alloc, nodelist, `partition`
                         FROM linux_job_table
                         WHERE deleted=0 AND time_start > 0 AND (time_end = 0 OR time_end > %s)"""
+
+GET_MAX_JOB_MOD_TIME_QUERY = """SELECT MAX(mod_time) FROM linux_job_table"""
+
+GET_JOB_CHANGES_BASE_QUERY = """SELECT job_db_inx, id_job, job_name, timelimit, state, priority, constraints,
+                        cpus_req, nodes_alloc, time_start, time_end, time_submit, time_eligible,
+                        mod_time, tres_req, tres_alloc, nodelist, `partition`, deleted=0 AND time_start > 0
+                        FROM linux_job_table
+                        WHERE mod_time >= %s"""
@@ -0,0 +1,247 @@
+import numpy as np
+
+from .models import HistoricalJob
+
+# Задания без time_end ещё выполняются: интервал открыт справа.
+OPEN_INTERVAL_END = np.iinfo(np.int64).max
+INTERVAL_TREE_LEAF_SIZE = 64
+
+
+class HistoricalJobIntervalIndex:
+    """
+    Point-in-time and range index over materialized ``HistoricalJob`` lists.
+
+    A started job occupies ``[timeStart, timeEnd)``, or ``[timeStart, ∞)`` while
+    ``timeEnd == 0``, which is the same rule the active-jobs SQL query applies
+    for the current time. Queries run on a static centered interval tree and
+    visit O(log n) nodes, each answered by a binary search over sorted
+    endpoints, so their cost is O(log² n + k) for k returned jobs.
+
+    Features are taken from the job nodelist with the cluster config at job
+    start, partitions from ``job.partition``. Per-feature and per-partition
+    trees are built on first use.
+    """
+
+    def __init__(self, jobs, clusterConfig=None):
+        self.jobs = sorted(
+            (job for job in jobs if job.hasStarted() and _job_interval_end(job) > job.timeStart),
+            key=lambda job: (job.timeStart, job.jobID),
+        )
+        self.clusterConfig = clusterConfig
+        self.starts = np.fromiter((job.timeStart for job in self.jobs), dtype=np.int64, count=len(self.jobs))
+        self.ends = np.fromiter(
+            (_job_interval_end(job) for job in self.jobs), dtype=np.int64, count=len(self.jobs)
+        )
+        self._trees = {None: self._buildTree(np.arange(len(self.jobs)))}
+        self._jobFeatures = None
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def getRunningJobs(
+        self,
+        timestamp: int,
+        feature: str | None = None,
+        partition: str | None = None,
+    ) -> list[HistoricalJob]:
+        tree = self._getTree(feature, partition)
+        return self._toJobs(tree.stab(int(timestamp)) if tree is not None else [])
+
+    def getJobsInRange(
+        self,
+        startTimestamp: int,
+        endTimestamp: int,
+        feature: str | None = None,
+        partition: str | None = None,
+    ) -> list[HistoricalJob]:
+        """
+        Jobs that ran at any moment of ``[startTimestamp, endTimestamp)``.
+        """
+        if endTimestamp <= startTimestamp:
+            return []
+
+        tree = self._getTree(feature, partition)
+        return self._toJobs(
+            tree.overlap(int(startTimestamp), int(endTimestamp)) if tree is not None else []
+        )
+
+    def getJobFeatures(self, job: HistoricalJob) -> tuple[str, ...]:
+        if self.clusterConfig is None:
+            raise ValueError("Feature queries require a cluster config")
+        if not job.hasAssignedNodes():
+            return ()
+
+        return tuple(
+            sorted(
+                self.clusterConfig.getFeatureCapacitiesForHostlist(
+                    job.nodelist, timestamp=job.timeStart
+                )
+            )
+        )
+
+    def _getTree(self, feature: str | None, partition: str | None):
+        treeKey = None if feature is None and partition is None else (feature, partition)
+        if treeKey not in self._trees:
+            self._trees[treeKey] = self._buildTree(self._selectPositions(feature, partition))
+
+        return self._trees[treeKey]
+
+    def _selectPositions(self, feature: str | None, partition: str | None) -> np.ndarray:
+        selected = np.ones(len(self.jobs), dtype=bool)
+        if partition is not None:
+            selected &= np.fromiter(
+                (partition in _split_partitions(job.partition) for job in self.jobs),
+                dtype=bool,
+                count=len(self.jobs),
+            )
+        if feature is not None:
+            jobFeatures = self._resolveJobFeatures()
+            selected &= np.fromiter(
+                (feature in features for features in jobFeatures),
+                dtype=bool,
+                count=len(self.jobs),
+            )
+
+        return np.flatnonzero(selected)
+
+    def _resolveJobFeatures(self) -> list[tuple[str, ...]]:
+        if self._jobFeatures is None:
+            # Массивы заданий делят один nodelist: раскрываем его один раз на эпоху.
+            featuresByNodelist = {}
+            jobFeatures = []
+            for job in self.jobs:
+                cacheKey = (
+                    job.nodelist,
+                    self.clusterConfig.getNodeCountEpochAt(job.timeStart)
+                    if self.clusterConfig is not None
+                    else None,
+                )
+                features = featuresByNodelist.get(cacheKey)
+                if features is None:
+                    features = self.getJobFeatures(job)
+                    featuresByNodelist[cacheKey] = features
+                jobFeatures.append(features)
+            self._jobFeatures = jobFeatures
+
+        return self._jobFeatures
+
+    def _buildTree(self, positions: np.ndarray):
+        if len(positions) == 0:
+            return None
+
+        return _IntervalTreeNode.build(self.starts[positions], self.ends[positions], positions)
+
+    def _toJobs(self, positions) -> list[HistoricalJob]:
+        return [self.jobs[position] for position in np.sort(np.asarray(positions, dtype=np.int64))]
+
+
+class _IntervalTreeNode:
+    """
+    Node of a centered interval tree. A node keeps intervals that contain its
+    ``center`` sorted by start and by end; the left subtree holds intervals that
+    end at or before the center, the right one those that start after it.
+    Small subtrees become leaves that are scanned with one vectorized mask.
+    """
+
+    __slots__ = ("center", "starts", "startPositions", "ends", "endPositions", "left", "right")
+
+    def __init__(self, center, starts, startPositions, ends, endPositions, left=None, right=None):
+        self.center = center
+        self.starts = starts
+        self.startPositions = startPositions
+        self.ends = ends
+        self.endPositions = endPositions
+        self.left = left
+        self.right = right
+
+    @classmethod
+    def build(cls, starts: np.ndarray, ends: np.ndarray, positions: np.ndarray):
+        if len(positions) <= INTERVAL_TREE_LEAF_SIZE:
+            return cls(None, starts, positions, ends, positions)
+
+        # Медиана начал: правое поддерево получает меньше половины интервалов,
+        # а левое не содержит ни одного с началом не раньше центра.
+        center = int(np.partition(starts, len(starts) // 2)[len(starts) // 2])
+        leftMask = ends <= center
+        rightMask = starts > center
+        centerMask = ~(leftMask | rightMask)
+
+        centerStarts = starts[centerMask]
+        centerEnds = ends[centerMask]
+        centerPositions = positions[centerMask]
+        startOrder = np.argsort(centerStarts, kind="stable")
+        endOrder = np.argsort(centerEnds, kind="stable")
+        return cls(
+            center,
+            centerStarts[startOrder],
+            centerPositions[startOrder],
+            centerEnds[endOrder],
+            centerPositions[endOrder],
+            cls._buildChild(starts, ends, positions, leftMask),
+            cls._buildChild(starts, ends, positions, rightMask),
+        )
+
+    @classmethod
+    def _buildChild(cls, starts, ends, positions, mask):
+        if not mask.any():
+            return None
+
+        return cls.build(starts[mask], ends[mask], positions[mask])
+
+    def stab(self, timestamp: int) -> list[int]:
+        matches = []
+        node = self
+        while node is not None:
+            if node.center is None:
+                mask = (node.starts <= timestamp) & (node.ends > timestamp)
+                matches.extend(node.startPositions[mask].tolist())
+                break
+
+            if timestamp < node.center:
+                # Все интервалы узла кончаются после центра: нужен только старт <= t.
+                count = int(np.searchsorted(node.starts, timestamp, side="right"))
+                matches.extend(node.startPositions[:count].tolist())
+                node = node.left
+            else:
+                firstIndex = int(np.searchsorted(node.ends, timestamp, side="right"))
+                matches.extend(node.endPositions[firstIndex:].tolist())
+                node = node.right if timestamp > node.center else None
+
+        return matches
+
+    def overlap(self, startTimestamp: int, endTimestamp: int) -> list[int]:
+        matches = []
+        pendingNodes = [self]
+        while pendingNodes:
+            node = pendingNodes.pop()
+            if node.center is None:
+                mask = (node.starts < endTimestamp) & (node.ends > startTimestamp)
+                matches.extend(node.startPositions[mask].tolist())
+                continue
+
+            if endTimestamp <= node.center:
+                count = int(np.searchsorted(node.starts, endTimestamp, side="left"))
+                matches.extend(node.startPositions[:count].tolist())
+                nextNodes = (node.left,)
+            elif startTimestamp >= node.center:
+                firstIndex = int(np.searchsorted(node.ends, startTimestamp, side="right"))
+                matches.extend(node.endPositions[firstIndex:].tolist())
+                nextNodes = (node.right,)
+            else:
+                matches.extend(node.startPositions.tolist())
+                nextNodes = (node.left, node.right)
+
+            pendingNodes.extend(child for child in nextNodes if child is not None)
+
+        return matches
+
+
+def _job_interval_end(job: HistoricalJob) -> int:
+    return int(job.timeEnd) if job.timeEnd > 0 else int(OPEN_INTERVAL_END)
+
+
+def _split_partitions(partition: str | None) -> set[str]:
+    if not partition:
+        return set()
+
+    return {name.strip() for name in partition.split(",") if name.strip()}
@@ -0,0 +1,216 @@
+import gzip
+import io
+import json
+import os
+from itertools import islice
+from pathlib import Path
+
+try:
+    import zstandard
+except ModuleNotFoundError:
+    zstandard = None
+
+from .constants import (
+    SERIES_COMPRESSION_GZIP,
+    SERIES_COMPRESSION_NONE,
+    SERIES_COMPRESSION_ZSTD,
+    SERIES_COMPRESSIONS,
+)
+
+JSON_COMPRESSION_SUFFIXES = {
+    SERIES_COMPRESSION_NONE: "",
+    SERIES_COMPRESSION_GZIP: ".gz",
+    SERIES_COMPRESSION_ZSTD: ".zst",
+}
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+JSON_STREAM_CHUNK_ITEMS = 4096
+COMPACT_SEPARATORS = (",", ":")
+
+
+def write_json_atomic(
+    path: str | Path,
+    payload,
+    compression: str | None = None,
+    indent: int | None = None,
+) -> Path:
+    """
+    Write ``payload`` through a temporary file and ``os.replace``, so readers
+    see either the previous file or the complete new one.
+    """
+    separators = COMPACT_SEPARATORS if indent is None else None
+    atomicFile = _AtomicJsonFile(path, compression)
+    with atomicFile as file:
+        json.dump(payload, file, indent=indent, separators=separators, ensure_ascii=False)
+
+    return atomicFile.path
+
+
+def write_json_array_stream(
+    path: str | Path,
+    items,
+    compression: str | None = None,
+) -> tuple[Path, int]:
+    """
+    Write an iterable as a compact JSON array without materializing it.
+
+    Items are encoded in chunks by the C encoder of ``json.dumps``, so memory
+    stays bounded by the chunk size while the speed matches a single dump.
+    Returns the written path and the number of items.
+    """
+    iterator = iter(items)
+    itemCount = 0
+    atomicFile = _AtomicJsonFile(path, compression)
+    with atomicFile as file:
+        file.write("[")
+        while True:
+            chunk = list(islice(iterator, JSON_STREAM_CHUNK_ITEMS))
+            if not chunk:
+                break
+
+            if itemCount:
+                file.write(",")
+            file.write(json.dumps(chunk, separators=COMPACT_SEPARATORS, ensure_ascii=False)[1:-1])
+            itemCount += len(chunk)
+        file.write("]")
+
+    return atomicFile.path, itemCount
+
+
+def load_json(path: str | Path):
+    """
+    Load a JSON file written by this module. ``path`` is the plain ``.json``
+    name; a compressed variant is found by suffix and decoded by its magic bytes.
+    """
+    jsonFile = resolve_json_file(path)
+    if jsonFile is None:
+        raise FileNotFoundError(f"JSON file not found: {path}")
+
+    with open(jsonFile, "rb") as file:
+        payload = file.read()
+
+    return json.loads(_decompress(payload, jsonFile))
+
+
+def resolve_json_file(path: str | Path) -> Path | None:
+    """
+    Return the newest existing variant of ``path`` (plain, ``.gz`` or ``.zst``).
+    """
+    newestPath = None
+    newestModifiedAt = None
+    for variantPath in iter_json_variants(path):
+        try:
+            modifiedAt = variantPath.stat().st_mtime_ns
+        except FileNotFoundError:
+            continue
+
+        if newestModifiedAt is None or modifiedAt > newestModifiedAt:
+            newestPath, newestModifiedAt = variantPath, modifiedAt
+
+    return newestPath
+
+
+def resolve_json_compression(path: str | Path) -> str | None:
+    jsonFile = resolve_json_file(path)
+    if jsonFile is None:
+        return None
+
+    for compression, suffix in JSON_COMPRESSION_SUFFIXES.items():
+        if suffix and jsonFile.name.endswith(suffix):
+            return compression
+
+    return SERIES_COMPRESSION_NONE
+
+
+def iter_json_variants(path: str | Path):
+    jsonPath = Path(path)
+    for suffix in JSON_COMPRESSION_SUFFIXES.values():
+        yield jsonPath.with_name(f"{jsonPath.name}{suffix}")
+
+
+def list_json_files(directory: str | Path) -> list[Path]:
+    """
+    Plain ``.json`` names of all JSON files in ``directory``, compressed or not.
+    """
+    directoryPath = Path(directory)
+    names = set()
+    for suffix in JSON_COMPRESSION_SUFFIXES.values():
+        for filePath in directoryPath.glob(f"*.json{suffix}"):
+            names.add(filePath.name[: len(filePath.name) - len(suffix)] if suffix else filePath.name)
+
+    return [directoryPath / name for name in sorted(names)]
+
+
+def _validate_compression(compression: str | None) -> str:
+    compression = compression or SERIES_COMPRESSION_NONE
+    if compression not in SERIES_COMPRESSIONS:
+        raise ValueError(
+            f"Unsupported JSON compression '{compression}'. Expected one of: {', '.join(SERIES_COMPRESSIONS)}"
+        )
+    if compression == SERIES_COMPRESSION_ZSTD and zstandard is None:
+        raise ModuleNotFoundError("zstd compression requires the 'zstandard' package")
+
+    return compression
+
+
+def _decompress(payload: bytes, path: Path) -> bytes:
+    if payload.startswith(GZIP_MAGIC):
+        return gzip.decompress(payload)
+    if payload.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ModuleNotFoundError(f"Reading '{path}' requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(payload)
+
+    return payload
+
+
+class _AtomicJsonFile:
+    """
+    Text stream into ``<path><suffix>.tmp`` that replaces the target on success
+    and removes the other compression variants of the same file.
+    """
+
+    def __init__(self, path: str | Path, compression: str | None):
+        self.compression = _validate_compression(compression)
+        jsonPath = Path(path)
+        self.path = jsonPath.with_name(
+            f"{jsonPath.name}{JSON_COMPRESSION_SUFFIXES[self.compression]}"
+        )
+        self.siblings = [variant for variant in iter_json_variants(jsonPath) if variant != self.path]
+        self.temporaryPath = self.path.with_name(f"{self.path.name}.tmp")
+        self.rawFile = None
+        self.stream = None
+        self.text = None
+
+    def __enter__(self):
+        self.rawFile = open(self.temporaryPath, "wb")
+        if self.compression == SERIES_COMPRESSION_GZIP:
+            # mtime=0: одинаковые данные дают одинаковые байты.
+            self.stream = gzip.GzipFile(fileobj=self.rawFile, mode="wb", compresslevel=6, mtime=0)
+        elif self.compression == SERIES_COMPRESSION_ZSTD:
+            self.stream = zstandard.ZstdCompressor().stream_writer(self.rawFile, closefd=False)
+        else:
+            self.stream = self.rawFile
+
+        self.text = io.TextIOWrapper(self.stream, encoding="utf-8", write_through=False)
+        return self.text
+
+    def __exit__(self, excType, exc, traceback):
+        try:
+            self.text.flush()
+            self.text.detach()
+            if self.stream is not self.rawFile:
+                self.stream.close()
+            self.rawFile.close()
+        except BaseException:
+            self.temporaryPath.unlink(missing_ok=True)
+            raise
+
+        if excType is not None:
+            self.temporaryPath.unlink(missing_ok=True)
+            return False
+
+        os.replace(self.temporaryPath, self.path)
+        for siblingPath in self.siblings:
+            siblingPath.unlink(missing_ok=True)
+        return False
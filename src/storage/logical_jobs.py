@@ -0,0 +1,145 @@
+from bisect import bisect_left
+from collections.abc import Sequence
+from heapq import merge
+from operator import itemgetter
+
+# До этого числа вставок и замен позиции ищутся бинарным поиском,
+# дальше дешевле один линейный проход по упорядоченному списку.
+LOGICAL_JOB_STORE_BISECT_LIMIT = 64
+
+
+class LogicalJobStore(Sequence):
+    """
+    Preferred version of every logical job, ordered by ``(timeStart, jobID, dbIndex)``.
+
+    Versions are ``HistoricalJob`` or ``RawHistoricalJobRow`` objects. They are
+    keyed by ``getLogicalKey()`` and compared by ``getVersionScore()``; on a tie
+    the version added first is kept. Each ``update`` dedupes its batch in one pass
+    and merges the new winners into the existing order, so the store never has
+    to be sorted again from scratch.
+    """
+
+    def __init__(self, versions=()):
+        self._versionsByKey = {}
+        self._sortKeys = []
+        self._versions = []
+        self.duplicateVersions = 0
+        self.update(versions)
+
+    @classmethod
+    def fromCanonical(cls, versions) -> "LogicalJobStore":
+        """
+        Wrap versions that are already unique per logical job and ordered, such as
+        the output of ``ColumnarJobRows.selectPreferredVersions``.
+        """
+        store = cls()
+        store._versions = list(versions)
+        store._sortKeys = [version.getSortKey() for version in store._versions]
+        store._versionsByKey = {version.getLogicalKey(): version for version in store._versions}
+        return store
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    def __getitem__(self, index):
+        return self._versions[index]
+
+    def __iter__(self):
+        return iter(self._versions)
+
+    def __contains__(self, version) -> bool:
+        return self._versionsByKey.get(version.getLogicalKey()) is version
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LogicalJobStore):
+            return self._versions == other._versions
+        if isinstance(other, list):
+            return self._versions == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"LogicalJobStore({len(self)} jobs, {self.duplicateVersions} duplicate versions)"
+
+    def get(self, logicalKey, default=None):
+        return self._versionsByKey.get(logicalKey, default)
+
+    def add(self, version) -> bool:
+        return self.update((version,)) > 0
+
+    def update(self, versions) -> int:
+        """
+        Add versions and return how many of them became the stored version of
+        their logical job.
+        """
+        winners = {}
+        for version in versions:
+            logicalKey = version.getLogicalKey()
+            current = winners.get(logicalKey)
+            if current is None:
+                current = self._versionsByKey.get(logicalKey)
+            if current is None:
+                winners[logicalKey] = version
+                continue
+
+            self.duplicateVersions += 1
+            if version.getVersionScore() > current.getVersionScore():
+                winners[logicalKey] = version
+
+        if not winners:
+            return 0
+
+        replacedKeys = {
+            self._versionsByKey[logicalKey].getSortKey()
+            for logicalKey in winners
+            if logicalKey in self._versionsByKey
+        }
+        self._removeSortKeys(replacedKeys)
+        self._versionsByKey.update(winners)
+        self._insertVersions(winners.values())
+        return len(winners)
+
+    def toHistoricalJobs(self) -> "LogicalJobStore":
+        """
+        The same logical jobs as ``HistoricalJob`` objects. Raw rows and jobs share
+        sort keys, so the order is kept without sorting.
+        """
+        return LogicalJobStore.fromCanonical(
+            version.toHistoricalJob() if hasattr(version, "toHistoricalJob") else version
+            for version in self._versions
+        )
+
+    def _removeSortKeys(self, sortKeys: set[tuple]):
+        if not sortKeys:
+            return
+
+        if len(sortKeys) <= LOGICAL_JOB_STORE_BISECT_LIMIT:
+            for sortKey in sortKeys:
+                position = bisect_left(self._sortKeys, sortKey)
+                del self._sortKeys[position]
+                del self._versions[position]
+            return
+
+        keptPositions = [
+            position for position, sortKey in enumerate(self._sortKeys) if sortKey not in sortKeys
+        ]
+        self._sortKeys = [self._sortKeys[position] for position in keptPositions]
+        self._versions = [self._versions[position] for position in keptPositions]
+
+    def _insertVersions(self, versions):
+        added = sorted(((version.getSortKey(), version) for version in versions), key=itemgetter(0))
+        if not self._sortKeys or added[0][0] > self._sortKeys[-1]:
+            # Частый случай: новые задания начались позже всех сохранённых.
+            self._sortKeys.extend(sortKey for sortKey, _ in added)
+            self._versions.extend(version for _, version in added)
+            return
+
+        if len(added) <= LOGICAL_JOB_STORE_BISECT_LIMIT:
+            for sortKey, version in added:
+                position = bisect_left(self._sortKeys, sortKey)
+                self._sortKeys.insert(position, sortKey)
+                self._versions.insert(position, version)
+            return
+
+        merged = list(merge(zip(self._sortKeys, self._versions), added, key=itemgetter(0)))
+        self._sortKeys = [sortKey for sortKey, _ in merged]
+        self._versions = [version for _, version in merged]
@@ -0,0 +1,191 @@
+import logging
+import sqlite3
+from dataclasses import fields
+from operator import attrgetter
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from loguru import logger
+except ModuleNotFoundError:
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+    logger.success = logger.info
+
+from .columnar import ColumnarJobRows
+from .constants import HISTORICAL_FETCH_BATCH_SIZE
+from .models import RawHistoricalJobRow
+from .repository import SlurmDBConnectionPool
+
+MIRROR_COLUMNS = tuple(field.name for field in fields(RawHistoricalJobRow))
+MIRROR_INDEXED_COLUMNS = ("time_start", "time_end", "mod_time", "partition", "id_job")
+# astuple копирует значения рекурсивно и на сотнях тысяч строк заметно медленнее.
+_get_row_values = attrgetter(*MIRROR_COLUMNS)
+_TEXT_COLUMNS = {"job_name", "constraints", "tres_req", "tres_alloc", "nodelist", "partition"}
+
+
+class SQLiteJobMirror:
+    """
+    Local SQLite copy of the ``linux_job_table`` rows fetched by the export sync.
+
+    The table keeps the slurmDB name and columns, so ``SlurmDBRepository`` runs
+    its usual queries against it in read-through mode. The mirror stores the
+    ``last_mod_time`` it was last synced to; a value that differs from
+    ``state.json`` means the mirror missed a sync and is rebuilt from the raw cache.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    def connect(self) -> "SQLiteMirrorConnection":
+        return SQLiteMirrorConnection(self._open())
+
+    def getLastModTime(self) -> int | None:
+        connection = self._open()
+        try:
+            row = connection.execute("SELECT value FROM mirror_state WHERE name = 'last_mod_time'").fetchone()
+        finally:
+            connection.close()
+
+        return None if row is None else row[0]
+
+    def upsertRows(self, rows: ColumnarJobRows, lastModTime: int | None):
+        self._writeRows(rows, lastModTime, replace=False)
+
+    def replaceRows(self, rows: ColumnarJobRows, lastModTime: int | None):
+        self._writeRows(rows, lastModTime, replace=True)
+
+    def _writeRows(self, rows: ColumnarJobRows, lastModTime: int | None, replace: bool):
+        query = _build_insert_query()
+        # Версии пишутся по возрастанию mod_time, чтобы у строки осталась последняя.
+        order = np.argsort(rows.getIntColumn("mod_time"), kind="stable")
+
+        connection = self._open()
+        try:
+            with connection:
+                if replace:
+                    connection.execute("DELETE FROM linux_job_table")
+                for start in range(0, len(order), HISTORICAL_FETCH_BATCH_SIZE):
+                    batch = rows.take(order[start : start + HISTORICAL_FETCH_BATCH_SIZE]).toRows()
+                    connection.executemany(query, [(*_get_row_values(row), 0) for row in batch])
+                connection.execute(
+                    "INSERT OR REPLACE INTO mirror_state (name, value) VALUES ('last_mod_time', ?)",
+                    (lastModTime,),
+                )
+        finally:
+            connection.close()
+
+        logger.debug(
+            f"{'Rebuilt' if replace else 'Updated'} job mirror '{self.path}' with {len(rows)} rows "
+            f"up to mod_time {lastModTime}"
+        )
+
+    def _open(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Пул отдаёт соединение другим потокам, но одновременно им пользуется только один.
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL не блокирует чтение панели, пока экспорт пишет новый пакет.
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_build_schema())
+        return connection
+
+
+class SQLiteSlurmDB(SQLiteJobMirror):
+    """
+    SQLite stand-in for a whole slurmDB ``linux_job_table``.
+
+    Unlike the mirror it also keeps pending and deleted rows, so
+    ``SlurmDBRepository`` built on ``createPool()`` serves every query, including
+    the pending queue, without MySQL. Used by benchmarks and tests with rows from
+    ``benchmarks.workload``.
+    """
+
+    def insertRows(self, rows, deleted: bool = False):
+        rows = list(rows)
+        query = _build_insert_query()
+
+        connection = self._open()
+        try:
+            with connection:
+                connection.executemany(query, [(*_get_row_values(row), int(deleted)) for row in rows])
+        finally:
+            connection.close()
+
+        return len(rows)
+
+    def countRows(self) -> int:
+        connection = self._open()
+        try:
+            return connection.execute("SELECT COUNT(*) FROM linux_job_table").fetchone()[0]
+        finally:
+            connection.close()
+
+    def createPool(self, size: int = 4) -> SlurmDBConnectionPool:
+        return SlurmDBConnectionPool(self.connect, size=size)
+
+
+class SQLiteMirrorConnection:
+    """DB-API connection wrapper that accepts the ``%s`` placeholders of the MySQL queries."""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def cursor(self, buffered=None):
+        return SQLiteMirrorCursor(self.connection.cursor())
+
+    def ping(self, reconnect=False):
+        pass
+
+    def close(self):
+        self.connection.close()
+
+
+class SQLiteMirrorCursor:
+    def __init__(self, cursor: sqlite3.Cursor):
+        self.cursor = cursor
+
+    def execute(self, query, params=()):
+        self.cursor.execute(query.replace("%s", "?"), tuple(params))
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchmany(self, size):
+        return self.cursor.fetchmany(size)
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+    def close(self):
+        self.cursor.close()
+
+
+def _quote(column: str) -> str:
+    return f"`{column}`"
+
+
+def _build_insert_query() -> str:
+    columns = ", ".join(_quote(column) for column in (*MIRROR_COLUMNS, "deleted"))
+    placeholders = ", ".join("?" for _ in (*MIRROR_COLUMNS, "deleted"))
+    return f"INSERT OR REPLACE INTO linux_job_table ({columns}) VALUES ({placeholders})"
+
+
+def _build_schema() -> str:
+    columns = ",\n    ".join(
+        f"{_quote(column)} {'TEXT' if column in _TEXT_COLUMNS else 'INTEGER'}"
+        + (" PRIMARY KEY" if column == "job_db_inx" else "")
+        for column in MIRROR_COLUMNS
+    )
+    indexes = "\n".join(
+        f"CREATE INDEX IF NOT EXISTS linux_job_table_{column} ON linux_job_table ({_quote(column)});"
+        for column in MIRROR_INDEXED_COLUMNS
+    )
+    return f"""
+CREATE TABLE IF NOT EXISTS linux_job_table (
+    {columns},
+    deleted INTEGER NOT NULL DEFAULT 0
+);
+{indexes}
+CREATE TABLE IF NOT EXISTS mirror_state (name TEXT PRIMARY KEY, value INTEGER);
+"""
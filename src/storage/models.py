@@ -1,35 +1,22 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
+from .tres_codes import TresCounts, decode_tres
 
-def _parse_tres_map(tresValue: str | None) -> dict[str, int]:
-    if not tresValue:
-        return {}
 
-    parsed = {}
-    for entry in tresValue.split(","):
-        entry = entry.strip()
-        if "=" not in entry:
-            continue
+def score_job_version(nodelist: str | None, timeEnd: int | None, tresAlloc: str | None, modTime: int | None) -> tuple:
+    """
+    Preference of one version of a logical job: assigned nodes, finished,
+    allocated TRES, then ``mod_time``. A higher tuple wins.
+    """
+    return (
+        1 if nodelist and nodelist != "None assigned" else 0,
+        1 if (timeEnd or 0) > 0 else 0,
+        1 if tresAlloc else 0,
+        int(modTime or 0),
+    )
 
-        key, value = entry.split("=", maxsplit=1)
-        try:
-            parsed[key] = int(value)
-        except ValueError:
-            continue
 
-    return parsed
-
-
-def _get_tres_value(tresValue: str | None, aliases: set[str]) -> int:
-    tresMap = _parse_tres_map(tresValue)
-    for alias in aliases:
-        if alias in tresMap:
-            return tresMap[alias]
-
-    return 0
-
-
-@dataclass
+@dataclass(slots=True)
 class Job:
     jobID: int
     jobName: str
@@ -40,6 +27,12 @@ class Job:
     cpusReq: int = 0
     tresReq: str | None = None
     partition: str | None = None
+    # TRES-строка раскладывается один раз при создании задания.
+    requestedTres: TresCounts | None = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.requestedTres is None:
+            self.requestedTres = decode_tres(self.tresReq)
 
     def getID(self):
         return self.jobID
@@ -54,10 +47,10 @@ class Job:
         return self.cpusReq or 0
 
     def getRequestedGpus(self) -> int:
-        return _get_tres_value(self.tresReq, {"1001", "gres/gpu", "gpu"})
+        return self.requestedTres.gpu
 
     def getRequestedNodes(self) -> int:
-        return _get_tres_value(self.tresReq, {"4", "node", "nodes"})
+        return self.requestedTres.node
 
     def getRequestedFeatures(self, availableFeatures: list[str]) -> list[str]:
         if not self.constraints:
@@ -74,7 +67,7 @@ class Job:
         return sorted(set(matchedFeatures))
 
 
-@dataclass
+@dataclass(slots=True)
 class HistoricalJob:
     dbIndex: int | None
     jobID: int
@@ -94,10 +87,24 @@ class HistoricalJob:
     tresAlloc: str | None
     nodelist: str | None
     partition: str | None
+    requestedTres: TresCounts | None = field(default=None, repr=False, compare=False)
+    allocatedTres: TresCounts | None = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.requestedTres is None:
+            self.requestedTres = decode_tres(self.tresReq)
+        if self.allocatedTres is None:
+            self.allocatedTres = decode_tres(self.tresAlloc)
 
     def getLogicalKey(self):
         return self.jobID
 
+    def getSortKey(self) -> tuple:
+        return (self.timeStart, self.jobID, self.dbIndex if self.dbIndex is not None else -1)
+
+    def getVersionScore(self) -> tuple:
+        return score_job_version(self.nodelist, self.timeEnd, self.tresAlloc, self.modTime)
+
     def hasStarted(self) -> bool:
         return self.timeStart > 0
 
@@ -105,21 +112,13 @@ class HistoricalJob:
         return bool(self.nodelist) and self.nodelist != "None assigned"
 
     def getRequestedGpus(self) -> int:
-        return _get_tres_value(self.tresReq, {"1001", "gres/gpu", "gpu"})
+        return self.requestedTres.gpu
 
     def getAllocatedCpus(self) -> int:
-        allocatedCpus = _get_tres_value(self.tresAlloc, {"1", "cpu"})
-        if allocatedCpus > 0:
-            return allocatedCpus
-
-        return self.cpusReq or 0
+        return self.allocatedTres.cpu if self.allocatedTres.cpu > 0 else self.cpusReq or 0
 
     def getAllocatedGpus(self) -> int:
-        allocatedGpus = _get_tres_value(self.tresAlloc, {"1001", "gres/gpu", "gpu"})
-        if allocatedGpus > 0:
-            return allocatedGpus
-
-        return self.getRequestedGpus()
+        return self.allocatedTres.gpu if self.allocatedTres.gpu > 0 else self.requestedTres.gpu
 
     def getEffectiveEnd(self, nowTimestamp: int) -> int:
         if self.timeEnd > 0:
@@ -179,7 +178,7 @@ class HistoricalJob:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class RawHistoricalJobRow:
     job_db_inx: int | None
     id_job: int
@@ -203,6 +202,16 @@ class RawHistoricalJobRow:
     def getLogicalKey(self):
         return self.id_job
 
+    def getSortKey(self) -> tuple:
+        return (
+            self.time_start or 0,
+            self.id_job,
+            self.job_db_inx if self.job_db_inx is not None else -1,
+        )
+
+    def getVersionScore(self) -> tuple:
+        return score_job_version(self.nodelist, self.time_end, self.tres_alloc, self.mod_time)
+
     def toHistoricalJob(self) -> HistoricalJob:
         return HistoricalJob(
             dbIndex=self.job_db_inx,
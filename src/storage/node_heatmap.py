@@ -0,0 +1,358 @@
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from loguru import logger
+except ModuleNotFoundError:
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+    logger.success = logger.info
+
+from config.parsing import expand_hostlist
+
+from .constants import DEFAULT_BUCKET_MINUTES
+from .timeutils import floor_timestamp
+
+NODE_HEATMAP_SCHEMA_VERSION = 1
+NODE_HEATMAP_RESOURCES = ("cpu", "gpu")
+# Остаток от сложения долей ядер ниже этого порога считаем нулём.
+NODE_HEATMAP_ZERO_TOLERANCE = 1e-6
+
+
+class NodeUtilizationHeatmap:
+    """
+    Nodes × buckets CPU/GPU occupancy stored as sparse step functions.
+
+    Row ``i`` belongs to ``nodeNames[i]``. Its used cores and GPUs change only at
+    the buckets ``bucketIndexes[indptr[i]:indptr[i + 1]]`` and keep the matching
+    ``cpuLevels``/``gpuLevels`` until the next change, like the rows of a CSR
+    matrix. Bucket ``b`` holds the load at ``rangeStart + b * intervalSeconds``,
+    the same sampling as the utilization series. Dense blocks are only built for
+    the nodes and time window of a query.
+    """
+
+    def __init__(
+        self,
+        nodeNames,
+        nodeCpu,
+        nodeGpu,
+        indptr,
+        bucketIndexes,
+        cpuLevels,
+        gpuLevels,
+        rangeStart: int,
+        intervalSeconds: int,
+        bucketCount: int,
+    ):
+        self.nodeNames = [str(nodeName) for nodeName in nodeNames]
+        self.nodeCpu = np.asarray(nodeCpu, dtype=np.int64)
+        self.nodeGpu = np.asarray(nodeGpu, dtype=np.int64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.bucketIndexes = np.asarray(bucketIndexes, dtype=np.int64)
+        self.cpuLevels = np.asarray(cpuLevels, dtype=np.float64)
+        self.gpuLevels = np.asarray(gpuLevels, dtype=np.float64)
+        self.rangeStart = int(rangeStart)
+        self.intervalSeconds = int(intervalSeconds)
+        self.bucketCount = int(bucketCount)
+        self._nodePositions = {nodeName: position for position, nodeName in enumerate(self.nodeNames)}
+        # Ключ строки и корзины растёт монотонно по всей матрице, поэтому любую
+        # клетку можно найти одним searchsorted.
+        rowIndexes = np.repeat(np.arange(len(self.nodeNames), dtype=np.int64), np.diff(self.indptr))
+        self._cellKeys = rowIndexes * max(1, self.bucketCount) + self.bucketIndexes
+
+    @property
+    def bucketTimestamps(self) -> np.ndarray:
+        return self.rangeStart + np.arange(self.bucketCount, dtype=np.int64) * self.intervalSeconds
+
+    def getMatrix(
+        self,
+        nodes=None,
+        startTimestamp: int | None = None,
+        endTimestamp: int | None = None,
+        resource: str = "cpu",
+        normalize: bool = False,
+    ) -> tuple[list[str], np.ndarray, np.ndarray]:
+        """
+        Dense ``(nodeNames, bucketTimestamps, matrix)`` block for buckets that
+        start in ``[startTimestamp, endTimestamp)``.
+
+        ``nodes`` is a hostlist expression such as ``"cn-[001-064]"`` or a list of
+        node names; names missing from the heatmap are skipped. Values are used
+        cores or GPUs, or percent of the node capacity with ``normalize``.
+        """
+        if resource not in NODE_HEATMAP_RESOURCES:
+            raise ValueError(
+                f"Unknown heatmap resource '{resource}', expected one of: {', '.join(NODE_HEATMAP_RESOURCES)}"
+            )
+
+        positions = self._selectPositions(nodes)
+        firstBucket, lastBucket = self._selectBuckets(startTimestamp, endTimestamp)
+        bucketWindow = np.arange(firstBucket, lastBucket, dtype=np.int64)
+        levels = self.cpuLevels if resource == "cpu" else self.gpuLevels
+
+        cellKeys = positions[:, None] * max(1, self.bucketCount) + bucketWindow[None, :]
+        cellIndexes = np.searchsorted(self._cellKeys, cellKeys, side="right") - 1
+        hasLevel = cellIndexes >= self.indptr[positions][:, None]
+        matrix = np.where(hasLevel, levels[np.maximum(cellIndexes, 0)] if len(levels) else 0.0, 0.0)
+
+        if normalize:
+            capacities = (self.nodeCpu if resource == "cpu" else self.nodeGpu)[positions][:, None]
+            matrix = np.divide(
+                100.0 * matrix,
+                capacities,
+                out=np.zeros_like(matrix),
+                where=capacities > 0,
+            )
+
+        return (
+            [self.nodeNames[position] for position in positions],
+            self.rangeStart + bucketWindow * self.intervalSeconds,
+            matrix,
+        )
+
+    def getNodeSeries(
+        self,
+        nodeName: str,
+        startTimestamp: int | None = None,
+        endTimestamp: int | None = None,
+    ) -> list[dict]:
+        """
+        Points of one node in the utilization series format, in percent.
+        """
+        if nodeName not in self._nodePositions:
+            raise KeyError(f"Node '{nodeName}' is not in the heatmap")
+
+        _, timestamps, cpuMatrix = self.getMatrix([nodeName], startTimestamp, endTimestamp, "cpu", True)
+        _, _, gpuMatrix = self.getMatrix([nodeName], startTimestamp, endTimestamp, "gpu", True)
+        return [
+            {"time": timestamp, "cpu": cpu, "gpu": gpu}
+            for timestamp, cpu, gpu in zip(timestamps.tolist(), cpuMatrix[0].tolist(), gpuMatrix[0].tolist())
+        ]
+
+    def save(self, path: str | Path) -> Path:
+        heatmapPath = Path(path)
+        heatmapPath.parent.mkdir(parents=True, exist_ok=True)
+        temporaryPath = heatmapPath.with_name(f"{heatmapPath.name}.tmp")
+        with open(temporaryPath, "wb") as file:
+            np.savez_compressed(
+                file,
+                schema_version=np.int64(NODE_HEATMAP_SCHEMA_VERSION),
+                node_names=np.array(self.nodeNames, dtype=np.str_),
+                node_cpu=self.nodeCpu,
+                node_gpu=self.nodeGpu,
+                indptr=self.indptr,
+                bucket_indexes=self.bucketIndexes,
+                cpu_levels=self.cpuLevels,
+                gpu_levels=self.gpuLevels,
+                range=np.array([self.rangeStart, self.intervalSeconds, self.bucketCount], dtype=np.int64),
+            )
+        os.replace(temporaryPath, heatmapPath)
+        return heatmapPath
+
+    @classmethod
+    def load(cls, path: str | Path) -> "NodeUtilizationHeatmap":
+        heatmapPath = Path(path)
+        with np.load(heatmapPath, allow_pickle=False) as arrays:
+            schemaVersion = int(arrays["schema_version"])
+            if schemaVersion != NODE_HEATMAP_SCHEMA_VERSION:
+                raise ValueError(f"Unsupported node heatmap schema {schemaVersion} in '{heatmapPath}'")
+
+            rangeStart, intervalSeconds, bucketCount = arrays["range"].tolist()
+            return cls(
+                nodeNames=arrays["node_names"].tolist(),
+                nodeCpu=arrays["node_cpu"],
+                nodeGpu=arrays["node_gpu"],
+                indptr=arrays["indptr"],
+                bucketIndexes=arrays["bucket_indexes"],
+                cpuLevels=arrays["cpu_levels"],
+                gpuLevels=arrays["gpu_levels"],
+                rangeStart=rangeStart,
+                intervalSeconds=intervalSeconds,
+                bucketCount=bucketCount,
+            )
+
+    def _selectPositions(self, nodes) -> np.ndarray:
+        if nodes is None:
+            return np.arange(len(self.nodeNames), dtype=np.int64)
+
+        nodeNames = expand_hostlist(nodes) if isinstance(nodes, str) else list(nodes)
+        return np.array(
+            [self._nodePositions[nodeName] for nodeName in nodeNames if nodeName in self._nodePositions],
+            dtype=np.int64,
+        )
+
+    def _selectBuckets(self, startTimestamp: int | None, endTimestamp: int | None) -> tuple[int, int]:
+        firstBucket = 0
+        if startTimestamp is not None:
+            firstBucket = -(-(int(startTimestamp) - self.rangeStart) // self.intervalSeconds)
+        lastBucket = self.bucketCount
+        if endTimestamp is not None:
+            lastBucket = -(-(int(endTimestamp) - self.rangeStart) // self.intervalSeconds)
+
+        firstBucket = min(max(firstBucket, 0), self.bucketCount)
+        return firstBucket, min(max(lastBucket, firstBucket), self.bucketCount)
+
+
+def build_node_utilization_heatmap(
+    jobs,
+    clusterConfig,
+    intervalMinutes: int = DEFAULT_BUCKET_MINUTES,
+    nowTimestamp: int | None = None,
+) -> NodeUtilizationHeatmap:
+    """
+    Accumulate start/end deltas of every job on every node of its nodelist.
+
+    A job's allocated cores and GPUs are split over its known nodes in
+    proportion to their capacity, or evenly when the nodes have none. Each
+    distinct nodelist is expanded once. Deltas are summed per (node, bucket)
+    cell and turned into levels with one cumulative sum per node, so the cost
+    grows with the number of job-node pairs, not with nodes × buckets.
+    """
+    nowTimestamp = int(nowTimestamp) if nowTimestamp is not None else int(datetime.now().timestamp())
+    intervalSeconds = intervalMinutes * 60
+    nodeCapacities = clusterConfig.getNodeCapacitiesForHostlist(",".join(clusterConfig.getNodeGroupNames()))
+    nodeNames = list(nodeCapacities)
+    nodeCpu = np.array([nodeCapacities[nodeName]["cpu"] for nodeName in nodeNames], dtype=np.int64)
+    nodeGpu = np.array([nodeCapacities[nodeName]["gpu"] for nodeName in nodeNames], dtype=np.int64)
+
+    startedJobs = [
+        job
+        for job in jobs
+        if job.hasStarted() and job.hasAssignedNodes() and job.getEffectiveEnd(nowTimestamp) > job.timeStart
+    ]
+    if not startedJobs:
+        return _empty_heatmap(nodeNames, nodeCpu, nodeGpu, nowTimestamp, intervalSeconds)
+
+    starts = np.fromiter((job.timeStart for job in startedJobs), dtype=np.int64, count=len(startedJobs))
+    ends = np.fromiter(
+        (job.getEffectiveEnd(nowTimestamp) for job in startedJobs), dtype=np.int64, count=len(startedJobs)
+    )
+    rangeStart = floor_timestamp(int(starts.min()), intervalSeconds)
+    lastBucketStart = floor_timestamp(max(0, int(ends.max()) - 1), intervalSeconds)
+    bucketCount = (lastBucketStart - rangeStart) // intervalSeconds + 1
+
+    # Точка корзины видит все события с меткой не позже её начала.
+    startBuckets = -(-(starts - rangeStart) // intervalSeconds)
+    endBuckets = -(-(ends - rangeStart) // intervalSeconds)
+    cpus = np.fromiter((job.getAllocatedCpus() for job in startedJobs), dtype=np.float64, count=len(startedJobs))
+    gpus = np.fromiter((job.getAllocatedGpus() for job in startedJobs), dtype=np.float64, count=len(startedJobs))
+
+    nodePositions = {nodeName: position for position, nodeName in enumerate(nodeNames)}
+    nodelistCodes = {}
+    nodelistCodesByJob = np.fromiter(
+        (nodelistCodes.setdefault(job.nodelist, len(nodelistCodes)) for job in startedJobs),
+        dtype=np.int64,
+        count=len(startedJobs),
+    )
+
+    cellRows, cellStarts, cellEnds, cpuDeltas, gpuDeltas = [], [], [], [], []
+    skippedJobs = 0
+    jobOrder = np.argsort(nodelistCodesByJob, kind="stable")
+    groupBounds = np.flatnonzero(np.diff(nodelistCodesByJob[jobOrder])) + 1
+    for jobIndexes in np.split(jobOrder, groupBounds):
+        nodelist = startedJobs[jobIndexes[0]].nodelist
+        rows = np.array(
+            [nodePositions[nodeName] for nodeName in expand_hostlist(nodelist) if nodeName in nodePositions],
+            dtype=np.int64,
+        )
+        if len(rows) == 0:
+            skippedJobs += len(jobIndexes)
+            continue
+
+        cpuWeights = _split_weights(nodeCpu[rows])
+        gpuWeights = _split_weights(nodeGpu[rows])
+        cellRows.append(np.tile(rows, len(jobIndexes)))
+        cellStarts.append(np.repeat(startBuckets[jobIndexes], len(rows)))
+        cellEnds.append(np.repeat(endBuckets[jobIndexes], len(rows)))
+        cpuDeltas.append(np.outer(cpus[jobIndexes], cpuWeights).ravel())
+        gpuDeltas.append(np.outer(gpus[jobIndexes], gpuWeights).ravel())
+
+    if skippedJobs > 0:
+        logger.warning(f"Skipped {skippedJobs} jobs whose nodelist has no nodes of the cluster config")
+    if not cellRows:
+        return _empty_heatmap(nodeNames, nodeCpu, nodeGpu, nowTimestamp, intervalSeconds)
+
+    cellRows = np.concatenate(cellRows)
+    cellStarts = np.concatenate(cellStarts)
+    cellEnds = np.concatenate(cellEnds)
+    cpuDeltas = np.concatenate(cpuDeltas)
+    gpuDeltas = np.concatenate(gpuDeltas)
+    # Задание короче шага может не попасть ни в одну точку корзины.
+    visible = cellStarts < cellEnds
+    closing = visible & (cellEnds < bucketCount)
+
+    cellKeys = np.concatenate(
+        (
+            cellRows[visible] * bucketCount + cellStarts[visible],
+            cellRows[closing] * bucketCount + cellEnds[closing],
+        )
+    )
+    uniqueKeys, cellIndexes = np.unique(cellKeys, return_inverse=True)
+    cpuSums = np.bincount(
+        cellIndexes, weights=np.concatenate((cpuDeltas[visible], -cpuDeltas[closing])), minlength=len(uniqueKeys)
+    )
+    gpuSums = np.bincount(
+        cellIndexes, weights=np.concatenate((gpuDeltas[visible], -gpuDeltas[closing])), minlength=len(uniqueKeys)
+    )
+
+    rows = uniqueKeys // bucketCount
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=len(nodeNames)))))
+    cpuLevels = np.empty_like(cpuSums)
+    gpuLevels = np.empty_like(gpuSums)
+    for position in np.flatnonzero(np.diff(indptr)):
+        # Отдельная сумма на узел: общая накопила бы погрешность соседних строк.
+        rowSlice = slice(indptr[position], indptr[position + 1])
+        cpuLevels[rowSlice] = np.cumsum(cpuSums[rowSlice])
+        gpuLevels[rowSlice] = np.cumsum(gpuSums[rowSlice])
+    cpuLevels[np.abs(cpuLevels) < NODE_HEATMAP_ZERO_TOLERANCE] = 0.0
+    gpuLevels[np.abs(gpuLevels) < NODE_HEATMAP_ZERO_TOLERANCE] = 0.0
+
+    rowStarts = np.zeros(len(rows), dtype=bool)
+    rowStarts[indptr[:-1][np.diff(indptr) > 0]] = True
+    previousCpu = np.concatenate(([0.0], cpuLevels[:-1]))
+    previousGpu = np.concatenate(([0.0], gpuLevels[:-1]))
+    changed = np.where(
+        rowStarts,
+        (cpuLevels != 0.0) | (gpuLevels != 0.0),
+        (cpuLevels != previousCpu) | (gpuLevels != previousGpu),
+    )
+    rows = rows[changed]
+    return NodeUtilizationHeatmap(
+        nodeNames=nodeNames,
+        nodeCpu=nodeCpu,
+        nodeGpu=nodeGpu,
+        indptr=np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=len(nodeNames))))),
+        bucketIndexes=(uniqueKeys % bucketCount)[changed],
+        cpuLevels=cpuLevels[changed],
+        gpuLevels=gpuLevels[changed],
+        rangeStart=rangeStart,
+        intervalSeconds=intervalSeconds,
+        bucketCount=bucketCount,
+    )
+
+
+def _split_weights(capacities: np.ndarray) -> np.ndarray:
+    total = capacities.sum()
+    if total <= 0:
+        return np.full(len(capacities), 1.0 / len(capacities))
+
+    return capacities / total
+
+
+def _empty_heatmap(nodeNames, nodeCpu, nodeGpu, nowTimestamp: int, intervalSeconds: int) -> NodeUtilizationHeatmap:
+    return NodeUtilizationHeatmap(
+        nodeNames=nodeNames,
+        nodeCpu=nodeCpu,
+        nodeGpu=nodeGpu,
+        indptr=np.zeros(len(nodeNames) + 1, dtype=np.int64),
+        bucketIndexes=[],
+        cpuLevels=[],
+        gpuLevels=[],
+        rangeStart=floor_timestamp(nowTimestamp, intervalSeconds),
+        intervalSeconds=intervalSeconds,
+        bucketCount=0,
+    )
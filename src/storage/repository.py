@@ -1,4 +1,9 @@
 import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 
 try:
     import mysql.connector
@@ -18,39 +23,280 @@ except ModuleNotFoundError:
 
 from config import getDBConfig
 
-from .constants import GET_ACTIVE_JOBS_BASE_QUERY, GET_HISTORICAL_JOBS_BASE_QUERY, GET_JOBS_WITH_STATE_QUERY
+from .constants import (
+    GET_ACTIVE_JOBS_BASE_QUERY,
+    GET_HISTORICAL_JOBS_BASE_QUERY,
+    GET_JOB_CHANGES_BASE_QUERY,
+    GET_JOBS_WITH_STATE_QUERY,
+    GET_MAX_JOB_MOD_TIME_QUERY,
+    HISTORICAL_FETCH_BATCH_SIZE,
+)
 from .models import HistoricalJob, Job, RawHistoricalJobRow
 
 
-class SlurmDBRepository:
-    def __init__(self):
-        self.connection = None
-        self.config = None
+_CONNECTION_POOL = None
+_CONNECTION_POOL_LOCK = threading.Lock()
 
-    def create(self):
-        if mysql is None:
-            raise ModuleNotFoundError("mysql-connector-python is required to connect to slurmDB.")
 
-        self.config = getDBConfig()
-        logger.debug("Create connection to slurmDB")
+class SlurmDBConnectionPool:
+    """
+    Thread-safe pool of slurmDB connections shared by the whole process.
+
+    ``acquire`` returns an idle connection that answers a ``ping``, or opens a new
+    one while fewer than ``size`` are open; otherwise it waits up to
+    ``timeoutSeconds`` for a release. Idle connections that fail the ping are
+    closed and replaced. ``connect`` must return connections in autocommit mode,
+    so a reused handle never reads from an old REPEATABLE READ snapshot. Every
+    new connection gets the session statement timeout.
+    """
+
+    def __init__(
+        self,
+        connect,
+        size: int = 4,
+        timeoutSeconds: float = 30,
+        statementTimeoutSeconds: float = 0,
+    ):
+        if size < 1:
+            raise ValueError("slurmDB connection pool size must be at least 1")
+
+        self.size = int(size)
+        self.timeoutSeconds = float(timeoutSeconds)
+        self.statementTimeoutSeconds = float(statementTimeoutSeconds)
+        self.pid = os.getpid()
+        self._connect = connect
+        self._idle = deque()
+        self._openCount = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._metrics = {
+            "connections_created": 0,
+            "connections_reused": 0,
+            "stale_connections_replaced": 0,
+            "connections_discarded": 0,
+            "acquire_waits": 0,
+            "acquire_timeouts": 0,
+            "wait_seconds": 0.0,
+        }
+
+    def acquire(self):
+        startedAt = time.monotonic()
+        with self._condition:
+            waited = False
+            while not self._closed and not self._idle and self._openCount >= self.size:
+                remainingSeconds = startedAt + self.timeoutSeconds - time.monotonic()
+                if remainingSeconds <= 0:
+                    self._metrics["acquire_timeouts"] += 1
+                    raise TimeoutError(
+                        f"No free slurmDB connection within {self.timeoutSeconds:g} s (pool size {self.size})"
+                    )
+                waited = True
+                self._condition.wait(remainingSeconds)
+
+            if self._closed:
+                raise RuntimeError("slurmDB connection pool is closed.")
+
+            connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                # Место занимаем сразу: подключение идёт уже без блокировки.
+                self._openCount += 1
+            if waited:
+                self._metrics["acquire_waits"] += 1
+                self._metrics["wait_seconds"] += time.monotonic() - startedAt
 
         try:
-            self.connection = mysql.connect(**self.config.getParameters())
-        except mysql.Error as err:
-            self.connection = None
-            if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
-                logger.critical("Something is wrong with your user name or password")
-            elif err.errno == errorcode.ER_BAD_DB_ERROR:
-                logger.critical("Database does not exist")
+            if connection is not None:
+                if self._isAlive(connection):
+                    self._count("connections_reused")
+                    return connection
+
+                logger.warning("Replacing stale slurmDB connection")
+                self._closeQuietly(connection)
+                self._count("stale_connections_replaced")
+
+            return self._openConnection()
+        except BaseException:
+            with self._condition:
+                self._openCount -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, connection, discard: bool = False):
+        with self._condition:
+            keep = not (discard or self._closed or self.pid != os.getpid())
+            if keep:
+                self._idle.append(connection)
             else:
-                logger.critical(err)
+                self._openCount -= 1
+                self._metrics["connections_discarded"] += 1
+            self._condition.notify()
+
+        if not keep:
+            self._closeQuietly(connection)
+
+    @contextmanager
+    def connection(self):
+        connection = self.acquire()
+        try:
+            yield connection
+        except BaseException:
+            self.release(connection, discard=True)
             raise
+        else:
+            self.release(connection)
+
+    def getMetrics(self) -> dict:
+        with self._condition:
+            return {
+                "size": self.size,
+                "open": self._openCount,
+                "idle": len(self._idle),
+                "in_use": self._openCount - len(self._idle),
+                **self._metrics,
+            }
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            idleConnections = list(self._idle)
+            self._idle.clear()
+            self._openCount -= len(idleConnections)
+            self._condition.notify_all()
+
+        for connection in idleConnections:
+            self._closeQuietly(connection)
+
+    def _openConnection(self):
+        connection = self._connect()
+        try:
+            self._applyStatementTimeout(connection)
+        except BaseException:
+            self._closeQuietly(connection)
+            raise
+
+        self._count("connections_created")
+        return connection
+
+    def _applyStatementTimeout(self, connection):
+        if self.statementTimeoutSeconds <= 0:
+            return
+
+        serverInfo = str(connection.get_server_info() or "")
+        cursor = connection.cursor()
+        try:
+            # MariaDB ограничивает любые запросы в секундах, MySQL — только SELECT в миллисекундах.
+            if "mariadb" in serverInfo.lower():
+                cursor.execute("SET SESSION max_statement_time = %s", (self.statementTimeoutSeconds,))
+            else:
+                cursor.execute(
+                    "SET SESSION max_execution_time = %s", (int(self.statementTimeoutSeconds * 1000),)
+                )
+        finally:
+            cursor.close()
+
+    def _isAlive(self, connection) -> bool:
+        try:
+            connection.ping(reconnect=False)
+        except Exception as error:
+            logger.debug(f"slurmDB connection failed liveness check: {error}")
+            return False
+
+        return True
+
+    def _count(self, metricName: str):
+        with self._condition:
+            self._metrics[metricName] += 1
+
+    def _closeQuietly(self, connection):
+        try:
+            connection.close()
+        except Exception as error:
+            logger.debug(f"Failed to close slurmDB connection: {error}")
+
+
+def get_connection_pool() -> SlurmDBConnectionPool:
+    global _CONNECTION_POOL
+
+    with _CONNECTION_POOL_LOCK:
+        # После fork сокеты родителя закрывать нельзя: пул просто создаётся заново.
+        if _CONNECTION_POOL is None or _CONNECTION_POOL.pid != os.getpid():
+            _CONNECTION_POOL = _create_connection_pool()
+
+        return _CONNECTION_POOL
+
+
+def get_connection_pool_metrics() -> dict | None:
+    with _CONNECTION_POOL_LOCK:
+        pool = _CONNECTION_POOL
+
+    return pool.getMetrics() if pool is not None else None
+
+
+def close_connection_pool():
+    global _CONNECTION_POOL
+
+    with _CONNECTION_POOL_LOCK:
+        pool = _CONNECTION_POOL
+        _CONNECTION_POOL = None
+
+    if pool is not None and pool.pid == os.getpid():
+        logger.info(f"Closing slurmDB connection pool: {pool.getMetrics()}")
+        pool.close()
+
+
+def _create_connection_pool() -> SlurmDBConnectionPool:
+    if mysql is None:
+        raise ModuleNotFoundError("mysql-connector-python is required to connect to slurmDB.")
+
+    config = getDBConfig()
+    return SlurmDBConnectionPool(
+        connect=lambda: _connect(config),
+        size=config.pool_size,
+        timeoutSeconds=config.pool_timeout_seconds,
+        statementTimeoutSeconds=config.statement_timeout_seconds,
+    )
+
+
+def _connect(config):
+    logger.debug("Create connection to slurmDB")
 
-        logger.success("Connection to slurmDB was created")
+    try:
+        connection = mysql.connect(**config.getParameters(), autocommit=True)
+    except mysql.Error as err:
+        if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
+            logger.critical("Something is wrong with your user name or password")
+        elif err.errno == errorcode.ER_BAD_DB_ERROR:
+            logger.critical("Database does not exist")
+        else:
+            logger.critical(err)
+        raise
+
+    logger.success("Connection to slurmDB was created")
+    return connection
+
+
+class SlurmDBRepository:
+    def __init__(self, pool: SlurmDBConnectionPool | None = None, mirror=None):
+        self.connection = None
+        self.pool = pool
+        # Режим read-through: те же запросы идут в локальное SQLite-зеркало (storage.mirror).
+        self.mirror = mirror
+
+    def create(self):
+        if self.mirror is not None:
+            self.connection = self.mirror.connect()
+            return self
+
+        if self.pool is None:
+            self.pool = get_connection_pool()
+
+        self.connection = self.pool.acquire()
         return self
 
     def get_jobs_with_state(self, state) -> list[Job]:
         self._require_connection()
+        if self.mirror is not None:
+            raise RuntimeError("The job mirror holds only started jobs, pending jobs need slurmDB.")
 
         result = []
         cursor = self.connection.cursor()
@@ -90,10 +336,34 @@ class SlurmDBRepository:
         modifiedFrom: int | None = None,
         modifiedUntil: int | None = None,
     ) -> list[RawHistoricalJobRow]:
+        return list(self.iter_historical_job_rows(modifiedAfter, modifiedFrom, modifiedUntil))
+
+    def iter_historical_job_rows(
+        self,
+        modifiedAfter: int | None = None,
+        modifiedFrom: int | None = None,
+        modifiedUntil: int | None = None,
+        batchSize: int = HISTORICAL_FETCH_BATCH_SIZE,
+    ):
+        for batch in self.iter_historical_job_row_batches(modifiedAfter, modifiedFrom, modifiedUntil, batchSize):
+            yield from batch
+
+    def iter_historical_job_row_batches(
+        self,
+        modifiedAfter: int | None = None,
+        modifiedFrom: int | None = None,
+        modifiedUntil: int | None = None,
+        batchSize: int = HISTORICAL_FETCH_BATCH_SIZE,
+    ):
+        """
+        Yield historical rows in lists of at most ``batchSize`` rows.
+
+        The cursor is unbuffered, so the server streams the result and only one
+        ``fetchmany`` batch is held in memory at a time. The connection cannot run
+        other queries until the generator is exhausted or closed.
+        """
         self._require_connection()
 
-        result = []
-        cursor = self.connection.cursor()
         query = GET_HISTORICAL_JOBS_BASE_QUERY
         params = []
 
@@ -111,84 +381,126 @@ class SlurmDBRepository:
 
         query += " ORDER BY mod_time ASC, job_db_inx ASC, id_job ASC"
         logger.debug(
-            "Loading historical jobs for utilization aggregation"
-            f" (modifiedAfter={modifiedAfter}, modifiedFrom={modifiedFrom}, modifiedUntil={modifiedUntil})"
+            "Streaming historical jobs for utilization aggregation"
+            f" (modifiedAfter={modifiedAfter}, modifiedFrom={modifiedFrom}, modifiedUntil={modifiedUntil},"
+            f" batchSize={batchSize})"
         )
-        cursor.execute(query, tuple(params))
 
-        for row in cursor:
-            result.append(
-                RawHistoricalJobRow(
-                    job_db_inx=row[0],
-                    id_job=row[1],
-                    job_name=row[2],
-                    timelimit=row[3],
-                    state=row[4],
-                    priority=row[5],
-                    constraints=row[6],
-                    cpus_req=row[7] or 0,
-                    nodes_alloc=row[8] or 0,
-                    time_start=row[9] or 0,
-                    time_end=row[10] or 0,
-                    time_submit=row[11] or 0,
-                    time_eligible=row[12] or 0,
-                    mod_time=row[13] or 0,
-                    tres_req=row[14],
-                    tres_alloc=row[15],
-                    nodelist=row[16],
-                    partition=row[17],
-                )
-            )
+        rowCount = 0
+        cursor = self.connection.cursor(buffered=False)
+        try:
+            cursor.execute(query, tuple(params))
+            while True:
+                rows = cursor.fetchmany(batchSize)
+                if not rows:
+                    break
 
-        cursor.close()
-        logger.success(f"Got {len(result)} historical job rows")
-        return result
+                rowCount += len(rows)
+                yield [_build_raw_historical_job_row(row) for row in rows]
+        finally:
+            # Закрытие дочитывает незабранный остаток, иначе соединение нельзя вернуть в пул.
+            cursor.close()
+
+        logger.success(f"Got {rowCount} historical job rows")
 
     def get_active_jobs(self, nowTimestamp: int) -> list[HistoricalJob]:
         self._require_connection()
 
-        result = []
         cursor = self.connection.cursor()
         query = GET_ACTIVE_JOBS_BASE_QUERY + " ORDER BY time_start ASC, job_db_inx ASC, id_job ASC"
 
         logger.debug(f"Loading active jobs at timestamp {nowTimestamp}")
         cursor.execute(query, (nowTimestamp,))
-
-        for row in cursor:
-            result.append(
-                HistoricalJob(
-                    dbIndex=row[0],
-                    jobID=row[1],
-                    jobName=row[2],
-                    timelimit=row[3],
-                    state=row[4],
-                    priority=row[5],
-                    constraints=row[6],
-                    cpusReq=row[7] or 0,
-                    nodesAlloc=row[8] or 0,
-                    timeStart=row[9] or 0,
-                    timeEnd=row[10] or 0,
-                    timeSubmit=row[11] or 0,
-                    timeEligible=row[12] or 0,
-                    modTime=row[13] or 0,
-                    tresReq=row[14],
-                    tresAlloc=row[15],
-                    nodelist=row[16],
-                    partition=row[17],
-                )
-            )
+        result = [_build_historical_job(row) for row in cursor]
 
         cursor.close()
         logger.success(f"Got {len(result)} active jobs")
         return result
 
+    def get_max_job_mod_time(self) -> int:
+        self._require_connection()
+
+        cursor = self.connection.cursor()
+        cursor.execute(GET_MAX_JOB_MOD_TIME_QUERY)
+        row = cursor.fetchone()
+        cursor.close()
+        return int(row[0] or 0) if row else 0
+
+    def get_job_changes(self, modifiedFrom: int) -> list[tuple[HistoricalJob, bool]]:
+        """
+        Rows with ``mod_time >= modifiedFrom`` as ``(job, isLive)`` pairs, where
+        ``isLive`` is false for deleted rows and jobs that have not started.
+        """
+        self._require_connection()
+
+        cursor = self.connection.cursor()
+        query = GET_JOB_CHANGES_BASE_QUERY + " ORDER BY mod_time ASC, job_db_inx ASC, id_job ASC"
+
+        logger.debug(f"Loading job changes since mod_time {modifiedFrom}")
+        cursor.execute(query, (modifiedFrom,))
+        result = [(_build_historical_job(row), bool(row[18])) for row in cursor]
+
+        cursor.close()
+        logger.debug(f"Got {len(result)} changed job rows")
+        return result
+
     def close(self):
         if self.connection is None:
             return
 
-        logger.info("Closing connection to slurmDB")
-        self.connection.close()
+        if self.mirror is not None:
+            self.connection.close()
+        else:
+            logger.debug("Returning slurmDB connection to the pool")
+            self.pool.release(self.connection)
+        self.connection = None
 
     def _require_connection(self):
         if self.connection is None:
             raise RuntimeError("slurmDB connection is not created.")
+
+
+def _build_raw_historical_job_row(row) -> RawHistoricalJobRow:
+    return RawHistoricalJobRow(
+        job_db_inx=row[0],
+        id_job=row[1],
+        job_name=row[2],
+        timelimit=row[3],
+        state=row[4],
+        priority=row[5],
+        constraints=row[6],
+        cpus_req=row[7] or 0,
+        nodes_alloc=row[8] or 0,
+        time_start=row[9] or 0,
+        time_end=row[10] or 0,
+        time_submit=row[11] or 0,
+        time_eligible=row[12] or 0,
+        mod_time=row[13] or 0,
+        tres_req=row[14],
+        tres_alloc=row[15],
+        nodelist=row[16],
+        partition=row[17],
+    )
+
+
+def _build_historical_job(row) -> HistoricalJob:
+    return HistoricalJob(
+        dbIndex=row[0],
+        jobID=row[1],
+        jobName=row[2],
+        timelimit=row[3],
+        state=row[4],
+        priority=row[5],
+        constraints=row[6],
+        cpusReq=row[7] or 0,
+        nodesAlloc=row[8] or 0,
+        timeStart=row[9] or 0,
+        timeEnd=row[10] or 0,
+        timeSubmit=row[11] or 0,
+        timeEligible=row[12] or 0,
+        modTime=row[13] or 0,
+        tresReq=row[14],
+        tresAlloc=row[15],
+        nodelist=row[16],
+        partition=row[17],
+    )
@@ -0,0 +1,192 @@
+import fcntl
+import json
+import logging
+import os
+import shutil
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    from loguru import logger
+except ModuleNotFoundError:
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+    logger.success = logger.info
+
+from .columnar import (
+    COLUMNAR_MANIFEST_FILE,
+    COLUMNAR_STRINGS_FILE,
+    INT_COLUMNS,
+    STRING_COLUMNS,
+    ColumnarJobRows,
+    select_preferred_job_rows,
+)
+
+SEGMENT_LOG_VERSION = 1
+SEGMENT_LOG_MANIFEST_FILE = "segments.json"
+SEGMENT_LOG_LOCK_FILE = "segments.lock"
+
+
+class JobRowSegmentLog:
+    """
+    Append-only raw job row cache made of immutable columnar segments.
+
+    Every sync writes one segment with its batch, so I/O follows the delta size
+    rather than the history size. ``segments.json`` lists live segments in write
+    order together with their row count and min/max ``mod_time`` and
+    ``time_start``. A job may have versions in several segments; readers keep the
+    one preferred by ``LogicalJobStore``, and ``compact`` rewrites the log into a
+    single segment holding only those versions.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    def exists(self) -> bool:
+        return (self.path / SEGMENT_LOG_MANIFEST_FILE).exists() or (
+            self.path / COLUMNAR_MANIFEST_FILE
+        ).exists()
+
+    def getSegments(self) -> list[dict]:
+        with self._lock(fcntl.LOCK_SH):
+            return self._readManifest()["segments"]
+
+    def loadRawRows(self) -> ColumnarJobRows:
+        with self._lock(fcntl.LOCK_SH):
+            return ColumnarJobRows.concat(
+                [
+                    ColumnarJobRows.load(self.path / segment["name"])
+                    for segment in self._readManifest()["segments"]
+                ]
+            )
+
+    def loadRows(self) -> ColumnarJobRows:
+        return select_preferred_job_rows(self.loadRawRows())
+
+    def append(self, rows: ColumnarJobRows) -> dict | None:
+        if len(rows) == 0:
+            return None
+
+        with self._lock(fcntl.LOCK_EX):
+            manifest = self._readManifest()
+            segment = self._writeSegment(manifest, rows)
+            manifest["segments"].append(segment)
+            self._writeManifest(manifest)
+
+        return segment
+
+    def replace(self, rows: ColumnarJobRows) -> dict | None:
+        with self._lock(fcntl.LOCK_EX):
+            manifest = self._readManifest()
+            previousSegments = manifest["segments"]
+            manifest["segments"] = (
+                [self._writeSegment(manifest, rows)] if len(rows) > 0 else []
+            )
+            self._writeManifest(manifest)
+            self._removeSegments(previousSegments)
+
+        return manifest["segments"][0] if manifest["segments"] else None
+
+    def compact(self, minSegments: int = 2) -> dict | None:
+        with self._lock(fcntl.LOCK_EX):
+            manifest = self._readManifest()
+            previousSegments = manifest["segments"]
+            if len(previousSegments) < max(2, minSegments):
+                return None
+
+            rawRows = ColumnarJobRows.concat(
+                [ColumnarJobRows.load(self.path / segment["name"]) for segment in previousSegments]
+            )
+            compactedRows = select_preferred_job_rows(rawRows)
+            manifest["segments"] = [self._writeSegment(manifest, compactedRows)]
+            self._writeManifest(manifest)
+            self._removeSegments(previousSegments)
+
+        stats = {
+            "segments_before": len(previousSegments),
+            "rows_before": len(rawRows),
+            "rows_after": len(compactedRows),
+            "collapsed_versions": len(rawRows) - len(compactedRows),
+        }
+        logger.info(
+            f"Compacted raw job cache '{self.path}': {stats['segments_before']} segments, "
+            f"{stats['rows_before']} -> {stats['rows_after']} rows"
+        )
+        return stats
+
+    def _writeSegment(self, manifest: dict, rows: ColumnarJobRows) -> dict:
+        name = f"{manifest['next_sequence']:08d}"
+        manifest["next_sequence"] += 1
+        rows.save(self.path / name)
+
+        modTimes = rows.getIntColumn("mod_time")
+        startTimes = rows.getIntColumn("time_start")
+        return {
+            "name": name,
+            "row_count": len(rows),
+            "min_mod_time": int(modTimes.min()),
+            "max_mod_time": int(modTimes.max()),
+            "min_time_start": int(startTimes.min()),
+            "max_time_start": int(startTimes.max()),
+            "created_at": datetime.now().isoformat(),
+        }
+
+    def _removeSegments(self, segments: list[dict]):
+        for segment in segments:
+            shutil.rmtree(self.path / segment["name"], ignore_errors=True)
+
+    def _readManifest(self) -> dict:
+        manifestPath = self.path / SEGMENT_LOG_MANIFEST_FILE
+        if not manifestPath.exists():
+            return {"version": SEGMENT_LOG_VERSION, "next_sequence": 1, "segments": []}
+
+        with open(manifestPath, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+        if manifest.get("version") != SEGMENT_LOG_VERSION:
+            raise ValueError(
+                f"Unsupported raw job segment log version {manifest.get('version')} in '{self.path}'"
+            )
+
+        return manifest
+
+    def _writeManifest(self, manifest: dict):
+        manifestPath = self.path / SEGMENT_LOG_MANIFEST_FILE
+        temporaryPath = manifestPath.with_name(f"{manifestPath.name}.tmp")
+        with open(temporaryPath, "w", encoding="utf-8") as file:
+            json.dump(manifest, file, indent=2, ensure_ascii=False)
+        os.replace(temporaryPath, manifestPath)
+
+    def _migrateSingleColumnarLayout(self):
+        # Кэш из одного набора колонок в корне каталога становится первым сегментом.
+        if (self.path / SEGMENT_LOG_MANIFEST_FILE).exists():
+            return
+        if not (self.path / COLUMNAR_MANIFEST_FILE).exists():
+            return
+
+        rows = ColumnarJobRows.load(self.path, mmapMode=None)
+        manifest = self._readManifest()
+        if len(rows) > 0:
+            manifest["segments"].append(self._writeSegment(manifest, rows))
+        self._writeManifest(manifest)
+
+        for fileName in (
+            COLUMNAR_MANIFEST_FILE,
+            COLUMNAR_STRINGS_FILE,
+            *(f"{column}.npy" for column in (*INT_COLUMNS, *STRING_COLUMNS)),
+        ):
+            (self.path / fileName).unlink(missing_ok=True)
+        logger.info(f"Converted columnar raw job cache '{self.path}' into a segment log")
+
+    @contextmanager
+    def _lock(self, mode):
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.path / SEGMENT_LOG_LOCK_FILE, "a+", encoding="utf-8") as lockFile:
+            fcntl.flock(lockFile, fcntl.LOCK_EX)
+            try:
+                self._migrateSingleColumnarLayout()
+                if mode != fcntl.LOCK_EX:
+                    fcntl.flock(lockFile, mode)
+                yield
+            finally:
+                fcntl.flock(lockFile, fcntl.LOCK_UN)
@@ -1,10 +1,12 @@
-import json
 import logging
+import shutil
 from bisect import bisect_left, bisect_right
 from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
+
 try:
     from loguru import logger
 except ModuleNotFoundError:
@@ -15,7 +17,40 @@ except ModuleNotFoundError:
 from config import loadClusterConfigTimelineSnapshots
 from config.parsing import parse_timestamp
 
-from .timeutils import ceil_timestamp, floor_timestamp, format_timestamp
+from . import series_numpy, series_parallel
+from .series_binary import SERIES_ARRAY_SUFFIX, SeriesArrayColumns
+from .series_rollup import SERIES_ROLLUP_RESOLUTIONS, write_series_rollups
+from .capacity import (
+    CompiledCapacityTimeline,
+    compile_capacity_timeline,
+    get_group_series_name,
+    split_group_series_name,
+)
+from .constants import (
+    DEFAULT_SERIES_BUILD_WORKERS,
+    DEFAULT_SERIES_ENGINE,
+    DEFAULT_SERIES_GROUP_BY,
+    METADATA_FILE,
+    SERIES_COMPRESSION_NONE,
+    SERIES_ENGINE_NUMPY,
+    SERIES_ENGINES,
+    SERIES_GROUP_DIMENSIONS,
+    SERIES_GROUP_FEATURE,
+    SERIES_GROUP_NODE_GROUP,
+    SERIES_GROUP_PARTITION,
+    SERIES_GROUPS_DIR,
+    SERIES_SCHEMA_VERSION,
+    SERIES_SCHEMA_VERSION_LABELS,
+)
+from .jsonio import (
+    JSON_COMPRESSION_SUFFIXES,
+    load_json,
+    resolve_json_compression,
+    write_json_array_stream,
+    write_json_atomic,
+)
+from .logical_jobs import LogicalJobStore
+from .timeutils import ceil_timestamp, floor_timestamp
 
 ANALYSIS_DISABLED_FEATURES = {
     "type_f",
@@ -27,6 +62,11 @@ ANALYSIS_FORCED_START_TIMESTAMPS = {
     "type_e": parse_timestamp("2022-01-01T00:00:00"),
 }
 
+HOSTLIST_SHARE_CACHE_DIAGNOSTICS = (
+    "hostlist_share_cache_hits",
+    "hostlist_share_cache_misses",
+)
+
 
 class _ClusterConfigTimeline:
     def __init__(self, snapshots: list[dict]):
@@ -35,6 +75,8 @@ class _ClusterConfigTimeline:
 
         self.snapshots = snapshots
         self.timestamps = [int(snapshot["timestamp"]) for snapshot in snapshots]
+        self._hostlistShareCaches = {}
+        self._compiledCapacities = {}
 
     @classmethod
     def from_cluster_config(cls, clusterConfig):
@@ -88,29 +130,147 @@ class _ClusterConfigTimeline:
 
         return sorted(featureNames)
 
+    def compileCapacitySteps(
+        self,
+        featureNames,
+        featureCommissionTimestamps: dict[str, int] | None = None,
+        forcedFeatureStartTimestamps: dict[str, int] | None = None,
+        groupDimensions=(),
+    ) -> CompiledCapacityTimeline:
+        cacheKey = (
+            tuple(featureNames),
+            tuple(sorted((featureCommissionTimestamps or {}).items())),
+            tuple(sorted((forcedFeatureStartTimestamps or {}).items())),
+            tuple(groupDimensions),
+        )
+        compiledCapacities = self._compiledCapacities.get(cacheKey)
+        if compiledCapacities is None:
+            compiledCapacities = compile_capacity_timeline(
+                self,
+                featureNames=featureNames,
+                featureCommissionTimestamps=featureCommissionTimestamps,
+                forcedFeatureStartTimestamps=forcedFeatureStartTimestamps,
+                groupDimensions=groupDimensions,
+            )
+            self._compiledCapacities[cacheKey] = compiledCapacities
+
+        return compiledCapacities
+
+    def getHostlistShareCache(self, allowedFeatures: set[str] | None = None):
+        cacheKey = frozenset(allowedFeatures) if allowedFeatures is not None else None
+        shareCache = self._hostlistShareCaches.get(cacheKey)
+        if shareCache is None:
+            shareCache = _HostlistShareCache(allowedFeatures)
+            self._hostlistShareCaches[cacheKey] = shareCache
+
+        return shareCache
+
+
+class _HostlistShareCache:
+    """
+    Memoized nodelist -> per-feature CPU/GPU share resolution.
+
+    Shares only depend on which nodes of a nodelist are active, so they are keyed
+    by config snapshot, nodelist and the node-count epoch of that snapshot at the
+    segment start. Jobs sharing a nodelist, array jobs above all, resolve with a
+    single lookup instead of expanding every node group of the cluster.
+    Partition and node group shares are memoized the same way, with the job
+    partition added to the key.
+    """
+
+    def __init__(self, allowedFeatures: set[str] | None = None):
+        self.allowedFeatures = allowedFeatures
+        self.hits = 0
+        self.misses = 0
+        self._shares = {}
+        self._groupShares = {}
+
+    def resolve(self, job, clusterConfig, timestamp: int | None = None):
+        if not job.hasAssignedNodes():
+            return ()
+
+        cacheKey = (
+            id(clusterConfig),
+            job.nodelist,
+            clusterConfig.getNodeCountEpochAt(timestamp) if timestamp is not None else None,
+        )
+        shares = self._shares.get(cacheKey)
+        if shares is not None:
+            self.hits += 1
+            return shares
+
+        self.misses += 1
+        shares = tuple(
+            (feature, featureShares["cpu"], featureShares["gpu"])
+            for feature, featureShares in _resolve_job_feature_resource_shares(
+                job=job,
+                clusterConfig=clusterConfig,
+                timestamp=timestamp,
+                allowedFeatures=self.allowedFeatures,
+            ).items()
+        )
+        self._shares[cacheKey] = shares
+        return shares
+
+    def resolveGroups(self, job, clusterConfig, timestamp: int, groupDimensions):
+        """
+        ``(seriesName, cpuShare, gpuShare)`` of the job for every partition and
+        node group series it contributes to.
+        """
+        cacheKey = (
+            id(clusterConfig),
+            job.nodelist,
+            job.partition,
+            clusterConfig.getNodeCountEpochAt(timestamp),
+            groupDimensions,
+        )
+        shares = self._groupShares.get(cacheKey)
+        if shares is not None:
+            self.hits += 1
+            return shares
+
+        self.misses += 1
+        shares = []
+        for dimension in groupDimensions:
+            if dimension == SERIES_GROUP_PARTITION:
+                groupShares = _resolve_job_partition_shares(job, clusterConfig)
+            else:
+                groupShares = _resolve_job_node_group_shares(job, clusterConfig, timestamp)
+            shares.extend(
+                (get_group_series_name(dimension, group), share["cpu"], share["gpu"])
+                for group, share in groupShares.items()
+            )
+
+        shares = tuple(shares)
+        self._groupShares[cacheKey] = shares
+        return shares
+
 
 def build_historical_utilization_series(
     jobs,
     clusterConfig=None,
     intervalMinutes: int = 15,
     nowTimestamp: int | None = None,
+    engine: str = DEFAULT_SERIES_ENGINE,
+    workers: int = DEFAULT_SERIES_BUILD_WORKERS,
+    groupBy=DEFAULT_SERIES_GROUP_BY,
 ) -> dict[str, list[dict]]:
+    """
+    Utilization series for every breakdown in ``groupBy`` plus ``overall``.
+
+    ``groupBy`` lists dimensions from ``SERIES_GROUP_DIMENSIONS``: feature series
+    are keyed by the feature name, partition and node group series by
+    ``"<dimension>:<group>"``. Deltas of all dimensions are collected in one pass
+    over the jobs and every series is swept from the same event arrays.
+    """
+    _validate_series_engine(engine)
+    groupDimensions = _resolve_group_dimensions(groupBy)
     normalizedJobs = _normalize_historical_jobs(jobs)
     activeJobs = [job for job in normalizedJobs if job.hasStarted()]
     resolvedJobs = [job for job in activeJobs if job.hasAssignedNodes()]
     skippedJobsCount = len(activeJobs) - len(resolvedJobs)
 
-    if nowTimestamp is None:
-        if not activeJobs:
-            nowTimestamp = int(datetime.now().timestamp())
-        else:
-            unfinishedJobs = [job for job in activeJobs if job.timeEnd <= 0]
-            if unfinishedJobs:
-                nowTimestamp = int(datetime.now().timestamp())
-            else:
-                nowTimestamp = max(
-                    max(job.timeStart, job.timeEnd, job.modTime) for job in activeJobs
-                )
+    nowTimestamp = _resolve_now_timestamp(activeJobs, nowTimestamp)
 
     clusterConfigTimeline = (
         _ClusterConfigTimeline.from_cluster_config(clusterConfig)
@@ -118,6 +278,21 @@ def build_historical_utilization_series(
         else _ClusterConfigTimeline.load_default(currentTimestamp=nowTimestamp)
     )
     featureNames = _get_analysis_feature_names(clusterConfigTimeline)
+    intervalSeconds = intervalMinutes * 60
+    featureCommissionTimestamps = {
+        feature: ANALYSIS_FORCED_START_TIMESTAMPS[feature]
+        for feature in featureNames
+        if feature in ANALYSIS_FORCED_START_TIMESTAMPS
+    }
+    seriesNames = [
+        *(featureNames if SERIES_GROUP_FEATURE in groupBy else []),
+        *clusterConfigTimeline.compileCapacitySteps(
+            featureNames,
+            featureCommissionTimestamps=featureCommissionTimestamps,
+            forcedFeatureStartTimestamps=ANALYSIS_FORCED_START_TIMESTAMPS,
+            groupDimensions=groupDimensions,
+        ).groups,
+    ]
 
     if skippedJobsCount > 0:
         logger.warning(
@@ -125,53 +300,52 @@ def build_historical_utilization_series(
         )
 
     if not activeJobs:
-        return {**{feature: [] for feature in featureNames}, "overall": []}
+        return {**{seriesName: [] for seriesName in seriesNames}, "overall": []}
 
-    intervalSeconds = intervalMinutes * 60
-    featureLoads, jobDiagnostics = _build_feature_events(
-        jobs=resolvedJobs,
-        clusterConfigTimeline=clusterConfigTimeline,
-        nowTimestamp=nowTimestamp,
-        allowedFeatures=set(featureNames),
-        forcedFeatureStartTimestamps=ANALYSIS_FORCED_START_TIMESTAMPS,
-    )
-    overallEvents = _build_overall_events(featureLoads)
-    featureCommissionTimestamps = {
-        feature: ANALYSIS_FORCED_START_TIMESTAMPS[feature]
-        for feature in featureNames
-        if feature in ANALYSIS_FORCED_START_TIMESTAMPS
-    }
+    with series_parallel.open_series_pool(workers) as pool:
+        featureLoads, jobDiagnostics = _build_feature_events(
+            jobs=resolvedJobs,
+            clusterConfigTimeline=clusterConfigTimeline,
+            nowTimestamp=nowTimestamp,
+            allowedFeatures=set(featureNames),
+            forcedFeatureStartTimestamps=ANALYSIS_FORCED_START_TIMESTAMPS,
+            pool=pool,
+            workers=workers,
+            groupDimensions=groupDimensions,
+        )
+        overallEvents = _build_overall_events(
+            {feature: featureLoads.get(feature, {}) for feature in featureNames}
+        )
+        if not overallEvents:
+            return {**{seriesName: [] for seriesName in seriesNames}, "overall": []}
 
-    if overallEvents:
         rangeStart = floor_timestamp(min(overallEvents.keys()), intervalSeconds)
         rangeEnd = _resolve_series_range_end(
             maxEventTimestamp=max(overallEvents.keys()),
             intervalSeconds=intervalSeconds,
         )
-    else:
-        return {**{feature: [] for feature in featureNames}, "overall": []}
-
-    series = {}
-    for feature in featureNames:
-        series[feature] = _build_feature_series(
-            feature=feature,
-            featureEvents=featureLoads.get(feature, {}),
+        series = _build_series(
+            engine=engine,
+            pool=pool,
+            featureNames=featureNames,
+            featureLoads=featureLoads,
+            overallEvents=overallEvents,
             clusterConfigTimeline=clusterConfigTimeline,
             rangeStart=rangeStart,
             rangeEnd=rangeEnd,
             intervalSeconds=intervalSeconds,
-            commissionTimestamp=featureCommissionTimestamps.get(feature),
+            featureCommissionTimestamps=featureCommissionTimestamps,
+            forcedFeatureStartTimestamps=ANALYSIS_FORCED_START_TIMESTAMPS,
+            groupDimensions=groupDimensions,
         )
 
-    series["overall"] = _build_overall_series(
-        overallEvents=overallEvents,
-        clusterConfigTimeline=clusterConfigTimeline,
-        rangeStart=rangeStart,
-        rangeEnd=rangeEnd,
-        intervalSeconds=intervalSeconds,
-        allowedFeatures=set(featureNames),
-        forcedFeatureStartTimestamps=ANALYSIS_FORCED_START_TIMESTAMPS,
-    )
+    if SERIES_GROUP_FEATURE not in groupBy:
+        # Признаки всё равно собираются: из них складывается overall.
+        series = {
+            seriesName: points
+            for seriesName, points in series.items()
+            if seriesName not in featureNames
+        }
 
     _log_job_diagnostics(jobDiagnostics)
     overflowCounts = _count_overflow_points(series)
@@ -191,6 +365,10 @@ def export_historical_utilization_series(
     clusterConfig=None,
     intervalMinutes: int = 15,
     nowTimestamp: int | None = None,
+    engine: str = DEFAULT_SERIES_ENGINE,
+    workers: int = DEFAULT_SERIES_BUILD_WORKERS,
+    compression: str | None = None,
+    groupBy=DEFAULT_SERIES_GROUP_BY,
 ) -> Path:
     outputPath = Path(outputDir)
     outputPath.mkdir(parents=True, exist_ok=True)
@@ -200,47 +378,675 @@ def export_historical_utilization_series(
         clusterConfig=clusterConfig,
         intervalMinutes=intervalMinutes,
         nowTimestamp=nowTimestamp,
+        engine=engine,
+        workers=workers,
+        groupBy=groupBy,
     )
+    return write_historical_utilization_series(
+        outputPath, series, intervalMinutes, compression=compression
+    )
+
+
+def write_historical_utilization_series(
+    outputDir: str | Path,
+    series: dict,
+    intervalMinutes: int = 15,
+    compression: str | None = None,
+    rollupFromTimestamp: int | None = None,
+) -> Path:
+    """
+    Stream every series into ``<feature>.json``, its ``.npy`` copy and rollups.
+
+    Partition and node group series go to ``groups/<dimension>/<group>.json``
+    with their own rollups, so readers of feature files never see them; group
+    series missing from ``series`` are removed. Series values may be lists or
+    any iterables of points. Files are compact and replaced atomically.
+    ``compression=None`` keeps the compression of the series already exported
+    to ``outputDir`` (plain JSON for a new directory).
+    With ``rollupFromTimestamp`` only rollup buckets from that time on are
+    recomputed; earlier points must be unchanged.
+    """
+    outputPath = Path(outputDir)
+    outputPath.mkdir(parents=True, exist_ok=True)
+    compression = compression or resolve_series_compression(outputPath)
 
+    _remove_stale_group_series(outputPath, series.keys())
     exportedFiles = []
-    for feature, featureSeries in series.items():
-        featurePath = outputPath / f"{feature}.json"
-        with open(featurePath, "w", encoding="utf-8") as file:
-            json.dump(featureSeries, file, indent=2, ensure_ascii=False)
-        exportedFiles.append(featurePath.name)
-
-    metadataPath = outputPath / "metadata.json"
-    with open(metadataPath, "w", encoding="utf-8") as file:
-        json.dump(
-            {
-                "generated_at": datetime.now().isoformat(),
-                "interval_minutes": intervalMinutes,
-                "features": sorted(series.keys()),
-                "files": sorted(exportedFiles),
-            },
-            file,
-            indent=2,
-            ensure_ascii=False,
+    arrayFiles = []
+    schemaVersion = SERIES_SCHEMA_VERSION
+    for seriesName, seriesPoints in series.items():
+        basePath = _get_series_base_path(outputPath, seriesName)
+        basePath.parent.mkdir(parents=True, exist_ok=True)
+        columns = SeriesArrayColumns()
+        seriesPath, _ = write_json_array_stream(
+            basePath.with_name(f"{basePath.name}.json"),
+            columns.track(seriesPoints),
+            compression,
+        )
+        exportedFiles.append(seriesPath.relative_to(outputPath).as_posix())
+        # Бинарная копия пишется после JSON, поэтому она не старее его.
+        arrayPath = columns.write(basePath.with_name(f"{basePath.name}{SERIES_ARRAY_SUFFIX}"))
+        arrayFiles.append(arrayPath.relative_to(outputPath).as_posix())
+        if columns.hasTimeLabels():
+            schemaVersion = SERIES_SCHEMA_VERSION_LABELS
+        write_series_rollups(
+            basePath.parent,
+            basePath.name,
+            columns.getTimestamps(),
+            columns.cpuValues,
+            columns.gpuValues,
+            fromTimestamp=rollupFromTimestamp,
         )
 
+    write_json_atomic(
+        outputPath / METADATA_FILE,
+        {
+            "generated_at": datetime.now().isoformat(),
+            "schema_version": schemaVersion,
+            "interval_minutes": intervalMinutes,
+            "features": sorted(
+                seriesName for seriesName in series if split_group_series_name(seriesName) is None
+            ),
+            "groups": sorted(
+                seriesName for seriesName in series if split_group_series_name(seriesName) is not None
+            ),
+            "files": sorted(exportedFiles),
+            "array_files": sorted(arrayFiles),
+            "compression": compression,
+            "rollup_resolutions": list(SERIES_ROLLUP_RESOLUTIONS),
+        },
+    )
+
     logger.success(
         f"Exported {len(exportedFiles)} utilization series files to '{outputPath}'"
     )
     return outputPath
 
 
+def _get_series_base_path(seriesDir: Path, seriesName: str) -> Path:
+    groupName = split_group_series_name(seriesName)
+    if groupName is None:
+        return seriesDir / seriesName
+
+    dimension, group = groupName
+    return seriesDir / SERIES_GROUPS_DIR / dimension / group
+
+
+def _remove_stale_group_series(seriesDir: Path, seriesNames) -> None:
+    groupsPath = seriesDir / SERIES_GROUPS_DIR
+    if not groupsPath.is_dir():
+        return
+
+    keptGroups = defaultdict(set)
+    for seriesName in seriesNames:
+        groupName = split_group_series_name(seriesName)
+        if groupName is not None:
+            keptGroups[groupName[0]].add(groupName[1])
+
+    for dimensionPath in groupsPath.iterdir():
+        if dimensionPath.name not in keptGroups:
+            # Срез больше не выгружается: удаляем его вместе с роллапами.
+            shutil.rmtree(dimensionPath, ignore_errors=True)
+            continue
+
+        keptNames = keptGroups[dimensionPath.name]
+        for filePath in list(dimensionPath.rglob("*")):
+            if filePath.is_file() and _strip_series_suffix(filePath.name) not in keptNames:
+                filePath.unlink()
+
+
+def _strip_series_suffix(fileName: str) -> str:
+    jsonSuffixes = [f".json{suffix}" for suffix in JSON_COMPRESSION_SUFFIXES.values()]
+    for suffix in (SERIES_ARRAY_SUFFIX, *jsonSuffixes):
+        if fileName.endswith(suffix):
+            return fileName[: -len(suffix)]
+
+    return fileName
+
+
+def resolve_series_compression(seriesDir: str | Path) -> str:
+    return (
+        resolve_json_compression(Path(seriesDir) / "overall.json")
+        or SERIES_COMPRESSION_NONE
+    )
+
+
+def load_series_schema_version(seriesDir: str | Path) -> int | None:
+    """
+    Schema version recorded in ``metadata.json``; exports written before the
+    version was recorded are v1. ``None`` when there is no metadata.
+    """
+    try:
+        metadata = load_json(Path(seriesDir) / METADATA_FILE)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    return int(metadata.get("schema_version", SERIES_SCHEMA_VERSION_LABELS))
+
+
+def load_historical_utilization_series(
+    seriesDir: str | Path, seriesNames
+) -> dict[str, list[dict]] | None:
+    seriesPath = Path(seriesDir)
+    series = {}
+    for seriesName in seriesNames:
+        basePath = _get_series_base_path(seriesPath, seriesName)
+        try:
+            payload = load_json(basePath.with_name(f"{basePath.name}.json"))
+        except FileNotFoundError:
+            return None
+        if not isinstance(payload, list):
+            return None
+
+        series[seriesName] = payload
+
+    return series
+
+
+def compile_cluster_capacity_timeline(
+    clusterConfig=None,
+    currentTimestamp: int | None = None,
+) -> CompiledCapacityTimeline:
+    """
+    Capacity step functions for the analysed features and ``overall``, with the
+    same commission and forced start rules as the exported series.
+    """
+    clusterConfigTimeline = (
+        _ClusterConfigTimeline.from_cluster_config(clusterConfig)
+        if clusterConfig is not None
+        else _ClusterConfigTimeline.load_default(currentTimestamp=currentTimestamp)
+    )
+    featureNames = _get_analysis_feature_names(clusterConfigTimeline)
+    return clusterConfigTimeline.compileCapacitySteps(
+        featureNames,
+        featureCommissionTimestamps={
+            feature: ANALYSIS_FORCED_START_TIMESTAMPS[feature]
+            for feature in featureNames
+            if feature in ANALYSIS_FORCED_START_TIMESTAMPS
+        },
+        forcedFeatureStartTimestamps=ANALYSIS_FORCED_START_TIMESTAMPS,
+    )
+
+
+def build_historical_utilization_tail(
+    jobs,
+    checkpoint: dict | None = None,
+    clusterConfig=None,
+    intervalMinutes: int = 15,
+    nowTimestamp: int | None = None,
+    engine: str = DEFAULT_SERIES_ENGINE,
+    workers: int = DEFAULT_SERIES_BUILD_WORKERS,
+    groupBy=DEFAULT_SERIES_GROUP_BY,
+) -> tuple[dict[str, list[dict]] | None, dict | None]:
+    """
+    Build utilization buckets starting at a sealed checkpoint boundary.
+
+    A checkpoint is taken at a bucket boundary before which every started job has
+    already finished. It stores the running CPU/GPU load of those sealed jobs per
+    feature at the boundary, plus their end deltas that fall after it. ``jobs``
+    must therefore contain every job starting at or after the boundary; older
+    jobs are represented by the checkpoint alone.
+
+    Without a checkpoint the whole history is built, exactly like
+    ``build_historical_utilization_series`` with the same ``groupBy``. Returns the
+    series from the boundary bucket on together with the checkpoint for the next
+    refresh, or ``(None, None)`` when the checkpoint no longer matches the inputs
+    or was taken for other breakdowns and a full rebuild is required.
+    """
+    _validate_series_engine(engine)
+    groupDimensions = _resolve_group_dimensions(groupBy)
+    normalizedGroupBy = [
+        dimension for dimension in SERIES_GROUP_DIMENSIONS if dimension in groupBy
+    ]
+    intervalSeconds = intervalMinutes * 60
+    normalizedJobs = _normalize_historical_jobs(jobs)
+    activeJobs = [job for job in normalizedJobs if job.hasStarted()]
+    resolvedJobs = [job for job in activeJobs if job.hasAssignedNodes()]
+    skippedJobsCount = len(activeJobs) - len(resolvedJobs)
+    if skippedJobsCount > 0:
+        logger.warning(
+            f"Skipped {skippedJobsCount} started jobs without assigned nodelist during utilization aggregation"
+        )
+
+    boundary = None
+    if checkpoint is not None:
+        boundary = int(checkpoint["boundary"])
+        if int(checkpoint.get("interval_minutes", 0)) != intervalMinutes:
+            return None, None
+        if checkpoint.get("group_by", list(DEFAULT_SERIES_GROUP_BY)) != normalizedGroupBy:
+            return None, None
+        if any(job.timeStart < boundary for job in activeJobs):
+            return None, None
+
+    nowTimestamp = _resolve_now_timestamp(
+        activeJobs,
+        nowTimestamp,
+        sealedLatestTimestamp=(
+            checkpoint.get("latest_job_timestamp") if checkpoint is not None else None
+        ),
+    )
+    clusterConfigTimeline = (
+        _ClusterConfigTimeline.from_cluster_config(clusterConfig)
+        if clusterConfig is not None
+        else _ClusterConfigTimeline.load_default(currentTimestamp=nowTimestamp)
+    )
+    featureNames = _get_analysis_feature_names(clusterConfigTimeline)
+    if checkpoint is not None and (
+        checkpoint.get("features") != featureNames
+        or checkpoint.get("timeline")
+        != _build_timeline_fingerprint(
+            clusterConfigTimeline, checkpoint.get("sealed_max_event")
+        )
+    ):
+        return None, None
+
+    featureCommissionTimestamps = {
+        feature: ANALYSIS_FORCED_START_TIMESTAMPS[feature]
+        for feature in featureNames
+        if feature in ANALYSIS_FORCED_START_TIMESTAMPS
+    }
+    seriesNames = [
+        *(featureNames if SERIES_GROUP_FEATURE in groupBy else []),
+        *clusterConfigTimeline.compileCapacitySteps(
+            featureNames,
+            featureCommissionTimestamps=featureCommissionTimestamps,
+            forcedFeatureStartTimestamps=ANALYSIS_FORCED_START_TIMESTAMPS,
+            groupDimensions=groupDimensions,
+        ).groups,
+    ]
+    emptySeries = {**{seriesName: [] for seriesName in seriesNames}, "overall": []}
+    if checkpoint is None and not activeJobs:
+        return emptySeries, None
+
+    sealCandidate = boundary
+    if activeJobs:
+        unfinishedStarts = [job.timeStart for job in activeJobs if job.timeEnd <= 0]
+        sealCandidate = floor_timestamp(
+            min(unfinishedStarts or [max(job.timeStart for job in activeJobs)]),
+            intervalSeconds,
+        )
+
+    with series_parallel.open_series_pool(workers) as pool:
+        featureLoads, sealedLoads, jobDiagnostics = _collect_feature_events(
+            jobs=resolvedJobs,
+            clusterConfigTimeline=clusterConfigTimeline,
+            nowTimestamp=nowTimestamp,
+            allowedFeatures=set(featureNames),
+            forcedFeatureStartTimestamps=ANALYSIS_FORCED_START_TIMESTAMPS,
+            sealedBeforeTimestamp=sealCandidate,
+            pool=pool,
+            workers=workers,
+            groupDimensions=groupDimensions,
+        )
+        # Границы ряда, как и overall, задаются только дельтами признаков.
+        maxEventTimestamps = [
+            max(featureLoads[feature]) for feature in featureNames if featureLoads.get(feature)
+        ]
+        if checkpoint is not None and checkpoint.get("sealed_max_event") is not None:
+            maxEventTimestamps.append(int(checkpoint["sealed_max_event"]))
+        if not maxEventTimestamps:
+            return (emptySeries, None) if checkpoint is None else (None, None)
+
+        if checkpoint is not None:
+            _apply_checkpoint_events(featureLoads, checkpoint)
+            rangeStart = boundary
+        else:
+            rangeStart = floor_timestamp(
+                min(
+                    min(featureLoads[feature])
+                    for feature in featureNames
+                    if featureLoads.get(feature)
+                ),
+                intervalSeconds,
+            )
+        rangeEnd = _resolve_series_range_end(
+            maxEventTimestamp=max(maxEventTimestamps),
+            intervalSeconds=intervalSeconds,
+        )
+        if rangeEnd < rangeStart:
+            return None, None
+
+        nextBoundary = min(sealCandidate, rangeEnd)
+        if nextBoundary < sealCandidate:
+            _, sealedLoads, _ = _collect_feature_events(
+                jobs=[job for job in resolvedJobs if job.timeStart < nextBoundary],
+                clusterConfigTimeline=clusterConfigTimeline,
+                nowTimestamp=nowTimestamp,
+                allowedFeatures=set(featureNames),
+                forcedFeatureStartTimestamps=ANALYSIS_FORCED_START_TIMESTAMPS,
+                sealedBeforeTimestamp=nextBoundary,
+                pool=pool,
+                workers=workers,
+                groupDimensions=groupDimensions,
+            )
+
+        previousPrefixLengths = (
+            checkpoint.get("prefix_lengths", {}) if checkpoint is not None else {}
+        )
+        series = _build_series(
+            engine=engine,
+            pool=pool,
+            featureNames=featureNames,
+            featureLoads=featureLoads,
+            overallEvents=_build_overall_events(
+                {feature: featureLoads.get(feature, {}) for feature in featureNames}
+            ),
+            clusterConfigTimeline=clusterConfigTimeline,
+            rangeStart=rangeStart,
+            rangeEnd=rangeEnd,
+            intervalSeconds=intervalSeconds,
+            featureCommissionTimestamps=featureCommissionTimestamps,
+            forcedFeatureStartTimestamps=ANALYSIS_FORCED_START_TIMESTAMPS,
+            leadingTrimSeries={
+                seriesName
+                for seriesName in [*featureNames, *seriesNames]
+                if int(previousPrefixLengths.get(seriesName, 0)) == 0
+            },
+            groupDimensions=groupDimensions,
+        )
+
+    if SERIES_GROUP_FEATURE not in groupBy:
+        series = {
+            seriesName: points
+            for seriesName, points in series.items()
+            if seriesName not in featureNames
+        }
+
+    _log_job_diagnostics(jobDiagnostics)
+
+    nextCheckpoint = _build_series_checkpoint(
+        previousCheckpoint=checkpoint,
+        sealedLoads=sealedLoads,
+        sealedJobs=[job for job in activeJobs if job.timeStart < nextBoundary],
+        series=series,
+        featureNames=featureNames,
+        clusterConfigTimeline=clusterConfigTimeline,
+        boundary=nextBoundary,
+        rangeEnd=rangeEnd,
+        intervalMinutes=intervalMinutes,
+        groupBy=normalizedGroupBy,
+    )
+    return series, nextCheckpoint
+
+
+def merge_historical_utilization_tail(
+    existingSeries: dict[str, list[dict]],
+    tailSeries: dict[str, list[dict]],
+    checkpoint: dict,
+) -> dict[str, list[dict]] | None:
+    boundary = int(checkpoint["boundary"])
+    prefixLengths = checkpoint.get("prefix_lengths", {})
+    mergedSeries = {}
+    for seriesName, tailPoints in tailSeries.items():
+        existingPoints = existingSeries.get(seriesName)
+        prefixLength = int(prefixLengths.get(seriesName, 0))
+        if existingPoints is None or len(existingPoints) < prefixLength:
+            return None
+
+        if (
+            0 < prefixLength < len(existingPoints)
+            and existingPoints[prefixLength].get("time") != boundary
+        ):
+            return None
+
+        mergedSeries[seriesName] = existingPoints[:prefixLength] + tailPoints
+
+    return mergedSeries
+
+
+def _build_series(engine: str, pool=None, **builderKwargs):
+    if pool is not None:
+        return _build_series_parallel(engine=engine, pool=pool, **builderKwargs)
+
+    builder = _build_series_numpy if engine == SERIES_ENGINE_NUMPY else _build_series_python
+    return builder(**builderKwargs)
+
+
+def _build_series_parallel(
+    engine,
+    pool,
+    featureNames,
+    featureLoads,
+    overallEvents,
+    clusterConfigTimeline,
+    rangeStart,
+    rangeEnd,
+    intervalSeconds,
+    featureCommissionTimestamps,
+    forcedFeatureStartTimestamps,
+    leadingTrimSeries=None,
+    groupDimensions=(),
+):
+    """
+    Build every feature, group and overall series in a separate worker.
+
+    Event deltas are passed through one shared memory block; each task only
+    carries its slice handle and the compiled capacity step function. Both
+    engines produce the same points as their serial variants.
+    """
+    compiledCapacities = clusterConfigTimeline.compileCapacitySteps(
+        featureNames,
+        featureCommissionTimestamps=featureCommissionTimestamps,
+        forcedFeatureStartTimestamps=forcedFeatureStartTimestamps,
+        groupDimensions=groupDimensions,
+    )
+    eventsBySeries = {feature: featureLoads.get(feature, {}) for feature in featureNames}
+    eventsBySeries.update(
+        {seriesName: featureLoads.get(seriesName, {}) for seriesName in compiledCapacities.groups}
+    )
+    eventsBySeries["overall"] = overallEvents
+
+    with series_parallel.SharedEventArrays(eventsBySeries) as sharedEvents:
+        futures = {
+            feature: pool.submit(
+                _build_series_task,
+                engine,
+                sharedEvents.getHandle(feature),
+                compiledCapacities.features[feature],
+                rangeStart,
+                rangeEnd,
+                intervalSeconds,
+                True,
+                leadingTrimSeries is None or feature in leadingTrimSeries,
+            )
+            for feature in featureNames
+        }
+        for seriesName, capacitySteps in compiledCapacities.groups.items():
+            futures[seriesName] = pool.submit(
+                _build_series_task,
+                engine,
+                sharedEvents.getHandle(seriesName),
+                capacitySteps,
+                rangeStart,
+                rangeEnd,
+                intervalSeconds,
+                True,
+                leadingTrimSeries is None or seriesName in leadingTrimSeries,
+            )
+        futures["overall"] = pool.submit(
+            _build_series_task,
+            engine,
+            sharedEvents.getHandle("overall"),
+            compiledCapacities.overall,
+            rangeStart,
+            rangeEnd,
+            intervalSeconds,
+            False,
+            False,
+        )
+        return {seriesName: future.result() for seriesName, future in futures.items()}
+
+
+def _build_series_task(
+    engine,
+    eventHandle,
+    capacitySteps,
+    rangeStart,
+    rangeEnd,
+    intervalSeconds,
+    cleanupOverflow,
+    trimLeadingOverflow,
+):
+    eventArrays = series_parallel.read_shared_event_arrays(eventHandle)
+    if engine == SERIES_ENGINE_NUMPY:
+        bucketTimestamps = series_numpy.build_bucket_timestamps(
+            rangeStart, rangeEnd, intervalSeconds
+        )
+        timestamps = bucketTimestamps.tolist()
+        cpuValues, gpuValues = _calculate_step_utilization(
+            eventArrays, bucketTimestamps, capacitySteps
+        )
+        if cleanupOverflow:
+            return _cleanup_overflow_values(
+                timestamps, cpuValues, gpuValues, trimLeading=trimLeadingOverflow
+            )
+
+        return [
+            {"time": timestamp, "cpu": cpu, "gpu": gpu}
+            for timestamp, cpu, gpu in zip(timestamps, cpuValues, gpuValues)
+        ]
+
+    eventTimestamps, cpuDeltas, gpuDeltas = eventArrays
+    events = {
+        timestamp: {"cpu": cpuDelta, "gpu": gpuDelta}
+        for timestamp, cpuDelta, gpuDelta in zip(
+            eventTimestamps.tolist(), cpuDeltas.tolist(), gpuDeltas.tolist()
+        )
+    }
+    if cleanupOverflow:
+        return _build_feature_series(
+            featureEvents=events,
+            capacitySteps=capacitySteps,
+            rangeStart=rangeStart,
+            rangeEnd=rangeEnd,
+            intervalSeconds=intervalSeconds,
+            trimLeadingOverflow=trimLeadingOverflow,
+        )
+
+    return _build_overall_series(
+        overallEvents=events,
+        capacitySteps=capacitySteps,
+        rangeStart=rangeStart,
+        rangeEnd=rangeEnd,
+        intervalSeconds=intervalSeconds,
+    )
+
+
+def _build_series_python(
+    featureNames,
+    featureLoads,
+    overallEvents,
+    clusterConfigTimeline,
+    rangeStart,
+    rangeEnd,
+    intervalSeconds,
+    featureCommissionTimestamps,
+    forcedFeatureStartTimestamps,
+    leadingTrimSeries=None,
+    groupDimensions=(),
+):
+    compiledCapacities = clusterConfigTimeline.compileCapacitySteps(
+        featureNames,
+        featureCommissionTimestamps=featureCommissionTimestamps,
+        forcedFeatureStartTimestamps=forcedFeatureStartTimestamps,
+        groupDimensions=groupDimensions,
+    )
+    series = {}
+    for feature in featureNames:
+        series[feature] = _build_feature_series(
+            featureEvents=featureLoads.get(feature, {}),
+            capacitySteps=compiledCapacities.features[feature],
+            rangeStart=rangeStart,
+            rangeEnd=rangeEnd,
+            intervalSeconds=intervalSeconds,
+            trimLeadingOverflow=leadingTrimSeries is None
+            or feature in leadingTrimSeries,
+        )
+
+    for seriesName, capacitySteps in compiledCapacities.groups.items():
+        series[seriesName] = _build_feature_series(
+            featureEvents=featureLoads.get(seriesName, {}),
+            capacitySteps=capacitySteps,
+            rangeStart=rangeStart,
+            rangeEnd=rangeEnd,
+            intervalSeconds=intervalSeconds,
+            trimLeadingOverflow=leadingTrimSeries is None
+            or seriesName in leadingTrimSeries,
+        )
+
+    series["overall"] = _build_overall_series(
+        overallEvents=overallEvents,
+        capacitySteps=compiledCapacities.overall,
+        rangeStart=rangeStart,
+        rangeEnd=rangeEnd,
+        intervalSeconds=intervalSeconds,
+    )
+
+    return series
+
+
 def _build_feature_events(
     jobs,
     clusterConfigTimeline,
     nowTimestamp: int,
     allowedFeatures: set[str] | None = None,
     forcedFeatureStartTimestamps: dict[str, int] | None = None,
+    pool=None,
+    workers: int = DEFAULT_SERIES_BUILD_WORKERS,
+    groupDimensions=(),
+):
+    featureEvents, _, diagnostics = _collect_feature_events(
+        jobs=jobs,
+        clusterConfigTimeline=clusterConfigTimeline,
+        nowTimestamp=nowTimestamp,
+        allowedFeatures=allowedFeatures,
+        forcedFeatureStartTimestamps=forcedFeatureStartTimestamps,
+        pool=pool,
+        workers=workers,
+        groupDimensions=groupDimensions,
+    )
+    return featureEvents, diagnostics
+
+
+def _collect_feature_events(
+    jobs,
+    clusterConfigTimeline,
+    nowTimestamp: int,
+    allowedFeatures: set[str] | None = None,
+    forcedFeatureStartTimestamps: dict[str, int] | None = None,
+    sealedBeforeTimestamp: int | None = None,
+    pool=None,
+    workers: int = DEFAULT_SERIES_BUILD_WORKERS,
+    groupDimensions=(),
 ):
+    """
+    Start/end deltas of every job segment keyed by series name: the feature
+    name, or ``"<dimension>:<group>"`` for each of ``groupDimensions``. Features
+    and groups are resolved in the same pass over the jobs.
+    """
+    groupDimensions = tuple(groupDimensions)
+    if pool is not None:
+        jobChunks = series_parallel.split_job_chunks(list(jobs), workers)
+        if len(jobChunks) > 1:
+            return _collect_feature_events_parallel(
+                jobChunks=jobChunks,
+                clusterConfigTimeline=clusterConfigTimeline,
+                nowTimestamp=nowTimestamp,
+                allowedFeatures=allowedFeatures,
+                forcedFeatureStartTimestamps=forcedFeatureStartTimestamps,
+                sealedBeforeTimestamp=sealedBeforeTimestamp,
+                pool=pool,
+                groupDimensions=groupDimensions,
+            )
+
     featureEvents = defaultdict(lambda: defaultdict(lambda: {"cpu": 0.0, "gpu": 0.0}))
+    sealedEvents = defaultdict(lambda: defaultdict(lambda: {"cpu": 0.0, "gpu": 0.0}))
     diagnostics = {
         "jobs_with_unknown_nodes": 0,
     }
     forcedFeatureStartTimestamps = forcedFeatureStartTimestamps or {}
+    shareCache = clusterConfigTimeline.getHostlistShareCache(allowedFeatures)
+    initialHits, initialMisses = shareCache.hits, shareCache.misses
 
     for job in jobs:
         endTimestamp = job.getEffectiveEnd(nowTimestamp)
@@ -248,53 +1054,135 @@ def _build_feature_events(
             continue
 
         resolvedAnySegment = False
+        isSealed = sealedBeforeTimestamp is not None and job.timeStart < sealedBeforeTimestamp
         for (
             segmentStart,
             segmentEnd,
             segmentConfig,
         ) in clusterConfigTimeline.iterSegments(job.timeStart, endTimestamp):
-            featureShares = _resolve_job_feature_resource_shares(
-                job=job,
-                clusterConfig=segmentConfig,
-                timestamp=segmentStart,
-                allowedFeatures=allowedFeatures,
-            )
+            featureShares = shareCache.resolve(job, segmentConfig, segmentStart)
             if not featureShares:
                 continue
 
             resolvedAnySegment = True
             allocatedCpus = job.getAllocatedCpus()
             allocatedGpus = job.getAllocatedGpus()
-            for feature, shares in featureShares.items():
-                effectiveStart = max(
-                    segmentStart,
-                    forcedFeatureStartTimestamps.get(feature, segmentStart),
+            seriesShares = [
+                (
+                    feature,
+                    max(segmentStart, forcedFeatureStartTimestamps.get(feature, segmentStart)),
+                    cpuShare,
+                    gpuShare,
                 )
+                for feature, cpuShare, gpuShare in featureShares
+            ]
+            if groupDimensions:
+                seriesShares.extend(
+                    (seriesName, segmentStart, cpuShare, gpuShare)
+                    for seriesName, cpuShare, gpuShare in shareCache.resolveGroups(
+                        job, segmentConfig, segmentStart, groupDimensions
+                    )
+                )
+
+            for seriesName, effectiveStart, cpuShare, gpuShare in seriesShares:
                 if segmentEnd <= effectiveStart:
                     continue
 
-                cpuDelta = float(allocatedCpus) * shares["cpu"]
-                gpuDelta = float(allocatedGpus) * shares["gpu"]
+                cpuDelta = float(allocatedCpus) * cpuShare
+                gpuDelta = float(allocatedGpus) * gpuShare
 
-                featureEvents[feature][effectiveStart]["cpu"] += cpuDelta
-                featureEvents[feature][effectiveStart]["gpu"] += gpuDelta
-                featureEvents[feature][segmentEnd]["cpu"] -= cpuDelta
-                featureEvents[feature][segmentEnd]["gpu"] -= gpuDelta
+                _add_segment_deltas(
+                    featureEvents[seriesName], effectiveStart, segmentEnd, cpuDelta, gpuDelta
+                )
+                if isSealed:
+                    _add_segment_deltas(
+                        sealedEvents[seriesName], effectiveStart, segmentEnd, cpuDelta, gpuDelta
+                    )
 
         if not resolvedAnySegment:
             diagnostics["jobs_with_unknown_nodes"] += 1
 
-    return featureEvents, diagnostics
+    diagnostics["hostlist_share_cache_hits"] = shareCache.hits - initialHits
+    diagnostics["hostlist_share_cache_misses"] = shareCache.misses - initialMisses
+    return featureEvents, sealedEvents, diagnostics
+
+
+def _add_segment_deltas(seriesEvents, startTimestamp, endTimestamp, cpuDelta, gpuDelta):
+    startEvent = seriesEvents[startTimestamp]
+    startEvent["cpu"] += cpuDelta
+    startEvent["gpu"] += gpuDelta
+    endEvent = seriesEvents[endTimestamp]
+    endEvent["cpu"] -= cpuDelta
+    endEvent["gpu"] -= gpuDelta
+
+
+def _collect_feature_events_parallel(
+    jobChunks,
+    clusterConfigTimeline,
+    nowTimestamp: int,
+    allowedFeatures: set[str] | None,
+    forcedFeatureStartTimestamps: dict[str, int] | None,
+    sealedBeforeTimestamp: int | None,
+    pool,
+    groupDimensions=(),
+):
+    chunkResults = list(
+        pool.map(
+            _collect_feature_events_chunk,
+            jobChunks,
+            [clusterConfigTimeline] * len(jobChunks),
+            [nowTimestamp] * len(jobChunks),
+            [allowedFeatures] * len(jobChunks),
+            [forcedFeatureStartTimestamps] * len(jobChunks),
+            [sealedBeforeTimestamp] * len(jobChunks),
+            [groupDimensions] * len(jobChunks),
+        )
+    )
+    diagnostics = defaultdict(int)
+    for _, _, chunkDiagnostics in chunkResults:
+        for key, value in chunkDiagnostics.items():
+            diagnostics[key] += value
+
+    return (
+        series_parallel.merge_event_deltas([events for events, _, _ in chunkResults]),
+        series_parallel.merge_event_deltas([sealed for _, sealed, _ in chunkResults]),
+        dict(diagnostics),
+    )
+
+
+def _collect_feature_events_chunk(
+    jobs,
+    clusterConfigTimeline,
+    nowTimestamp,
+    allowedFeatures,
+    forcedFeatureStartTimestamps,
+    sealedBeforeTimestamp,
+    groupDimensions=(),
+):
+    featureEvents, sealedEvents, diagnostics = _collect_feature_events(
+        jobs=jobs,
+        clusterConfigTimeline=clusterConfigTimeline,
+        nowTimestamp=nowTimestamp,
+        allowedFeatures=allowedFeatures,
+        forcedFeatureStartTimestamps=forcedFeatureStartTimestamps,
+        sealedBeforeTimestamp=sealedBeforeTimestamp,
+        groupDimensions=groupDimensions,
+    )
+    # defaultdict с lambda не сериализуется pickle, поэтому отдаём обычные словари.
+    return (
+        series_parallel.to_plain_events(featureEvents),
+        series_parallel.to_plain_events(sealedEvents),
+        diagnostics,
+    )
 
 
 def _build_feature_series(
-    feature,
     featureEvents,
-    clusterConfigTimeline,
+    capacitySteps,
     rangeStart,
     rangeEnd,
     intervalSeconds,
-    commissionTimestamp=None,
+    trimLeadingOverflow=True,
 ):
     sortedEventTimestamps = sorted(featureEvents.keys())
     eventIndex = 0
@@ -312,27 +1200,19 @@ def _build_feature_series(
             currentGpuLoad += event["gpu"]
             eventIndex += 1
 
-        if commissionTimestamp is not None and timestamp < commissionTimestamp:
-            capacities = {"cpu": 0, "gpu": 0}
-        else:
-            capacities = (
-                clusterConfigTimeline.getConfigAt(timestamp)
-                .getFeatureCapacitiesAt(timestamp)
-                .get(
-                    feature,
-                    {"cpu": 0, "gpu": 0},
-                )
-            )
+        capacities = capacitySteps.at(timestamp)
         featureSeries.append(
             {
-                "time": format_timestamp(timestamp),
+                "time": timestamp,
                 "cpu": _calculate_utilization(currentCpuLoad, capacities["cpu"]),
                 "gpu": _calculate_utilization(currentGpuLoad, capacities["gpu"]),
             }
         )
 
     # Clean up overflow points (trim corrupted data + clip remaining overflows)
-    featureSeries = _cleanup_overflow_points(featureSeries)
+    featureSeries = _cleanup_overflow_points(
+        featureSeries, trimLeading=trimLeadingOverflow
+    )
 
     return featureSeries
 
@@ -352,12 +1232,10 @@ def _build_overall_events(
 
 def _build_overall_series(
     overallEvents,
-    clusterConfigTimeline,
+    capacitySteps,
     rangeStart,
     rangeEnd,
     intervalSeconds,
-    allowedFeatures,
-    forcedFeatureStartTimestamps,
 ):
     sortedEventTimestamps = sorted(overallEvents.keys())
     eventIndex = 0
@@ -375,20 +1253,10 @@ def _build_overall_series(
             currentGpuLoad += event["gpu"]
             eventIndex += 1
 
-        activeFeatures = {
-            feature
-            for feature in allowedFeatures
-            if forcedFeatureStartTimestamps.get(feature, 0) <= timestamp
-        }
-        capacities = clusterConfigTimeline.getConfigAt(
-            timestamp
-        ).getClusterCapacitiesForFeaturesAt(
-            timestamp,
-            activeFeatures,
-        )
+        capacities = capacitySteps.at(timestamp)
         overallSeries.append(
             {
-                "time": format_timestamp(timestamp),
+                "time": timestamp,
                 "cpu": _calculate_utilization(currentCpuLoad, capacities["cpu"]),
                 "gpu": _calculate_utilization(currentGpuLoad, capacities["gpu"]),
             }
@@ -397,6 +1265,259 @@ def _build_overall_series(
     return overallSeries
 
 
+def _build_series_numpy(
+    featureNames,
+    featureLoads,
+    overallEvents,
+    clusterConfigTimeline,
+    rangeStart,
+    rangeEnd,
+    intervalSeconds,
+    featureCommissionTimestamps,
+    forcedFeatureStartTimestamps,
+    leadingTrimSeries=None,
+    groupDimensions=(),
+):
+    """
+    Sweep the same event deltas as the loop engine, but with array operations.
+
+    Per-bucket loads come from a cumulative sum over sorted event timestamps and
+    a searchsorted lookup of every bucket start. Capacities are evaluated once per
+    step of the cluster configuration (snapshot switches, node count history
+    boundaries, commission and forced start timestamps) instead of once per bucket.
+    The produced points are identical to the loop engine output.
+    """
+    bucketTimestamps = series_numpy.build_bucket_timestamps(
+        rangeStart, rangeEnd, intervalSeconds
+    )
+    timestamps = bucketTimestamps.tolist()
+    compiledCapacities = clusterConfigTimeline.compileCapacitySteps(
+        featureNames,
+        featureCommissionTimestamps=featureCommissionTimestamps,
+        forcedFeatureStartTimestamps=forcedFeatureStartTimestamps,
+        groupDimensions=groupDimensions,
+    )
+
+    series = {}
+    for feature in featureNames:
+        cpuValues, gpuValues = _calculate_step_utilization(
+            eventArrays=series_numpy.build_event_arrays(featureLoads.get(feature, {})),
+            bucketTimestamps=bucketTimestamps,
+            capacitySteps=compiledCapacities.features[feature],
+        )
+        series[feature] = _cleanup_overflow_values(
+            timestamps,
+            cpuValues,
+            gpuValues,
+            trimLeading=leadingTrimSeries is None or feature in leadingTrimSeries,
+        )
+
+    for seriesName, capacitySteps in compiledCapacities.groups.items():
+        cpuValues, gpuValues = _calculate_step_utilization(
+            eventArrays=series_numpy.build_event_arrays(featureLoads.get(seriesName, {})),
+            bucketTimestamps=bucketTimestamps,
+            capacitySteps=capacitySteps,
+        )
+        series[seriesName] = _cleanup_overflow_values(
+            timestamps,
+            cpuValues,
+            gpuValues,
+            trimLeading=leadingTrimSeries is None or seriesName in leadingTrimSeries,
+        )
+
+    cpuValues, gpuValues = _calculate_step_utilization(
+        eventArrays=series_numpy.build_event_arrays(overallEvents),
+        bucketTimestamps=bucketTimestamps,
+        capacitySteps=compiledCapacities.overall,
+    )
+    series["overall"] = [
+        {"time": timestamp, "cpu": cpu, "gpu": gpu}
+        for timestamp, cpu, gpu in zip(timestamps, cpuValues, gpuValues)
+    ]
+
+    return series
+
+
+def _calculate_step_utilization(eventArrays, bucketTimestamps, capacitySteps):
+    eventTimestamps, cpuDeltas, gpuDeltas = eventArrays
+    cpuCapacities, gpuCapacities = capacitySteps.lookup(bucketTimestamps)
+    cpuValues = series_numpy.calculate_utilization_values(
+        series_numpy.accumulate_bucket_loads(eventTimestamps, cpuDeltas, bucketTimestamps),
+        cpuCapacities,
+    )
+    gpuValues = series_numpy.calculate_utilization_values(
+        series_numpy.accumulate_bucket_loads(eventTimestamps, gpuDeltas, bucketTimestamps),
+        gpuCapacities,
+    )
+    return cpuValues, gpuValues
+
+
+def _cleanup_overflow_values(
+    timestamps: list[int],
+    cpuValues: list[float],
+    gpuValues: list[float],
+    trimLeading: bool = True,
+) -> list[dict]:
+    cpuArray = np.asarray(cpuValues, dtype=np.float64)
+    gpuArray = np.asarray(gpuValues, dtype=np.float64)
+    trimmedCount = (
+        series_numpy.count_leading_overflow_points(cpuArray, gpuArray)
+        if trimLeading
+        else 0
+    )
+    if trimmedCount > 0:
+        _warn_trimmed_overflow_points(trimmedCount)
+        timestamps = timestamps[trimmedCount:]
+        cpuArray = cpuArray[trimmedCount:]
+        gpuArray = gpuArray[trimmedCount:]
+
+    clippedCount = int(np.count_nonzero(cpuArray > 100.0)) + int(
+        np.count_nonzero(gpuArray > 100.0)
+    )
+    if clippedCount > 0:
+        _warn_clipped_overflow_points(clippedCount)
+        cpuArray = np.minimum(cpuArray, 100.0)
+        gpuArray = np.minimum(gpuArray, 100.0)
+
+    return [
+        {"time": timestamp, "cpu": cpu, "gpu": gpu}
+        for timestamp, cpu, gpu in zip(timestamps, cpuArray.tolist(), gpuArray.tolist())
+    ]
+
+
+def _resolve_now_timestamp(
+    activeJobs, nowTimestamp: int | None, sealedLatestTimestamp: int | None = None
+) -> int:
+    if nowTimestamp is not None:
+        return nowTimestamp
+
+    if not activeJobs and sealedLatestTimestamp is None:
+        return int(datetime.now().timestamp())
+
+    if any(job.timeEnd <= 0 for job in activeJobs):
+        return int(datetime.now().timestamp())
+
+    latestTimestamps = [
+        max(job.timeStart, job.timeEnd, job.modTime) for job in activeJobs
+    ]
+    if sealedLatestTimestamp is not None:
+        latestTimestamps.append(int(sealedLatestTimestamp))
+
+    return max(latestTimestamps)
+
+
+def _apply_checkpoint_events(featureLoads, checkpoint: dict):
+    boundary = int(checkpoint["boundary"])
+    for feature, load in checkpoint.get("loads", {}).items():
+        featureLoads[feature][boundary]["cpu"] += float(load["cpu"])
+        featureLoads[feature][boundary]["gpu"] += float(load["gpu"])
+
+    for feature, pendingEvents in checkpoint.get("pending", {}).items():
+        for timestamp, cpuDelta, gpuDelta in pendingEvents:
+            featureLoads[feature][int(timestamp)]["cpu"] += float(cpuDelta)
+            featureLoads[feature][int(timestamp)]["gpu"] += float(gpuDelta)
+
+
+def _build_series_checkpoint(
+    previousCheckpoint,
+    sealedLoads,
+    sealedJobs,
+    series,
+    featureNames,
+    clusterConfigTimeline,
+    boundary: int,
+    rangeEnd: int,
+    intervalMinutes: int,
+    groupBy=DEFAULT_SERIES_GROUP_BY,
+) -> dict:
+    loads = defaultdict(lambda: {"cpu": 0.0, "gpu": 0.0})
+    pending = defaultdict(lambda: defaultdict(lambda: {"cpu": 0.0, "gpu": 0.0}))
+    sealedMaxEvent = None
+    latestJobTimestamp = None
+    previousPrefixLengths = {}
+    if previousCheckpoint is not None:
+        sealedMaxEvent = previousCheckpoint.get("sealed_max_event")
+        latestJobTimestamp = previousCheckpoint.get("latest_job_timestamp")
+        previousPrefixLengths = previousCheckpoint.get("prefix_lengths", {})
+        for feature, load in previousCheckpoint.get("loads", {}).items():
+            loads[feature]["cpu"] += float(load["cpu"])
+            loads[feature]["gpu"] += float(load["gpu"])
+        for feature, pendingEvents in previousCheckpoint.get("pending", {}).items():
+            for timestamp, cpuDelta, gpuDelta in pendingEvents:
+                pending[feature][int(timestamp)]["cpu"] += float(cpuDelta)
+                pending[feature][int(timestamp)]["gpu"] += float(gpuDelta)
+
+    for feature, events in sealedLoads.items():
+        for timestamp, event in events.items():
+            pending[feature][timestamp]["cpu"] += event["cpu"]
+            pending[feature][timestamp]["gpu"] += event["gpu"]
+        if events:
+            sealedMaxEvent = max(sealedMaxEvent or 0, max(events))
+
+    for job in sealedJobs:
+        latestJobTimestamp = max(
+            latestJobTimestamp or 0, job.timeStart, job.timeEnd, job.modTime
+        )
+
+    # Всё, что случилось не позже границы, сворачиваем в базовую нагрузку.
+    remainingPending = {}
+    for feature, events in pending.items():
+        remainingEvents = []
+        for timestamp in sorted(events):
+            event = events[timestamp]
+            if timestamp <= boundary:
+                loads[feature]["cpu"] += event["cpu"]
+                loads[feature]["gpu"] += event["gpu"]
+            else:
+                remainingEvents.append([timestamp, event["cpu"], event["gpu"]])
+        if remainingEvents:
+            remainingPending[feature] = remainingEvents
+
+    intervalSeconds = intervalMinutes * 60
+    tailLength = (rangeEnd - boundary) // intervalSeconds + 1
+    prefixLengths = {}
+    for seriesName, points in series.items():
+        totalLength = int(previousPrefixLengths.get(seriesName, 0)) + len(points)
+        prefixLengths[seriesName] = max(0, totalLength - tailLength)
+
+    return {
+        "version": 1,
+        "interval_minutes": intervalMinutes,
+        "boundary": boundary,
+        "range_end": rangeEnd,
+        "features": featureNames,
+        "group_by": list(groupBy),
+        "timeline": _build_timeline_fingerprint(clusterConfigTimeline, sealedMaxEvent),
+        "sealed_max_event": sealedMaxEvent,
+        "latest_job_timestamp": latestJobTimestamp,
+        "prefix_lengths": prefixLengths,
+        "loads": {
+            feature: {
+                "cpu": _snap_to_zero(load["cpu"]),
+                "gpu": _snap_to_zero(load["gpu"]),
+            }
+            for feature, load in loads.items()
+        },
+        "pending": remainingPending,
+    }
+
+
+def _build_timeline_fingerprint(clusterConfigTimeline, untilTimestamp) -> list:
+    if untilTimestamp is None:
+        return []
+
+    return [
+        [int(snapshot["timestamp"]), str(snapshot.get("path"))]
+        for snapshot in clusterConfigTimeline.snapshots
+        if int(snapshot["timestamp"]) <= int(untilTimestamp)
+    ]
+
+
+def _snap_to_zero(value: float) -> float:
+    # Погрешность от многократного сложения дельт не должна давать -0.0 в рядах.
+    return 0.0 if abs(value) < 1e-9 else value
+
+
 def _resolve_series_range_end(maxEventTimestamp: int, intervalSeconds: int) -> int:
     """
     Convert the last event timestamp into the last bucket start we can safely emit.
@@ -417,7 +1538,7 @@ def _calculate_utilization(usedCapacity: float, totalCapacity: int) -> float:
     return round((usedCapacity / totalCapacity) * 100, 2)
 
 
-def _cleanup_overflow_points(series: list[dict]) -> list[dict]:
+def _cleanup_overflow_points(series: list[dict], trimLeading: bool = True) -> list[dict]:
     """
     Clean up overflow points in utilization series using a two-step strategy:
 
@@ -429,7 +1550,9 @@ def _cleanup_overflow_points(series: list[dict]) -> list[dict]:
        These might be minor artifacts or rounding issues.
 
     Args:
-        series: List of {"time": str, "cpu": float, "gpu": float} points
+        series: List of {"time": int, "cpu": float, "gpu": float} points
+        trimLeading: Skip step 1 when the series continues an already cleaned
+            prefix, e.g. for a checkpointed tail recomputation
 
     Returns:
         Cleaned series with overflow handled
@@ -441,7 +1564,7 @@ def _cleanup_overflow_points(series: list[dict]) -> list[dict]:
     # Overflow = cpu > 100 OR gpu > 100
     last_consecutive_overflow_index = -1
 
-    for i, point in enumerate(series):
+    for i, point in enumerate(series if trimLeading else []):
         cpu = point.get("cpu", 0.0)
         gpu = point.get("gpu", 0.0)
 
@@ -455,10 +1578,7 @@ def _cleanup_overflow_points(series: list[dict]) -> list[dict]:
     if last_consecutive_overflow_index >= 0:
         # Remove all points up to and including the last consecutive overflow
         series = series[last_consecutive_overflow_index + 1 :]
-        logger.warning(
-            f"Trimmed {last_consecutive_overflow_index + 1} consecutive overflow points "
-            f"from the beginning of utilization series"
-        )
+        _warn_trimmed_overflow_points(last_consecutive_overflow_index + 1)
 
     # Step 3: Clip any remaining overflow points to 100%
     clipped_count = 0
@@ -475,13 +1595,24 @@ def _cleanup_overflow_points(series: list[dict]) -> list[dict]:
             clipped_count += 1
 
     if clipped_count > 0:
-        logger.warning(
-            f"Clipped {clipped_count} overflow points to 100% in utilization series"
-        )
+        _warn_clipped_overflow_points(clipped_count)
 
     return series
 
 
+def _warn_trimmed_overflow_points(trimmedCount: int):
+    logger.warning(
+        f"Trimmed {trimmedCount} consecutive overflow points "
+        f"from the beginning of utilization series"
+    )
+
+
+def _warn_clipped_overflow_points(clippedCount: int):
+    logger.warning(
+        f"Clipped {clippedCount} overflow points to 100% in utilization series"
+    )
+
+
 def _count_overflow_points(series: dict[str, list[dict]]) -> dict[str, int]:
     overflowCounts = {}
     for feature, points in series.items():
@@ -534,6 +1665,50 @@ def _resolve_job_feature_resource_shares(
     return shares
 
 
+def _resolve_job_partition_shares(job, clusterConfig) -> dict[str, dict[str, float]]:
+    partitionNames = [
+        partitionName
+        for partitionName in _split_job_partitions(job.partition)
+        if clusterConfig.getPartition(partitionName) is not None
+    ]
+    if not partitionNames:
+        return {}
+
+    # Запущенное задание идёт в одном разделе; список делим поровну на всякий случай.
+    share = 1.0 / len(partitionNames)
+    return {partitionName: {"cpu": share, "gpu": share} for partitionName in partitionNames}
+
+
+def _resolve_job_node_group_shares(
+    job, clusterConfig, timestamp: int
+) -> dict[str, dict[str, float]]:
+    groupCapacities = clusterConfig.getNodeGroupCapacitiesForHostlist(
+        job.nodelist, timestamp=timestamp
+    )
+    totalNodes = sum(capacity["nodes"] for capacity in groupCapacities.values())
+    totalCpu = sum(capacity["cpu"] for capacity in groupCapacities.values())
+    totalGpu = sum(capacity["gpu"] for capacity in groupCapacities.values())
+    if totalNodes <= 0:
+        return {}
+
+    shares = {}
+    for group, capacity in groupCapacities.items():
+        nodeShare = capacity["nodes"] / totalNodes
+        shares[group] = {
+            "cpu": (capacity["cpu"] / totalCpu) if totalCpu > 0 else nodeShare,
+            "gpu": (capacity["gpu"] / totalGpu) if totalGpu > 0 else nodeShare,
+        }
+
+    return shares
+
+
+def _split_job_partitions(partition: str | None) -> list[str]:
+    if not partition:
+        return []
+
+    return sorted({name.strip() for name in partition.split(",") if name.strip()})
+
+
 def _infer_feature_commission_timestamps(
     featureEvents: dict,
     featureNames: list[str],
@@ -559,6 +1734,29 @@ def _infer_feature_commission_timestamps(
     return commissionTimestamps
 
 
+def _validate_series_engine(engine: str):
+    if engine not in SERIES_ENGINES:
+        raise ValueError(
+            f"Unknown utilization series engine '{engine}', "
+            f"expected one of: {', '.join(SERIES_ENGINES)}"
+        )
+
+
+def _resolve_group_dimensions(groupBy) -> tuple[str, ...]:
+    unknownDimensions = sorted(set(groupBy) - set(SERIES_GROUP_DIMENSIONS))
+    if unknownDimensions:
+        raise ValueError(
+            f"Unknown utilization series group dimensions {unknownDimensions}, "
+            f"expected any of: {', '.join(SERIES_GROUP_DIMENSIONS)}"
+        )
+
+    return tuple(
+        dimension
+        for dimension in (SERIES_GROUP_PARTITION, SERIES_GROUP_NODE_GROUP)
+        if dimension in groupBy
+    )
+
+
 def _get_analysis_feature_names(clusterConfigTimeline) -> list[str]:
     return [
         feature
@@ -571,7 +1769,19 @@ def _log_job_diagnostics(diagnostics: dict):
     if not diagnostics:
         return
 
-    problematicJobs = {key: value for key, value in diagnostics.items() if value > 0}
+    cacheHits = diagnostics.get("hostlist_share_cache_hits", 0)
+    cacheMisses = diagnostics.get("hostlist_share_cache_misses", 0)
+    if cacheHits or cacheMisses:
+        logger.debug(
+            f"Hostlist share cache: {cacheHits} hits, {cacheMisses} misses "
+            f"({cacheHits / (cacheHits + cacheMisses):.1%} hit rate)"
+        )
+
+    problematicJobs = {
+        key: value
+        for key, value in diagnostics.items()
+        if key not in HOSTLIST_SHARE_CACHE_DIAGNOSTICS and value > 0
+    }
     if not problematicJobs:
         return
 
@@ -581,53 +1791,14 @@ def _log_job_diagnostics(diagnostics: dict):
 
 
 def _normalize_historical_jobs(jobs):
-    jobsByLogicalKey = {}
-    duplicateVersions = 0
+    # Хранилище логических заданий уже без дублей и упорядочено.
+    if isinstance(jobs, LogicalJobStore):
+        return jobs
 
-    for job in jobs:
-        logicalKey = job.getLogicalKey()
-        current = jobsByLogicalKey.get(logicalKey)
-        if current is None:
-            jobsByLogicalKey[logicalKey] = job
-            continue
-
-        duplicateVersions += 1
-        jobsByLogicalKey[logicalKey] = _select_preferred_job_version(current, job)
-
-    if duplicateVersions > 0:
+    store = LogicalJobStore(jobs)
+    if store.duplicateVersions > 0:
         logger.warning(
-            f"Collapsed {duplicateVersions} duplicate historical job versions before utilization aggregation"
+            f"Collapsed {store.duplicateVersions} duplicate historical job versions before utilization aggregation"
         )
 
-    return sorted(
-        jobsByLogicalKey.values(),
-        key=lambda job: (
-            job.timeStart,
-            job.jobID,
-            job.dbIndex if job.dbIndex is not None else -1,
-        ),
-    )
-
-
-def _select_preferred_job_version(left, right):
-    leftScore = _score_job_version(left)
-    rightScore = _score_job_version(right)
-    if rightScore > leftScore:
-        return right
-
-    if leftScore > rightScore:
-        return left
-
-    if (right.modTime or 0) > (left.modTime or 0):
-        return right
-
-    return left
-
-
-def _score_job_version(job) -> tuple:
-    return (
-        1 if job.hasAssignedNodes() else 0,
-        1 if job.timeEnd > 0 else 0,
-        1 if job.tresAlloc else 0,
-        int(job.modTime or 0),
-    )
+    return store
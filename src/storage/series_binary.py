@@ -0,0 +1,134 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .jsonio import resolve_json_file
+from .timeutils import from_wall_clock_seconds
+
+SERIES_ARRAY_SUFFIX = ".npy"
+SERIES_ARRAY_DTYPE = np.dtype([("time", "<i8"), ("cpu", "<f4"), ("gpu", "<f4")])
+SERIES_LABEL_LENGTH = 17
+
+
+def write_series_array(path: str | Path, points: list[dict]) -> Path:
+    """
+    Write one exported series as a structured ``.npy`` file.
+
+    ``time`` holds epoch seconds: the time of v2 points as is, v1
+    ``%H:%M:%S %d.%m.%y`` labels converted from the exporter's local time. The
+    column is sorted like the points; readers shift it to wall clock themselves.
+    """
+    columns = SeriesArrayColumns()
+    for _ in columns.track(points):
+        pass
+
+    return columns.write(path)
+
+
+class SeriesArrayColumns:
+    """
+    Collects the columns of points passing through ``track``, so a streamed
+    JSON export can write the ``.npy`` copy without keeping the point dicts.
+    """
+
+    def __init__(self):
+        self.timeValues = []
+        self.cpuValues = []
+        self.gpuValues = []
+        self.timestamps = None
+
+    def track(self, points):
+        for point in points:
+            self.timeValues.append(point["time"])
+            self.cpuValues.append(point["cpu"])
+            self.gpuValues.append(point["gpu"])
+            yield point
+
+    def hasTimeLabels(self) -> bool:
+        return bool(self.timeValues) and isinstance(self.timeValues[0], str)
+
+    def getTimestamps(self) -> np.ndarray:
+        if self.timestamps is None:
+            self.timestamps = (
+                from_wall_clock_seconds(parse_series_labels(self.timeValues))
+                if self.hasTimeLabels()
+                else np.asarray(self.timeValues, dtype=np.int64)
+            )
+
+        return self.timestamps
+
+    def write(self, path: str | Path) -> Path:
+        return _write_series_values(path, self.getTimestamps(), self.cpuValues, self.gpuValues)
+
+
+def _write_series_values(path: str | Path, timestamps, cpuValues, gpuValues) -> Path:
+    arrayPath = Path(path)
+    values = np.empty(len(timestamps), dtype=SERIES_ARRAY_DTYPE)
+    values["time"] = timestamps
+    values["cpu"] = cpuValues
+    values["gpu"] = gpuValues
+
+    temporaryPath = arrayPath.with_name(f"{arrayPath.name}.tmp")
+    with open(temporaryPath, "wb") as file:
+        np.save(file, values)
+    os.replace(temporaryPath, arrayPath)
+    return arrayPath
+
+
+def load_series_array(path: str | Path) -> np.ndarray:
+    arrayPath = Path(path)
+    values = np.load(arrayPath, mmap_mode="r")
+    if values.dtype != SERIES_ARRAY_DTYPE:
+        raise ValueError(f"Unexpected series array layout in '{arrayPath}': {values.dtype}")
+
+    return values
+
+
+def find_series_array(jsonPath: str | Path) -> Path | None:
+    """
+    Return the ``.npy`` twin of an exported JSON series when it is at least as
+    fresh as the JSON file (plain or compressed), otherwise ``None``.
+    """
+    jsonPath = Path(jsonPath)
+    arrayPath = jsonPath.with_suffix(SERIES_ARRAY_SUFFIX)
+    try:
+        arrayModifiedAt = arrayPath.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    jsonFile = resolve_json_file(jsonPath)
+    if jsonFile is None:
+        return arrayPath
+
+    try:
+        jsonModifiedAt = jsonFile.stat().st_mtime_ns
+    except FileNotFoundError:
+        return arrayPath
+
+    return arrayPath if arrayModifiedAt >= jsonModifiedAt else None
+
+
+def parse_series_labels(labels: list[str]) -> np.ndarray:
+    if not labels:
+        return np.empty(0, dtype=np.int64)
+
+    # Метки фиксированной ширины "HH:MM:SS dd.mm.yy": разбираем цифры
+    # по позициям сразу для всего массива вместо strptime на каждую точку.
+    codes = (
+        np.asarray(labels, dtype=f"U{SERIES_LABEL_LENGTH}")
+        .view(np.uint32)
+        .reshape(len(labels), SERIES_LABEL_LENGTH)
+        .astype(np.int64)
+        - ord("0")
+    )
+
+    def field(position):
+        return codes[:, position] * 10 + codes[:, position + 1]
+
+    # Двузначный год трактуем так же, как %y в strptime: 69-99 -> 19xx.
+    shortYears = field(15)
+    years = np.where(shortYears >= 69, 1900, 2000) + shortYears
+    months = (years - 1970) * 12 + field(12) - 1
+    days = months.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64) + field(9) - 1
+    return days * 86400 + field(0) * 3600 + field(3) * 60 + field(6)
@@ -0,0 +1,66 @@
+import numpy as np
+
+
+def build_bucket_timestamps(
+    rangeStart: int, rangeEnd: int, intervalSeconds: int
+) -> np.ndarray:
+    return np.arange(
+        int(rangeStart), int(rangeEnd) + intervalSeconds, intervalSeconds, dtype=np.int64
+    )
+
+
+def build_event_arrays(
+    events: dict[int, dict[str, float]],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    sortedTimestamps = sorted(events.keys())
+    eventTimestamps = np.fromiter(
+        sortedTimestamps, dtype=np.int64, count=len(sortedTimestamps)
+    )
+    cpuDeltas = np.fromiter(
+        (events[timestamp]["cpu"] for timestamp in sortedTimestamps),
+        dtype=np.float64,
+        count=len(sortedTimestamps),
+    )
+    gpuDeltas = np.fromiter(
+        (events[timestamp]["gpu"] for timestamp in sortedTimestamps),
+        dtype=np.float64,
+        count=len(sortedTimestamps),
+    )
+    return eventTimestamps, cpuDeltas, gpuDeltas
+
+
+def accumulate_bucket_loads(
+    eventTimestamps: np.ndarray,
+    deltas: np.ndarray,
+    bucketTimestamps: np.ndarray,
+) -> np.ndarray:
+    # Ведущий ноль повторяет порядок сложения посчитанного в цикле варианта,
+    # поэтому нагрузки совпадают побитово.
+    runningLoads = np.cumsum(np.concatenate(([0.0], deltas)))
+    appliedEventCounts = np.searchsorted(eventTimestamps, bucketTimestamps, side="right")
+    return runningLoads[appliedEventCounts]
+
+
+def calculate_utilization_values(
+    loads: np.ndarray, capacities: np.ndarray
+) -> list[float]:
+    hasCapacity = capacities > 0
+    ratios = np.zeros(len(loads), dtype=np.float64)
+    np.divide(loads, capacities, out=ratios, where=hasCapacity)
+    ratios *= 100
+    # round() встроенного float, а не np.round: только так значения совпадают
+    # с _calculate_utilization на границах округления.
+    return [
+        round(ratio, 2) if available else 0.0
+        for ratio, available in zip(ratios.tolist(), hasCapacity.tolist())
+    ]
+
+
+def count_leading_overflow_points(
+    cpuValues: np.ndarray, gpuValues: np.ndarray, limit: float = 100.0
+) -> int:
+    notOverflowing = np.flatnonzero((cpuValues <= limit) & (gpuValues <= limit))
+    if notOverflowing.size == 0:
+        return int(cpuValues.size)
+
+    return int(notOverflowing[0])
@@ -0,0 +1,124 @@
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from . import series_numpy
+
+# Меньшие куски не окупают пересылку заданий и копию таймлайна в процесс.
+PARALLEL_EVENT_MIN_JOBS_PER_CHUNK = 2000
+
+
+@contextmanager
+def open_series_pool(workers: int):
+    """
+    Yield a process pool for ``workers > 1`` and ``None`` otherwise, so callers
+    can keep one serial code path for the default configuration.
+    """
+    if int(workers) <= 1:
+        yield None
+        return
+
+    # Воркеры должны наследовать уже запущенный трекер ресурсов: иначе каждый
+    # заведёт свой и при выходе удалит блоки общей памяти родителя.
+    resource_tracker.ensure_running()
+    with ProcessPoolExecutor(max_workers=int(workers)) as pool:
+        yield pool
+
+
+def split_job_chunks(jobs: list, workers: int) -> list[list]:
+    chunkCount = max(
+        1, min(int(workers), len(jobs) // PARALLEL_EVENT_MIN_JOBS_PER_CHUNK)
+    )
+    chunkSize = -(-len(jobs) // chunkCount) if jobs else 0
+    return [jobs[index : index + chunkSize] for index in range(0, len(jobs), chunkSize or 1)]
+
+
+def merge_event_deltas(chunkEvents: list[dict]) -> dict:
+    """
+    Sum per-chunk ``{feature: {timestamp: {"cpu", "gpu"}}}`` deltas in chunk order.
+    """
+    mergedEvents = defaultdict(lambda: defaultdict(lambda: {"cpu": 0.0, "gpu": 0.0}))
+    for events in chunkEvents:
+        for feature, featureEvents in events.items():
+            mergedFeatureEvents = mergedEvents[feature]
+            for timestamp, event in featureEvents.items():
+                mergedEvent = mergedFeatureEvents[timestamp]
+                mergedEvent["cpu"] += event["cpu"]
+                mergedEvent["gpu"] += event["gpu"]
+
+    return mergedEvents
+
+
+def to_plain_events(events: dict) -> dict:
+    return {
+        feature: {timestamp: dict(event) for timestamp, event in featureEvents.items()}
+        for feature, featureEvents in events.items()
+    }
+
+
+class SharedEventArrays:
+    """
+    Sorted event deltas of several series packed into one shared memory block.
+
+    The block holds all timestamps (int64), then all CPU deltas and all GPU
+    deltas (float64). ``slices`` maps a series name to its ``(offset, count)``, so
+    a worker only receives the block name and its slice instead of a pickled
+    event dict.
+    """
+
+    def __init__(self, eventsBySeries: dict[str, dict]):
+        arrays = {
+            name: series_numpy.build_event_arrays(events)
+            for name, events in eventsBySeries.items()
+        }
+        self.size = sum(len(timestamps) for timestamps, _, _ in arrays.values())
+        self.memory = shared_memory.SharedMemory(create=True, size=max(1, 24 * self.size))
+        self.slices = {}
+
+        buffers = _view_event_buffers(self.memory, self.size)
+        offset = 0
+        for name, columns in arrays.items():
+            count = len(columns[0])
+            for buffer, values in zip(buffers, columns):
+                buffer[offset : offset + count] = values
+            self.slices[name] = (offset, count)
+            offset += count
+
+    def getHandle(self, name: str) -> tuple[str, int, int, int]:
+        offset, count = self.slices[name]
+        return self.memory.name, self.size, offset, count
+
+    def close(self):
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_shared_event_arrays(handle) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    memoryName, size, offset, count = handle
+    memory = shared_memory.SharedMemory(name=memoryName)
+    try:
+        columns = tuple(
+            buffer[offset : offset + count].copy()
+            for buffer in _view_event_buffers(memory, size)
+        )
+    finally:
+        # Представления numpy на буфер уже освобождены, поэтому close() не упадёт.
+        memory.close()
+
+    return columns
+
+
+def _view_event_buffers(memory, size: int):
+    timestampBuffer = np.ndarray((size,), dtype=np.int64, buffer=memory.buf, offset=0)
+    cpuBuffer = np.ndarray((size,), dtype=np.float64, buffer=memory.buf, offset=8 * size)
+    gpuBuffer = np.ndarray((size,), dtype=np.float64, buffer=memory.buf, offset=16 * size)
+    return timestampBuffer, cpuBuffer, gpuBuffer
@@ -0,0 +1,245 @@
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .constants import SERIES_ROLLUP_DIR
+from .jsonio import resolve_json_file
+from .series_binary import SERIES_ARRAY_SUFFIX, find_series_array, load_series_array
+from .timeutils import from_wall_clock_seconds, to_wall_clock_seconds
+
+SERIES_ROLLUP_RESOLUTIONS = {"1h": 3600, "6h": 6 * 3600, "1d": 86400}
+SERIES_ROLLUP_STATS = ("mean", "min", "max", "p50", "p95")
+SERIES_ROLLUP_DTYPE = np.dtype(
+    [("time", "<i8"), ("count", "<i4")]
+    + [
+        (f"{resource}_{stat}", "<f8")
+        for resource in ("cpu", "gpu")
+        for stat in SERIES_ROLLUP_STATS
+    ]
+)
+
+
+@dataclass(frozen=True)
+class SeriesRollup:
+    """
+    Rows of one series at one resolution. ``time`` is the bucket start in epoch
+    seconds, like the ``.npy`` series and v2 points; buckets follow local
+    wall-clock hours and days. The base resolution is the export interval
+    itself with ``count == 1``.
+    """
+
+    resolution: str
+    seconds: int
+    values: np.ndarray
+
+
+def write_series_rollups(
+    seriesDir: str | Path,
+    feature: str,
+    timestamps: np.ndarray,
+    cpuValues,
+    gpuValues,
+    fromTimestamp: int | None = None,
+) -> list[Path]:
+    """
+    Write 1h/6h/1d rollups of one series under ``<seriesDir>/rollups``.
+
+    With ``fromTimestamp`` (epoch seconds) rows of buckets that end before
+    it are taken from the existing rollup and only later buckets are
+    recomputed. Without it, or when the stored rows do not cover exactly the
+    points before that bucket, the rollup is rebuilt from all points.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    cpuValues = np.asarray(cpuValues, dtype=np.float64)
+    gpuValues = np.asarray(gpuValues, dtype=np.float64)
+
+    writtenPaths = []
+    for resolution, resolutionSeconds in SERIES_ROLLUP_RESOLUTIONS.items():
+        rollupPath = _rollup_path(seriesDir, resolution, feature)
+        keptRows = _load_sealed_rollup_rows(rollupPath, timestamps, resolutionSeconds, fromTimestamp)
+        firstIndex = int(keptRows["count"].sum())
+        rows = np.concatenate(
+            [
+                keptRows,
+                build_series_rollup(
+                    timestamps[firstIndex:],
+                    cpuValues[firstIndex:],
+                    gpuValues[firstIndex:],
+                    resolutionSeconds,
+                ),
+            ]
+        )
+        writtenPaths.append(_write_rollup(rollupPath, rows))
+
+    return writtenPaths
+
+
+def build_series_rollup(
+    timestamps: np.ndarray,
+    cpuValues: np.ndarray,
+    gpuValues: np.ndarray,
+    resolutionSeconds: int,
+) -> np.ndarray:
+    """
+    Aggregate sorted epoch points into ``resolutionSeconds`` buckets of local
+    wall-clock time, so daily buckets start at local midnight. Percentiles use
+    linear interpolation, the same as ``np.percentile``.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if len(timestamps) == 0:
+        return np.empty(0, dtype=SERIES_ROLLUP_DTYPE)
+
+    # Повтор часа при переходе на зимнее время попадает в ту же корзину, поэтому
+    # настенные начала корзин не убывают вдоль отсортированных точек.
+    bucketTimes = _get_wall_clock_buckets(timestamps, resolutionSeconds)
+    bucketStarts = np.flatnonzero(np.r_[True, bucketTimes[1:] != bucketTimes[:-1]])
+    bucketCounts = np.diff(np.r_[bucketStarts, len(timestamps)])
+
+    rows = np.empty(len(bucketStarts), dtype=SERIES_ROLLUP_DTYPE)
+    rows["time"] = from_wall_clock_seconds(bucketTimes[bucketStarts])
+    rows["count"] = bucketCounts
+    bucketIndexes = np.repeat(np.arange(len(bucketStarts)), bucketCounts)
+    for resource, values in (("cpu", cpuValues), ("gpu", gpuValues)):
+        values = np.asarray(values, dtype=np.float64)
+        rows[f"{resource}_mean"] = np.add.reduceat(values, bucketStarts) / bucketCounts
+        rows[f"{resource}_min"] = np.minimum.reduceat(values, bucketStarts)
+        rows[f"{resource}_max"] = np.maximum.reduceat(values, bucketStarts)
+        # Сортировка внутри корзин одним lexsort, затем перцентили по позициям.
+        sortedValues = values[np.lexsort((values, bucketIndexes))]
+        for stat, quantile in (("p50", 0.5), ("p95", 0.95)):
+            rows[f"{resource}_{stat}"] = _bucket_quantile(
+                sortedValues, bucketStarts, bucketCounts, quantile
+            )
+
+    return rows
+
+
+def load_series_rollup(seriesDir: str | Path, feature: str, resolution: str) -> SeriesRollup | None:
+    """
+    Load one rollup, or ``None`` when it is missing or older than the series.
+    """
+    rollupPath = _rollup_path(seriesDir, resolution, feature)
+    try:
+        rollupModifiedAt = rollupPath.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    jsonFile = resolve_json_file(Path(seriesDir) / f"{feature}.json")
+    if jsonFile is not None and jsonFile.stat().st_mtime_ns > rollupModifiedAt:
+        return None
+
+    values = np.load(rollupPath, mmap_mode="r")
+    if values.dtype != SERIES_ROLLUP_DTYPE:
+        return None
+
+    return SeriesRollup(resolution, SERIES_ROLLUP_RESOLUTIONS[resolution], values)
+
+
+def query_series_rollup(
+    seriesDir: str | Path,
+    feature: str,
+    startTime: int | None = None,
+    endTime: int | None = None,
+    maxPoints: int | None = None,
+    intervalSeconds: int | None = None,
+) -> SeriesRollup | None:
+    """
+    Rows of ``feature`` in ``[startTime, endTime)`` at the finest resolution that
+    fits into ``maxPoints``: the base series first, then 1h, 6h and 1d. When none
+    fits, the 1d rollup is returned. Times are epoch seconds.
+    """
+    candidates = []
+    if intervalSeconds is not None:
+        candidates.append(lambda: _load_base_rollup(seriesDir, feature, intervalSeconds))
+    candidates.extend(
+        lambda resolution=resolution: load_series_rollup(seriesDir, feature, resolution)
+        for resolution in SERIES_ROLLUP_RESOLUTIONS
+    )
+
+    selected = None
+    for loadCandidate in candidates:
+        rollup = loadCandidate()
+        if rollup is None:
+            continue
+
+        selected = _slice_rollup(rollup, startTime, endTime)
+        if maxPoints is None or len(selected.values) <= maxPoints:
+            break
+
+    return selected
+
+
+def _slice_rollup(rollup: SeriesRollup, startTime: int | None, endTime: int | None) -> SeriesRollup:
+    times = rollup.values["time"]
+    firstIndex = 0 if startTime is None else int(np.searchsorted(times, startTime, side="left"))
+    lastIndex = len(times) if endTime is None else int(np.searchsorted(times, endTime, side="left"))
+    return SeriesRollup(rollup.resolution, rollup.seconds, rollup.values[firstIndex:lastIndex])
+
+
+def _load_base_rollup(seriesDir: str | Path, feature: str, intervalSeconds: int) -> SeriesRollup | None:
+    arrayPath = find_series_array(Path(seriesDir) / f"{feature}.json")
+    if arrayPath is None:
+        return None
+
+    values = load_series_array(arrayPath)
+    rows = np.empty(len(values), dtype=SERIES_ROLLUP_DTYPE)
+    rows["time"] = values["time"]
+    rows["count"] = 1
+    for resource in ("cpu", "gpu"):
+        for stat in SERIES_ROLLUP_STATS:
+            rows[f"{resource}_{stat}"] = values[resource]
+
+    return SeriesRollup(f"{intervalSeconds // 60}m", intervalSeconds, rows)
+
+
+def _load_sealed_rollup_rows(
+    rollupPath: Path,
+    timestamps: np.ndarray,
+    resolutionSeconds: int,
+    fromTimestamp: int | None,
+) -> np.ndarray:
+    emptyRows = np.empty(0, dtype=SERIES_ROLLUP_DTYPE)
+    if fromTimestamp is None or not rollupPath.exists():
+        return emptyRows
+
+    existingRows = np.load(rollupPath)
+    if existingRows.dtype != SERIES_ROLLUP_DTYPE:
+        return emptyRows
+
+    sealedUntil = int(
+        from_wall_clock_seconds(_get_wall_clock_buckets([int(fromTimestamp)], resolutionSeconds))[0]
+    )
+    keptRows = existingRows[existingRows["time"] < sealedUntil]
+    # Сохранённые корзины должны покрывать ровно те же точки, что и новый префикс.
+    if int(keptRows["count"].sum()) != int(np.searchsorted(timestamps, sealedUntil, side="left")):
+        return emptyRows
+
+    return keptRows
+
+
+def _get_wall_clock_buckets(timestamps, resolutionSeconds: int) -> np.ndarray:
+    return to_wall_clock_seconds(timestamps) // resolutionSeconds * resolutionSeconds
+
+
+def _bucket_quantile(sortedValues, bucketStarts, bucketCounts, quantile: float) -> np.ndarray:
+    positions = (bucketCounts - 1) * quantile
+    lowerOffsets = np.floor(positions).astype(np.int64)
+    upperOffsets = np.ceil(positions).astype(np.int64)
+    lower = sortedValues[bucketStarts + lowerOffsets]
+    upper = sortedValues[bucketStarts + upperOffsets]
+    return lower + (upper - lower) * (positions - lowerOffsets)
+
+
+def _rollup_path(seriesDir: str | Path, resolution: str, feature: str) -> Path:
+    return Path(seriesDir) / SERIES_ROLLUP_DIR / resolution / f"{feature}{SERIES_ARRAY_SUFFIX}"
+
+
+def _write_rollup(rollupPath: Path, rows: np.ndarray) -> Path:
+    rollupPath.parent.mkdir(parents=True, exist_ok=True)
+    temporaryPath = rollupPath.with_name(f"{rollupPath.name}.tmp")
+    with open(temporaryPath, "wb") as file:
+        np.save(file, rows)
+    os.replace(temporaryPath, rollupPath)
+    return rollupPath
@@ -2,6 +2,8 @@ import logging
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
+
 try:
     from loguru import logger
 except ModuleNotFoundError:
@@ -9,31 +11,76 @@ except ModuleNotFoundError:
     logger = logging.getLogger(__name__)
     logger.success = logger.info
 
+from config import getClusterConfig
+
+from .active_jobs import get_active_job_set
+from .backfill import build_backfill_state, get_pending_backfill_chunks, run_parallel_backfill
 from .cache import (
+    append_cached_historical_job_rows,
     build_state_payload,
-    load_cached_historical_job_rows,
+    compact_cached_historical_job_rows,
+    load_cached_historical_job_columns,
+    load_series_checkpoint,
     load_state,
     resolve_history_start,
-    save_cached_historical_job_rows,
+    save_series_checkpoint,
     save_state,
 )
+from .columnar import ColumnarJobRows, select_preferred_job_rows
 from .constants import (
+    DEFAULT_BACKFILL_WORKERS,
     DEFAULT_BUCKET_MINUTES,
+    DEFAULT_SERIES_BUILD_WORKERS,
+    DEFAULT_SERIES_ENGINE,
+    DEFAULT_SERIES_GROUP_BY,
     DEFAULT_EXPORT_ROOT,
+    JOB_MIRROR_FILE,
+    JOB_MIRROR_MODES,
+    JOB_MIRROR_OFF,
+    JOB_MIRROR_READ_THROUGH,
     METADATA_FILE,
+    NODE_HEATMAP_FILE,
     PENDING_STATE,
-    RAW_JOBS_CACHE_FILE,
+    RAW_JOBS_CACHE_DIR,
+    RAW_JOBS_COMPACTION_MIN_SEGMENTS,
+    SERIES_CHECKPOINT_FILE,
     SERIES_DIR,
+    SERIES_SCHEMA_VERSION,
     STATE_FILE,
 )
-from .repository import SlurmDBRepository
-from .series import build_historical_utilization_series, export_historical_utilization_series
+from .job_index import HistoricalJobIntervalIndex
+from .jsonio import write_json_atomic
+from .logical_jobs import LogicalJobStore
+from .mirror import SQLiteJobMirror
+from .node_heatmap import NodeUtilizationHeatmap, build_node_utilization_heatmap
+from .repository import SlurmDBRepository, get_connection_pool
+from .series import (
+    build_historical_utilization_series,
+    build_historical_utilization_tail,
+    export_historical_utilization_series,
+    load_historical_utilization_series,
+    load_series_schema_version,
+    merge_historical_utilization_tail,
+    write_historical_utilization_series,
+)
 from .timeutils import parse_time_value
 
 
 class slurmStorage:
-    def __init__(self):
-        self.repository = SlurmDBRepository()
+    def __init__(self, activeJobs=None, jobMirrorMode=JOB_MIRROR_OFF, mirrorDir=None, repository=None):
+        if jobMirrorMode not in JOB_MIRROR_MODES:
+            raise ValueError(f"Unknown job mirror mode '{jobMirrorMode}', expected one of {JOB_MIRROR_MODES}")
+
+        mirrorPath = (Path(mirrorDir) if mirrorDir is not None else DEFAULT_EXPORT_ROOT) / JOB_MIRROR_FILE
+        self.jobMirror = SQLiteJobMirror(mirrorPath) if jobMirrorMode != JOB_MIRROR_OFF else None
+        self.mirrorReadThrough = jobMirrorMode == JOB_MIRROR_READ_THROUGH
+        # Другой источник задач (например, SQLiteSlurmDB для бенчмарков) подключается готовым репозиторием.
+        self.repository = (
+            repository
+            if repository is not None
+            else SlurmDBRepository(mirror=self.jobMirror if self.mirrorReadThrough else None)
+        )
+        self.activeJobs = activeJobs
 
     def create(self):
         self.repository.create()
@@ -48,7 +95,16 @@ class slurmStorage:
 
     def getHistoricalJobs(self, modifiedAfter=None, modifiedFrom=None, modifiedUntil=None):
         return self._materializeHistoricalJobs(
-            self.repository.get_historical_job_rows(
+            self.getHistoricalJobColumns(
+                modifiedAfter=modifiedAfter,
+                modifiedFrom=modifiedFrom,
+                modifiedUntil=modifiedUntil,
+            )
+        )
+
+    def getHistoricalJobColumns(self, modifiedAfter=None, modifiedFrom=None, modifiedUntil=None):
+        return ColumnarJobRows.fromRowBatches(
+            self.repository.iter_historical_job_row_batches(
                 modifiedAfter=modifiedAfter,
                 modifiedFrom=modifiedFrom,
                 modifiedUntil=modifiedUntil,
@@ -66,75 +122,259 @@ class slurmStorage:
         if nowTimestamp is None:
             nowTimestamp = int(datetime.now().timestamp())
 
-        return self.repository.get_active_jobs(nowTimestamp)
+        if self.mirrorReadThrough:
+            return self.repository.get_active_jobs(nowTimestamp)
+
+        activeJobs = self.activeJobs if self.activeJobs is not None else get_active_job_set()
+        return activeJobs.getRunningJobs(self.repository, nowTimestamp)
+
+    def loadHistoricalJobIndex(self, outputDir=None, clusterConfig=None):
+        outputPath = Path(outputDir) if outputDir is not None else DEFAULT_EXPORT_ROOT
+        return HistoricalJobIntervalIndex(
+            self._loadCachedHistoricalJobs(outputPath), clusterConfig=clusterConfig
+        )
+
+    def exportNodeUtilizationHeatmap(self, outputDir=None, jobs=None, clusterConfig=None, intervalMinutes=DEFAULT_BUCKET_MINUTES, nowTimestamp=None):
+        outputPath = Path(outputDir) if outputDir is not None else DEFAULT_EXPORT_ROOT
+        heatmap = build_node_utilization_heatmap(
+            jobs=self._loadCachedHistoricalJobs(outputPath) if jobs is None else jobs,
+            clusterConfig=getClusterConfig() if clusterConfig is None else clusterConfig,
+            intervalMinutes=intervalMinutes,
+            nowTimestamp=parse_time_value(nowTimestamp),
+        )
+        heatmapPath = heatmap.save(outputPath / NODE_HEATMAP_FILE)
+
+        logger.success(
+            f"Exported node utilization heatmap for {len(heatmap.nodeNames)} nodes and "
+            f"{heatmap.bucketCount} buckets to '{heatmapPath}'"
+        )
+        return heatmapPath
+
+    def loadNodeUtilizationHeatmap(self, outputDir=None):
+        outputPath = Path(outputDir) if outputDir is not None else DEFAULT_EXPORT_ROOT
+        return NodeUtilizationHeatmap.load(outputPath / NODE_HEATMAP_FILE)
+
+    def syncHistoricalJobsCache(self, outputDir=None, historyStart=None, modifiedUntil=None, jobsOverride=None, backfillChunkDays=None, backfillWorkers=DEFAULT_BACKFILL_WORKERS):
+        mergedRows, incrementalRows, _, outputPath, newState = self._syncHistoricalJobRows(
+            outputDir=outputDir,
+            historyStart=historyStart,
+            modifiedUntil=modifiedUntil,
+            jobsOverride=jobsOverride,
+            backfillChunkDays=backfillChunkDays,
+            backfillWorkers=backfillWorkers,
+        )
+        materializedJobs = self._materializeHistoricalJobs(mergedRows)
+
+        logger.success(
+            f"Synchronized historical jobs cache in '{outputPath}': "
+            f"{len(incrementalRows)} new/updated raw rows, "
+            f"{len(mergedRows)} total cached raw rows, {len(materializedJobs)} logical jobs"
+        )
+        return materializedJobs, outputPath, newState
 
-    def syncHistoricalJobsCache(self, outputDir=None, historyStart=None, modifiedUntil=None, jobsOverride=None):
+    def _syncHistoricalJobRows(self, outputDir=None, historyStart=None, modifiedUntil=None, jobsOverride=None, backfillChunkDays=None, backfillWorkers=DEFAULT_BACKFILL_WORKERS):
         outputPath = Path(outputDir) if outputDir is not None else DEFAULT_EXPORT_ROOT
         outputPath.mkdir(parents=True, exist_ok=True)
 
         statePath = outputPath / STATE_FILE
-        rawJobsPath = outputPath / RAW_JOBS_CACHE_FILE
+        rawJobsPath = outputPath / RAW_JOBS_CACHE_DIR
 
         state = load_state(statePath)
-        cachedRows = load_cached_historical_job_rows(rawJobsPath)
-        rowsById = {row.getLogicalKey(): row for row in cachedRows}
-
         historyStartTimestamp = resolve_history_start(historyStart, state)
         modifiedUntilTimestamp = parse_time_value(modifiedUntil)
+        if self.mirrorReadThrough and jobsOverride is None:
+            self._refreshJobMirror(historyStartTimestamp)
+
+        if jobsOverride is None and (state.get("backfill") or (not state and backfillChunkDays)):
+            if not state:
+                state = self._startHistoricalBackfill(
+                    statePath, historyStartTimestamp, modifiedUntilTimestamp, backfillChunkDays
+                )
+            self._runHistoricalBackfill(rawJobsPath, statePath, state, backfillWorkers)
+
+            # Все куски уже лежат в кэше, поэтому весь кэш и есть пакет первой синхронизации.
+            batchRows = load_cached_historical_job_columns(rawJobsPath)
+            mergedRows = select_preferred_job_rows(batchRows)
+            newState = build_state_payload(
+                previousState={},
+                mergedRows=mergedRows,
+                historyStartTimestamp=state["history_start"],
+                modifiedUntilTimestamp=state["modified_until"],
+                batchRows=batchRows,
+            )
+            self._syncJobMirror(ColumnarJobRows.empty(), batchRows, {}, newState)
+            save_state(statePath, newState)
+            return mergedRows, batchRows, ColumnarJobRows.empty(), outputPath, newState
 
+        cachedRows = load_cached_historical_job_columns(rawJobsPath)
         if jobsOverride is not None:
             incrementalRows = jobsOverride
         elif state:
-            incrementalRows = self.getHistoricalJobRows(
+            incrementalRows = self.getHistoricalJobColumns(
                 modifiedAfter=state.get("last_mod_time"),
                 modifiedUntil=modifiedUntilTimestamp,
             )
         else:
-            incrementalRows = self.getHistoricalJobRows(
+            incrementalRows = self.getHistoricalJobColumns(
                 modifiedFrom=historyStartTimestamp,
                 modifiedUntil=modifiedUntilTimestamp,
             )
 
-        for row in incrementalRows:
-            rowsById[row.getLogicalKey()] = row
-
-        mergedRows = sorted(
-            rowsById.values(),
-            key=lambda row: (row.time_start, row.id_job, row.job_db_inx if row.job_db_inx is not None else -1),
+        batchRows = (
+            incrementalRows
+            if isinstance(incrementalRows, ColumnarJobRows)
+            else ColumnarJobRows.fromRows(incrementalRows)
         )
-        save_cached_historical_job_rows(rawJobsPath, mergedRows)
-        materializedJobs = self._materializeHistoricalJobs(mergedRows)
+        replacedRows = cachedRows.take(
+            np.flatnonzero(
+                np.isin(cachedRows.getIntColumn("id_job"), batchRows.getIntColumn("id_job"))
+            )
+        )
+        append_cached_historical_job_rows(rawJobsPath, batchRows)
+        mergedRows = select_preferred_job_rows(ColumnarJobRows.concat([cachedRows, batchRows]))
 
         newState = build_state_payload(
             previousState=state,
             mergedRows=mergedRows,
             historyStartTimestamp=historyStartTimestamp,
             modifiedUntilTimestamp=modifiedUntilTimestamp,
+            batchRows=batchRows,
         )
+        self._syncJobMirror(cachedRows, batchRows, state, newState)
         save_state(statePath, newState)
+        return mergedRows, batchRows, replacedRows, outputPath, newState
+
+    def _refreshJobMirror(self, historyStartTimestamp):
+        # read_through: сначала догоняем зеркало по slurmDB от его собственной отметки,
+        # иначе экспорт в каталог зеркала спрашивал бы mod_time > last_mod_time у самого себя.
+        mirrorModTime = self.jobMirror.getLastModTime()
+        upstream = SlurmDBRepository().create()
+        try:
+            rows = ColumnarJobRows.fromRowBatches(
+                upstream.iter_historical_job_row_batches(
+                    modifiedAfter=mirrorModTime,
+                    modifiedFrom=historyStartTimestamp if mirrorModTime is None else None,
+                )
+            )
+        finally:
+            upstream.close()
+
+        if len(rows) == 0:
+            logger.debug(f"Job mirror '{self.jobMirror.path}' is up to date with slurmDB at mod_time {mirrorModTime}")
+            return
+
+        lastModTime = int(rows.getIntColumn("mod_time").max())
+        self.jobMirror.upsertRows(rows, max(lastModTime, mirrorModTime or 0))
+        logger.info(f"Pulled {len(rows)} changed rows from slurmDB into job mirror '{self.jobMirror.path}'")
+
+    def _syncJobMirror(self, cachedRows, batchRows, previousState, newState):
+        if self.jobMirror is None or self.mirrorReadThrough:
+            return
+
+        # Зеркало обновляется до state.json: после сбоя между ними отметки разойдутся,
+        # и следующая синхронизация пересоберёт зеркало из сырого кэша.
+        if self.jobMirror.getLastModTime() != previousState.get("last_mod_time"):
+            logger.info(f"Job mirror '{self.jobMirror.path}' is behind state.json, rebuilding it from the raw cache")
+            self.jobMirror.replaceRows(ColumnarJobRows.concat([cachedRows, batchRows]), newState["last_mod_time"])
+        else:
+            self.jobMirror.upsertRows(batchRows, newState["last_mod_time"])
 
-        logger.success(
-            f"Synchronized historical jobs cache in '{outputPath}': "
-            f"{len(incrementalRows)} new/updated raw rows, "
-            f"{len(mergedRows)} total cached raw rows, {len(materializedJobs)} logical jobs"
+    def _startHistoricalBackfill(self, statePath, historyStartTimestamp, modifiedUntilTimestamp, chunkDays):
+        if historyStartTimestamp is None:
+            raise ValueError("Parallel history backfill needs a history start")
+
+        rangeEnd = modifiedUntilTimestamp
+        if rangeEnd is None:
+            rangeEnd = int(datetime.now().timestamp())
+
+        state = build_backfill_state(
+            historyStartTimestamp, modifiedUntilTimestamp, rangeEnd, int(float(chunkDays) * 24 * 3600)
         )
-        return materializedJobs, outputPath, newState
+        save_state(statePath, state)
+        return state
+
+    def _runHistoricalBackfill(self, rawJobsPath, statePath, state, workers):
+        backfillState = state["backfill"]
+        chunks = get_pending_backfill_chunks(backfillState)
+        mirror = self.repository.mirror
+        sharedRepository = None
+        if mirror is not None:
+            pool, workers = None, 1
+        else:
+            pool = self.repository.pool if self.repository.pool is not None else get_connection_pool()
+            # Соединение, уже взятое этим хранилищем, воркерам недоступно.
+            freeConnections = pool.size - pool.getMetrics()["in_use"]
+            if freeConnections <= 0 and self.repository.connection is not None:
+                # Свободных соединений нет (например, DB_POOL_SIZE=1): куски грузятся
+                # по очереди на соединении самого хранилища, иначе воркер ждал бы его до тайм-аута.
+                sharedRepository, workers = self.repository, 1
+            else:
+                workers = max(1, min(int(workers), freeConnections))
+        logger.info(
+            f"Backfilling {len(chunks)} pending mod_time chunks "
+            f"({len(backfillState['completed_chunks'])} already done) on {workers} connections"
+        )
+
+        def fetchChunk(modifiedFrom, modifiedUntil):
+            if sharedRepository is not None:
+                return ColumnarJobRows.fromRowBatches(
+                    sharedRepository.iter_historical_job_row_batches(
+                        modifiedFrom=modifiedFrom, modifiedUntil=modifiedUntil
+                    )
+                )
+
+            repository = SlurmDBRepository(pool=pool, mirror=mirror).create()
+            try:
+                return ColumnarJobRows.fromRowBatches(
+                    repository.iter_historical_job_row_batches(
+                        modifiedFrom=modifiedFrom, modifiedUntil=modifiedUntil
+                    )
+                )
+            finally:
+                repository.close()
+
+        def onChunkFetched(chunk, rows):
+            # Кусок, записанный в кэш, но не отмеченный в state.json, при возобновлении
+            # загрузится ещё раз; повторные версии схлопывает выбор предпочтительной строки.
+            append_cached_historical_job_rows(rawJobsPath, rows)
+            backfillState["completed_chunks"].append(chunk[0])
+            save_state(statePath, state)
+            logger.info(f"Backfilled {len(rows)} raw rows with mod_time {chunk[0]}..{chunk[1]}")
+
+        run_parallel_backfill(chunks, fetchChunk, onChunkFetched, workers)
+
+    def compactHistoricalJobsCache(self, outputDir=None, minSegments=RAW_JOBS_COMPACTION_MIN_SEGMENTS):
+        outputPath = Path(outputDir) if outputDir is not None else DEFAULT_EXPORT_ROOT
+        stats = compact_cached_historical_job_rows(
+            outputPath / RAW_JOBS_CACHE_DIR, minSegments=minSegments
+        )
+        if stats is None:
+            logger.info(f"Raw job cache in '{outputPath}' has fewer than {minSegments} segments, nothing to compact")
+
+        return stats
 
-    def buildHistoricalUtilizationSeries(self, jobs=None, clusterConfig=None, intervalMinutes=DEFAULT_BUCKET_MINUTES, nowTimestamp=None):
+    def buildHistoricalUtilizationSeries(self, jobs=None, clusterConfig=None, intervalMinutes=DEFAULT_BUCKET_MINUTES, nowTimestamp=None, seriesEngine=DEFAULT_SERIES_ENGINE, seriesWorkers=DEFAULT_SERIES_BUILD_WORKERS, seriesGroupBy=DEFAULT_SERIES_GROUP_BY):
         return build_historical_utilization_series(
             jobs=self.getHistoricalJobs() if jobs is None else jobs,
             clusterConfig=clusterConfig,
             intervalMinutes=intervalMinutes,
             nowTimestamp=nowTimestamp,
+            engine=seriesEngine,
+            workers=seriesWorkers,
+            groupBy=seriesGroupBy,
         )
 
-    def exportHistoricalUtilizationSeries(self, outputDir=None, jobs=None, clusterConfig=None, intervalMinutes=DEFAULT_BUCKET_MINUTES, nowTimestamp=None):
+    def exportHistoricalUtilizationSeries(self, outputDir=None, jobs=None, clusterConfig=None, intervalMinutes=DEFAULT_BUCKET_MINUTES, nowTimestamp=None, seriesEngine=DEFAULT_SERIES_ENGINE, seriesWorkers=DEFAULT_SERIES_BUILD_WORKERS, seriesCompression=None, seriesGroupBy=DEFAULT_SERIES_GROUP_BY):
         return export_historical_utilization_series(
             outputDir=DEFAULT_EXPORT_ROOT if outputDir is None else outputDir,
             jobs=self.getHistoricalJobs() if jobs is None else jobs,
             clusterConfig=clusterConfig,
             intervalMinutes=intervalMinutes,
             nowTimestamp=nowTimestamp,
+            engine=seriesEngine,
+            workers=seriesWorkers,
+            compression=seriesCompression,
+            groupBy=seriesGroupBy,
         )
 
     def exportIncrementalHistoricalUtilization(
@@ -146,44 +386,73 @@ class slurmStorage:
         modifiedUntil=None,
         clusterConfig=None,
         jobsOverride=None,
+        seriesEngine=DEFAULT_SERIES_ENGINE,
+        tailOnly=False,
+        seriesWorkers=DEFAULT_SERIES_BUILD_WORKERS,
+        seriesCompression=None,
+        backfillChunkDays=None,
+        backfillWorkers=DEFAULT_BACKFILL_WORKERS,
+        seriesGroupBy=DEFAULT_SERIES_GROUP_BY,
     ):
-        cachedJobs, outputPath, state = self.syncHistoricalJobsCache(
+        mergedRows, incrementalRows, replacedRows, outputPath, state = self._syncHistoricalJobRows(
             outputDir=outputDir,
             historyStart=historyStart,
             modifiedUntil=modifiedUntil,
             jobsOverride=jobsOverride,
+            backfillChunkDays=backfillChunkDays,
+            backfillWorkers=backfillWorkers,
         )
 
         seriesOutputPath = outputPath / SERIES_DIR
-        export_historical_utilization_series(
-            outputDir=seriesOutputPath,
-            jobs=cachedJobs,
+        checkpointPath = outputPath / SERIES_CHECKPOINT_FILE
+        exportedTail = tailOnly and self._exportHistoricalUtilizationTail(
+            mergedRows=mergedRows,
+            changedRows=ColumnarJobRows.concat([incrementalRows, replacedRows]),
+            seriesOutputPath=seriesOutputPath,
+            checkpointPath=checkpointPath,
             clusterConfig=clusterConfig,
             intervalMinutes=intervalMinutes,
             nowTimestamp=parse_time_value(nowTimestamp),
+            seriesEngine=seriesEngine,
+            seriesWorkers=seriesWorkers,
+            seriesCompression=seriesCompression,
+            seriesGroupBy=seriesGroupBy,
         )
-
-        metadataPath = outputPath / METADATA_FILE
-        with open(metadataPath, "w", encoding="utf-8") as file:
-            import json
-
-            json.dump(
-                {
-                    "generated_at": datetime.now().isoformat(),
-                    "interval_minutes": intervalMinutes,
-                    "history_start": state.get("history_start"),
-                    "modified_until": state.get("modified_until"),
-                    "last_mod_time": state.get("last_mod_time"),
-                    "job_count": state.get("job_count"),
-                    "series_dir": SERIES_DIR,
-                    "raw_rows_file": RAW_JOBS_CACHE_FILE,
-                    "state_file": STATE_FILE,
-                },
-                file,
-                indent=2,
-                ensure_ascii=False,
+        if not exportedTail:
+            materializedJobs = self._materializeHistoricalJobs(mergedRows)
+            series, checkpoint = build_historical_utilization_tail(
+                jobs=materializedJobs,
+                clusterConfig=clusterConfig,
+                intervalMinutes=intervalMinutes,
+                nowTimestamp=parse_time_value(nowTimestamp),
+                engine=seriesEngine,
+                workers=seriesWorkers,
+                groupBy=seriesGroupBy,
+            )
+            write_historical_utilization_series(
+                seriesOutputPath, series, intervalMinutes, compression=seriesCompression
+            )
+            save_series_checkpoint(checkpointPath, checkpoint)
+            logger.info(
+                f"Rebuilt utilization series from {len(materializedJobs)} logical jobs "
+                f"({len(incrementalRows)} new/updated raw rows)"
             )
 
+        write_json_atomic(
+            outputPath / METADATA_FILE,
+            {
+                "generated_at": datetime.now().isoformat(),
+                "interval_minutes": intervalMinutes,
+                "history_start": state.get("history_start"),
+                "modified_until": state.get("modified_until"),
+                "last_mod_time": state.get("last_mod_time"),
+                "job_count": state.get("job_count"),
+                "series_dir": SERIES_DIR,
+                "raw_rows_dir": RAW_JOBS_CACHE_DIR,
+                "state_file": STATE_FILE,
+            },
+        )
+
         logger.success(f"Incremental utilization export completed in '{outputPath}'")
         return outputPath
 
@@ -193,51 +462,55 @@ class slurmStorage:
         intervalMinutes=DEFAULT_BUCKET_MINUTES,
         nowTimestamp=None,
         clusterConfig=None,
+        seriesEngine=DEFAULT_SERIES_ENGINE,
+        seriesWorkers=DEFAULT_SERIES_BUILD_WORKERS,
+        seriesCompression=None,
+        seriesGroupBy=DEFAULT_SERIES_GROUP_BY,
     ):
         outputPath = Path(outputDir) if outputDir is not None else DEFAULT_EXPORT_ROOT
-        rawJobsPath = outputPath / RAW_JOBS_CACHE_FILE
+        rawJobsPath = outputPath / RAW_JOBS_CACHE_DIR
         statePath = outputPath / STATE_FILE
 
-        cachedRows = load_cached_historical_job_rows(rawJobsPath)
-        if not cachedRows:
+        cachedRows = load_cached_historical_job_columns(rawJobsPath)
+        if len(cachedRows) == 0:
             raise FileNotFoundError(
-                f"Raw cache file '{rawJobsPath}' not found or empty. Run full export first."
+                f"Raw cache '{rawJobsPath}' not found or empty. Run full export first."
             )
 
         state = load_state(statePath)
         materializedJobs = self._materializeHistoricalJobs(cachedRows)
 
         seriesOutputPath = outputPath / SERIES_DIR
-        export_historical_utilization_series(
-            outputDir=seriesOutputPath,
+        series, checkpoint = build_historical_utilization_tail(
             jobs=materializedJobs,
             clusterConfig=clusterConfig,
             intervalMinutes=intervalMinutes,
             nowTimestamp=parse_time_value(nowTimestamp),
+            engine=seriesEngine,
+            workers=seriesWorkers,
+            groupBy=seriesGroupBy,
+        )
+        write_historical_utilization_series(
+            seriesOutputPath, series, intervalMinutes, compression=seriesCompression
+        )
+        save_series_checkpoint(outputPath / SERIES_CHECKPOINT_FILE, checkpoint)
+
+        write_json_atomic(
+            outputPath / METADATA_FILE,
+            {
+                "generated_at": datetime.now().isoformat(),
+                "interval_minutes": intervalMinutes,
+                "history_start": state.get("history_start"),
+                "modified_until": state.get("modified_until"),
+                "last_mod_time": state.get("last_mod_time"),
+                "job_count": len(cachedRows),
+                "logical_job_count": len(materializedJobs),
+                "series_dir": SERIES_DIR,
+                "raw_rows_dir": RAW_JOBS_CACHE_DIR,
+                "state_file": STATE_FILE,
+                "source": "raw_cache_only",
+            },
         )
-
-        metadataPath = outputPath / METADATA_FILE
-        with open(metadataPath, "w", encoding="utf-8") as file:
-            import json
-
-            json.dump(
-                {
-                    "generated_at": datetime.now().isoformat(),
-                    "interval_minutes": intervalMinutes,
-                    "history_start": state.get("history_start"),
-                    "modified_until": state.get("modified_until"),
-                    "last_mod_time": state.get("last_mod_time"),
-                    "job_count": len(cachedRows),
-                    "logical_job_count": len(materializedJobs),
-                    "series_dir": SERIES_DIR,
-                    "raw_rows_file": RAW_JOBS_CACHE_FILE,
-                    "state_file": STATE_FILE,
-                    "source": "raw_cache_only",
-                },
-                file,
-                indent=2,
-                ensure_ascii=False,
-            )
 
         logger.success(f"Historical utilization series rebuilt from raw cache in '{outputPath}'")
         return outputPath
@@ -245,52 +518,110 @@ class slurmStorage:
     def close(self):
         self.repository.close()
 
-    def _materializeHistoricalJobs(self, rawRows):
-        if not rawRows:
-            return []
-
-        rowsByJobId = {}
-        duplicateVersions = 0
-        for row in rawRows:
-            logicalKey = row.getLogicalKey()
-            current = rowsByJobId.get(logicalKey)
-            if current is None:
-                rowsByJobId[logicalKey] = row
-                continue
+    def _exportHistoricalUtilizationTail(
+        self,
+        mergedRows,
+        changedRows,
+        seriesOutputPath,
+        checkpointPath,
+        clusterConfig,
+        intervalMinutes,
+        nowTimestamp,
+        seriesEngine,
+        seriesWorkers=DEFAULT_SERIES_BUILD_WORKERS,
+        seriesCompression=None,
+        seriesGroupBy=DEFAULT_SERIES_GROUP_BY,
+    ) -> bool:
+        checkpoint = load_series_checkpoint(checkpointPath)
+        if checkpoint is None:
+            logger.info("No utilization series checkpoint found, rebuilding full history")
+            return False
+
+        schemaVersion = load_series_schema_version(seriesOutputPath)
+        if schemaVersion != SERIES_SCHEMA_VERSION:
+            logger.info(
+                f"Utilization series schema v{schemaVersion} differs from v{SERIES_SCHEMA_VERSION}, "
+                f"rebuilding full history"
+            )
+            return False
+
+        boundary = int(checkpoint["boundary"])
+        changedStarts = changedRows.getIntColumn("time_start")
+        lateRowCount = int(np.count_nonzero((changedStarts > 0) & (changedStarts < boundary)))
+        if lateRowCount:
+            logger.info(
+                f"{lateRowCount} new/updated raw rows start before the sealed checkpoint boundary, "
+                f"rebuilding full history"
+            )
+            return False
 
-            duplicateVersions += 1
-            rowsByJobId[logicalKey] = self._selectPreferredRawRow(current, row)
+        tailJobs = self._materializeHistoricalJobs(
+            mergedRows.take(np.flatnonzero(mergedRows.getIntColumn("time_start") >= boundary))
+        )
+        tailSeries, nextCheckpoint = build_historical_utilization_tail(
+            jobs=tailJobs,
+            checkpoint=checkpoint,
+            clusterConfig=clusterConfig,
+            intervalMinutes=intervalMinutes,
+            nowTimestamp=nowTimestamp,
+            engine=seriesEngine,
+            workers=seriesWorkers,
+            groupBy=seriesGroupBy,
+        )
+        if tailSeries is None:
+            logger.info("Utilization series checkpoint no longer matches inputs, rebuilding full history")
+            return False
+
+        existingSeries = load_historical_utilization_series(seriesOutputPath, tailSeries.keys())
+        mergedSeries = (
+            merge_historical_utilization_tail(existingSeries, tailSeries, checkpoint)
+            if existingSeries is not None
+            else None
+        )
+        if mergedSeries is None:
+            logger.info("Exported utilization series do not match the checkpoint, rebuilding full history")
+            return False
+
+        write_historical_utilization_series(
+            seriesOutputPath,
+            mergedSeries,
+            intervalMinutes,
+            compression=seriesCompression,
+            rollupFromTimestamp=boundary,
+        )
+        save_series_checkpoint(checkpointPath, nextCheckpoint)
+        logger.info(
+            f"Recomputed utilization series tail from {len(tailJobs)} logical jobs "
+            f"starting at sealed boundary {boundary}"
+        )
+        return True
 
-        if duplicateVersions > 0:
-            logger.warning(
-                f"Collapsed {duplicateVersions} duplicate raw job versions while materializing historical jobs"
+    def _loadCachedHistoricalJobs(self, outputPath: Path):
+        cachedRows = load_cached_historical_job_columns(outputPath / RAW_JOBS_CACHE_DIR)
+        if len(cachedRows) == 0:
+            raise FileNotFoundError(
+                f"Raw cache '{outputPath / RAW_JOBS_CACHE_DIR}' not found or empty. Run full export first."
             )
 
-        logicalJobs = [row.toHistoricalJob() for row in rowsByJobId.values()]
-        return sorted(
-            logicalJobs,
-            key=lambda job: (job.timeStart, job.jobID, job.dbIndex if job.dbIndex is not None else -1),
-        )
+        return self._materializeHistoricalJobs(cachedRows)
 
-    def _selectPreferredRawRow(self, left, right):
-        leftScore = self._scoreRawRow(left)
-        rightScore = self._scoreRawRow(right)
-        if rightScore > leftScore:
-            return right
+    def _materializeHistoricalJobs(self, rawRows):
+        if isinstance(rawRows, ColumnarJobRows):
+            return self._materializeHistoricalJobColumns(rawRows)
 
-        if leftScore > rightScore:
-            return left
+        store = LogicalJobStore(rawRows)
+        if store.duplicateVersions > 0:
+            logger.warning(
+                f"Collapsed {store.duplicateVersions} duplicate raw job versions while materializing historical jobs"
+            )
 
-        if (right.mod_time or 0) > (left.mod_time or 0):
-            return right
+        return store.toHistoricalJobs()
 
-        return left
+    def _materializeHistoricalJobColumns(self, rawRows):
+        preferredIndexes, duplicateVersions = rawRows.selectPreferredVersions()
+        if duplicateVersions > 0:
+            logger.warning(
+                f"Collapsed {duplicateVersions} duplicate raw job versions while materializing historical jobs"
+            )
 
-    def _scoreRawRow(self, row):
-        hasAssignedNodes = bool(row.nodelist) and row.nodelist != "None assigned"
-        return (
-            1 if hasAssignedNodes else 0,
-            1 if (row.time_end or 0) > 0 else 0,
-            1 if row.tres_alloc else 0,
-            int(row.mod_time or 0),
-        )
+        return LogicalJobStore.fromCanonical(rawRows.take(preferredIndexes).toHistoricalJobs())
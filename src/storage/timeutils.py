@@ -1,5 +1,8 @@
+import time
 from datetime import datetime
 
+import numpy as np
+
 
 def floor_timestamp(timestamp: int, step: int) -> int:
     return timestamp - (timestamp % step)
@@ -17,6 +20,44 @@ def format_timestamp(timestamp: int) -> str:
     return datetime.fromtimestamp(timestamp).strftime("%H:%M:%S %d.%m.%y")
 
 
+def to_wall_clock_seconds(timestamps) -> np.ndarray:
+    """
+    Local wall-clock seconds of epoch timestamps, read as if they were UTC: the
+    same instants ``format_timestamp`` labels show. The UTC offset is looked up
+    once per day and per point only on days with a DST switch.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if len(timestamps) == 0:
+        return timestamps.copy()
+
+    uniqueDays, dayIndexes = np.unique(timestamps // 86400, return_inverse=True)
+    dayStarts = uniqueDays * 86400
+    startOffsets = np.array([_utc_offset(value) for value in dayStarts.tolist()], dtype=np.int64)
+    endOffsets = np.array([_utc_offset(value + 86399) for value in dayStarts.tolist()], dtype=np.int64)
+
+    offsets = startOffsets[dayIndexes]
+    switchMask = (startOffsets != endOffsets)[dayIndexes]
+    if switchMask.any():
+        offsets[switchMask] = [_utc_offset(value) for value in timestamps[switchMask].tolist()]
+
+    return timestamps + offsets
+
+
+def from_wall_clock_seconds(wallSeconds) -> np.ndarray:
+    """
+    Epoch timestamps of local wall-clock seconds, the inverse of
+    ``to_wall_clock_seconds``. A label repeated by a DST fall-back maps to one
+    of its two instants.
+    """
+    wallSeconds = np.asarray(wallSeconds, dtype=np.int64)
+    estimate = wallSeconds - (to_wall_clock_seconds(wallSeconds) - wallSeconds)
+    return wallSeconds - (to_wall_clock_seconds(estimate) - estimate)
+
+
+def _utc_offset(timestamp: int) -> int:
+    return time.localtime(timestamp).tm_gmtoff
+
+
 def parse_time_value(value):
     if value is None:
         return None
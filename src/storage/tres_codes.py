@@ -5,6 +5,9 @@ Based on slurm cluster configuration, TRES codes represent different resource ty
 See: https://slurm.schedmd.com/tres.html
 """
 
+from dataclasses import dataclass
+from functools import lru_cache
+
 # Basic TRES codes
 TRES_CPU = 1
 TRES_MEM = 2
@@ -82,3 +85,68 @@ def get_tres_name(tres_id: int) -> str:
         TRES_GPU_V100: "gres/gpu:v100",
     }
     return tres_names.get(tres_id, f"tres_{tres_id}")
+
+
+# Ключи TRES-строки, которые раскладываются в поля TresCounts. Для gpu берутся
+# только общие ключи: типизированные GPU учитываются отдельно, как и раньше.
+TRES_FIELD_KEYS = {
+    "cpu": CPU_ALIASES,
+    "mem": MEM_ALIASES,
+    "node": NODE_ALIASES,
+    "gpu": {str(TRES_GPU), "gres/gpu", "gpu"},
+    "gpuTesla": {str(TRES_GPU_TESLA), "gres/gpu:tesla"},
+    "gpuA100": {str(TRES_GPU_A100), "gres/gpu:a100"},
+    "gpuH100": {str(TRES_GPU_H100), "gres/gpu:h100"},
+    "gpuH200": {str(TRES_GPU_H200), "gres/gpu:h200"},
+    "gpuV100": {str(TRES_GPU_V100), "gres/gpu:v100"},
+}
+_TRES_KEY_FIELDS = {key: fieldName for fieldName, keys in TRES_FIELD_KEYS.items() for key in keys}
+
+TRES_DECODE_CACHE_SIZE = 65536
+
+
+@dataclass(frozen=True, slots=True)
+class TresCounts:
+    """Integer amounts of one TRES string, keyed by the codes above"""
+
+    cpu: int = 0
+    mem: int = 0
+    node: int = 0
+    gpu: int = 0
+    gpuTesla: int = 0
+    gpuA100: int = 0
+    gpuH100: int = 0
+    gpuH200: int = 0
+    gpuV100: int = 0
+
+
+EMPTY_TRES_COUNTS = TresCounts()
+
+
+@lru_cache(maxsize=TRES_DECODE_CACHE_SIZE)
+def decode_tres(tresValue: str | None) -> TresCounts:
+    """
+    Decode a ``"1=8,4=2,1001=4"`` string once. Entries with unknown keys or
+    non-integer amounts are skipped; a repeated key keeps its last amount.
+    Identical strings share one cached immutable instance.
+    """
+    if not tresValue:
+        return EMPTY_TRES_COUNTS
+
+    counts = {}
+    for entry in tresValue.split(","):
+        entry = entry.strip()
+        if "=" not in entry:
+            continue
+
+        key, value = entry.split("=", maxsplit=1)
+        fieldName = _TRES_KEY_FIELDS.get(key)
+        if fieldName is None:
+            continue
+
+        try:
+            counts[fieldName] = int(value)
+        except ValueError:
+            continue
+
+    return TresCounts(**counts) if counts else EMPTY_TRES_COUNTS
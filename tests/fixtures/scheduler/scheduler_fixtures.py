@@ -87,6 +87,46 @@ def build_mini_cluster_config() -> ClusterConfig:
     return config
 
 
+def build_wide_cluster_config() -> ClusterConfig:
+    """
+    96-node cluster for engine comparisons: four features, each served by two
+    node groups of different size and weight. Only wide_0 has GPUs. Partition
+    "normal" spans all nodes, "half" the first node group of every feature.
+    """
+    config = ClusterConfig()
+    config.gres_types = ["gpu"]
+    halfPatterns = []
+    nextNode = 1
+    for featureIndex in range(4):
+        for generation, (coresPerSocket, gpus) in enumerate(((16, 4), (32, 8))):
+            namePattern = f"wn-[{nextNode:03d}-{nextNode + 11:03d}]"
+            nextNode += 12
+            if generation == 0:
+                halfPatterns.append(namePattern)
+            config.node_groups.append(
+                NodeGroupConfig(
+                    name_pattern=namePattern,
+                    node_count=12,
+                    weight=generation + 1,
+                    features=[f"wide_{featureIndex}"],
+                    resources=NodeResources(
+                        sockets=2,
+                        cores_per_socket=coresPerSocket,
+                        threads_per_core=1,
+                        gpus=gpus if featureIndex == 0 else 0,
+                    ),
+                )
+            )
+
+    config.partitions = [
+        PartitionConfig(name="normal", nodes=f"wn-[001-{nextNode - 1:03d}]", state="UP"),
+        PartitionConfig(name="half", nodes=",".join(halfPatterns), state="UP"),
+    ]
+    config._node_features_cache = None
+    config._node_capacities_cache = None
+    return config
+
+
 def build_mini_cluster_config_mock() -> MagicMock:
     """Build a MagicMock of ClusterConfig that behaves like the real one"""
     config = build_mini_cluster_config()
@@ -18,6 +18,7 @@ from pathlib import Path
 import mysql.connector
 import pytest
 
+from storage.active_jobs import reset_active_job_set
 from tests.fixtures.scheduler.scheduler_fixtures import build_mini_cluster_config
 
 
@@ -232,6 +233,8 @@ def reset_database_tables(db_connection):
     cursor.execute("TRUNCATE TABLE linux_job_table")
     db_connection.commit()
     cursor.close()
+    # После TRUNCATE mod_time начинается заново, дельта по старой отметке ничего не увидит.
+    reset_active_job_set()
 
 
 @pytest.fixture
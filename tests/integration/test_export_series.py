@@ -8,7 +8,6 @@ MySQL is bypassed entirely via the ``jobsOverride`` parameter accepted by
 """
 
 import json
-from datetime import datetime
 
 from storage.cache import load_cached_historical_job_rows
 from storage.models import HistoricalJob
@@ -90,8 +89,6 @@ class TestExportSeriesBuild:
 
     def test_series_has_correct_time_range(self, tmp_path):
         """Series time range covers all job timestamps."""
-        fmt = "%H:%M:%S %d.%m.%y"
-
         rows = build_standard_test_dataset()
         jobs = [row.toHistoricalJob() for row in rows]
         config = build_mini_cluster_config()
@@ -105,14 +102,12 @@ class TestExportSeriesBuild:
         type_a_series = series["type_a"]
         assert len(type_a_series) >= 2
 
-        first_time = datetime.strptime(type_a_series[0]["time"], fmt)
-        last_time = datetime.strptime(type_a_series[-1]["time"], fmt)
+        first_time = type_a_series[0]["time"]
+        last_time = type_a_series[-1]["time"]
         assert first_time < last_time
 
     def test_15_minute_intervals(self, tmp_path):
         """Series points are spaced at 15-minute intervals."""
-        fmt = "%H:%M:%S %d.%m.%y"
-
         rows = build_standard_test_dataset()
         jobs = [row.toHistoricalJob() for row in rows]
         config = build_mini_cluster_config()
@@ -125,15 +120,13 @@ class TestExportSeriesBuild:
 
         type_a = series["type_a"]
         if len(type_a) >= 2:
-            times = [datetime.strptime(p["time"], fmt) for p in type_a]
+            times = [p["time"] for p in type_a]
             for i in range(1, len(times)):
-                diff = (times[i] - times[i - 1]).total_seconds()
+                diff = times[i] - times[i - 1]
                 assert diff == 900, f"Interval {i}: {diff}s != 900s"
 
     def test_running_job_does_not_append_trailing_zero_bucket(self, tmp_path):
         """Running jobs should end on the latest observed bucket, not a synthetic zero tail."""
-        fmt = "%H:%M:%S %d.%m.%y"
-
         factory = SyntheticJobFactory()
         rows = [factory.running_gpu_job(feature="type_a", node="cn-001", gpus=2)]
         jobs = [row.toHistoricalJob() for row in rows]
@@ -150,7 +143,7 @@ class TestExportSeriesBuild:
         overall_series = series["overall"]
         assert overall_series
         assert overall_series[-1]["gpu"] > 0.0
-        assert datetime.strptime(overall_series[-1]["time"], fmt) < datetime.fromtimestamp(now_timestamp)
+        assert overall_series[-1]["time"] < now_timestamp
 
 
 # ─── File-export tests ──────────────────────────────────────────────────────────
@@ -245,8 +238,8 @@ class TestIncrementalExport:
             jobsOverride=rows,
         )
 
-        # Cache file should exist
-        cache_file = tmp_path / "raw_job_rows.json"
+        # Columnar cache directory should exist
+        cache_file = tmp_path / "raw_job_rows"
         assert cache_file.exists()
 
         # State file should exist
@@ -284,7 +277,7 @@ class TestIncrementalExport:
         )
 
         # Cache should now have ALL jobs (initial + incremental)
-        cache_file = tmp_path / "raw_job_rows.json"
+        cache_file = tmp_path / "raw_job_rows"
         loaded_rows = load_cached_historical_job_rows(cache_file)
 
         assert len(loaded_rows) == len(all_rows)
@@ -369,7 +362,7 @@ class TestIncrementalExport:
             jobsOverride=rows,
         )
 
-        cache_file = tmp_path / "raw_job_rows.json"
+        cache_file = tmp_path / "raw_job_rows"
         loaded1 = load_cached_historical_job_rows(cache_file)
 
         # Second export with same data (simulates re-querying)
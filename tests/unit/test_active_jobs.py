@@ -0,0 +1,132 @@
+"""
+Unit tests for the in-memory active job set
+"""
+
+import dataclasses
+
+from storage.active_jobs import ActiveJobSet
+from storage.service import slurmStorage
+from tests.fixtures.scheduler.scheduler_fixtures import TIMESTAMP_NOW, create_running_gpu_job
+
+
+class FakeJobTable:
+    """slurmDB job table with the three queries the active set uses"""
+
+    def __init__(self, jobs=()):
+        self.rows = {}
+        self.queries = []
+        for job in jobs:
+            self.write(job)
+
+    def write(self, job, deleted=False):
+        self.rows[job.dbIndex] = (job, deleted)
+
+    def get_max_job_mod_time(self):
+        self.queries.append("max_mod_time")
+        return max((job.modTime for job, _ in self.rows.values()), default=0)
+
+    def get_active_jobs(self, nowTimestamp):
+        self.queries.append("active")
+        return sorted(
+            (
+                job
+                for job, deleted in self.rows.values()
+                if not deleted and job.timeStart > 0 and (job.timeEnd == 0 or job.timeEnd > nowTimestamp)
+            ),
+            key=lambda job: (job.timeStart, job.dbIndex, job.jobID),
+        )
+
+    def get_job_changes(self, modifiedFrom):
+        self.queries.append("changes")
+        return [
+            (job, not deleted and job.timeStart > 0)
+            for job, deleted in sorted(self.rows.values(), key=lambda item: item[0].modTime)
+            if job.modTime >= modifiedFrom
+        ]
+
+
+class FakeClock:
+    def __init__(self):
+        self.value = 0.0
+
+    def __call__(self):
+        return self.value
+
+
+def _job(jobID, timeStart, **changes):
+    return dataclasses.replace(create_running_gpu_job(jobID=jobID, timeStart=timeStart), **changes)
+
+
+def _ids(jobs):
+    return [job.jobID for job in jobs]
+
+
+class TestActiveJobSet:
+    """Delta refreshes keep the set equal to the full active-jobs query"""
+
+    def test_delta_refresh_tracks_started_finished_and_deleted_jobs(self):
+        """Changes since the last mod_time are applied without a full query"""
+        now = TIMESTAMP_NOW
+        table = FakeJobTable([_job(1, now - 600), _job(2, now - 300), _job(3, now - 200)])
+        activeJobs = ActiveJobSet(reconcileSeconds=600, clock=FakeClock())
+
+        assert _ids(activeJobs.getRunningJobs(table, now)) == [1, 2, 3]
+
+        table.write(_job(4, now + 10, modTime=now + 10))
+        table.write(_job(2, now - 300, timeEnd=now + 20, modTime=now + 20))
+        table.write(_job(3, now - 200, modTime=now + 25), deleted=True)
+        table.write(_job(5, 0, modTime=now + 30))
+        table.queries.clear()
+
+        assert _ids(activeJobs.getRunningJobs(table, now + 60)) == [1, 4]
+        assert _ids(activeJobs.getRunningJobs(table, now + 60)) == _ids(table.get_active_jobs(now + 60))
+        assert table.queries == ["changes", "changes", "active"]
+        assert activeJobs.getMetrics()["delta_refreshes"] == 2
+        assert activeJobs.lastModTime == now + 30
+
+    def test_jobs_ending_later_leave_the_set_on_time(self):
+        """A known time_end in the future is honoured without another change row"""
+        now = TIMESTAMP_NOW
+        table = FakeJobTable([_job(1, now - 600, timeEnd=now + 100), _job(2, now - 300)])
+        activeJobs = ActiveJobSet(clock=FakeClock())
+
+        assert _ids(activeJobs.getRunningJobs(table, now)) == [1, 2]
+        assert _ids(activeJobs.getRunningJobs(table, now + 100)) == [2]
+
+    def test_periodic_reconciliation_repairs_missed_changes(self):
+        """A change the delta cannot see is fixed by the next full reload"""
+        now = TIMESTAMP_NOW
+        table = FakeJobTable([_job(1, now - 600, modTime=now - 100), _job(2, now - 300)])
+        clock = FakeClock()
+        activeJobs = ActiveJobSet(reconcileSeconds=600, clock=clock)
+        activeJobs.getRunningJobs(table, now)
+
+        # Строка сменилась без увеличения mod_time.
+        table.write(_job(2, now - 300, timeEnd=now + 1))
+        assert _ids(activeJobs.getRunningJobs(table, now + 60)) == [1, 2]
+
+        clock.value = 600
+        assert _ids(activeJobs.getRunningJobs(table, now + 120)) == [1]
+        assert activeJobs.getMetrics()["full_reloads"] == 2
+
+    def test_past_timestamp_is_answered_from_the_database(self):
+        """Jobs already dropped from the set are still visible for an earlier timestamp"""
+        now = TIMESTAMP_NOW
+        table = FakeJobTable([_job(1, now - 600, timeEnd=now + 50, modTime=now + 50), _job(2, now - 300)])
+        activeJobs = ActiveJobSet(clock=FakeClock())
+        activeJobs.getRunningJobs(table, now + 100)
+
+        assert _ids(activeJobs.getRunningJobs(table, now)) == [1, 2]
+        assert activeJobs.getMetrics()["jobs"] == 1
+
+    def test_storage_answers_from_the_active_set(self):
+        """slurmStorage.getRunningJobs goes through the injected set"""
+        now = TIMESTAMP_NOW
+        table = FakeJobTable([_job(1, now - 600)])
+        storage = slurmStorage(activeJobs=ActiveJobSet(clock=FakeClock()))
+        storage.repository = table
+
+        storage.getRunningJobs(now)
+        storage.getRunningJobs(now + 60)
+
+        assert table.queries == ["max_mod_time", "active", "changes"]
@@ -50,3 +50,49 @@ def test_resource_tree_payload_subtracts_running_jobs():
     assert cn007["used_gpu"] == 2
     assert cn007["available_cpu"] == cn007["total_cpu"] - 4
     assert cn007["available_gpu"] == cn007["total_gpu"] - 2
+
+
+class _FakeCacheStorage:
+    def __init__(self, job_index):
+        self.job_index = job_index
+        self.output_dirs = []
+
+    def create(self):
+        raise AssertionError("past snapshots must not connect to slurmdb")
+
+    def loadHistoricalJobIndex(self, outputDir=None, clusterConfig=None):
+        self.output_dirs.append(outputDir)
+        return self.job_index
+
+
+def test_resource_tree_payload_for_past_timestamp_uses_raw_cache(tmp_path):
+    from types import SimpleNamespace
+
+    from admin_panel import resource_tree
+    from storage.job_index import HistoricalJobIntervalIndex
+
+    cluster_config = ClusterConfig()
+    cluster_config.loadFromSlurmText(VALID_SLURM_CONF)
+    finished_job = create_running_gpu_job(
+        jobID=2001, cpusReq=4, gpusRequested=2, nodelist="cn-007", timeStart=1_000
+    )
+    finished_job.timeEnd = 2_000
+    fake_storage = _FakeCacheStorage(HistoricalJobIntervalIndex([finished_job]))
+    resource_tree._JOB_INDEX_CACHE.clear()
+
+    with (
+        patch("admin_panel.resource_tree.getClusterConfig", return_value=cluster_config),
+        patch(
+            "admin_panel.resource_tree.getSchedulerConfig",
+            return_value=SimpleNamespace(forecast_data_dir=str(tmp_path)),
+        ),
+        patch("admin_panel.resource_tree.slurmStorage", return_value=fake_storage),
+    ):
+        during = build_resource_tree_payload(timestamp=1_500, projectRoot=tmp_path)
+        after = build_resource_tree_payload(timestamp=2_500, projectRoot=tmp_path)
+
+    assert fake_storage.output_dirs == [tmp_path.resolve()]
+    assert during["source"] == "raw_cache"
+    assert during["running_job_count"] == 1
+    assert during["used_gpu"] == 2
+    assert after["running_job_count"] == 0
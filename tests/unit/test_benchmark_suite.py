@@ -0,0 +1,111 @@
+"""
+Unit tests for the benchmark suite and its baseline comparison
+"""
+
+import pytest
+
+from benchmarks import suite
+from benchmarks.suite import (
+    compare_benchmark_results,
+    load_benchmark_results,
+    main,
+    run_benchmark_suite,
+    save_benchmark_results,
+)
+
+TINY_SCALE = {
+    "nodes": 48,
+    "features": 3,
+    "partitions": 2,
+    "span_days": 7,
+    "jobs_per_day": 60,
+    "pending_jobs": 20,
+    "log_lines": 200,
+}
+
+
+def _results(scale="small", **cases):
+    return {
+        "scale": scale,
+        "cases": {name: {"seconds": seconds, "peak_bytes": peak} for name, (seconds, peak) in cases.items()},
+    }
+
+
+class TestCompareBenchmarkResults:
+    """Regressions are flagged against the baseline above thresholds and noise floors"""
+
+    def test_time_and_memory_growth_over_threshold_is_a_regression(self):
+        """A slower case and a heavier case regress, a case within threshold does not"""
+        baseline = _results(slow=(1.0, 10 << 20), heavy=(1.0, 10 << 20), steady=(1.0, 10 << 20))
+        results = _results(slow=(1.5, 10 << 20), heavy=(1.0, 20 << 20), steady=(1.1, 11 << 20))
+
+        comparison = compare_benchmark_results(results, baseline, timeThreshold=0.2, memoryThreshold=0.2)
+
+        assert comparison["regressions"] == ["slow", "heavy"]
+        assert comparison["cases"]["slow"]["regressed"] == ["time"]
+        assert comparison["cases"]["heavy"]["regressed"] == ["memory"]
+        assert comparison["cases"]["steady"]["status"] == "ok"
+        assert comparison["cases"]["slow"]["time_ratio"] == pytest.approx(1.5)
+
+    def test_noise_floor_new_and_missing_cases(self):
+        """Tiny absolute growth is ignored, unknown cases are new and dropped ones are listed"""
+        baseline = _results(fast=(0.001, 1000), dropped=(1.0, None))
+        results = _results(fast=(0.003, 3000), added=(1.0, None))
+
+        comparison = compare_benchmark_results(results, baseline)
+
+        assert comparison["regressions"] == []
+        assert comparison["cases"]["fast"]["status"] == "ok"
+        assert comparison["cases"]["added"]["status"] == "new"
+        assert comparison["missing_cases"] == ["dropped"]
+
+    def test_different_scales_are_not_compared(self):
+        """Comparing a medium run with a small baseline is an error"""
+        with pytest.raises(ValueError):
+            compare_benchmark_results(_results("medium"), _results("small"))
+
+
+class TestRunBenchmarkSuite:
+    """The suite runs cases on a generated workload and round-trips its results"""
+
+    def test_selected_cases_report_time_and_memory(self, tmp_path):
+        """Each selected case gets seconds and peak bytes, and results compare with themselves"""
+        results = run_benchmark_suite(
+            scale="small",
+            cases=["series_build_numpy", "scheduler_pass", "log_payloads"],
+            workDir=tmp_path,
+            scaleOverrides=TINY_SCALE,
+        )
+        save_benchmark_results(tmp_path / "results.json", results)
+
+        assert list(results["cases"]) == ["series_build_numpy", "scheduler_pass", "log_payloads"]
+        assert results["workload"]["rows"] > 0
+        for case in results["cases"].values():
+            assert case["seconds"] >= 0
+            assert case["peak_bytes"] > 0
+        assert load_benchmark_results(tmp_path / "results.json") == results
+        assert compare_benchmark_results(results, results)["regressions"] == []
+
+    def test_unknown_case_is_rejected(self, tmp_path):
+        """A misspelled case name fails before the workload is generated"""
+        with pytest.raises(ValueError):
+            run_benchmark_suite(scale="small", cases=["resource_trees"], workDir=tmp_path)
+
+
+class TestBenchmarkMain:
+    """The module entry point runs like taskshift bench"""
+
+    def test_lowers_log_level_and_prints_only_the_report(self, monkeypatch, capsys):
+        """Logging is set to WARNING and results JSON is not dumped without --output"""
+        logLevels = []
+        results = _results(steady=(1.0, 10 << 20))
+        results["workload"] = {"rows": 10}
+        monkeypatch.setattr(suite, "setup_logger", lambda level: logLevels.append(level))
+        monkeypatch.setattr(suite, "run_benchmark_suite", lambda **kwargs: results)
+
+        assert main(["--cases", "log_payloads"]) == 0
+
+        output = capsys.readouterr().out
+        assert logLevels == ["WARNING"]
+        assert "steady" in output
+        assert '"cases"' not in output
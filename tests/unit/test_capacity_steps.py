@@ -0,0 +1,94 @@
+"""
+Unit tests for precompiled capacity step functions of the cluster config timeline
+"""
+
+from dataclasses import replace
+
+import numpy as np
+
+from config.models import NodeCountPeriod
+from storage.series import _ClusterConfigTimeline, compile_cluster_capacity_timeline
+from tests.fixtures.scheduler.scheduler_fixtures import build_mini_cluster_config
+
+BOUNDARY = 1_700_000_000
+FEATURES = ["type_a", "type_b", "type_d"]
+
+
+def _build_config_with_history():
+    config = build_mini_cluster_config()
+    config.node_groups[0] = replace(
+        config.node_groups[0],
+        history=[
+            NodeCountPeriod(node_count=2, start=None, end=BOUNDARY),
+            NodeCountPeriod(node_count=4, start=BOUNDARY, end=None),
+        ],
+    )
+    return config
+
+
+def _direct_feature_capacity(config, feature, timestamp, commissionTimestamp=None):
+    if commissionTimestamp is not None and timestamp < commissionTimestamp:
+        return {"cpu": 0, "gpu": 0}
+
+    return config.getFeatureCapacitiesAt(timestamp).get(feature, {"cpu": 0, "gpu": 0})
+
+
+class TestCompileCapacitySteps:
+    """Tests for _ClusterConfigTimeline.compileCapacitySteps"""
+
+    def test_steps_match_direct_evaluation(self):
+        """Compiled lookups agree with ClusterConfig around every change point"""
+        config = _build_config_with_history()
+        timeline = _ClusterConfigTimeline.from_cluster_config(config)
+        commission = {"type_b": BOUNDARY + 600}
+        forcedStarts = {"type_d": BOUNDARY + 1200}
+
+        compiled = timeline.compileCapacitySteps(
+            FEATURES,
+            featureCommissionTimestamps=commission,
+            forcedFeatureStartTimestamps=forcedStarts,
+        )
+
+        for timestamp in (0, BOUNDARY - 1, BOUNDARY, BOUNDARY + 600, BOUNDARY + 1199, BOUNDARY + 1200):
+            for feature in FEATURES:
+                assert compiled.getFeatureCapacityAt(feature, timestamp) == _direct_feature_capacity(
+                    config, feature, timestamp, commission.get(feature)
+                )
+            activeFeatures = {
+                feature for feature in FEATURES if forcedStarts.get(feature, 0) <= timestamp
+            }
+            assert compiled.getOverallCapacityAt(timestamp) == config.getClusterCapacitiesForFeaturesAt(
+                timestamp, activeFeatures
+            )
+
+    def test_vectorized_lookup_matches_scalar(self):
+        """lookup() over an array returns the same values as at() per timestamp"""
+        timeline = _ClusterConfigTimeline.from_cluster_config(_build_config_with_history())
+        stepFunction = timeline.compileCapacitySteps(FEATURES).features["type_a"]
+        timestamps = np.arange(BOUNDARY - 1800, BOUNDARY + 1800, 900, dtype=np.int64)
+
+        cpu, gpu = stepFunction.lookup(timestamps)
+
+        assert [stepFunction.at(timestamp) for timestamp in timestamps.tolist()] == [
+            {"cpu": int(cpuValue), "gpu": int(gpuValue)} for cpuValue, gpuValue in zip(cpu, gpu)
+        ]
+        assert cpu.tolist() == [8, 8, 16, 16]
+
+    def test_compiled_timeline_is_reused(self):
+        """The same feature set and start timestamps return the cached compilation"""
+        timeline = _ClusterConfigTimeline.from_cluster_config(build_mini_cluster_config())
+
+        first = timeline.compileCapacitySteps(FEATURES, featureCommissionTimestamps={"type_a": 10})
+
+        assert timeline.compileCapacitySteps(FEATURES, featureCommissionTimestamps={"type_a": 10}) is first
+        assert timeline.compileCapacitySteps(FEATURES) is not first
+
+    def test_public_compilation_uses_analysis_features(self):
+        """compile_cluster_capacity_timeline covers every analysed feature of the config"""
+        config = build_mini_cluster_config()
+
+        compiled = compile_cluster_capacity_timeline(clusterConfig=config)
+
+        assert sorted(compiled.features) == FEATURES
+        assert compiled.getFeatureCapacityAt("type_a", BOUNDARY) == {"cpu": 16, "gpu": 8}
+        assert compiled.getOverallCapacityAt(BOUNDARY) == {"cpu": 48, "gpu": 16}
@@ -2,7 +2,8 @@ from argparse import Namespace
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
-from cli import bootstrap_forecast_runtime, resolve_export_output_dir
+from cli import bootstrap_forecast_runtime, build_parser, resolve_export_output_dir
+from storage.constants import RAW_JOBS_COMPACTION_MIN_SEGMENTS
 
 
 class TestResolveExportOutputDir:
@@ -15,6 +16,26 @@ class TestResolveExportOutputDir:
         assert result.endswith("tmp/export-root")
 
 
+class TestCompactRawCacheArgument:
+    def test_min_segments_defaults_to_scheduled_threshold(self):
+        args = build_parser().parse_args(["compact-raw-cache"])
+
+        assert args.min_segments == RAW_JOBS_COMPACTION_MIN_SEGMENTS
+
+
+class TestSeriesGroupByArgument:
+    def test_export_and_rebuild_default_to_feature_breakdown(self):
+        parser = build_parser()
+
+        assert parser.parse_args(["export"]).series_group_by == ["feature"]
+        assert parser.parse_args(["rebuild-series"]).series_group_by == ["feature"]
+
+    def test_accepts_several_dimensions(self):
+        args = build_parser().parse_args(["rebuild-series", "--series-group-by", "feature", "partition"])
+
+        assert args.series_group_by == ["feature", "partition"]
+
+
 class TestBootstrapForecastRuntime:
     def _scheduler_config(self):
         config = MagicMock()
@@ -4,7 +4,7 @@ Unit tests for config.models.ClusterConfig
 
 import pytest
 
-from config.models import ClusterConfig
+from config.models import ClusterConfig, NodeCountPeriod
 from tests.fixtures.config.slurm_fixtures import (
     EXPECTED_NODE_GROUPS,
     EXPECTED_PARTITIONS,
@@ -191,6 +191,25 @@ class TestClusterConfigNodes:
         assert capacities["cn-040"]["cpu"] == 48
         assert capacities["cn-040"]["gpu"] == 0
 
+    def test_node_count_epoch_follows_history_boundaries(self, cluster_config):
+        """Timestamps between the same history boundaries share one epoch"""
+        node_group = cluster_config.node_groups[0]
+        node_group.history = [
+            NodeCountPeriod(node_count=1, start=None, end=2000),
+            NodeCountPeriod(node_count=node_group.node_count, start=2000, end=None),
+        ]
+
+        assert cluster_config.getNodeCountEpochAt(1000) == cluster_config.getNodeCountEpochAt(1999)
+        assert cluster_config.getNodeCountEpochAt(2000) != cluster_config.getNodeCountEpochAt(1999)
+        assert len(cluster_config.getNodeCapacitiesAt(2000)) == 40
+        assert len(cluster_config.getNodeCapacitiesAt(1000)) == 40 - (node_group.node_count - 1)
+
+    def test_node_capacities_at_returns_copies(self, cluster_config):
+        """Callers cannot corrupt the per-epoch capacity cache"""
+        cluster_config.getNodeCapacitiesAt(1000)["cn-001"]["features"].append("mutated")
+
+        assert cluster_config.getNodeCapacitiesAt(1000)["cn-001"]["features"] == ["type_a"]
+
     def test_get_cluster_capacities_at(self, cluster_config):
         """Test getting cluster total capacities"""
         timestamp = 1000
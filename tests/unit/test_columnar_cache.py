@@ -0,0 +1,102 @@
+"""
+Unit tests for the columnar raw job row cache
+"""
+
+import json
+from dataclasses import asdict, replace
+
+from storage.cache import (
+    load_cached_historical_job_columns,
+    load_cached_historical_job_rows,
+    save_cached_historical_job_rows,
+)
+from storage.columnar import ColumnarJobRows
+from storage.constants import RAW_JOBS_CACHE_DIR, RAW_JOBS_CACHE_FILE
+from storage.service import slurmStorage
+from tests.integration.synthetic_data import (
+    build_incremental_dataset,
+    build_standard_test_dataset,
+)
+
+
+def _sort_rows(rows):
+    return sorted(
+        rows,
+        key=lambda row: (row.time_start, row.id_job, row.job_db_inx if row.job_db_inx is not None else -1),
+    )
+
+
+def _build_duplicate_versions(rows):
+    first = rows[0]
+    return [
+        # Более новая версия без назначенных узлов проигрывает исходной строке
+        replace(first, job_db_inx=9001, nodelist="None assigned", mod_time=first.mod_time + 100),
+        # Полная копия с тем же счётом: остаётся строка, встреченная первой
+        replace(first, job_db_inx=9002),
+        replace(rows[1], job_db_inx=9003, mod_time=rows[1].mod_time + 50),
+    ]
+
+
+class TestColumnarJobRows:
+    """Tests for ColumnarJobRows encoding, persistence and selection"""
+
+    def test_historical_jobs_carry_decoded_tres(self):
+        """Jobs built from columns get the same TRES counts as direct decoding"""
+        rows = build_standard_test_dataset()
+        jobs = ColumnarJobRows.fromRows(rows).toHistoricalJobs()
+
+        assert [job.allocatedTres for job in jobs] == [row.toHistoricalJob().allocatedTres for row in rows]
+        assert [job.getAllocatedCpus() for job in jobs] == [
+            row.toHistoricalJob().getAllocatedCpus() for row in rows
+        ]
+
+    def test_save_and_load_roundtrip(self, tmp_path):
+        """Rows survive a save/load cycle unchanged, including None values"""
+        rows = build_standard_test_dataset()
+        rows[0] = replace(rows[0], job_db_inx=None, tres_alloc=None, partition=None)
+
+        save_cached_historical_job_rows(tmp_path / RAW_JOBS_CACHE_DIR, rows)
+
+        assert load_cached_historical_job_rows(tmp_path / RAW_JOBS_CACHE_DIR) == _sort_rows(rows)
+
+    def test_missing_cache_loads_empty(self, tmp_path):
+        """A fresh export root has no cached rows"""
+        assert len(load_cached_historical_job_columns(tmp_path / RAW_JOBS_CACHE_DIR)) == 0
+
+    def test_legacy_json_cache_is_migrated(self, tmp_path):
+        """An existing raw_job_rows.json is converted once and kept as .migrated"""
+        rows = build_standard_test_dataset()
+        legacyPath = tmp_path / RAW_JOBS_CACHE_FILE
+        legacyPath.write_text(json.dumps([asdict(row) for row in rows]), encoding="utf-8")
+
+        loaded = load_cached_historical_job_columns(tmp_path / RAW_JOBS_CACHE_DIR)
+
+        assert loaded.toRows() == _sort_rows(rows)
+        assert not legacyPath.exists()
+        assert (tmp_path / f"{RAW_JOBS_CACHE_FILE}.migrated").exists()
+        assert (tmp_path / RAW_JOBS_CACHE_DIR).is_dir()
+
+    def test_concat_remaps_string_codes(self):
+        """Concatenated parts share one string table without mixing values"""
+        rows = build_standard_test_dataset()
+        extraRows = build_incremental_dataset()
+
+        merged = ColumnarJobRows.concat(
+            [ColumnarJobRows.fromRows(rows), ColumnarJobRows.fromRows(extraRows)]
+        )
+
+        assert merged.toRows() == rows + extraRows
+        assert len(merged.strings) == len(set(merged.strings))
+
+    def test_preferred_versions_match_row_materialization(self):
+        """Columnar duplicate selection gives the same jobs as the row-based path"""
+        rows = build_standard_test_dataset()
+        rawRows = rows + _build_duplicate_versions(rows)
+        storage = slurmStorage()
+
+        expected = storage._materializeHistoricalJobs(rawRows)
+        actual = storage._materializeHistoricalJobs(ColumnarJobRows.fromRows(rawRows))
+
+        assert actual == expected
+        assert ColumnarJobRows.fromRows(rawRows).selectPreferredVersions()[1] == 3
+
@@ -244,6 +244,52 @@ class TestSchedulerConfigForecastFields:
         assert cloned.cluster_config_refresh_time == "01:15"
 
 
+class TestSchedulerConfigSeriesBuildWorkers:
+    def test_defaults_to_serial_build(self):
+        assert SchedulerConfig().series_build_workers == 1
+
+    def test_loads_and_copies_series_build_workers(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("TASKSHIFT_DB_CONFIG_FILE", str(tmp_path / "missing.env"))
+        config_path = tmp_path / "scheduler.yaml"
+        config_path.write_text("timelimit: 600\nseries_build_workers: 4\n", encoding="utf-8")
+
+        config = SchedulerConfig().loadConfig(str(config_path))
+
+        assert config.series_build_workers == 4
+        assert config.copy().series_build_workers == 4
+        assert config.to_dict()["series_build_workers"] == 4
+
+    @pytest.mark.parametrize("value", ["0", "2.5"])
+    def test_rejects_invalid_series_build_workers(self, tmp_path, monkeypatch, value):
+        monkeypatch.setenv("TASKSHIFT_DB_CONFIG_FILE", str(tmp_path / "missing.env"))
+        config_path = tmp_path / "scheduler.yaml"
+        config_path.write_text(f"timelimit: 600\nseries_build_workers: {value}\n", encoding="utf-8")
+
+        with pytest.raises(ValueError, match="series_build_workers"):
+            SchedulerConfig().loadConfig(str(config_path))
+
+
+class TestSchedulerConfigResourceTreeEngine:
+    def test_loads_and_copies_resource_tree_engine(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("TASKSHIFT_DB_CONFIG_FILE", str(tmp_path / "missing.env"))
+        config_path = tmp_path / "scheduler.yaml"
+        config_path.write_text("timelimit: 600\nresource_tree_engine: numpy\n", encoding="utf-8")
+
+        config = SchedulerConfig().loadConfig(str(config_path))
+
+        assert SchedulerConfig().resource_tree_engine == "python"
+        assert config.copy().resource_tree_engine == "numpy"
+        assert config.to_dict()["resource_tree_engine"] == "numpy"
+
+    def test_rejects_unknown_resource_tree_engine(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("TASKSHIFT_DB_CONFIG_FILE", str(tmp_path / "missing.env"))
+        config_path = tmp_path / "scheduler.yaml"
+        config_path.write_text("timelimit: 600\nresource_tree_engine: arrays\n", encoding="utf-8")
+
+        with pytest.raises(ValueError, match="resource_tree_engine"):
+            SchedulerConfig().loadConfig(str(config_path))
+
+
 class TestSchedulerConfigConnectorFields:
     def test_defaults_include_mserver_connector_fields(self):
         config = SchedulerConfig()
@@ -0,0 +1,146 @@
+"""
+Unit tests for the process-wide slurmDB connection pool
+"""
+
+import threading
+
+import pytest
+
+from storage import repository
+from storage.repository import SlurmDBConnectionPool, SlurmDBRepository
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, query, params=()):
+        self.connection.statements.append((query, params))
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, serverInfo="10.11.6-MariaDB"):
+        self.serverInfo = serverInfo
+        self.statements = []
+        self.alive = True
+        self.closed = False
+
+    def get_server_info(self):
+        return self.serverInfo
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise OSError("MySQL Connection not available")
+
+    def close(self):
+        self.closed = True
+
+
+def _build_pool(size=2, timeoutSeconds=0.05, statementTimeoutSeconds=0, serverInfo="10.11.6-MariaDB"):
+    connections = []
+
+    def connect():
+        connections.append(FakeConnection(serverInfo))
+        return connections[-1]
+
+    pool = SlurmDBConnectionPool(
+        connect,
+        size=size,
+        timeoutSeconds=timeoutSeconds,
+        statementTimeoutSeconds=statementTimeoutSeconds,
+    )
+    return pool, connections
+
+
+class TestSlurmDBConnectionPool:
+    """Connections are reused across repository sessions"""
+
+    def test_repository_sessions_reuse_one_connection(self):
+        """Create/close cycles, like scheduler ticks, open a single connection"""
+        pool, connections = _build_pool()
+
+        for _ in range(5):
+            storage = SlurmDBRepository(pool=pool).create()
+            storage.close()
+
+        assert len(connections) == 1
+        assert pool.getMetrics()["connections_created"] == 1
+        assert pool.getMetrics()["connections_reused"] == 4
+        assert pool.getMetrics()["idle"] == 1
+
+    def test_stale_connection_is_replaced(self):
+        """An idle connection that fails ping is closed and a new one is opened"""
+        pool, connections = _build_pool()
+        with pool.connection():
+            pass
+        connections[0].alive = False
+
+        with pool.connection() as connection:
+            assert connection is connections[1]
+
+        assert connections[0].closed
+        assert pool.getMetrics()["stale_connections_replaced"] == 1
+        assert pool.getMetrics()["open"] == 1
+
+    def test_exhausted_pool_waits_then_times_out(self):
+        """Acquire blocks until a release and fails after the pool timeout"""
+        pool, _ = _build_pool(size=1, timeoutSeconds=1.0)
+        first = pool.acquire()
+        threading.Timer(0.05, pool.release, args=(first,)).start()
+
+        assert pool.acquire() is first
+        pool.timeoutSeconds = 0.05
+        with pytest.raises(TimeoutError):
+            pool.acquire()
+        assert pool.getMetrics()["acquire_waits"] == 1
+        assert pool.getMetrics()["acquire_timeouts"] == 1
+
+    @pytest.mark.parametrize(
+        ("serverInfo", "expected"),
+        [
+            ("10.11.6-MariaDB", ("SET SESSION max_statement_time = %s", (2.5,))),
+            ("8.0.36", ("SET SESSION max_execution_time = %s", (2500,))),
+        ],
+    )
+    def test_statement_timeout_is_set_per_connection(self, serverInfo, expected):
+        """New connections get the session statement limit of their server flavour"""
+        pool, connections = _build_pool(statementTimeoutSeconds=2.5, serverInfo=serverInfo)
+
+        with pool.connection():
+            pass
+        with pool.connection():
+            pass
+
+        assert connections[0].statements == [expected]
+
+    def test_failed_session_discards_connection(self):
+        """A connection used by a failed block is not handed out again"""
+        pool, connections = _build_pool()
+
+        with pytest.raises(RuntimeError):
+            with pool.connection():
+                raise RuntimeError("query failed")
+
+        assert connections[0].closed
+        assert pool.getMetrics()["open"] == 0
+
+    def test_process_pool_is_recreated_after_fork(self, monkeypatch):
+        """A pool inherited from the parent process is not reused by the child"""
+        created = []
+        monkeypatch.setattr(repository, "_CONNECTION_POOL", None)
+        monkeypatch.setattr(
+            repository, "_create_connection_pool", lambda: created.append(_build_pool()[0]) or created[-1]
+        )
+
+        first = repository.get_connection_pool()
+        assert repository.get_connection_pool() is first
+        first.pid = -1
+
+        assert repository.get_connection_pool() is not first
+        assert len(created) == 2
@@ -0,0 +1,269 @@
+"""
+Unit tests for partition and node group utilization series
+"""
+
+import json
+import random
+from dataclasses import replace
+
+import pytest
+
+from storage import series_parallel
+from storage.constants import SERIES_DIR
+from storage.jsonio import list_json_files, load_json
+from storage.series import (
+    build_historical_utilization_series,
+    build_historical_utilization_tail,
+    merge_historical_utilization_tail,
+    write_historical_utilization_series,
+)
+from storage.service import slurmStorage
+from tests.fixtures.scheduler.scheduler_fixtures import build_mini_cluster_config
+from tests.integration.synthetic_data import (
+    BASE_TIME,
+    INTERVAL_15M,
+    INTERVAL_1H,
+    SyntheticJobFactory,
+    build_incremental_dataset,
+    build_standard_test_dataset,
+)
+
+ALL_DIMENSIONS = ("feature", "partition", "node_group")
+FIRST_NOW = BASE_TIME + 6 * INTERVAL_1H
+SECOND_NOW = BASE_TIME + 9 * INTERVAL_1H
+
+
+def _build_jobs():
+    generator = random.Random(3)
+    jobs = [
+        row.toHistoricalJob()
+        for row in build_standard_test_dataset() + build_incremental_dataset()
+    ]
+    for job in jobs:
+        job.partition = generator.choice(["normal", "gpu_only"])
+    return jobs
+
+
+def _build(jobs, groupBy, engine="python", workers=1):
+    return build_historical_utilization_series(
+        jobs=jobs,
+        clusterConfig=build_mini_cluster_config(),
+        nowTimestamp=max(job.timeStart for job in jobs) + 3 * INTERVAL_15M,
+        engine=engine,
+        workers=workers,
+        groupBy=groupBy,
+    )
+
+
+def _finish_running_rows(rows, endTimestamp):
+    return [
+        replace(row, time_end=endTimestamp, state=3, mod_time=endTimestamp)
+        for row in rows
+        if row.time_start > 0 and row.time_end == 0
+    ]
+
+
+def _load_series_tree(seriesDir):
+    return {
+        path.relative_to(seriesDir).as_posix(): json.loads(path.read_text(encoding="utf-8"))
+        for path in sorted(seriesDir.rglob("*.json"))
+        if path.name != "metadata.json"
+    }
+
+
+class TestGroupedSeries:
+    """All breakdowns come out of one event pass"""
+
+    def test_default_keeps_feature_breakdown(self):
+        """Without groupBy the output holds only feature series and overall"""
+        series = build_historical_utilization_series(
+            jobs=_build_jobs(), clusterConfig=build_mini_cluster_config()
+        )
+
+        assert list(series) == ["type_a", "type_b", "type_d", "overall"]
+
+    @pytest.mark.parametrize("engine", ["python", "numpy"])
+    def test_grouped_build_matches_single_dimension_builds(self, engine):
+        """One pass over all dimensions gives the series of separate runs"""
+        jobs = _build_jobs()
+
+        grouped = _build(jobs, ALL_DIMENSIONS, engine=engine)
+
+        expected = {}
+        for dimension in ALL_DIMENSIONS:
+            expected.update(_build(jobs, (dimension,), engine=engine))
+        assert grouped == expected
+        assert "partition:gpu_only" in grouped
+        assert grouped["overall"] == _build(jobs, ("feature",), engine=engine)["overall"]
+
+    def test_node_groups_match_single_feature_groups(self):
+        """Every mini cluster node group carries one feature, so the series coincide"""
+        series = _build(_build_jobs(), ALL_DIMENSIONS)
+
+        assert series["node_group:cn-[001-004]"] == series["type_a"]
+        assert series["node_group:cn-[005-006]"] == series["type_b"]
+        assert series["node_group:cn-[007-008]"] == series["type_d"]
+
+    def test_partition_capacity_counts_partition_nodes(self):
+        """A partition series divides by the capacity of the partition nodes only"""
+        factory = SyntheticJobFactory()
+        job = factory.running_gpu_job(feature="type_a", node="cn-001", gpus=2).toHistoricalJob()
+        job.partition = "gpu_only"
+        nowTimestamp = job.timeStart + 2 * INTERVAL_15M
+
+        series = build_historical_utilization_series(
+            jobs=[job],
+            clusterConfig=build_mini_cluster_config(),
+            nowTimestamp=nowTimestamp,
+            groupBy=("partition",),
+        )
+
+        point = series["partition:gpu_only"][-1]
+        assert point["cpu"] == pytest.approx(100.0 * job.getAllocatedCpus() / 32)
+        assert point["gpu"] == pytest.approx(100.0 * 2 / 16)
+        assert all(value["cpu"] == 0.0 for value in series["partition:normal"])
+
+    def test_parallel_grouped_build_matches_serial(self, monkeypatch):
+        """Chunked collection keeps group deltas apart from feature deltas"""
+        monkeypatch.setattr(series_parallel, "PARALLEL_EVENT_MIN_JOBS_PER_CHUNK", 3)
+        jobs = _build_jobs()
+
+        assert _build(jobs, ALL_DIMENSIONS, workers=3) == _build(jobs, ALL_DIMENSIONS)
+
+    def test_unknown_dimension_is_rejected(self):
+        """Misspelled dimensions fail instead of silently dropping a breakdown"""
+        with pytest.raises(ValueError):
+            _build(_build_jobs(), ("feature", "racks"))
+
+
+class TestGroupedSeriesFiles:
+    """Group series live apart from feature files and do not outlive their export"""
+
+    def test_groups_are_written_under_groups_dir(self, tmp_path):
+        """Feature readers listing the series directory only see features and overall"""
+        series = _build(_build_jobs(), ALL_DIMENSIONS)
+
+        write_historical_utilization_series(tmp_path, series)
+
+        assert (tmp_path / "groups" / "partition" / "gpu_only.json").exists()
+        assert (tmp_path / "groups" / "node_group" / "cn-[001-004].npy").exists()
+        assert (tmp_path / "groups" / "partition" / "rollups" / "1h" / "normal.npy").exists()
+        assert [path.stem for path in list_json_files(tmp_path)] == [
+            "metadata",
+            "overall",
+            "type_a",
+            "type_b",
+            "type_d",
+        ]
+        metadata = load_json(tmp_path / "metadata.json")
+        assert metadata["features"] == ["overall", "type_a", "type_b", "type_d"]
+        assert "partition:normal" in metadata["groups"]
+        assert "groups/partition/normal.json" in metadata["files"]
+
+    def test_later_export_removes_stale_groups(self, tmp_path):
+        """Dropped dimensions and groups lose their files and rollups"""
+        jobs = _build_jobs()
+        write_historical_utilization_series(tmp_path, _build(jobs, ALL_DIMENSIONS))
+
+        partitionSeries = _build(jobs, ("feature", "partition"))
+        del partitionSeries["partition:gpu_only"]
+        write_historical_utilization_series(tmp_path, partitionSeries)
+
+        assert not (tmp_path / "groups" / "node_group").exists()
+        assert sorted(
+            path.relative_to(tmp_path / "groups").as_posix()
+            for path in (tmp_path / "groups").rglob("*")
+            if path.is_file()
+        ) == [
+            "partition/normal.json",
+            "partition/normal.npy",
+            "partition/rollups/1d/normal.npy",
+            "partition/rollups/1h/normal.npy",
+            "partition/rollups/6h/normal.npy",
+        ]
+
+        write_historical_utilization_series(tmp_path, _build(jobs, ("feature",)))
+
+        assert list((tmp_path / "groups").rglob("*")) == []
+
+
+class TestGroupedSeriesTail:
+    """Checkpointed tail refreshes keep the requested breakdowns"""
+
+    @pytest.mark.parametrize("groupBy", [ALL_DIMENSIONS, ("partition", "node_group")])
+    def test_checkpointed_tail_matches_full_rebuild(self, groupBy):
+        """Appending the grouped tail gives the same series as a full grouped rebuild"""
+        rows = build_standard_test_dataset()
+        config = build_mini_cluster_config()
+        series, checkpoint = build_historical_utilization_tail(
+            jobs=[row.toHistoricalJob() for row in rows],
+            clusterConfig=config,
+            nowTimestamp=FIRST_NOW,
+            groupBy=groupBy,
+        )
+
+        finishedRows = _finish_running_rows(rows, FIRST_NOW + 1800)
+        finishedIds = {row.id_job for row in finishedRows}
+        allRows = [
+            row for row in rows if row.id_job not in finishedIds
+        ] + finishedRows + build_incremental_dataset()
+        tailSeries, nextCheckpoint = build_historical_utilization_tail(
+            jobs=[
+                row.toHistoricalJob()
+                for row in allRows
+                if row.time_start >= checkpoint["boundary"]
+            ],
+            checkpoint=checkpoint,
+            clusterConfig=config,
+            nowTimestamp=SECOND_NOW,
+            groupBy=groupBy,
+        )
+
+        expected = build_historical_utilization_series(
+            jobs=[row.toHistoricalJob() for row in allRows],
+            clusterConfig=config,
+            nowTimestamp=SECOND_NOW,
+            groupBy=groupBy,
+        )
+        assert merge_historical_utilization_tail(series, tailSeries, checkpoint) == expected
+        assert nextCheckpoint["group_by"] == list(groupBy)
+        assert "partition:normal" in nextCheckpoint["prefix_lengths"]
+
+    def test_group_by_change_requires_full_rebuild(self):
+        """A checkpoint taken for other breakdowns is not reused"""
+        rows = build_standard_test_dataset()
+        config = build_mini_cluster_config()
+        _, checkpoint = build_historical_utilization_tail(
+            jobs=[row.toHistoricalJob() for row in rows],
+            clusterConfig=config,
+            nowTimestamp=FIRST_NOW,
+        )
+
+        assert build_historical_utilization_tail(
+            jobs=[],
+            checkpoint=checkpoint,
+            clusterConfig=config,
+            nowTimestamp=SECOND_NOW,
+            groupBy=ALL_DIMENSIONS,
+        ) == (None, None)
+
+    def test_tail_only_export_matches_full_export(self, tmp_path):
+        """Incremental exports write and refresh group series like full exports"""
+        rows = build_standard_test_dataset()
+        updates = _finish_running_rows(rows, FIRST_NOW + 1800) + build_incremental_dataset()
+        config = build_mini_cluster_config()
+
+        for exportDir, tailOnly in ((tmp_path / "tail", True), (tmp_path / "full", False)):
+            for jobsOverride, nowTimestamp in ((rows, FIRST_NOW), (updates, SECOND_NOW)):
+                slurmStorage().exportIncrementalHistoricalUtilization(
+                    outputDir=exportDir,
+                    clusterConfig=config,
+                    jobsOverride=jobsOverride,
+                    nowTimestamp=nowTimestamp,
+                    tailOnly=tailOnly,
+                    seriesGroupBy=ALL_DIMENSIONS,
+                )
+
+        tailSeries = _load_series_tree(tmp_path / "tail" / SERIES_DIR)
+        assert "groups/partition/normal.json" in tailSeries
+        assert tailSeries == _load_series_tree(tmp_path / "full" / SERIES_DIR)
@@ -0,0 +1,105 @@
+"""
+Unit tests for streaming historical job fetches from slurmDB
+"""
+
+import dataclasses
+
+from storage.cache import load_cached_historical_job_rows
+from storage.constants import RAW_JOBS_CACHE_DIR
+from storage.repository import SlurmDBRepository
+from storage.service import slurmStorage
+from tests.integration.synthetic_data import build_incremental_dataset, build_standard_test_dataset
+
+
+class FakeStreamingCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.position = 0
+        self.fetchSizes = []
+        self.buffered = None
+        self.closed = False
+
+    def execute(self, query, params=()):
+        self.query = query
+        self.params = params
+
+    def fetchmany(self, size):
+        self.fetchSizes.append(size)
+        batch = self.rows[self.position:self.position + size]
+        self.position += len(batch)
+        return batch
+
+    def close(self):
+        self.closed = True
+
+
+class FakeStreamingConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.cursors = []
+
+    def cursor(self, buffered=None):
+        cursor = FakeStreamingCursor(self.rows)
+        cursor.buffered = buffered
+        self.cursors.append(cursor)
+        return cursor
+
+
+def _as_db_tuples(rows):
+    return [dataclasses.astuple(row) for row in rows]
+
+
+def _build_repository(rows):
+    repository = SlurmDBRepository()
+    repository.connection = FakeStreamingConnection(_as_db_tuples(rows))
+    return repository
+
+
+class TestHistoricalFetchStream:
+    """Rows arrive in fetchmany batches from an unbuffered cursor"""
+
+    def test_batches_follow_fetchmany_size(self):
+        """Each batch holds at most batchSize typed rows"""
+        rows = build_standard_test_dataset()
+        repository = _build_repository(rows)
+
+        batches = list(repository.iter_historical_job_row_batches(modifiedFrom=0, batchSize=3))
+
+        cursor = repository.connection.cursors[0]
+        assert cursor.buffered is False
+        assert cursor.params == (0,)
+        assert [len(batch) for batch in batches[:-1]] == [3] * (len(batches) - 1)
+        assert [row for batch in batches for row in batch] == rows
+        assert cursor.closed
+
+    def test_list_method_wraps_stream(self):
+        """get_historical_job_rows returns the same rows as the generator"""
+        rows = build_standard_test_dataset()
+
+        assert _build_repository(rows).get_historical_job_rows() == rows
+        assert list(_build_repository(rows).iter_historical_job_rows(batchSize=2)) == rows
+
+    def test_abandoned_stream_closes_cursor(self):
+        """Stopping early still closes the cursor so the connection can go back to the pool"""
+        repository = _build_repository(build_standard_test_dataset())
+
+        stream = repository.iter_historical_job_rows(batchSize=2)
+        next(stream)
+        stream.close()
+
+        cursor = repository.connection.cursors[0]
+        assert cursor.closed
+        assert cursor.fetchSizes == [2]
+
+    def test_sync_writes_streamed_rows_to_cache(self, tmp_path):
+        """A full sync encodes the stream batch by batch into the raw cache"""
+        rows = build_standard_test_dataset() + build_incremental_dataset()
+        storage = slurmStorage()
+        storage.repository = _build_repository(rows)
+
+        jobs, _, state = storage.syncHistoricalJobsCache(outputDir=tmp_path)
+
+        cached = load_cached_historical_job_rows(tmp_path / RAW_JOBS_CACHE_DIR)
+        assert sorted(cached, key=lambda row: row.job_db_inx) == sorted(rows, key=lambda row: row.job_db_inx)
+        assert state["last_mod_time"] == max(row.mod_time for row in rows)
+        assert len(jobs) == len({row.id_job for row in rows})
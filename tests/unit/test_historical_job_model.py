@@ -5,6 +5,7 @@ Unit tests for storage.models module - HistoricalJob and RawHistoricalJobRow
 import pytest
 
 from storage.models import HistoricalJob, RawHistoricalJobRow
+from storage.tres_codes import EMPTY_TRES_COUNTS, decode_tres
 from tests.fixtures.storage.storage_fixtures import (
     COMPLETED_JOB_RAW,
     OLD_JOB_RAW,
@@ -140,6 +141,43 @@ class TestHistoricalJobResources:
         assert job.getAllocatedCpus() == 616  # Code 1 = cpu
 
 
+class TestTresDecoding:
+    """Tests for TRES strings decoded once at job creation"""
+
+    def test_decode_typed_gpus_and_memory(self):
+        """Typed GPU codes and memory get their own fields"""
+        counts = decode_tres("1=16,2=64000,4=2,1001=4,gres/gpu:a100=4,1009=2")
+        assert (counts.cpu, counts.mem, counts.node, counts.gpu) == (16, 64000, 2, 4)
+        assert counts.gpuA100 == 4
+        assert counts.gpuH200 == 2
+
+    def test_decode_skips_invalid_and_keeps_last_duplicate(self):
+        """Invalid amounts are skipped and a repeated key keeps its last amount"""
+        counts = decode_tres("1001=2,1=abc,1001=4,1001=")
+        assert counts.gpu == 4
+        assert counts.cpu == 0
+        assert decode_tres("") is EMPTY_TRES_COUNTS
+        assert decode_tres(None) is EMPTY_TRES_COUNTS
+
+    def test_identical_strings_share_decoded_counts(self):
+        """Jobs with the same TRES string reuse one decoded instance"""
+        first = create_historical_job(jobID=1, tresAlloc="1=8,4=1,1001=2")
+        second = create_historical_job(jobID=2, tresAlloc="1=8,4=1,1001=2")
+        assert first.allocatedTres is second.allocatedTres
+
+    def test_decoded_fields_do_not_affect_equality(self):
+        """Pre-decoded counts do not change equality or serialization"""
+        job = create_historical_job(tresAlloc="1=8,4=1")
+        restored = HistoricalJob.from_dict(job.to_dict())
+        assert restored == job
+        assert "allocatedTres" not in job.to_dict()
+
+    def test_jobs_use_slots(self):
+        """Job models keep no per-instance __dict__"""
+        assert not hasattr(create_historical_job(), "__dict__")
+        assert not hasattr(create_raw_historical_job_row(), "__dict__")
+
+
 class TestHistoricalJobEffectiveEnd:
     """Tests for HistoricalJob.getEffectiveEnd()"""
 
@@ -0,0 +1,177 @@
+"""
+Unit tests for the parallel range-partitioned history backfill
+"""
+
+import dataclasses
+import threading
+
+import pytest
+
+from storage.backfill import split_mod_time_range
+from storage.cache import load_cached_historical_job_rows, load_state
+from storage.constants import RAW_JOBS_CACHE_DIR, STATE_FILE
+from storage.repository import SlurmDBConnectionPool
+from storage.service import slurmStorage
+from tests.integration.synthetic_data import build_incremental_dataset, build_standard_test_dataset
+
+HISTORY_START = 1_700_000_000
+MODIFIED_UNTIL = 1_700_030_000
+# 4320 секунд: история тестового набора делится на 7 кусков.
+CHUNK_DAYS = 0.05
+
+
+class FakeSlurmDB:
+    def __init__(self, rows, failingChunkStart=None):
+        self.rows = [dataclasses.astuple(row) for row in rows]
+        self.failingChunkStart = failingChunkStart
+        self.queries = []
+        self.lock = threading.Lock()
+
+    def connect(self):
+        return FakeConnection(self)
+
+
+class FakeConnection:
+    def __init__(self, database):
+        self.database = database
+
+    def cursor(self, buffered=None):
+        return FakeCursor(self.database)
+
+    def ping(self, reconnect=False):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeCursor:
+    def __init__(self, database):
+        self.database = database
+        self.rows = []
+
+    def execute(self, query, params=()):
+        params = list(params)
+        filters = {}
+        for operator in ("mod_time > %s", "mod_time >= %s", "mod_time <= %s"):
+            if operator in query:
+                filters[operator] = params.pop(0)
+
+        with self.database.lock:
+            self.database.queries.append(filters)
+        failingChunkStart = self.database.failingChunkStart
+        if failingChunkStart is not None and filters.get("mod_time >= %s") == failingChunkStart:
+            raise RuntimeError("Lost connection to MySQL server during query")
+
+        self.rows = [
+            row
+            for row in self.database.rows
+            if row[13] > filters.get("mod_time > %s", -1)
+            and row[13] >= filters.get("mod_time >= %s", -1)
+            and row[13] <= filters.get("mod_time <= %s", float("inf"))
+        ]
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def close(self):
+        pass
+
+
+def _build_storage(database, poolSize=4, **poolKwargs):
+    storage = slurmStorage()
+    storage.repository.pool = SlurmDBConnectionPool(database.connect, size=poolSize, **poolKwargs)
+    return storage.create()
+
+
+def _sync(storage, outputDir, **kwargs):
+    return storage.syncHistoricalJobsCache(
+        outputDir=outputDir,
+        historyStart=HISTORY_START,
+        modifiedUntil=MODIFIED_UNTIL,
+        backfillChunkDays=CHUNK_DAYS,
+        **kwargs,
+    )
+
+
+def _sorted_rows(rows):
+    return sorted(rows, key=lambda row: row.job_db_inx)
+
+
+class TestHistoryBackfill:
+    """Chunked backfill fills the cache like one big query and can resume"""
+
+    def test_chunks_cover_range_without_overlap(self):
+        """Every mod_time of the range falls into exactly one chunk"""
+        chunks = split_mod_time_range(10, 35, 10)
+
+        assert chunks == [(10, 19), (20, 29), (30, 35)]
+        with pytest.raises(ValueError):
+            split_mod_time_range(10, 35, 0)
+
+    def test_backfill_matches_single_query_sync(self, tmp_path):
+        """Concurrent chunks produce the same cache and state as one query"""
+        rows = build_standard_test_dataset() + build_incremental_dataset()
+        database = FakeSlurmDB(rows)
+
+        jobs, _, state = _sync(_build_storage(database), tmp_path / "backfill", backfillWorkers=3)
+        expectedJobs, _, expectedState = slurmStorage.syncHistoricalJobsCache(
+            _build_storage(FakeSlurmDB(rows)),
+            outputDir=tmp_path / "single",
+            historyStart=HISTORY_START,
+            modifiedUntil=MODIFIED_UNTIL,
+        )
+
+        assert len(database.queries) == 7
+        assert _sorted_rows(load_cached_historical_job_rows(tmp_path / "backfill" / RAW_JOBS_CACHE_DIR)) == _sorted_rows(rows)
+        assert list(jobs) == list(expectedJobs)
+        assert "backfill" not in state
+        assert {key: state[key] for key in ("history_start", "last_mod_time", "job_count")} == {
+            key: expectedState[key] for key in ("history_start", "last_mod_time", "job_count")
+        }
+
+    def test_interrupted_backfill_resumes_pending_chunks(self, tmp_path):
+        """Completed chunks are checkpointed and not fetched again"""
+        rows = build_standard_test_dataset() + build_incremental_dataset()
+        failingChunkStart = HISTORY_START + 2 * 4320
+        database = FakeSlurmDB(rows, failingChunkStart=failingChunkStart)
+
+        with pytest.raises(RuntimeError):
+            _sync(_build_storage(database), tmp_path, backfillWorkers=1)
+
+        backfillState = load_state(tmp_path / STATE_FILE)["backfill"]
+        assert backfillState["completed_chunks"] == [HISTORY_START, HISTORY_START + 4320]
+
+        resumedDatabase = FakeSlurmDB(rows)
+        jobs, _, state = slurmStorage.syncHistoricalJobsCache(_build_storage(resumedDatabase), outputDir=tmp_path)
+
+        assert sorted(query["mod_time >= %s"] for query in resumedDatabase.queries) == [
+            HISTORY_START + index * 4320 for index in range(2, 7)
+        ]
+        assert _sorted_rows(load_cached_historical_job_rows(tmp_path / RAW_JOBS_CACHE_DIR)) == _sorted_rows(rows)
+        assert state["last_mod_time"] == max(row.mod_time for row in rows)
+
+    def test_sync_after_backfill_is_incremental(self, tmp_path):
+        """Once finished, the next sync asks only for rows after last_mod_time"""
+        rows = build_standard_test_dataset()
+        _sync(_build_storage(FakeSlurmDB(rows)), tmp_path, backfillWorkers=2)
+        database = FakeSlurmDB(rows + build_incremental_dataset())
+
+        _sync(_build_storage(database), tmp_path)
+
+        assert database.queries == [
+            {"mod_time > %s": max(row.mod_time for row in rows), "mod_time <= %s": MODIFIED_UNTIL}
+        ]
+
+    def test_backfill_with_single_connection_pool(self, tmp_path):
+        """With DB_POOL_SIZE=1 the chunks are fetched in turn on the storage's own connection"""
+        rows = build_standard_test_dataset() + build_incremental_dataset()
+        database = FakeSlurmDB(rows)
+
+        jobs, _, state = _sync(_build_storage(database, poolSize=1, timeoutSeconds=1), tmp_path, backfillWorkers=3)
+
+        assert len(database.queries) == 7
+        assert _sorted_rows(load_cached_historical_job_rows(tmp_path / RAW_JOBS_CACHE_DIR)) == _sorted_rows(rows)
+        assert "backfill" not in state
+        assert state["last_mod_time"] == max(row.mod_time for row in rows)
@@ -0,0 +1,123 @@
+"""
+Unit tests for the historical job interval index
+"""
+
+import random
+
+import pytest
+
+from scheduler.resources import ResourceAvailabilityTree
+from storage import job_index
+from storage.cache import save_cached_historical_job_rows
+from storage.constants import RAW_JOBS_CACHE_DIR
+from storage.job_index import HistoricalJobIntervalIndex
+from storage.service import slurmStorage
+from tests.fixtures.scheduler.scheduler_fixtures import (
+    build_mini_cluster_config,
+    create_running_gpu_job,
+    create_running_job,
+)
+from tests.integration.synthetic_data import build_standard_test_dataset
+
+START = 1_700_000_000
+
+
+def _build_random_jobs(count=600):
+    random.seed(11)
+    jobs = []
+    for jobID in range(1, count + 1):
+        timeStart = START + random.randint(0, 20_000)
+        job = create_running_job(
+            jobID=jobID,
+            timeStart=timeStart,
+            nodelist=random.choice(["cn-001", "cn-005", "cn-[001,007]"]),
+            partition=random.choice(["normal", "gpu"]),
+        )
+        job.timeEnd = random.choice([0, timeStart + random.randint(0, 3_000)])
+        jobs.append(job)
+    return jobs
+
+
+def _is_running(job, timestamp):
+    return job.timeStart <= timestamp and (job.timeEnd == 0 or job.timeEnd > timestamp)
+
+
+class TestHistoricalJobIntervalIndex:
+    """Stabbing and range queries agree with a linear scan"""
+
+    @pytest.fixture(autouse=True)
+    def _small_leaves(self, monkeypatch):
+        monkeypatch.setattr(job_index, "INTERVAL_TREE_LEAF_SIZE", 4)
+
+    def test_running_jobs_match_scan(self):
+        """Jobs running at T are those with start <= T < end"""
+        jobs = _build_random_jobs()
+        index = HistoricalJobIntervalIndex(jobs)
+
+        for timestamp in range(START - 100, START + 24_000, 397):
+            expected = sorted(
+                (job for job in jobs if job.timeEnd != job.timeStart and _is_running(job, timestamp)),
+                key=lambda job: (job.timeStart, job.jobID),
+            )
+            assert index.getRunningJobs(timestamp) == expected
+
+    def test_range_queries_filter_by_feature_and_partition(self):
+        """Range overlap honours the nodelist feature and the partition"""
+        jobs = _build_random_jobs()
+        index = HistoricalJobIntervalIndex(jobs, clusterConfig=build_mini_cluster_config())
+
+        for startTimestamp in range(START, START + 22_000, 1_531):
+            endTimestamp = startTimestamp + 900
+            found = index.getJobsInRange(
+                startTimestamp, endTimestamp, feature="type_d", partition="gpu"
+            )
+            expected = [
+                job
+                for job in jobs
+                if job.timeEnd != job.timeStart
+                and job.nodelist == "cn-[001,007]"
+                and job.partition == "gpu"
+                and job.timeStart < endTimestamp
+                and (job.timeEnd == 0 or job.timeEnd > startTimestamp)
+            ]
+            assert sorted(job.jobID for job in found) == sorted(job.jobID for job in expected)
+
+    def test_feature_query_requires_cluster_config(self):
+        """Feature filters cannot be resolved without a cluster config"""
+        index = HistoricalJobIntervalIndex(_build_random_jobs(10))
+
+        with pytest.raises(ValueError):
+            index.getRunningJobs(START + 100, feature="type_a")
+
+
+class TestPastResourceTree:
+    """Resource trees rebuilt from the index at a past time"""
+
+    def test_tree_from_index_matches_running_jobs(self):
+        """A tree built from the index at a past time reserves only jobs running then"""
+        finished = create_running_gpu_job(jobID=1, timeStart=START, nodelist="cn-007")
+        finished.timeEnd = START + 600
+        running = create_running_gpu_job(jobID=2, timeStart=START + 300, nodelist="cn-008")
+        index = HistoricalJobIntervalIndex([finished, running])
+        config = build_mini_cluster_config()
+
+        tree = ResourceAvailabilityTree.fromClusterAndJobs(config, index.getRunningJobs(START + 900), START + 900)
+
+        nodes = {node.nodeName: node for node in tree.nodesByFeature["type_d"]}
+        assert nodes["cn-007"].usedGpu == 0
+        assert nodes["cn-008"].usedGpu == 2
+
+    def test_storage_loads_index_from_raw_cache(self, tmp_path):
+        """The index is built from the local raw cache without the database"""
+        rows = build_standard_test_dataset()
+        save_cached_historical_job_rows(tmp_path / RAW_JOBS_CACHE_DIR, rows)
+
+        index = slurmStorage().loadHistoricalJobIndex(outputDir=tmp_path)
+
+        timestamp = sorted(row.time_start for row in rows)[len(rows) // 2]
+        expected = {
+            row.id_job
+            for row in rows
+            if 0 < row.time_start <= timestamp and (row.time_end == 0 or row.time_end > timestamp)
+        }
+        assert {job.jobID for job in index.getRunningJobs(timestamp)} == expected
@@ -0,0 +1,146 @@
+"""
+Unit tests for the local SQLite mirror of linux_job_table
+"""
+
+import sqlite3
+
+import pytest
+
+from storage import repository
+from storage.cache import load_cached_historical_job_rows, load_state
+from storage.constants import JOB_MIRROR_FILE, RAW_JOBS_CACHE_DIR, STATE_FILE
+from storage.mirror import MIRROR_INDEXED_COLUMNS, SQLiteSlurmDB
+from storage.service import slurmStorage
+from tests.integration.synthetic_data import build_incremental_dataset, build_standard_test_dataset
+
+
+def _sorted_rows(rows):
+    return sorted(rows, key=lambda row: row.job_db_inx)
+
+
+def _mirror_rows(path):
+    with sqlite3.connect(path) as connection:
+        return connection.execute("SELECT job_db_inx, mod_time FROM linux_job_table ORDER BY job_db_inx").fetchall()
+
+
+@pytest.fixture
+def no_slurmdb(monkeypatch):
+    def fail():
+        raise AssertionError("read-through mode must not open slurmDB connections")
+
+    monkeypatch.setattr(repository, "get_connection_pool", fail)
+
+
+@pytest.fixture
+def sqlite_slurmdb(tmp_path, monkeypatch):
+    slurmDB = SQLiteSlurmDB(tmp_path / "slurmdb.sqlite")
+    pool = slurmDB.createPool(size=1)
+    monkeypatch.setattr(repository, "get_connection_pool", lambda: pool)
+    return slurmDB
+
+
+class TestJobMirror:
+    """The mirror follows the sync watermark and serves repository queries"""
+
+    def test_sync_writes_batches_and_watermark(self, tmp_path):
+        """Each sync batch lands in the mirror with the state.json last_mod_time"""
+        storage = slurmStorage(jobMirrorMode="sync", mirrorDir=tmp_path)
+        rows = build_standard_test_dataset()
+        updates = build_incremental_dataset()
+
+        storage.syncHistoricalJobsCache(outputDir=tmp_path, jobsOverride=rows)
+        _, _, state = storage.syncHistoricalJobsCache(outputDir=tmp_path, jobsOverride=updates)
+
+        assert _mirror_rows(tmp_path / JOB_MIRROR_FILE) == [
+            (row.job_db_inx, row.mod_time) for row in _sorted_rows(rows + updates)
+        ]
+        assert storage.jobMirror.getLastModTime() == state["last_mod_time"]
+        with sqlite3.connect(tmp_path / JOB_MIRROR_FILE) as connection:
+            indexes = {name for (name,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {f"linux_job_table_{column}" for column in MIRROR_INDEXED_COLUMNS} <= indexes
+
+    def test_mirror_behind_state_is_rebuilt_from_raw_cache(self, tmp_path):
+        """Enabling the mirror on an existing export copies the whole raw cache"""
+        rows = build_standard_test_dataset()
+        updates = build_incremental_dataset()
+        slurmStorage().syncHistoricalJobsCache(outputDir=tmp_path, jobsOverride=rows)
+
+        slurmStorage(jobMirrorMode="sync", mirrorDir=tmp_path).syncHistoricalJobsCache(
+            outputDir=tmp_path, jobsOverride=updates
+        )
+
+        assert len(_mirror_rows(tmp_path / JOB_MIRROR_FILE)) == len(rows + updates)
+
+    def test_read_through_serves_historical_and_active_queries(self, tmp_path, no_slurmdb):
+        """Repository queries run against the mirror with their usual filters"""
+        rows = build_standard_test_dataset()
+        slurmStorage(jobMirrorMode="sync", mirrorDir=tmp_path).syncHistoricalJobsCache(
+            outputDir=tmp_path, jobsOverride=rows
+        )
+        nowTimestamp = sorted(row.time_start for row in rows)[len(rows) // 2]
+
+        storage = slurmStorage(jobMirrorMode="read_through", mirrorDir=tmp_path).create()
+        try:
+            historicalRows = storage.getHistoricalJobRows(modifiedAfter=rows[0].mod_time)
+            runningJobs = storage.getRunningJobs(nowTimestamp)
+            with pytest.raises(RuntimeError):
+                storage.getPendingJobs()
+        finally:
+            storage.close()
+
+        startedRows = [row for row in rows if row.time_start > 0]
+        assert _sorted_rows(historicalRows) == _sorted_rows(
+            row for row in startedRows if row.mod_time > rows[0].mod_time
+        )
+        assert {job.dbIndex for job in runningJobs} == {
+            row.job_db_inx for row in startedRows if row.time_end == 0 or row.time_end > nowTimestamp
+        }
+
+    def test_new_export_rebuilds_from_mirror_of_another_export(self, tmp_path, sqlite_slurmdb):
+        """A fresh export directory is filled from the mirror once it has caught up with slurmDB"""
+        rows = build_standard_test_dataset() + build_incremental_dataset()
+        slurmStorage(jobMirrorMode="sync", mirrorDir=tmp_path / "live").syncHistoricalJobsCache(
+            outputDir=tmp_path / "live", jobsOverride=rows
+        )
+        # В slurmDB нет ничего новее отметки зеркала, поэтому догонять нечего.
+        sqlite_slurmdb.insertRows(rows[:1])
+
+        storage = slurmStorage(jobMirrorMode="read_through", mirrorDir=tmp_path / "live").create()
+        try:
+            storage.syncHistoricalJobsCache(outputDir=tmp_path / "restored")
+        finally:
+            storage.close()
+
+        # Как и slurmDB, зеркало не отдаёт задачи, которые ещё не стартовали.
+        startedRows = [row for row in rows if row.time_start > 0]
+        assert _sorted_rows(load_cached_historical_job_rows(tmp_path / "restored" / RAW_JOBS_CACHE_DIR)) == _sorted_rows(
+            startedRows
+        )
+        assert load_state(tmp_path / "restored" / STATE_FILE)["last_mod_time"] == max(row.mod_time for row in startedRows)
+
+    def test_unknown_mode_is_rejected(self, tmp_path):
+        """A misspelled mode fails instead of silently using slurmDB"""
+        with pytest.raises(ValueError):
+            slurmStorage(jobMirrorMode="mirror", mirrorDir=tmp_path)
+
+    def test_read_through_syncs_pull_new_slurmdb_rows(self, tmp_path, sqlite_slurmdb):
+        """Each read_through sync first brings the mirror up to slurmDB, then reads from it"""
+        rows = build_standard_test_dataset()
+        updates = build_incremental_dataset()
+        startedRows = [row for row in rows + updates if row.time_start > 0]
+        sqlite_slurmdb.insertRows(rows)
+
+        storage = slurmStorage(jobMirrorMode="read_through", mirrorDir=tmp_path / "export").create()
+        try:
+            storage.syncHistoricalJobsCache(outputDir=tmp_path / "export")
+            sqlite_slurmdb.insertRows(updates)
+            _, _, state = storage.syncHistoricalJobsCache(outputDir=tmp_path / "export")
+        finally:
+            storage.close()
+
+        assert state["last_mod_time"] == max(row.mod_time for row in startedRows)
+        assert storage.jobMirror.getLastModTime() == state["last_mod_time"]
+        cachedRows = load_cached_historical_job_rows(tmp_path / "export" / RAW_JOBS_CACHE_DIR)
+        assert {(row.job_db_inx, row.mod_time) for row in cachedRows} == {
+            (row.job_db_inx, row.mod_time) for row in startedRows
+        }
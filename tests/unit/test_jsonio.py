@@ -0,0 +1,98 @@
+"""
+Unit tests for atomic streaming JSON export files
+"""
+
+import gzip
+import json
+
+import pytest
+
+from forecast.training import load_overall_series_frame
+from storage import jsonio
+from storage.series import load_historical_utilization_series, write_historical_utilization_series
+from storage.timeutils import format_timestamp
+
+START = 1_700_000_000
+
+
+def _iter_points(count=10):
+    for index in range(count):
+        yield {"time": format_timestamp(START + index * 900), "cpu": float(index), "gpu": 50.0}
+
+
+class TestJsonArrayStream:
+    """Tests for the chunked array writer and transparent reader"""
+
+    def test_stream_writes_compact_array(self, tmp_path, monkeypatch):
+        """Chunks join into one compact array equal to json.dumps"""
+        monkeypatch.setattr(jsonio, "JSON_STREAM_CHUNK_ITEMS", 3)
+        points = list(_iter_points())
+
+        path, count = jsonio.write_json_array_stream(tmp_path / "overall.json", iter(points))
+
+        assert count == 10
+        assert path.read_text(encoding="utf-8") == json.dumps(points, separators=(",", ":"))
+        assert jsonio.write_json_array_stream(tmp_path / "empty.json", [])[1] == 0
+        assert jsonio.load_json(tmp_path / "empty.json") == []
+
+    def test_gzip_variant_replaces_plain_file(self, tmp_path):
+        """The compressed file supersedes the plain one and reads back unchanged"""
+        jsonPath = tmp_path / "overall.json"
+        jsonio.write_json_atomic(jsonPath, {"old": True})
+
+        path, _ = jsonio.write_json_array_stream(jsonPath, _iter_points(), compression="gzip")
+
+        assert path.name == "overall.json.gz"
+        assert not jsonPath.exists()
+        assert gzip.decompress(path.read_bytes()).startswith(b"[{")
+        assert jsonio.load_json(jsonPath) == list(_iter_points())
+        assert jsonio.resolve_json_compression(jsonPath) == "gzip"
+        assert jsonio.list_json_files(tmp_path) == [jsonPath]
+
+    def test_failed_write_keeps_previous_file(self, tmp_path):
+        """An exception inside the stream leaves the old file and no temp file"""
+        jsonPath = tmp_path / "overall.json"
+        jsonio.write_json_atomic(jsonPath, [1, 2])
+
+        def brokenPoints():
+            yield {"cpu": 1.0}
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            jsonio.write_json_array_stream(jsonPath, brokenPoints())
+
+        assert jsonio.load_json(jsonPath) == [1, 2]
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["overall.json"]
+
+    def test_unknown_compression_is_rejected(self, tmp_path):
+        """Only none, gzip and zstd are accepted"""
+        with pytest.raises(ValueError):
+            jsonio.write_json_atomic(tmp_path / "state.json", {}, compression="brotli")
+
+
+class TestCompressedSeriesExport:
+    """Series export keeps working end to end with compressed files"""
+
+    def test_compression_is_kept_on_rewrite(self, tmp_path):
+        """A rewrite without explicit compression keeps the exported one"""
+        write_historical_utilization_series(
+            tmp_path, {"overall": _iter_points()}, compression="gzip"
+        )
+        write_historical_utilization_series(tmp_path, {"overall": _iter_points(12)})
+
+        metadata = jsonio.load_json(tmp_path / "metadata.json")
+        assert metadata["files"] == ["overall.json.gz"]
+        assert metadata["compression"] == "gzip"
+        assert len(load_historical_utilization_series(tmp_path, ["overall"])["overall"]) == 12
+
+    def test_training_reads_compressed_series(self, tmp_path):
+        """The forecast frame loads from .json.gz when no array copy exists"""
+        seriesDir = tmp_path / "series"
+        write_historical_utilization_series(
+            seriesDir, {"overall": _iter_points()}, compression="gzip"
+        )
+        (seriesDir / "overall.npy").unlink()
+
+        frame = load_overall_series_frame(tmp_path)
+
+        assert frame["cpu"].tolist() == [float(index) for index in range(10)]
@@ -0,0 +1,96 @@
+"""
+Unit tests for the logical job store shared by storage and series layers
+"""
+
+import random
+from dataclasses import replace
+
+import pytest
+
+from storage import logical_jobs
+from storage.logical_jobs import LogicalJobStore
+from storage.series import _normalize_historical_jobs
+from storage.service import slurmStorage
+from tests.integration.synthetic_data import build_standard_test_dataset
+
+
+def _build_versions(rows, seed=5):
+    generator = random.Random(seed)
+    versions = list(rows)
+    for row in rows:
+        for offset in range(generator.randint(0, 2)):
+            versions.append(
+                replace(
+                    row,
+                    job_db_inx=(row.job_db_inx or 0) + 10_000 * (offset + 1),
+                    nodelist=generator.choice([row.nodelist, "None assigned", None]),
+                    time_end=generator.choice([0, row.time_end]),
+                    mod_time=row.mod_time + generator.randint(-50, 50),
+                )
+            )
+    generator.shuffle(versions)
+    return versions
+
+
+def _expected_versions(versions):
+    best = {}
+    for version in versions:
+        current = best.get(version.getLogicalKey())
+        if current is None or version.getVersionScore() > current.getVersionScore():
+            best[version.getLogicalKey()] = version
+    return sorted(best.values(), key=lambda version: version.getSortKey())
+
+
+class TestLogicalJobStore:
+    """Single-pass dedupe with an incrementally kept order"""
+
+    def test_dedupes_and_orders_in_one_pass(self):
+        """The preferred version of every job is kept in (timeStart, jobID, dbIndex) order"""
+        versions = _build_versions(build_standard_test_dataset())
+
+        store = LogicalJobStore(versions)
+
+        assert list(store) == _expected_versions(versions)
+        assert store.duplicateVersions == len(versions) - len(store)
+
+    @pytest.mark.parametrize("bisectLimit", [0, 1_000_000])
+    def test_incremental_batches_match_single_batch(self, monkeypatch, bisectLimit):
+        """Adding batches one by one gives the same store as one bulk update"""
+        monkeypatch.setattr(logical_jobs, "LOGICAL_JOB_STORE_BISECT_LIMIT", bisectLimit)
+        versions = _build_versions(build_standard_test_dataset(), seed=9)
+
+        store = LogicalJobStore()
+        for start in range(0, len(versions), 7):
+            store.update(versions[start:start + 7])
+
+        assert list(store) == list(LogicalJobStore(versions))
+
+    def test_tie_keeps_first_version(self):
+        """A version with an equal score does not replace the stored one"""
+        row = build_standard_test_dataset()[0]
+        twin = replace(row, job_db_inx=(row.job_db_inx or 0) + 1)
+
+        store = LogicalJobStore([row])
+
+        assert store.add(twin) is False
+        assert store.get(row.id_job) is row
+
+
+class TestSharedNormalization:
+    """Storage output is reused by the series builder as is"""
+
+    def test_series_skips_normalizing_store(self):
+        """An already-canonical store is returned without another dedupe"""
+        jobs = slurmStorage()._materializeHistoricalJobs(_build_versions(build_standard_test_dataset()))
+
+        assert isinstance(jobs, LogicalJobStore)
+        assert _normalize_historical_jobs(jobs) is jobs
+
+    def test_series_normalizes_plain_job_lists(self):
+        """Plain job lists still get deduped with the shared scoring"""
+        rows = build_standard_test_dataset()
+        jobs = [row.toHistoricalJob() for row in _build_versions(rows)]
+
+        normalized = _normalize_historical_jobs(jobs)
+
+        assert normalized == slurmStorage()._materializeHistoricalJobs(_build_versions(rows))
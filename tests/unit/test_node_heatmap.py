@@ -0,0 +1,124 @@
+"""
+Unit tests for the per-node utilization heatmap
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from config.parsing import expand_hostlist
+from storage.cache import save_cached_historical_job_rows
+from storage.constants import NODE_HEATMAP_FILE, RAW_JOBS_CACHE_DIR
+from storage.node_heatmap import NodeUtilizationHeatmap, build_node_utilization_heatmap
+from storage.service import slurmStorage
+from tests.fixtures.scheduler.scheduler_fixtures import (
+    EXPECTED_NODE_CAPACITIES,
+    build_mini_cluster_config,
+    create_running_gpu_job,
+)
+from tests.integration.synthetic_data import build_standard_test_dataset
+
+START = 1_700_000_000
+INTERVAL = 15 * 60
+NODELISTS = ["cn-001", "cn-[001-002]", "cn-005", "cn-[004-007]", "cn-008", "cn-[007-008]"]
+
+
+def _build_random_jobs(count=300):
+    generator = random.Random(7)
+    jobs = []
+    for jobID in range(1, count + 1):
+        timeStart = START + generator.randint(0, 40 * INTERVAL)
+        job = create_running_gpu_job(
+            jobID=jobID,
+            timeStart=timeStart,
+            nodelist=generator.choice(NODELISTS),
+            cpusReq=generator.choice([1, 4, 6]),
+            gpusRequested=generator.choice([0, 1, 3]),
+        )
+        job.timeEnd = generator.choice([0, timeStart + generator.randint(1, 6 * INTERVAL)])
+        jobs.append(job)
+    return jobs
+
+
+def _dense_loads(jobs, heatmap, nowTimestamp, resource):
+    matrix = np.zeros((len(heatmap.nodeNames), heatmap.bucketCount))
+    rows = {nodeName: row for row, nodeName in enumerate(heatmap.nodeNames)}
+    for job in jobs:
+        nodes = expand_hostlist(job.nodelist)
+        capacities = [EXPECTED_NODE_CAPACITIES[node][resource] for node in nodes]
+        amount = job.getAllocatedCpus() if resource == "cpu" else job.getAllocatedGpus()
+        endTimestamp = job.getEffectiveEnd(nowTimestamp)
+        for column, timestamp in enumerate(heatmap.bucketTimestamps.tolist()):
+            if not job.timeStart <= timestamp < endTimestamp:
+                continue
+            for node, capacity in zip(nodes, capacities):
+                share = capacity / sum(capacities) if sum(capacities) else 1 / len(nodes)
+                matrix[rows[node], column] += amount * share
+    return matrix
+
+
+class TestNodeUtilizationHeatmap:
+    """Sparse accumulation agrees with a dense per-bucket scan"""
+
+    @pytest.mark.parametrize("resource", ["cpu", "gpu"])
+    def test_matrix_matches_dense_scan(self, resource):
+        """Every cell holds the load of jobs running at the bucket start"""
+        jobs = _build_random_jobs()
+        nowTimestamp = START + 45 * INTERVAL + 100
+
+        heatmap = build_node_utilization_heatmap(jobs, build_mini_cluster_config(), nowTimestamp=nowTimestamp)
+        _, timestamps, matrix = heatmap.getMatrix(resource=resource)
+
+        assert timestamps.tolist() == heatmap.bucketTimestamps.tolist()
+        np.testing.assert_allclose(matrix, _dense_loads(jobs, heatmap, nowTimestamp, resource), atol=1e-9)
+
+    def test_queries_slice_nodes_and_time(self):
+        """Node ranges and time windows return the matching block of the full matrix"""
+        heatmap = build_node_utilization_heatmap(
+            _build_random_jobs(), build_mini_cluster_config(), nowTimestamp=START + 45 * INTERVAL
+        )
+        nodeNames, fullTimestamps, fullMatrix = heatmap.getMatrix(normalize=True)
+        windowStart, windowEnd = START + 10 * INTERVAL + 1, START + 20 * INTERVAL
+
+        names, timestamps, block = heatmap.getMatrix(
+            "cn-[004-007]", windowStart, windowEnd, normalize=True
+        )
+
+        rows = [nodeNames.index(name) for name in names]
+        columns = (fullTimestamps >= windowStart) & (fullTimestamps < windowEnd)
+        assert names == ["cn-004", "cn-005", "cn-006", "cn-007"]
+        assert timestamps.tolist() == fullTimestamps[columns].tolist()
+        np.testing.assert_array_equal(block, fullMatrix[rows][:, columns])
+        assert heatmap.getNodeSeries("cn-005", windowStart, windowEnd)[0]["cpu"] == block[1, 0]
+
+    def test_saved_file_roundtrips(self, tmp_path):
+        """The compressed array file loads back to the same queries"""
+        heatmap = build_node_utilization_heatmap(
+            _build_random_jobs(), build_mini_cluster_config(), nowTimestamp=START + 45 * INTERVAL
+        )
+
+        loaded = NodeUtilizationHeatmap.load(heatmap.save(tmp_path / NODE_HEATMAP_FILE))
+
+        assert loaded.nodeNames == heatmap.nodeNames
+        for resource in ("cpu", "gpu"):
+            np.testing.assert_array_equal(
+                loaded.getMatrix(resource=resource)[2], heatmap.getMatrix(resource=resource)[2]
+            )
+        with pytest.raises(KeyError):
+            loaded.getNodeSeries("cn-999")
+
+    def test_storage_exports_heatmap_from_raw_cache(self, tmp_path):
+        """The heatmap is refreshed from the local raw cache without the database"""
+        rows = build_standard_test_dataset()
+        save_cached_historical_job_rows(tmp_path / RAW_JOBS_CACHE_DIR, rows)
+        nowTimestamp = max(row.time_start for row in rows) + INTERVAL
+        storage = slurmStorage()
+
+        storage.exportNodeUtilizationHeatmap(
+            outputDir=tmp_path, clusterConfig=build_mini_cluster_config(), nowTimestamp=nowTimestamp
+        )
+        heatmap = storage.loadNodeUtilizationHeatmap(outputDir=tmp_path)
+
+        assert heatmap.nodeNames == sorted(EXPECTED_NODE_CAPACITIES)
+        assert heatmap.getMatrix()[2].sum() > 0.0
@@ -0,0 +1,137 @@
+"""
+Unit tests for the append-only segmented raw job row cache
+"""
+
+from dataclasses import replace
+
+from storage.cache import load_cached_historical_job_rows, load_state
+from storage.columnar import ColumnarJobRows
+from storage.constants import RAW_JOBS_CACHE_DIR, STATE_FILE
+from storage.segments import JobRowSegmentLog
+from storage.service import slurmStorage
+from tests.integration.synthetic_data import (
+    build_incremental_dataset,
+    build_standard_test_dataset,
+)
+
+
+def _sort_rows(rows):
+    return sorted(
+        rows,
+        key=lambda row: (row.time_start, row.id_job, row.job_db_inx if row.job_db_inx is not None else -1),
+    )
+
+
+def _finish_first_row(rows):
+    first = rows[0]
+    return replace(first, time_end=first.time_start + 600, state=3, mod_time=first.mod_time + 600)
+
+
+class TestJobRowSegmentLog:
+    """Tests for JobRowSegmentLog"""
+
+    def test_append_writes_one_segment_per_batch(self, tmp_path):
+        """Each batch becomes a new segment with its own min/max statistics"""
+        rows = build_standard_test_dataset()
+        extraRows = build_incremental_dataset()
+        segmentLog = JobRowSegmentLog(tmp_path / RAW_JOBS_CACHE_DIR)
+
+        segmentLog.append(ColumnarJobRows.fromRows(rows))
+        segment = segmentLog.append(ColumnarJobRows.fromRows(extraRows))
+
+        segments = segmentLog.getSegments()
+        assert [item["name"] for item in segments] == ["00000001", "00000002"]
+        assert segment["row_count"] == len(extraRows)
+        assert segment["max_mod_time"] == max(row.mod_time for row in extraRows)
+        assert segment["min_time_start"] == min(row.time_start for row in extraRows)
+        assert segmentLog.append(ColumnarJobRows.empty()) is None
+        assert len(segmentLog.getSegments()) == 2
+
+    def test_readers_prefer_scored_version_across_segments(self, tmp_path):
+        """A job with versions in several segments resolves like LogicalJobStore"""
+        rows = build_standard_test_dataset()
+        finishedRow = _finish_first_row(rows)
+        staleRow = replace(rows[1], nodelist="None assigned", mod_time=rows[1].mod_time + 900)
+        segmentLog = JobRowSegmentLog(tmp_path / RAW_JOBS_CACHE_DIR)
+
+        segmentLog.append(ColumnarJobRows.fromRows(rows))
+        segmentLog.append(ColumnarJobRows.fromRows([finishedRow, staleRow]))
+
+        loadedRows = segmentLog.loadRows().toRows()
+        assert len(loadedRows) == len(rows)
+        assert finishedRow in loadedRows
+        assert rows[1] in loadedRows
+        assert staleRow not in loadedRows
+
+    def test_compact_collapses_superseded_versions(self, tmp_path):
+        """Compaction leaves one segment with the same logical rows"""
+        rows = build_standard_test_dataset()
+        segmentLog = JobRowSegmentLog(tmp_path / RAW_JOBS_CACHE_DIR)
+        segmentLog.append(ColumnarJobRows.fromRows(rows))
+        segmentLog.append(ColumnarJobRows.fromRows([_finish_first_row(rows)]))
+        segmentLog.append(ColumnarJobRows.fromRows(build_incremental_dataset()))
+        expectedRows = segmentLog.loadRows().toRows()
+
+        assert segmentLog.compact(minSegments=4) is None
+        stats = segmentLog.compact()
+
+        assert stats["segments_before"] == 3
+        assert stats["collapsed_versions"] == 1
+        assert len(segmentLog.getSegments()) == 1
+        assert segmentLog.loadRows().toRows() == expectedRows
+        assert not (tmp_path / RAW_JOBS_CACHE_DIR / "00000001").exists()
+
+    def test_single_columnar_layout_becomes_first_segment(self, tmp_path):
+        """A cache saved as one set of columns is converted in place"""
+        rows = build_standard_test_dataset()
+        ColumnarJobRows.fromRows(rows).save(tmp_path / RAW_JOBS_CACHE_DIR)
+
+        segmentLog = JobRowSegmentLog(tmp_path / RAW_JOBS_CACHE_DIR)
+
+        assert segmentLog.loadRows().toRows() == _sort_rows(rows)
+        assert len(segmentLog.getSegments()) == 1
+
+
+class TestSegmentedHistoricalSync:
+    """Tests for slurmStorage sync on top of the segmented cache"""
+
+    def test_sync_appends_only_the_batch(self, tmp_path):
+        """A sync writes one new segment and leaves earlier segments untouched"""
+        rows = build_standard_test_dataset()
+        extraRows = build_incremental_dataset()
+        storage = slurmStorage()
+        storage.syncHistoricalJobsCache(outputDir=tmp_path, jobsOverride=rows)
+        firstSegment = tmp_path / RAW_JOBS_CACHE_DIR / "00000001" / "id_job.npy"
+        firstModified = firstSegment.stat().st_mtime_ns
+
+        jobs, _, state = storage.syncHistoricalJobsCache(outputDir=tmp_path, jobsOverride=extraRows)
+
+        segments = JobRowSegmentLog(tmp_path / RAW_JOBS_CACHE_DIR).getSegments()
+        assert [segment["row_count"] for segment in segments] == [len(rows), len(extraRows)]
+        assert firstSegment.stat().st_mtime_ns == firstModified
+        assert len(jobs) == state["job_count"] == len(rows) + len(extraRows)
+        assert len(load_cached_historical_job_rows(tmp_path / RAW_JOBS_CACHE_DIR)) == len(jobs)
+
+    def test_losing_batch_version_still_advances_last_mod_time(self, tmp_path):
+        """A batch row that loses scoring is not fetched again on the next sync"""
+        rows = build_standard_test_dataset()
+        staleRow = replace(rows[0], nodelist="None assigned", mod_time=max(row.mod_time for row in rows) + 100)
+        storage = slurmStorage()
+        storage.syncHistoricalJobsCache(outputDir=tmp_path, jobsOverride=rows)
+
+        storage.syncHistoricalJobsCache(outputDir=tmp_path, jobsOverride=[staleRow])
+
+        assert load_state(tmp_path / STATE_FILE)["last_mod_time"] == staleRow.mod_time
+
+    def test_compact_historical_jobs_cache(self, tmp_path):
+        """slurmStorage.compactHistoricalJobsCache compacts once enough segments exist"""
+        rows = build_standard_test_dataset()
+        storage = slurmStorage()
+        storage.syncHistoricalJobsCache(outputDir=tmp_path, jobsOverride=rows)
+        storage.syncHistoricalJobsCache(outputDir=tmp_path, jobsOverride=[_finish_first_row(rows)])
+
+        assert storage.compactHistoricalJobsCache(outputDir=tmp_path) is None
+        stats = storage.compactHistoricalJobsCache(outputDir=tmp_path, minSegments=2)
+
+        assert stats["rows_after"] == len(rows)
+        assert len(JobRowSegmentLog(tmp_path / RAW_JOBS_CACHE_DIR).getSegments()) == 1
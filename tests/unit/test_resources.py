@@ -8,13 +8,17 @@ Classes tested:
   - ResourceAvailabilityTree
 """
 
+import random
+
 import pytest
 
 from scheduler.resources import (
+    RESOURCE_TREE_ENGINES,
     JobPlacement,
     NodeAllocation,
     NodeResourceState,
     ResourceAvailabilityTree,
+    get_resource_tree_class,
 )
 from tests.fixtures.scheduler.scheduler_fixtures import (
     EXPECTED_FEATURE_CAPACITIES,
@@ -22,11 +26,19 @@ from tests.fixtures.scheduler.scheduler_fixtures import (
     TIMESTAMP_NOW,
     build_mini_cluster_config,
     build_mini_cluster_config_mock,
+    build_wide_cluster_config,
     create_pending_job,
     create_running_gpu_job,
     create_running_job,
 )
 
+
+@pytest.fixture(params=RESOURCE_TREE_ENGINES)
+def tree_class(request):
+    """Every tree test runs on the Python tree and on the array-backed one."""
+    return get_resource_tree_class(request.param)
+
+
 # ════════════════════════════════════════════════════════════════════════════════
 # NodeResourceState
 # ════════════════════════════════════════════════════════════════════════════════
@@ -189,17 +201,17 @@ class TestFromClusterAndJobs:
     def cluster_config(self):
         return build_mini_cluster_config()
 
-    def test_empty_cluster_no_jobs(self, cluster_config):
+    def test_empty_cluster_no_jobs(self, cluster_config, tree_class):
         """Empty node_groups → empty tree."""
         cluster_config.node_groups = []
-        tree = ResourceAvailabilityTree.fromClusterAndJobs(
+        tree = tree_class.fromClusterAndJobs(
             cluster_config, [], TIMESTAMP_NOW
         )
         assert tree.nodesByFeature == {}
 
-    def test_no_running_jobs(self, cluster_config):
+    def test_no_running_jobs(self, cluster_config, tree_class):
         """Cluster with nodes but no running jobs → all resources available."""
-        tree = ResourceAvailabilityTree.fromClusterAndJobs(
+        tree = tree_class.fromClusterAndJobs(
             cluster_config, [], TIMESTAMP_NOW
         )
 
@@ -227,7 +239,7 @@ class TestFromClusterAndJobs:
             assert node.availableCpu == 8.0
             assert node.availableGpu == 4.0
 
-    def test_with_running_jobs_resources_consumed(self, cluster_config):
+    def test_with_running_jobs_resources_consumed(self, cluster_config, tree_class):
         """Running jobs consume resources from their nodes."""
         # Job using cn-001: 2 CPU. GPU comes from getRequestedGpus() which reads
         # tresReq. Default tresReq is f"1={cpusReq},4={nodesAlloc}" — no 1001 key,
@@ -235,7 +247,7 @@ class TestFromClusterAndJobs:
         job = create_running_gpu_job(
             jobID=2001, cpusReq=2, nodelist="cn-001", gpusRequested=1
         )
-        tree = ResourceAvailabilityTree.fromClusterAndJobs(
+        tree = tree_class.fromClusterAndJobs(
             cluster_config, [job], TIMESTAMP_NOW
         )
 
@@ -248,10 +260,10 @@ class TestFromClusterAndJobs:
         assert cn002.availableCpu == 4.0
         assert cn002.availableGpu == 2.0
 
-    def test_running_job_without_nodelist_skipped(self, cluster_config):
+    def test_running_job_without_nodelist_skipped(self, cluster_config, tree_class):
         """Running job with no nodelist → skipped with warning."""
         job = create_running_job(jobID=2001, nodelist="")
-        tree = ResourceAvailabilityTree.fromClusterAndJobs(
+        tree = tree_class.fromClusterAndJobs(
             cluster_config, [job], TIMESTAMP_NOW
         )
 
@@ -261,18 +273,18 @@ class TestFromClusterAndJobs:
                 assert node.availableCpu == float(node.totalCpu)
                 assert node.availableGpu == float(node.totalGpu)
 
-    def test_running_job_nodelist_none_assigned_skipped(self, cluster_config):
+    def test_running_job_nodelist_none_assigned_skipped(self, cluster_config, tree_class):
         """Running job with nodelist='None assigned' → skipped with warning."""
         job = create_running_job(jobID=2001, nodelist="None assigned")
-        tree = ResourceAvailabilityTree.fromClusterAndJobs(
+        tree = tree_class.fromClusterAndJobs(
             cluster_config, [job], TIMESTAMP_NOW
         )
         # hasAssignedNodes returns False, so placeRunningJob returns None
 
-    def test_running_job_on_unknown_nodes_ignored(self, cluster_config):
+    def test_running_job_on_unknown_nodes_ignored(self, cluster_config, tree_class):
         """Running job on nodes not in tree → placement returns None, no crash."""
         job = create_running_job(jobID=2001, nodelist="cn-999")
-        tree = ResourceAvailabilityTree.fromClusterAndJobs(
+        tree = tree_class.fromClusterAndJobs(
             cluster_config, [job], TIMESTAMP_NOW
         )
         # Tree should be fine, all nodes untouched
@@ -281,7 +293,7 @@ class TestFromClusterAndJobs:
                 assert node.usedCpu == 0.0
                 assert node.usedGpu == 0.0
 
-    def test_multiple_running_jobs(self, cluster_config):
+    def test_multiple_running_jobs(self, cluster_config, tree_class):
         """Multiple running jobs on different nodes accumulate consumption."""
         job1 = create_running_gpu_job(
             jobID=2001, cpusReq=2, nodelist="cn-001", gpusRequested=1
@@ -293,7 +305,7 @@ class TestFromClusterAndJobs:
             gpusRequested=2,
             constraints="type_d",
         )
-        tree = ResourceAvailabilityTree.fromClusterAndJobs(
+        tree = tree_class.fromClusterAndJobs(
             cluster_config, [job1, job2], TIMESTAMP_NOW
         )
 
@@ -305,7 +317,7 @@ class TestFromClusterAndJobs:
         assert cn007.availableCpu == 4.0  # 8 - 4
         assert cn007.availableGpu == 2.0  # 4 - 2
 
-    def test_running_job_multi_node(self, cluster_config):
+    def test_running_job_multi_node(self, cluster_config, tree_class):
         """Running job across multiple nodes consumes resources on each.
 
         With spreadAcrossSelectedNodes=True, CPU is distributed round-robin.
@@ -317,7 +329,7 @@ class TestFromClusterAndJobs:
             nodesAlloc=2,
             nodelist="cn-[001-002]",
         )
-        tree = ResourceAvailabilityTree.fromClusterAndJobs(
+        tree = tree_class.fromClusterAndJobs(
             cluster_config, [job], TIMESTAMP_NOW
         )
 
@@ -326,9 +338,9 @@ class TestFromClusterAndJobs:
         cn002 = _find_node(tree, "cn-002")
         assert cn002.availableCpu == 3.0  # 4 - 1 (spread: 1 CPU each)
 
-    def test_node_count_per_feature(self, cluster_config):
+    def test_node_count_per_feature(self, cluster_config, tree_class):
         """Verify node counts per feature match the cluster config."""
-        tree = ResourceAvailabilityTree.fromClusterAndJobs(
+        tree = tree_class.fromClusterAndJobs(
             cluster_config, [], TIMESTAMP_NOW
         )
         assert len(tree.nodesByFeature["type_a"]) == 4
@@ -345,9 +357,9 @@ class TestFindPlacement:
     """Tests for ResourceAvailabilityTree.findPlacement."""
 
     @pytest.fixture
-    def tree(self):
+    def tree(self, tree_class):
         config = build_mini_cluster_config()
-        return ResourceAvailabilityTree.fromClusterAndJobs(config, [], TIMESTAMP_NOW)
+        return tree_class.fromClusterAndJobs(config, [], TIMESTAMP_NOW)
 
     def test_job_needs_type_a(self, tree):
         """Job with constraint type_a gets placed on type_a nodes."""
@@ -446,9 +458,9 @@ class TestFindPlacementOnFeature:
     """Tests for ResourceAvailabilityTree.findPlacementOnFeature."""
 
     @pytest.fixture
-    def tree(self):
+    def tree(self, tree_class):
         config = build_mini_cluster_config()
-        return ResourceAvailabilityTree.fromClusterAndJobs(config, [], TIMESTAMP_NOW)
+        return tree_class.fromClusterAndJobs(config, [], TIMESTAMP_NOW)
 
     def test_basic_placement(self, tree):
         """Basic placement with enough resources → placement found."""
@@ -596,9 +608,9 @@ class TestReservePlacement:
     """Tests for ResourceAvailabilityTree.reservePlacement."""
 
     @pytest.fixture
-    def tree(self):
+    def tree(self, tree_class):
         config = build_mini_cluster_config()
-        return ResourceAvailabilityTree.fromClusterAndJobs(config, [], TIMESTAMP_NOW)
+        return tree_class.fromClusterAndJobs(config, [], TIMESTAMP_NOW)
 
     def test_reserve_cpu(self, tree):
         """Reserve CPU → availableCpu decreases on the node."""
@@ -722,9 +734,9 @@ class TestGetFeatureTotals:
     """Tests for ResourceAvailabilityTree.getFeatureTotals."""
 
     @pytest.fixture
-    def tree(self):
+    def tree(self, tree_class):
         config = build_mini_cluster_config()
-        return ResourceAvailabilityTree.fromClusterAndJobs(config, [], TIMESTAMP_NOW)
+        return tree_class.fromClusterAndJobs(config, [], TIMESTAMP_NOW)
 
     def test_all_nodes_available(self, tree):
         """All nodes available → total feature capacity."""
@@ -837,9 +849,9 @@ class TestPlaceRunningJob:
     """Tests for ResourceAvailabilityTree.placeRunningJob."""
 
     @pytest.fixture
-    def tree(self):
+    def tree(self, tree_class):
         config = build_mini_cluster_config()
-        return ResourceAvailabilityTree.fromClusterAndJobs(config, [], TIMESTAMP_NOW)
+        return tree_class.fromClusterAndJobs(config, [], TIMESTAMP_NOW)
 
     def test_single_node_job(self, tree):
         """Single node job → correct CPU allocation on one node.
@@ -945,6 +957,27 @@ class TestPlaceRunningJob:
         assert placement is not None
         assert set(placement.nodeNames) == {"cn-005", "cn-006"}
 
+    def test_hostlist_order_does_not_change_placement(self, tree):
+        """Nodes are taken in tree order through the name index, whatever the hostlist order."""
+        job = create_running_job(jobID=2001, cpusReq=3, nodesAlloc=3, nodelist="cn-[001-003]")
+        shuffledJob = create_running_job(jobID=2002, cpusReq=3, nodesAlloc=3, nodelist="cn-003,cn-001,cn-002,cn-001")
+
+        assert tree.placeRunningJob(shuffledJob) == tree.placeRunningJob(job)
+        assert tree.nodeStatesByName["cn-001"] is _find_node(tree, "cn-001")
+
+    def test_node_shared_between_features_is_indexed_once(self, tree_class):
+        """A node listed under two features has one state in both indexes."""
+        shared = NodeResourceState(nodeName="cn-001", featureName="type_a", totalCpu=4, totalGpu=0)
+        tree = tree_class({"type_a": [shared], "type_b": [shared]})
+        placement = tree.placeRunningJob(create_running_job(jobID=2001, cpusReq=2, nodelist="cn-001"))
+
+        tree.reservePlacement(placement)
+
+        nodeState = tree.nodeStatesByName["cn-001"]
+        assert tree.nodeStatesByFeature["type_a"]["cn-001"] is nodeState
+        assert tree.nodeStatesByFeature["type_b"]["cn-001"] is nodeState
+        assert nodeState.usedCpu == 2.0
+
     def test_running_job_with_zero_gpu(self, tree):
         """Running job with 0 GPU allocated → 0 GPU in allocation."""
         job = create_running_job(
@@ -971,9 +1004,9 @@ class TestResourceTreeIntegration:
     """Integration tests combining multiple tree operations."""
 
     @pytest.fixture
-    def tree(self):
+    def tree(self, tree_class):
         config = build_mini_cluster_config()
-        return ResourceAvailabilityTree.fromClusterAndJobs(config, [], TIMESTAMP_NOW)
+        return tree_class.fromClusterAndJobs(config, [], TIMESTAMP_NOW)
 
     def test_place_reserve_then_find_reduced(self, tree):
         """After placing and reserving, findPlacement sees reduced resources."""
@@ -1062,6 +1095,58 @@ class TestResourceTreeIntegration:
         assert totals["gpu"] == 8.0  # totalGpu is unaffected by usedGpu
 
 
+# ════════════════════════════════════════════════════════════════════════════════
+# ArrayResourceAvailabilityTree — agreement with the Python tree
+# ════════════════════════════════════════════════════════════════════════════════
+
+
+class TestArrayResourceAvailabilityTree:
+    """The array-backed tree gives the same placements as the Python tree."""
+
+    def test_random_placements_match_python_tree(self):
+        """Random jobs and limits on a half-used wide cluster place and reserve identically."""
+        clusterConfig = build_wide_cluster_config()
+        generator = random.Random(11)
+        trees = [
+            get_resource_tree_class(engine).fromClusterAndJobs(clusterConfig, [], TIMESTAMP_NOW)
+            for engine in RESOURCE_TREE_ENGINES
+        ]
+        for nodeName in clusterConfig.getNodeCapacitiesAt(TIMESTAMP_NOW):
+            usedCpu = generator.randrange(0, 64) / 2
+            usedGpu = generator.choice((0.0, 0.5, 1.0, 3.0))
+            for tree in trees:
+                tree.nodeStatesByName[nodeName].usedCpu = usedCpu
+                tree.nodeStatesByName[nodeName].usedGpu = usedGpu
+
+        features = list(trees[0].nodesByFeature)
+        nodeNames = list(trees[0].nodeStatesByName)
+        for jobID in range(400):
+            nodes = generator.choice((0, 1, 1, 2, 3, 8))
+            gpus = generator.choice((0, 0, 1, 2, 5))
+            cpus = generator.randint(1, 96)
+            job = create_pending_job(
+                jobID=jobID,
+                cpusReq=cpus,
+                tresReq=f"1={cpus}" + (f",4={nodes}" if nodes else "") + (f",1001={gpus}" if gpus else ""),
+            )
+            featureName = generator.choice(features)
+            allowedNodeNames = set(generator.sample(nodeNames, 40)) if generator.random() < 0.3 else None
+            maxCpuPerNode = generator.choice((None, None, 4, 16))
+            maxNodesLimit = generator.choice((None, None, 2, 4))
+
+            placements = [
+                tree.findPlacementOnFeature(job, featureName, allowedNodeNames, maxCpuPerNode, maxNodesLimit)
+                for tree in trees
+            ]
+            assert placements[0] == placements[1]
+            if placements[0] is not None:
+                for tree, placement in zip(trees, placements):
+                    tree.reservePlacement(placement)
+
+        for featureName in features:
+            assert trees[0].getFeatureSnapshot(featureName) == trees[1].getFeatureSnapshot(featureName)
+
+
 # ════════════════════════════════════════════════════════════════════════════════
 # Helpers
 # ════════════════════════════════════════════════════════════════════════════════
@@ -36,6 +36,7 @@ def _make_scheduler(
     scheduler_config.forecast_enabled = False
     scheduler_config.forecast_model_dir = None
     scheduler_config.forecast_skip_startup_training = False
+    scheduler_config.resource_tree_engine = "python"
 
     return Scheduler(
         storage=mock_storage,
@@ -521,6 +522,7 @@ class TestFindRunnablePlacement:
         scheduler_config.forecast_enabled = False
         scheduler_config.forecast_model_dir = None
         scheduler_config.forecast_skip_startup_training = False
+        scheduler_config.resource_tree_engine = "python"
         scheduler = Scheduler(
             storage=mock_storage,
             connector=mock_connector,
@@ -553,6 +555,7 @@ class TestFindRunnablePlacement:
         scheduler_config.forecast_enabled = False
         scheduler_config.forecast_model_dir = None
         scheduler_config.forecast_skip_startup_training = False
+        scheduler_config.resource_tree_engine = "python"
         scheduler = Scheduler(
             storage=mock_storage,
             connector=mock_connector,
@@ -586,6 +589,7 @@ class TestFindRunnablePlacement:
         scheduler_config.forecast_enabled = False
         scheduler_config.forecast_model_dir = None
         scheduler_config.forecast_skip_startup_training = False
+        scheduler_config.resource_tree_engine = "python"
         scheduler = Scheduler(
             storage=mock_storage,
             connector=mock_connector,
@@ -619,6 +623,7 @@ class TestFindRunnablePlacement:
         scheduler_config.forecast_enabled = True
         scheduler_config.forecast_model_dir = "artifacts/forecast_model"
         scheduler_config.forecast_skip_startup_training = False
+        scheduler_config.resource_tree_engine = "python"
 
         scheduler = Scheduler(
             storage=mock_storage,
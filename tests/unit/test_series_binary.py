@@ -0,0 +1,188 @@
+"""
+Unit tests for the binary utilization series artifact
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from forecast.service import ForecastService
+from forecast.training import load_overall_series_frame
+from storage.series import write_historical_utilization_series
+from storage.series_binary import (
+    SERIES_ARRAY_DTYPE,
+    find_series_array,
+    load_series_array,
+    parse_series_labels,
+)
+from storage.timeutils import format_timestamp, from_wall_clock_seconds, to_wall_clock_seconds
+
+START = 1_700_000_000
+# 2025-10-26 00:00 UTC: in Europe/Berlin the clocks go back from 03:00 to 02:00 at 01:00 UTC.
+BERLIN_FALL_BACK_DAY = 1_761_436_800
+
+
+@pytest.fixture
+def berlin_timezone(monkeypatch):
+    monkeypatch.setenv("TZ", "Europe/Berlin")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _build_points(count=8):
+    return [
+        {
+            "time": format_timestamp(START + index * 900),
+            "cpu": round(10.0 + index * 1.25, 2),
+            "gpu": round(50.0 - index * 0.5, 2),
+        }
+        for index in range(count)
+    ]
+
+
+def _build_epoch_points(count=8):
+    return [{**point, "time": START + index * 900} for index, point in enumerate(_build_points(count))]
+
+
+def _write_json_only(seriesDir, points):
+    seriesDir.mkdir(parents=True, exist_ok=True)
+    (seriesDir / "overall.json").write_text(json.dumps(points), encoding="utf-8")
+
+
+class TestSeriesArrayFiles:
+    """Tests for writing and locating .npy series files"""
+
+    def test_export_writes_array_twin(self, tmp_path):
+        """Every exported JSON series gets a structured .npy copy"""
+        points = _build_points()
+
+        write_historical_utilization_series(tmp_path, {"type_a": points, "overall": points})
+
+        values = load_series_array(tmp_path / "overall.npy")
+        metadata = json.loads((tmp_path / "metadata.json").read_text(encoding="utf-8"))
+        assert values.dtype == SERIES_ARRAY_DTYPE
+        assert values["cpu"].tolist() == [np.float32(point["cpu"]) for point in points]
+        assert metadata["array_files"] == ["overall.npy", "type_a.npy"]
+
+    def test_labels_parse_to_wall_clock_seconds(self):
+        """Label parsing matches strptime of the same label"""
+        labels = [point["time"] for point in _build_points()] + ["23:45:00 31.12.99"]
+
+        parsed = parse_series_labels(labels)
+
+        expected = [
+            int((datetime.strptime(label, "%H:%M:%S %d.%m.%y") - datetime(1970, 1, 1)).total_seconds())
+            for label in labels
+        ]
+        assert parsed.tolist() == expected
+
+    def test_stale_array_is_ignored(self, tmp_path):
+        """A JSON file rewritten after the array takes precedence"""
+        write_historical_utilization_series(tmp_path, {"overall": _build_points()})
+        jsonPath = tmp_path / "overall.json"
+        arrayStat = (tmp_path / "overall.npy").stat()
+        os.utime(jsonPath, ns=(arrayStat.st_atime_ns, arrayStat.st_mtime_ns + 1_000_000))
+
+        assert find_series_array(jsonPath) is None
+
+
+class TestSeriesArrayConsumers:
+    """Forecast loaders read the array and agree with the JSON path"""
+
+    def test_overall_frame_matches_json(self, tmp_path):
+        """The training frame from .npy has the same times and float32-rounded values"""
+        points = _build_points()
+        _write_json_only(tmp_path / "json" / "series", points)
+        write_historical_utilization_series(tmp_path / "binary" / "series", {"overall": points})
+
+        jsonFrame = load_overall_series_frame(tmp_path / "json")
+        arrayFrame = load_overall_series_frame(tmp_path / "binary")
+
+        assert arrayFrame["time"].tolist() == jsonFrame["time"].tolist()
+        assert np.allclose(arrayFrame["cpu"], jsonFrame["cpu"], atol=1e-4)
+        assert np.allclose(arrayFrame["gpu"], jsonFrame["gpu"], atol=1e-4)
+
+    def test_feature_average_prefers_array(self, tmp_path):
+        """ForecastService averages come from the array when it is fresh"""
+        points = _build_points()
+        write_historical_utilization_series(tmp_path / "series", {"overall": points})
+        service = ForecastService.__new__(ForecastService)
+
+        average = service._loadFeatureAverage(tmp_path / "series" / "overall.json")
+
+        (tmp_path / "series" / "overall.npy").unlink()
+        jsonAverage = service._loadFeatureAverage(tmp_path / "series" / "overall.json")
+        assert average["gpu"] == jsonAverage["gpu"]
+        assert abs(average["cpu"] - jsonAverage["cpu"]) < 1e-4
+
+
+class TestSeriesSchemaVersions:
+    """v1 label and v2 epoch series are written and read alike"""
+
+    def test_epoch_converts_to_label_wall_clock(self):
+        """Epoch seconds map to the wall-clock seconds of their labels"""
+        timestamps = np.arange(START - 200 * 86400, START + 200 * 86400, 3600)
+
+        expected = parse_series_labels([format_timestamp(value) for value in timestamps.tolist()])
+
+        assert to_wall_clock_seconds(timestamps).tolist() == expected.tolist()
+
+    def test_metadata_records_schema_version(self, tmp_path):
+        """Epoch points are recorded as v2 and give the same array as v1 labels"""
+        write_historical_utilization_series(tmp_path / "v1", {"overall": _build_points()})
+        write_historical_utilization_series(tmp_path / "v2", {"overall": _build_epoch_points()})
+
+        versions = [
+            json.loads((tmp_path / name / "metadata.json").read_text(encoding="utf-8"))["schema_version"]
+            for name in ("v1", "v2")
+        ]
+        assert versions == [1, 2]
+        assert np.array_equal(
+            load_series_array(tmp_path / "v1" / "overall.npy"),
+            load_series_array(tmp_path / "v2" / "overall.npy"),
+        )
+
+    def test_training_frame_reads_both_versions(self, tmp_path):
+        """The JSON trainer path gives the same frame for v1 and v2 files"""
+        _write_json_only(tmp_path / "v1" / "series", _build_points())
+        _write_json_only(tmp_path / "v2" / "series", _build_epoch_points())
+
+        labelFrame = load_overall_series_frame(tmp_path / "v1")
+        epochFrame = load_overall_series_frame(tmp_path / "v2")
+
+        assert epochFrame.equals(labelFrame)
+
+
+class TestSeriesArrayTimeBase:
+    """The .npy time column holds epoch seconds whatever the exporter timezone"""
+
+    def test_array_time_is_epoch_across_dst_fall_back(self, tmp_path, berlin_timezone):
+        """A series spanning the Berlin fall-back keeps a sorted epoch column"""
+        timestamps = BERLIN_FALL_BACK_DAY + np.arange(16) * 900
+        points = [{"time": int(value), "cpu": 1.0, "gpu": 2.0} for value in timestamps.tolist()]
+
+        write_historical_utilization_series(tmp_path / "series", {"overall": points})
+
+        values = load_series_array(tmp_path / "series" / "overall.npy")
+        assert values["time"].tolist() == timestamps.tolist()
+        frame = load_overall_series_frame(tmp_path)
+        # В настенном времени час 02:00-03:00 повторяется: кадр оставляет последние точки.
+        assert frame["time"].is_monotonic_increasing
+        assert frame["time"].iloc[-1] == datetime(2025, 10, 26, 4, 45)
+
+    def test_labels_convert_back_to_epoch(self, berlin_timezone):
+        """v1 labels outside a repeated hour give back the instants they were made from"""
+        timestamps = np.arange(START - 200 * 86400, START + 200 * 86400, 3600)
+
+        wallSeconds = to_wall_clock_seconds(timestamps)
+        labels, labelCounts = np.unique(wallSeconds, return_counts=True)
+        uniqueMask = np.isin(wallSeconds, labels[labelCounts == 1])
+
+        assert not uniqueMask.all()
+        assert from_wall_clock_seconds(wallSeconds)[uniqueMask].tolist() == timestamps[uniqueMask].tolist()
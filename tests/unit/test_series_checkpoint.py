@@ -0,0 +1,232 @@
+"""
+Unit tests for checkpointed tail-only recomputation of utilization series
+"""
+
+import json
+from dataclasses import replace
+
+from storage.constants import SERIES_CHECKPOINT_FILE, SERIES_DIR
+from storage.series import (
+    build_historical_utilization_series,
+    build_historical_utilization_tail,
+    load_series_schema_version,
+    merge_historical_utilization_tail,
+    write_historical_utilization_series,
+)
+from storage.service import slurmStorage
+from storage.timeutils import floor_timestamp, format_timestamp
+from tests.fixtures.scheduler.scheduler_fixtures import build_mini_cluster_config
+from tests.integration.synthetic_data import (
+    BASE_TIME,
+    INTERVAL_1H,
+    build_incremental_dataset,
+    build_standard_test_dataset,
+)
+
+FIRST_NOW = BASE_TIME + 6 * INTERVAL_1H
+SECOND_NOW = BASE_TIME + 9 * INTERVAL_1H
+
+
+def _finish_running_rows(rows, endTimestamp):
+    return [
+        replace(row, time_end=endTimestamp, state=3, mod_time=endTimestamp)
+        for row in rows
+        if row.time_start > 0 and row.time_end == 0
+    ]
+
+
+def _load_exported_series(seriesDir):
+    return {
+        path.stem: json.loads(path.read_text(encoding="utf-8"))
+        for path in sorted(seriesDir.glob("*.json"))
+        if path.name != "metadata.json"
+    }
+
+
+class TestBuildHistoricalUtilizationTail:
+    """Tests for build_historical_utilization_tail and merge_historical_utilization_tail"""
+
+    def test_full_build_matches_series_builder(self):
+        """Without a checkpoint the tail builder produces the full history"""
+        jobs = [row.toHistoricalJob() for row in build_standard_test_dataset()]
+        config = build_mini_cluster_config()
+
+        series, checkpoint = build_historical_utilization_tail(
+            jobs=jobs, clusterConfig=config, nowTimestamp=FIRST_NOW
+        )
+
+        assert series == build_historical_utilization_series(
+            jobs=jobs, clusterConfig=config, nowTimestamp=FIRST_NOW
+        )
+        # Running jobs start at hour 5, so the boundary cannot move past them
+        assert checkpoint["boundary"] == floor_timestamp(BASE_TIME + 5 * INTERVAL_1H, 900)
+
+    def test_checkpointed_tail_matches_full_rebuild(self):
+        """Appending the recomputed tail gives the same series as a full rebuild"""
+        rows = build_standard_test_dataset()
+        config = build_mini_cluster_config()
+        series, checkpoint = build_historical_utilization_tail(
+            jobs=[row.toHistoricalJob() for row in rows],
+            clusterConfig=config,
+            nowTimestamp=FIRST_NOW,
+        )
+
+        finishedRows = _finish_running_rows(rows, FIRST_NOW + 1800)
+        finishedIds = {row.id_job for row in finishedRows}
+        allRows = [
+            row for row in rows if row.id_job not in finishedIds
+        ] + finishedRows + build_incremental_dataset()
+        tailJobs = [
+            row.toHistoricalJob()
+            for row in allRows
+            if row.time_start >= checkpoint["boundary"]
+        ]
+
+        tailSeries, nextCheckpoint = build_historical_utilization_tail(
+            jobs=tailJobs,
+            checkpoint=checkpoint,
+            clusterConfig=config,
+            nowTimestamp=SECOND_NOW,
+        )
+        merged = merge_historical_utilization_tail(series, tailSeries, checkpoint)
+
+        expected = build_historical_utilization_series(
+            jobs=[row.toHistoricalJob() for row in allRows],
+            clusterConfig=config,
+            nowTimestamp=SECOND_NOW,
+        )
+        assert merged == expected
+        assert nextCheckpoint["boundary"] > checkpoint["boundary"]
+
+    def test_job_before_boundary_requires_full_rebuild(self):
+        """A job starting before the sealed boundary invalidates the checkpoint"""
+        rows = build_standard_test_dataset()
+        config = build_mini_cluster_config()
+        _, checkpoint = build_historical_utilization_tail(
+            jobs=[row.toHistoricalJob() for row in rows],
+            clusterConfig=config,
+            nowTimestamp=FIRST_NOW,
+        )
+
+        assert build_historical_utilization_tail(
+            jobs=[row.toHistoricalJob() for row in rows],
+            checkpoint=checkpoint,
+            clusterConfig=config,
+            nowTimestamp=SECOND_NOW,
+        ) == (None, None)
+
+    def test_interval_change_requires_full_rebuild(self):
+        """Checkpoints are only valid for the interval they were taken with"""
+        rows = build_standard_test_dataset()
+        config = build_mini_cluster_config()
+        _, checkpoint = build_historical_utilization_tail(
+            jobs=[row.toHistoricalJob() for row in rows],
+            clusterConfig=config,
+            nowTimestamp=FIRST_NOW,
+        )
+
+        assert build_historical_utilization_tail(
+            jobs=[],
+            checkpoint=checkpoint,
+            clusterConfig=config,
+            intervalMinutes=60,
+            nowTimestamp=SECOND_NOW,
+        ) == (None, None)
+
+
+class TestTailOnlyIncrementalExport:
+    """Tests for slurmStorage.exportIncrementalHistoricalUtilization(tailOnly=True)"""
+
+    def test_tail_only_export_matches_full_export(self, tmp_path):
+        """Tail-only refresh writes the same series files as a full refresh"""
+        rows = build_standard_test_dataset()
+        updates = _finish_running_rows(rows, FIRST_NOW + 1800) + build_incremental_dataset()
+        config = build_mini_cluster_config()
+
+        for exportDir, tailOnly in ((tmp_path / "tail", True), (tmp_path / "full", False)):
+            storage = slurmStorage()
+            storage.exportIncrementalHistoricalUtilization(
+                outputDir=exportDir,
+                clusterConfig=config,
+                jobsOverride=rows,
+                nowTimestamp=FIRST_NOW,
+                tailOnly=tailOnly,
+            )
+            storage.exportIncrementalHistoricalUtilization(
+                outputDir=exportDir,
+                clusterConfig=config,
+                jobsOverride=updates,
+                nowTimestamp=SECOND_NOW,
+                tailOnly=tailOnly,
+            )
+
+        assert (tmp_path / "tail" / SERIES_CHECKPOINT_FILE).exists()
+        assert _load_exported_series(tmp_path / "tail" / SERIES_DIR) == _load_exported_series(
+            tmp_path / "full" / SERIES_DIR
+        )
+
+    def test_late_row_falls_back_to_full_rebuild(self, tmp_path):
+        """Rows older than the boundary trigger a full rebuild instead of a wrong tail"""
+        rows = build_standard_test_dataset()
+        config = build_mini_cluster_config()
+        storage = slurmStorage()
+        storage.exportIncrementalHistoricalUtilization(
+            outputDir=tmp_path,
+            clusterConfig=config,
+            jobsOverride=rows[1:],
+            nowTimestamp=FIRST_NOW,
+            tailOnly=True,
+        )
+
+        storage.exportIncrementalHistoricalUtilization(
+            outputDir=tmp_path,
+            clusterConfig=config,
+            jobsOverride=rows[:1],
+            nowTimestamp=FIRST_NOW,
+            tailOnly=True,
+        )
+
+        expected = build_historical_utilization_series(
+            jobs=[row.toHistoricalJob() for row in rows],
+            clusterConfig=config,
+            nowTimestamp=FIRST_NOW,
+        )
+        assert _load_exported_series(tmp_path / SERIES_DIR) == expected
+
+    def test_v1_series_fall_back_to_full_rebuild(self, tmp_path):
+        """Series exported with v1 labels are rebuilt as v2 instead of merged"""
+        rows = build_standard_test_dataset()
+        config = build_mini_cluster_config()
+        storage = slurmStorage()
+        storage.exportIncrementalHistoricalUtilization(
+            outputDir=tmp_path,
+            clusterConfig=config,
+            jobsOverride=rows,
+            nowTimestamp=FIRST_NOW,
+            tailOnly=True,
+        )
+        seriesDir = tmp_path / SERIES_DIR
+        write_historical_utilization_series(
+            seriesDir,
+            {
+                name: [{**point, "time": format_timestamp(point["time"])} for point in points]
+                for name, points in _load_exported_series(seriesDir).items()
+            },
+        )
+        assert load_series_schema_version(seriesDir) == 1
+
+        storage.exportIncrementalHistoricalUtilization(
+            outputDir=tmp_path,
+            clusterConfig=config,
+            jobsOverride=build_incremental_dataset(),
+            nowTimestamp=SECOND_NOW,
+            tailOnly=True,
+        )
+
+        expected = build_historical_utilization_series(
+            jobs=[row.toHistoricalJob() for row in rows + build_incremental_dataset()],
+            clusterConfig=config,
+            nowTimestamp=SECOND_NOW,
+        )
+        assert load_series_schema_version(seriesDir) == 2
+        assert _load_exported_series(seriesDir) == expected
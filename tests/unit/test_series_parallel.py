@@ -0,0 +1,97 @@
+"""
+Unit tests for process-pool parallel utilization series building
+"""
+
+import numpy as np
+import pytest
+
+from storage import series_parallel
+from storage.series import build_historical_utilization_series, build_historical_utilization_tail
+from tests.fixtures.scheduler.scheduler_fixtures import build_mini_cluster_config
+from tests.integration.synthetic_data import (
+    INTERVAL_15M,
+    build_incremental_dataset,
+    build_standard_test_dataset,
+)
+
+
+def _build_jobs():
+    rows = build_standard_test_dataset() + build_incremental_dataset()
+    return [row.toHistoricalJob() for row in rows]
+
+
+class TestSharedEventArrays:
+    """Tests for the shared memory transport of event deltas"""
+
+    def test_slices_roundtrip(self):
+        """Every series reads back exactly its own sorted deltas"""
+        eventsBySeries = {
+            "type_a": {30: {"cpu": 1.5, "gpu": 0.0}, 10: {"cpu": 2.0, "gpu": 1.0}},
+            "type_b": {},
+            "overall": {20: {"cpu": -0.25, "gpu": 3.0}},
+        }
+
+        with series_parallel.SharedEventArrays(eventsBySeries) as sharedEvents:
+            typeA = series_parallel.read_shared_event_arrays(sharedEvents.getHandle("type_a"))
+            typeB = series_parallel.read_shared_event_arrays(sharedEvents.getHandle("type_b"))
+            overall = series_parallel.read_shared_event_arrays(sharedEvents.getHandle("overall"))
+
+        assert typeA[0].tolist() == [10, 30]
+        assert typeA[1].tolist() == [2.0, 1.5]
+        assert typeA[2].tolist() == [1.0, 0.0]
+        assert all(len(column) == 0 for column in typeB)
+        assert overall[1].dtype == np.float64
+        assert overall[1].tolist() == [-0.25]
+
+    def test_job_chunks_keep_order(self, monkeypatch):
+        """Chunks are contiguous job ranges limited by the worker count"""
+        monkeypatch.setattr(series_parallel, "PARALLEL_EVENT_MIN_JOBS_PER_CHUNK", 2)
+
+        chunks = series_parallel.split_job_chunks(list(range(7)), workers=3)
+
+        assert chunks == [[0, 1, 2], [3, 4, 5], [6]]
+        assert series_parallel.split_job_chunks(list(range(3)), workers=3) == [[0, 1, 2]]
+
+
+class TestParallelSeriesBuild:
+    """Parallel builds must reproduce the serial output of both engines"""
+
+    @pytest.fixture(autouse=True)
+    def _small_chunks(self, monkeypatch):
+        monkeypatch.setattr(series_parallel, "PARALLEL_EVENT_MIN_JOBS_PER_CHUNK", 3)
+
+    @pytest.mark.parametrize("engine", ["python", "numpy"])
+    def test_parallel_matches_serial(self, engine):
+        """Chunked events and per-feature workers give the serial series"""
+        jobs = _build_jobs()
+        nowTimestamp = max(job.timeStart for job in jobs) + 3 * INTERVAL_15M
+        config = build_mini_cluster_config()
+
+        serial = build_historical_utilization_series(
+            jobs=jobs, clusterConfig=config, nowTimestamp=nowTimestamp, engine=engine
+        )
+        parallel = build_historical_utilization_series(
+            jobs=jobs,
+            clusterConfig=config,
+            nowTimestamp=nowTimestamp,
+            engine=engine,
+            workers=3,
+        )
+
+        assert serial["overall"]
+        assert parallel == serial
+
+    def test_parallel_tail_matches_serial(self):
+        """Tail builds also return the same checkpoint when run in parallel"""
+        jobs = _build_jobs()
+        nowTimestamp = max(job.timeStart for job in jobs) + 3 * INTERVAL_15M
+        config = build_mini_cluster_config()
+
+        serial = build_historical_utilization_tail(
+            jobs=jobs, clusterConfig=config, nowTimestamp=nowTimestamp
+        )
+        parallel = build_historical_utilization_tail(
+            jobs=jobs, clusterConfig=config, nowTimestamp=nowTimestamp, workers=2
+        )
+
+        assert parallel == serial
@@ -0,0 +1,191 @@
+"""
+Unit tests for 1h/6h/1d utilization series rollups
+"""
+
+import shutil
+import time
+
+import numpy as np
+import pytest
+
+from forecast.training import build_current_year_seasonality_points
+from storage.series import write_historical_utilization_series
+from storage.series_rollup import (
+    SERIES_ROLLUP_RESOLUTIONS,
+    build_series_rollup,
+    load_series_rollup,
+    query_series_rollup,
+)
+from storage.timeutils import format_timestamp
+
+START = 1_700_000_000
+# 2025-10-26 00:00 UTC: in Europe/Berlin the clocks go back from 03:00 to 02:00 at 01:00 UTC.
+BERLIN_FALL_BACK_DAY = 1_761_436_800
+# Локальная полночь 25.10.2025 в Берлине (CEST, UTC+2).
+BERLIN_MIDNIGHT = BERLIN_FALL_BACK_DAY - 86400 - 7200
+
+
+@pytest.fixture
+def berlin_timezone(monkeypatch):
+    monkeypatch.setenv("TZ", "Europe/Berlin")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _build_points(count, offset=0):
+    random = np.random.default_rng(7)
+    cpuValues = np.round(random.uniform(0.0, 100.0, count + offset), 2)
+    gpuValues = np.round(random.uniform(0.0, 100.0, count + offset), 2)
+    return [
+        {
+            "time": format_timestamp(START + index * 900),
+            "cpu": float(cpuValues[index]),
+            "gpu": float(gpuValues[index]),
+        }
+        for index in range(offset, offset + count)
+    ]
+
+
+class TestBuildSeriesRollup:
+    """Tests for bucket statistics"""
+
+    def test_stats_match_numpy(self):
+        """Mean, min, max and percentiles agree with numpy per bucket"""
+        timestamps = np.arange(30, dtype=np.int64) * 900 + 1800
+        values = np.random.default_rng(3).uniform(0.0, 100.0, 30)
+
+        rows = build_series_rollup(timestamps, values, values[::-1], 6 * 3600)
+
+        assert rows["time"].tolist() == [0, 21600]
+        assert rows["count"].tolist() == [22, 8]
+        firstBucket = values[:22]
+        assert np.isclose(rows["cpu_mean"][0], firstBucket.mean())
+        assert rows["cpu_min"][0] == firstBucket.min()
+        assert rows["cpu_max"][0] == firstBucket.max()
+        assert np.isclose(rows["cpu_p50"][0], np.median(firstBucket))
+        assert np.isclose(rows["cpu_p95"][1], np.percentile(values[22:], 95))
+        assert np.isclose(rows["gpu_p95"][1], np.percentile(values[::-1][22:], 95))
+
+
+class TestSeriesRollupFiles:
+    """Tests for rollup export, incremental update and lookup"""
+
+    def test_incremental_update_matches_full_build(self, tmp_path):
+        """Rewriting only buckets after the boundary gives the full rollup"""
+        points = _build_points(500)
+        boundary = START + 300 * 900
+        write_historical_utilization_series(tmp_path / "tail", {"overall": points[:350]})
+        write_historical_utilization_series(
+            tmp_path / "tail", {"overall": points}, rollupFromTimestamp=boundary
+        )
+        write_historical_utilization_series(tmp_path / "full", {"overall": points})
+
+        for resolution in SERIES_ROLLUP_RESOLUTIONS:
+            incremental = load_series_rollup(tmp_path / "tail", "overall", resolution)
+            full = load_series_rollup(tmp_path / "full", "overall", resolution)
+            assert np.array_equal(incremental.values, full.values)
+
+    def test_changed_prefix_forces_full_build(self, tmp_path):
+        """Stored rows that do not cover the unchanged prefix are discarded"""
+        write_historical_utilization_series(
+            tmp_path / "tail", {"overall": _build_points(200, offset=4)}
+        )
+        points = _build_points(300)
+
+        write_historical_utilization_series(
+            tmp_path / "tail", {"overall": points}, rollupFromTimestamp=START + 250 * 900
+        )
+        write_historical_utilization_series(tmp_path / "full", {"overall": points})
+
+        for resolution in SERIES_ROLLUP_RESOLUTIONS:
+            incremental = load_series_rollup(tmp_path / "tail", "overall", resolution)
+            full = load_series_rollup(tmp_path / "full", "overall", resolution)
+            assert np.array_equal(incremental.values, full.values)
+
+    def test_query_picks_resolution_for_budget(self, tmp_path):
+        """The finest resolution within the point budget is returned"""
+        write_historical_utilization_series(tmp_path, {"overall": _build_points(960)})
+
+        base = query_series_rollup(tmp_path, "overall", maxPoints=1000, intervalSeconds=900)
+        hourly = query_series_rollup(tmp_path, "overall", maxPoints=300, intervalSeconds=900)
+        daily = query_series_rollup(tmp_path, "overall", maxPoints=5, intervalSeconds=900)
+        window = query_series_rollup(
+            tmp_path,
+            "overall",
+            startTime=int(hourly.values["time"][10]),
+            endTime=int(hourly.values["time"][20]),
+            maxPoints=12,
+        )
+
+        assert base.resolution == "15m" and len(base.values) == 960
+        assert hourly.resolution == "1h" and len(hourly.values) == 240
+        assert daily.resolution == "1d" and len(daily.values) <= 11
+        assert window.resolution == "1h" and len(window.values) == 10
+
+    def test_seasonality_from_daily_rollup(self, tmp_path):
+        """Daily rollup medians give the same seasonality as the JSON series"""
+        seriesDir = tmp_path / "series"
+        write_historical_utilization_series(seriesDir, {"overall": _build_points(96 * 40)})
+
+        fromRollup = build_current_year_seasonality_points(seriesDir=tmp_path)
+        shutil.rmtree(seriesDir / "rollups")
+        (seriesDir / "overall.npy").unlink()
+        fromJson = build_current_year_seasonality_points(seriesDir=tmp_path)
+
+        assert fromRollup["points"]
+        assert fromRollup == fromJson
+
+
+class TestSeriesRollupTimeBase:
+    """Tests for epoch rollup times under a DST change"""
+
+    def test_daily_buckets_start_at_local_midnight_epoch(self, tmp_path, berlin_timezone):
+        """Daily rows hold the epoch of local midnight and the 25-hour day stays whole"""
+        timestamps = BERLIN_MIDNIGHT + np.arange(96 + 100 + 96) * 900
+        points = [{"time": int(value), "cpu": 1.0, "gpu": 2.0} for value in timestamps.tolist()]
+
+        write_historical_utilization_series(tmp_path, {"overall": points})
+
+        daily = load_series_rollup(tmp_path, "overall", "1d").values
+        hourly = load_series_rollup(tmp_path, "overall", "1h").values
+        assert daily["time"].tolist() == [
+            BERLIN_MIDNIGHT,
+            BERLIN_MIDNIGHT + 86400,
+            BERLIN_MIDNIGHT + 2 * 86400 + 3600,
+        ]
+        assert daily["count"].tolist() == [96, 100, 96]
+        assert np.all(np.diff(hourly["time"]) > 0)
+        assert hourly["count"].sum() == len(timestamps)
+
+    def test_query_and_incremental_update_use_epoch(self, tmp_path, berlin_timezone):
+        """Epoch query bounds and a tail update across the fall-back match the full build"""
+        timestamps = BERLIN_MIDNIGHT + np.arange(96 + 100 + 96) * 900
+        points = [
+            {"time": int(value), "cpu": float(index % 7), "gpu": 2.0}
+            for index, value in enumerate(timestamps.tolist())
+        ]
+        boundary = BERLIN_FALL_BACK_DAY + 3600
+        write_historical_utilization_series(tmp_path / "tail", {"overall": points[:150]})
+        write_historical_utilization_series(
+            tmp_path / "tail", {"overall": points}, rollupFromTimestamp=boundary
+        )
+        write_historical_utilization_series(tmp_path / "full", {"overall": points})
+
+        for resolution in SERIES_ROLLUP_RESOLUTIONS:
+            incremental = load_series_rollup(tmp_path / "tail", "overall", resolution)
+            full = load_series_rollup(tmp_path / "full", "overall", resolution)
+            assert np.array_equal(incremental.values, full.values)
+
+        fallBackDay = query_series_rollup(
+            tmp_path / "full",
+            "overall",
+            startTime=BERLIN_MIDNIGHT + 86400,
+            endTime=BERLIN_MIDNIGHT + 2 * 86400 + 3600,
+            maxPoints=30,
+            intervalSeconds=900,
+        )
+        assert fallBackDay.resolution == "1h"
+        assert len(fallBackDay.values) == 24
+        assert fallBackDay.values["count"].sum() == 100
@@ -0,0 +1,101 @@
+"""
+Unit tests for the synthetic workload generator and the SQLite slurmDB backend
+"""
+
+from benchmarks.workload import (
+    build_synthetic_cluster_config,
+    build_synthetic_slurmdb,
+    generate_synthetic_job_rows,
+)
+from storage.active_jobs import ActiveJobSet
+from storage.cache import load_cached_historical_job_rows
+from storage.constants import PENDING_STATE, RAW_JOBS_CACHE_DIR
+from storage.repository import SlurmDBRepository
+from storage.service import slurmStorage
+
+WORKLOAD = {"spanDays": 14, "jobsPerDay": 150, "arrayShare": 0.2, "burstsPerWeek": 3.5, "seed": 7}
+
+
+def _build_cluster():
+    return build_synthetic_cluster_config(nodeCount=96, featureCount=6, partitionCount=3)
+
+
+def _sorted_rows(rows):
+    return sorted(rows, key=lambda row: row.job_db_inx)
+
+
+class TestSyntheticWorkload:
+    """Generated clusters and job histories are consistent and reproducible"""
+
+    def test_cluster_splits_nodes_between_features_and_partitions(self):
+        """Every node belongs to one feature and the normal partition"""
+        clusterConfig = _build_cluster()
+        capacities = clusterConfig.getNodeCapacitiesAt(0)
+
+        assert len(capacities) == 96
+        assert len(clusterConfig.getFeatureNames()) == 6
+        assert len(clusterConfig.getPartitionNodeNames("normal", 0)) == 96
+        assert sum(len(clusterConfig.getPartitionNodeNames(f"part_{index}", 0)) for index in range(2)) == 96
+        assert any(capacity["gpu"] > 0 for capacity in capacities.values())
+
+    def test_rows_are_reproducible_and_fit_the_cluster(self):
+        """The same seed gives the same rows, and jobs run on nodes of their feature"""
+        clusterConfig = _build_cluster()
+        rows = generate_synthetic_job_rows(clusterConfig, **WORKLOAD)
+
+        assert rows == generate_synthetic_job_rows(clusterConfig, **WORKLOAD)
+        assert rows != generate_synthetic_job_rows(clusterConfig, **{**WORKLOAD, "seed": 8})
+        assert len({row.job_db_inx for row in rows}) == len(rows)
+        for row in rows:
+            if row.time_start > 0:
+                nodeFeatures = clusterConfig.getFeatureNodeCountsForHostlist(row.nodelist)
+                assert nodeFeatures == {row.constraints: row.nodes_alloc}
+                assert row.time_start >= row.time_submit
+
+    def test_rows_include_arrays_running_and_pending_jobs(self):
+        """Array tasks share a submit time, and the span end leaves running and pending jobs"""
+        rows = generate_synthetic_job_rows(_build_cluster(), **WORKLOAD)
+        arrayTasks = {}
+        for row in rows:
+            if "_array_" in row.job_name:
+                arrayTasks.setdefault((row.job_name, row.time_submit), []).append(row)
+
+        assert any(len(tasks) >= 4 for tasks in arrayTasks.values())
+        assert any(row.time_start > 0 and row.time_end == 0 for row in rows)
+        assert any(row.state == PENDING_STATE and row.time_start == 0 for row in rows)
+
+
+class TestSQLiteSlurmDB:
+    """slurmStorage runs unchanged on top of the SQLite slurmDB"""
+
+    def test_storage_queries_and_backfill_match_generated_rows(self, tmp_path):
+        """Pending queue, running jobs and a parallel backfill read the generated history"""
+        clusterConfig = _build_cluster()
+        rows = generate_synthetic_job_rows(clusterConfig, **WORKLOAD)
+        database = build_synthetic_slurmdb(tmp_path / "slurmdb.sqlite", clusterConfig, **WORKLOAD)
+        endTimestamp = max(row.mod_time for row in rows)
+
+        storage = slurmStorage(
+            activeJobs=ActiveJobSet(),
+            repository=SlurmDBRepository(pool=database.createPool(size=4)),
+        ).create()
+        try:
+            pendingJobs = storage.getPendingJobs()
+            runningJobs = storage.getRunningJobs(endTimestamp)
+            storage.syncHistoricalJobsCache(
+                outputDir=tmp_path / "export",
+                historyStart=min(row.mod_time for row in rows),
+                modifiedUntil=endTimestamp,
+                backfillChunkDays=2,
+                backfillWorkers=3,
+            )
+        finally:
+            storage.close()
+
+        startedRows = [row for row in rows if row.time_start > 0]
+        assert database.countRows() == len(rows)
+        assert {job.jobID for job in pendingJobs} == {row.id_job for row in rows if row.state == PENDING_STATE}
+        assert {job.jobID for job in runningJobs} == {row.id_job for row in startedRows if row.time_end == 0}
+        assert _sorted_rows(load_cached_historical_job_rows(tmp_path / "export" / RAW_JOBS_CACHE_DIR)) == _sorted_rows(
+            startedRows
+        )
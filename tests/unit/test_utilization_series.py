@@ -2,18 +2,27 @@
 Unit tests for storage.series module - utilization calculation and overflow handling
 """
 
-from datetime import datetime
+from dataclasses import replace
 
 import pytest
 
 from storage.series import (
     _calculate_utilization,
     _cleanup_overflow_points,
+    _ClusterConfigTimeline,
+    _collect_feature_events,
     _count_overflow_points,
+    _resolve_job_feature_resource_shares,
     build_historical_utilization_series,
 )
+from config.models import NodeCountPeriod
 from tests.fixtures.scheduler.scheduler_fixtures import build_mini_cluster_config
-from tests.integration.synthetic_data import INTERVAL_15M, SyntheticJobFactory
+from tests.integration.synthetic_data import (
+    INTERVAL_15M,
+    SyntheticJobFactory,
+    build_incremental_dataset,
+    build_standard_test_dataset,
+)
 
 
 class TestCalculateUtilization:
@@ -382,6 +391,148 @@ class TestSeriesRangeEnd:
         overall_series = series["overall"]
         assert overall_series
         assert overall_series[-1]["gpu"] > 0.0
-        assert datetime.strptime(overall_series[-1]["time"], "%H:%M:%S %d.%m.%y") < datetime.fromtimestamp(
-            now_timestamp
+        assert overall_series[-1]["time"] < now_timestamp
+
+
+class TestSeriesEngines:
+    """The numpy sweep engine must reproduce the loop engine output exactly"""
+
+    def _build_jobs(self):
+        rows = build_standard_test_dataset() + build_incremental_dataset()
+        return [row.toHistoricalJob() for row in rows]
+
+    def _build_both(self, jobs, clusterConfig, nowTimestamp=None):
+        return [
+            build_historical_utilization_series(
+                jobs=jobs,
+                clusterConfig=clusterConfig,
+                intervalMinutes=15,
+                nowTimestamp=nowTimestamp,
+                engine=engine,
+            )
+            for engine in ("python", "numpy")
+        ]
+
+    def test_engines_match_on_standard_dataset(self):
+        """Both engines produce identical series for the synthetic dataset"""
+        jobs = self._build_jobs()
+        now_timestamp = max(job.timeStart for job in jobs) + 3 * INTERVAL_15M
+
+        python_series, numpy_series = self._build_both(
+            jobs, build_mini_cluster_config(), now_timestamp
+        )
+
+        assert python_series["overall"]
+        assert numpy_series == python_series
+
+    def test_engines_match_with_node_count_history(self):
+        """Capacity steps from node count history are applied at the same buckets"""
+        jobs = self._build_jobs()
+        cluster_config = build_mini_cluster_config()
+        first_start = min(job.timeStart for job in jobs)
+        cluster_config.node_groups[0] = replace(
+            cluster_config.node_groups[0],
+            history=[
+                NodeCountPeriod(node_count=2, start=None, end=first_start + 2 * 3600 + 60),
+                NodeCountPeriod(node_count=4, start=first_start + 2 * 3600 + 60, end=None),
+            ],
+        )
+
+        python_series, numpy_series = self._build_both(
+            jobs, cluster_config, max(job.timeStart for job in jobs) + INTERVAL_15M
+        )
+
+        assert numpy_series == python_series
+
+    def test_engines_match_on_overflow_cleanup(self):
+        """Leading overflow trimming and clipping behave the same in both engines"""
+        factory = SyntheticJobFactory()
+        rows = [
+            factory.completed_cpu_job(
+                feature="type_a", node="cn-001", cpus=60, duration_seconds=2 * 3600
+            ),
+            factory.completed_cpu_job(
+                feature="type_a",
+                node="cn-002",
+                cpus=4,
+                start_offset=3 * 3600,
+                duration_seconds=3600,
+            ),
+            factory.completed_cpu_job(
+                feature="type_a",
+                node="cn-003",
+                cpus=20,
+                start_offset=5 * 3600,
+                duration_seconds=3600,
+            ),
+        ]
+        jobs = [row.toHistoricalJob() for row in rows]
+
+        python_series, numpy_series = self._build_both(jobs, build_mini_cluster_config())
+
+        assert python_series["type_a"][0]["cpu"] <= 100.0
+        assert max(point["cpu"] for point in python_series["overall"]) > 100.0
+        assert numpy_series == python_series
+
+    def test_unknown_engine_is_rejected(self):
+        """Unknown engine names fail fast"""
+        with pytest.raises(ValueError, match="Unknown utilization series engine"):
+            build_historical_utilization_series(
+                jobs=[],
+                clusterConfig=build_mini_cluster_config(),
+                engine="fortran",
+            )
+
+
+class TestHostlistShareCache:
+    """Memoized hostlist share resolution used by event aggregation"""
+
+    def test_same_nodelist_resolves_once(self):
+        """Jobs on the same nodelist within one node-count epoch hit the cache"""
+        factory = SyntheticJobFactory()
+        jobs = [
+            factory.completed_cpu_job(
+                feature="type_a", node="cn-001", cpus=2, start_offset=index * 3600
+            ).toHistoricalJob()
+            for index in range(4)
+        ]
+        timeline = _ClusterConfigTimeline.from_cluster_config(build_mini_cluster_config())
+
+        _, _, diagnostics = _collect_feature_events(
+            jobs=jobs,
+            clusterConfigTimeline=timeline,
+            nowTimestamp=max(job.timeEnd for job in jobs),
+        )
+
+        assert diagnostics["hostlist_share_cache_misses"] == 1
+        assert diagnostics["hostlist_share_cache_hits"] == 3
+
+    def test_node_count_epoch_change_misses(self):
+        """A node-count history boundary between jobs forces a new resolution"""
+        factory = SyntheticJobFactory()
+        jobs = [
+            factory.completed_cpu_job(
+                feature="type_a", node="cn-[001-004]", cpus=8, start_offset=offset
+            ).toHistoricalJob()
+            for offset in (0, 4 * 3600)
+        ]
+        cluster_config = build_mini_cluster_config()
+        cluster_config.node_groups[0] = replace(
+            cluster_config.node_groups[0],
+            history=[
+                NodeCountPeriod(node_count=2, start=None, end=jobs[1].timeStart),
+                NodeCountPeriod(node_count=4, start=jobs[1].timeStart, end=None),
+            ],
         )
+        timeline = _ClusterConfigTimeline.from_cluster_config(cluster_config)
+        shareCache = timeline.getHostlistShareCache()
+
+        early = shareCache.resolve(jobs[0], cluster_config, jobs[0].timeStart)
+        late = shareCache.resolve(jobs[1], cluster_config, jobs[1].timeStart)
+
+        assert (shareCache.hits, shareCache.misses) == (0, 2)
+        for job, shares in ((jobs[0], early), (jobs[1], late)):
+            expected = _resolve_job_feature_resource_shares(job, cluster_config, job.timeStart)
+            assert shares == tuple(
+                (feature, value["cpu"], value["gpu"]) for feature, value in expected.items()
+            )